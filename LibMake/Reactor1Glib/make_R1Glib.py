@@ -82,12 +82,14 @@ def write_H5(h5name = "reactor.h5"):
 
 	FromIso = [] 
 	ToIso = [] 
+	ToIso_keys = []
 
 	#Create Groups
 	libfile.createGroup(lbr, "Burnup")
 	libfile.createGroup(lbr, "Production")
 	libfile.createGroup(lbr, "Destruction")
 	libfile.createGroup(lbr, "Transmutation")
+	libfile.createGroup(lbr, "TransmutationMatrix")
 
 	#Fill Groups
 	for iso in BUi_F_.keys():
@@ -111,6 +113,14 @@ def write_H5(h5name = "reactor.h5"):
 			libfile.createArray("/Transmutation/" + i_LL, j_LL, Tij_F_[i][j], "Transmutation Matrix T(F) from {0} to {1}".format(i_LL, j_LL)) 	
 			if int(i) == 922350:
 				ToIso.append(j_LL)
+				ToIso_keys.append(j)
+
+	#Also write each transmutation matrix as a single (ToIso x Fluence) array, 
+	#so that it may be read in all at once.
+	for i in Tij_F_.keys():
+		i_LL =  isoname.zzaaam_2_LLAAAM(int(i))
+		T = [Tij_F_[i].get(j, [0.0] * len(F)) for j in ToIso_keys]
+		libfile.createArray("/TransmutationMatrix", i_LL, T, "Transmutation Matrix T(F) from {0} to each of ToIso".format(i_LL)) 	
 
 	libfile.createArray(lbr, "FromIso_LL", FromIso, "Initial Loading Nuclide List (LL)")
 	libfile.createArray(lbr, "FromIso_zz", isoname.LLAAAM_2_zzaaam_List(FromIso), "Initial Loading Nuclide List (zz)")
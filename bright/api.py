@@ -1,5 +1,6 @@
 """Bright API"""
-from bright.bright_config import bright_conf, load_track_nucs_hdf5, load_track_nucs_text, sort_track_nucs
+from bright.bright_config import bright_conf, load_track_nucs_hdf5, load_track_nucs_text, sort_track_nucs, \
+    close_output_hdf5, solve_eigenvalue
 
 from bright.fccomp import FCComp
 
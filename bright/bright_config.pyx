@@ -7,6 +7,7 @@ from cython.operator cimport dereference as deref
 from cython.operator cimport preincrement as inc
 from libc.stdlib cimport free
 from libcpp.string cimport string as std_string
+from libcpp.vector cimport vector
 
 cimport numpy as np
 import numpy as np
@@ -145,6 +146,18 @@ cdef class BrightConf:
             cpp_bright.write_text = value
 
 
+    property lazy_libraries:
+        """Boolean flag for whether reactor libraries read in their transmutation data 
+        only as it is needed by the feed, rather than all at once when first loaded 
+        (default False).  When this is set and track_nucs is not empty, only daughter 
+        nuclides in track_nucs are read in."""
+        def __get__(self):
+            return cpp_bright.lazy_libraries
+
+        def __set__(self, bint value):
+            cpp_bright.lazy_libraries = value
+
+
     property output_filename:
         """Path to outputh file."""
         def __get__(self):
@@ -155,6 +168,39 @@ cdef class BrightConf:
             cpp_bright.output_filename = std_string(value)
 
 
+    property hdf5_buffer_passes:
+        """Number of passes that each component holds in memory before writing 
+        them to the HDF5 output file (default 1).  Larger values make for fewer, 
+        larger writes, but passes still in memory must be written out with 
+        FCComp.flush_hdf5() before the component goes away."""
+        def __get__(self):
+            return cpp_bright.hdf5_buffer_passes
+
+        def __set__(self, int value):
+            cpp_bright.hdf5_buffer_passes = value
+
+
+    property hdf5_chunk_passes:
+        """Number of passes per chunk of the HDF5 output datasets (default 10).
+        This only applies to datasets which are created after it is set."""
+        def __get__(self):
+            return cpp_bright.hdf5_chunk_passes
+
+        def __set__(self, int value):
+            cpp_bright.hdf5_chunk_passes = value
+
+
+    property hdf5_compression:
+        """The gzip compression level (1-9) of the HDF5 output datasets, or 0 for 
+        no compression (default 0).  This only applies to datasets which are 
+        created after it is set."""
+        def __get__(self):
+            return cpp_bright.hdf5_compression
+
+        def __set__(self, int value):
+            cpp_bright.hdf5_compression = value
+
+
 # Make a singleton of the Bright config object
 bright_conf = BrightConf()
 
@@ -221,5 +267,57 @@ def sort_track_nucs():
     cpp_bright.sort_track_nucs()
 
 
+def close_output_hdf5():
+    """Closes the HDF5 output file.  This file is opened once and then kept open 
+    by all components between writes, so that it must be closed before other 
+    programs may safely read it.  It is reopened by the next write."""
+    cpp_bright.close_output_hdf5()
+
+
+def solve_eigenvalue(A, F, w, phi=None, double k=1.0, char * method="wielandt", 
+                     double tol=1E-8, int max_iter=500):
+    """Finds the fundamental mode of the generalized eigenvalue problem 
+    A phi = (1/k) F phi.  This is the solver which ReactorMG uses for 
+    criticality, with A the absorption and F the fission matrix.
 
+    Parameters
+    ----------
+    A : 2D array_like
+        Square matrix on the left hand side.
+    F : 2D array_like
+        Square matrix on the right hand side, of the same shape as A.
+    w : array_like
+        Weights, typically nubar Sigma_f, which k is updated with.
+    phi : array_like or None, optional
+        Initial guess at the eigenvector, flat if not given.
+    k : float, optional
+        Initial guess at the eigenvalue.
+    method : str, optional
+        Iteration method, one of "power", "wielandt", or "anderson".
+    tol : float, optional
+        Convergence tolerance on the relative change in k and phi.
+    max_iter : int, optional
+        Maximum number of iterations.
+
+    Returns
+    -------
+    k : float
+        Eigenvalue.
+    phi : numpy array
+        Eigenvector, normalized to sum to one.
+    iterations : int
+        Number of iterations taken.
+    residual : float
+        Final relative change in k and phi.
 
+    """
+    cdef vector[vector[double]] cpp_A = np.asarray(A, dtype='float64').tolist()
+    cdef vector[vector[double]] cpp_F = np.asarray(F, dtype='float64').tolist()
+    cdef vector[double] cpp_w = np.asarray(w, dtype='float64').tolist()
+    if phi is None:
+        phi = np.ones(len(cpp_w), dtype='float64')
+    cdef vector[double] cpp_phi = np.asarray(phi, dtype='float64').tolist()
+    cdef double residual = 0.0
+    cdef int iterations = cpp_bright.solve_eigenvalue(cpp_A, cpp_F, cpp_w, cpp_phi, k, 
+                                                      std_string(method), tol, max_iter, &residual)
+    return k, np.array(cpp_phi), iterations, residual
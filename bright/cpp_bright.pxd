@@ -20,7 +20,28 @@ cdef extern from "bright.h" namespace "bright":
     int verbosity
     bint write_hdf5
     bint write_text
+    bint lazy_libraries
 
     std_string output_filename
 
+    int hdf5_buffer_passes
+    int hdf5_chunk_passes
+    int hdf5_compression
+
+    void close_output_hdf5() except +
+
+    cdef cppclass sparse_matrix_entry[T]:
+        int row
+        int col
+        T val
+
+    cdef cppclass SparseMatrix[T]:
+        int nrows
+        int ncols
+        vector[sparse_matrix_entry[T]] sm
+        int size()
+
+    int solve_eigenvalue(vector[vector[double]] &, vector[vector[double]] &, vector[double] &, \
+                         vector[double] &, double &, std_string, double, int, double *) except +
+
 
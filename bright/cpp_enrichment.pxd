@@ -12,6 +12,7 @@ from bright cimport cpp_enrichment_parameters
 from bright cimport cpp_fccomp
 from libcpp.map cimport map as cpp_map
 from libcpp.string cimport string as std_string
+from libcpp.vector cimport vector as cpp_vector
 from pyne cimport cpp_material
 from pyne cimport cpp_nucname
 
@@ -53,12 +54,14 @@ cdef extern from "bright_enrichment.h" namespace "bright":
         cpp_material.Material calc() except +
         cpp_material.Material calc(cpp_map[int, double]) except +
         cpp_material.Material calc(cpp_material.Material) except +
+        void calc_many(cpp_vector[double] &, cpp_vector[double] &, cpp_vector[double] &, cpp_vector[double] &, cpp_vector[double] &, cpp_vector[double] &, cpp_vector[double] &) nogil except +
         void calc_params() except +
         double deltaU_i_OverG(int) except +
         double get_Ei(double) except +
         double get_Si(double) except +
         double get_alphastar_i(double) except +
         void initialize(cpp_enrichment_parameters.EnrichmentParameters) except +
+        double optimize_tails(double, double) except +
         double xP_i(int) except +
         double xW_i(int) except +
         pass
@@ -37,6 +37,7 @@ cdef extern from "fccomp.h" namespace "bright":
         cpp_material.Material calc(cpp_map[int, double]) except +
         cpp_material.Material calc(cpp_material.Material) except +
         void calc_params() except +
+        void flush_hdf5() except +
         void write() except +
         void write_hdf5() except +
         void write_mat_pass() except +
@@ -13,6 +13,7 @@ from bright cimport cpp_reactor1g
 from libcpp.map cimport map as cpp_map
 from libcpp.set cimport set as cpp_set
 from libcpp.string cimport string as std_string
+from libcpp.vector cimport vector as cpp_vector
 from pyne cimport cpp_material
 
 cdef extern from "fuel_fabrication.h" namespace "bright":
@@ -40,6 +41,7 @@ cdef extern from "fuel_fabrication.h" namespace "bright":
         cpp_material.Material calc(cpp_map[std_string, cpp_material.Material *], cpp_map[std_string, double], cpp_reactor1g.Reactor1G) except +
         cpp_material.Material calc_core_input() except +
         void calc_deltaRs() except +
+        void calc_many(cpp_vector[cpp_map[std_string, double]] &, cpp_vector[cpp_map[std_string, double]] &) except +
         void calc_mass_ratios() except +
         void calc_params() except +
         void initialize(cpp_map[std_string, cpp_material.Material *], cpp_map[std_string, double], cpp_reactor1g.Reactor1G) except +
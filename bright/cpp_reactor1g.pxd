@@ -35,6 +35,7 @@ cdef extern from "reactor1g.h" namespace "bright":
         int B
         cpp_vector[double] BU_F_
         double BUd
+        bint BUd_fallback
         cpp_map[int, cpp_vector[double]] BUi_F_
         cpp_vector[double] D_F_
         cpp_vector[double] F
@@ -95,9 +96,12 @@ cdef extern from "reactor1g.h" namespace "bright":
 
         # methods
         void BUd_bisection_method() except +
+        void BUd_segment_method() except +
         double batch_average(double) except +
         double batch_average(double, std_string) except +
         double batch_average_k(double) except +
+        cpp_vector[double] batch_average_many(cpp_vector[double] &) except +
+        cpp_vector[double] batch_average_many(cpp_vector[double] &, std_string) except +
         cpp_material.Material calc() except +
         cpp_material.Material calc(cpp_map[int, double]) except +
         cpp_material.Material calc(cpp_material.Material) except +
@@ -106,6 +110,7 @@ cdef extern from "reactor1g.h" namespace "bright":
         double calc_deltaR() except +
         double calc_deltaR(cpp_map[int, double]) except +
         double calc_deltaR(cpp_material.Material) except +
+        void calc_many(cpp_vector[cpp_material.Material] &, cpp_vector[double] &, cpp_vector[int] &, cpp_vector[double] &) except +
         void calc_mat_prod() except +
         void calc_sub_mats() except +
         double calc_tru_cr() except +
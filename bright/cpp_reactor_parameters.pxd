@@ -30,6 +30,7 @@ cdef extern from "reactor_parameters.h" namespace "bright":
         cpp_map[std_string, double] cladding_form
         double coolant_density
         cpp_map[std_string, double] coolant_form
+        std_string depletion_solver
         double flux
         double fuel_density
         cpp_map[std_string, double] fuel_form
@@ -8,6 +8,7 @@
 ################################################
 
 
+from bright cimport cpp_bright
 from bright cimport cpp_fccomp
 from bright cimport cpp_fluence_point
 from bright cimport cpp_reactor_parameters
@@ -36,6 +37,7 @@ cdef extern from "reactormg.h" namespace "bright":
         cpp_vector[double] BU0
         cpp_vector[double] BU_t
         double BUd
+        bint BUd_fallback
         cpp_vector[double] E_g
         int G
         cpp_set[int] I
@@ -47,6 +49,7 @@ cdef extern from "reactormg.h" namespace "bright":
         cpp_vector[double] MW_clad_t
         cpp_vector[double] MW_cool_t
         cpp_vector[double] MW_fuel_t
+        cpp_vector[cpp_bright.SparseMatrix[double]] M_tij
         cpp_map[int, cpp_vector[double]] N_clad_it
         cpp_map[int, cpp_vector[double]] N_cool_it
         cpp_map[int, cpp_vector[double]] N_fuel_it
@@ -57,6 +60,7 @@ cdef extern from "reactormg.h" namespace "bright":
         int S
         double S_O
         double S_T
+        cpp_vector[cpp_bright.SparseMatrix[double]] T_int_tij
         cpp_map[int, cpp_vector[double]] T_it
         cpp_map[int, cpp_vector[double]] Ti0
         double V_clad
@@ -72,6 +76,12 @@ cdef extern from "reactormg.h" namespace "bright":
         cpp_map[std_string, double] chemical_form_cool
         cpp_map[std_string, double] chemical_form_fuel
         double deltaR
+        std_string depletion_solver
+        cpp_vector[int] eigen_iterations_t
+        int eigen_max_iter
+        cpp_vector[double] eigen_residual_t
+        std_string eigen_solver
+        double eigen_tol
         double flux
         double k
         cpp_vector[double] k_t
@@ -105,22 +115,29 @@ cdef extern from "reactormg.h" namespace "bright":
         double rho_cool
         double rho_fuel
         double specific_power
+        bint store_inverses
         double target_BU
         double td
         int td_n
         cpp_vector[double] time0
         cpp_vector[double] trans_consts
+        cpp_map[int, cpp_map[int, cpp_vector[cpp_vector[int]]]] transmutation_chains
         double tru_cr
         bint use_zeta
+        cpp_vector[double] xs_itg
+        double * xs_lib
+        size_t xs_lib_size
 
         # methods
         void BUd_bisection_method() except +
+        void BUd_segment_method() except +
         void add_transmutation_chains(cpp_vector[int]) except +
         void assemble_multigroup_matrices() except +
         void assemble_transmutation_matrices() except +
         double batch_average_k(double) except +
         double bateman(int, int, double) except +
         double bateman_chain(int, int, int, double) except +
+        void build_transmutation_chains() except +
         void burnup_core() except +
         cpp_material.Material calc() except +
         cpp_material.Material calc(cpp_map[int, double]) except +
@@ -149,6 +166,9 @@ cdef extern from "reactormg.h" namespace "bright":
         void loadlib() except +
         void loadlib(std_string) except +
         void run_P_NL(double) except +
+        std_string transmutation_chains_key() except +
+        void write_chains_file() except +
+        void write_xs_file() except +
         pass
 
 
@@ -11,6 +11,7 @@
 from bright cimport cpp_fccomp
 from libcpp.map cimport map as cpp_map
 from libcpp.string cimport string as std_string
+from libcpp.vector cimport vector as cpp_vector
 from pyne cimport cpp_material
 
 cdef extern from "reprocess.h" namespace "bright":
@@ -30,7 +31,9 @@ cdef extern from "reprocess.h" namespace "bright":
         cpp_material.Material calc() except +
         cpp_material.Material calc(cpp_map[int, double]) except +
         cpp_material.Material calc(cpp_material.Material) except +
+        void calc_many(cpp_vector[cpp_material.Material] &, cpp_vector[int] &, cpp_vector[double] &) except +
         void calc_params() except +
+        cpp_vector[cpp_material.Material] calc_products(cpp_vector[cpp_map[int, double]]) except +
         void initialize(cpp_map[int, double]) except +
         pass
 
@@ -11,6 +11,7 @@
 from bright cimport cpp_fccomp
 from libcpp.map cimport map as cpp_map
 from libcpp.string cimport string as std_string
+from libcpp.vector cimport vector as cpp_vector
 from pyne cimport cpp_material
 
 cdef extern from "storage.h" namespace "bright":
@@ -22,6 +23,7 @@ cdef extern from "storage.h" namespace "bright":
 
         # attributes
         double decay_time
+        bint use_decay_matrix
 
         # methods
         cpp_material.Material calc() except +
@@ -30,9 +32,13 @@ cdef extern from "storage.h" namespace "bright":
         cpp_material.Material calc(cpp_material.Material) except +
         cpp_material.Material calc(cpp_material.Material, double) except +
         cpp_material.Material calc(double) except +
+        void calc_many(cpp_vector[double] &, cpp_vector[int] &, cpp_vector[double] &) except +
         void calc_params() except +
         pass
 
+    void cram(cpp_vector[double] &, cpp_vector[int] &, cpp_vector[int] &, cpp_vector[double] &, \
+              cpp_vector[int] &, cpp_vector[double] &, double) except +
+
 
 
 cdef extern from "storage.h" namespace "bright":
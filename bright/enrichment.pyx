@@ -10,11 +10,13 @@
 """
 cimport enrichment_parameters
 cimport fccomp
+cimport numpy as np
 cimport pyne.stlcontainers
 from bright cimport cpp_enrichment_parameters
 from bright cimport cpp_fccomp
 from libcpp.map cimport map as cpp_map
 from libcpp.string cimport string as std_string
+from libcpp.vector cimport vector as cpp_vector
 from pyne cimport cpp_material
 from pyne cimport cpp_nucname
 from pyne cimport material
@@ -24,7 +26,11 @@ from pyne import material
 from pyne import nucname
 import enrichment_parameters
 import fccomp
+import numpy as np
 import pyne.stlcontainers
+import warnings
+
+np.import_array()
 
 
 
@@ -285,13 +291,21 @@ cdef class Enrichment(fccomp.FCComp):
     # methods
     def Comp2UnityOther(self):
         """Comp2UnityOther(self)
-        no docstring for Comp2UnityOther, please file a bug report!"""
+        Deprecated, use SolveNM() instead.  The stream compositions are now made to 
+        sum to unity as part of the Newton iteration in FindNM(), so this just calls 
+        SolveNM()."""
+        warnings.warn("Comp2UnityOther() is deprecated, use SolveNM() instead", 
+                      DeprecationWarning)
         (<cpp_enrichment.Enrichment *> self._inst).Comp2UnityOther()
     
     
     def Comp2UnitySecant(self):
         """Comp2UnitySecant(self)
-        no docstring for Comp2UnitySecant, please file a bug report!"""
+        Deprecated, use SolveNM() instead.  The stream compositions are now made to 
+        sum to unity as part of the Newton iteration in FindNM(), so this just calls 
+        SolveNM()."""
+        warnings.warn("Comp2UnitySecant() is deprecated, use SolveNM() instead", 
+                      DeprecationWarning)
         (<cpp_enrichment.Enrichment *> self._inst).Comp2UnitySecant()
     
     
@@ -507,6 +521,71 @@ cdef class Enrichment(fccomp.FCComp):
             pass
         raise RuntimeError('method calc() could not be dispatched')
     
+    def calc_many(self, xP_js, xW_js, input=None):
+        """calc_many(self, xP_js, xW_js, input=None)
+        Enriches mat_feed to each of many product and tails fractions of the jth 
+        key component, as calc() does.  This is for tables of SWU and feed ratios 
+        over grids of assays.  Each cascade is solved starting from the N, M, and M* 
+        of the point before it, so the points should be ordered such that neighbors 
+        are close.  Only mat_feed is changed, when input is given; the cascade of 
+        this object (N, M, Mstar, xP_j, xW_j, mat_prod, and mat_tail) is left as 
+        it was.  The C++ solve runs without the GIL, and when bright is built with 
+        OpenMP the points are split into blocks that are solved in parallel.
+        
+        Parameters
+        ----------
+        xP_js : float or array_like
+            Product fractions of the jth key component.
+        xW_js : float or array_like
+            Tails fractions of the jth key component.  This is broadcast against 
+            xP_js.
+        input : dict or Material or None, optional
+            If input is present, it is set as the component's mat_feed.
+        
+        Returns
+        -------
+        SWUperProduct : numpy array 
+            SWU per unit of product at each point, with the broadcast shape of 
+            xP_js and xW_js.
+        SWUperFeed : numpy array 
+            SWU per unit of feed at each point.
+        TotalPerFeed : numpy array 
+            Total flow rate per feed rate at each point.
+        N : numpy array 
+            Number of enriching stages at each point.
+        M : numpy array 
+            Number of stripping stages at each point.  Points which could not be 
+            solved are NaN in all of the arrays.
+        """
+        cdef int i
+        cdef cpp_vector[double] xP_js_proxy
+        cdef cpp_vector[double] xW_js_proxy
+        cdef cpp_vector[double] outs_proxy[5]
+        cdef np.npy_intp size
+        cdef cpp_enrichment.Enrichment * inst = <cpp_enrichment.Enrichment *> self._inst
+        if input is not None:
+            self.mat_feed = input
+        xP_js, xW_js = np.broadcast_arrays(np.asarray(xP_js, dtype=np.float64), 
+                                           np.asarray(xW_js, dtype=np.float64))
+        shape = xP_js.shape
+        for x in xP_js.flat:
+            xP_js_proxy.push_back(<double> x)
+        for x in xW_js.flat:
+            xW_js_proxy.push_back(<double> x)
+        with nogil:
+            inst.calc_many(xP_js_proxy, xW_js_proxy, outs_proxy[0], outs_proxy[1], 
+                           outs_proxy[2], outs_proxy[3], outs_proxy[4])
+        size = <np.npy_intp> xP_js_proxy.size()
+        outs = []
+        for i in range(5):
+            if size == 0:
+                outs.append(np.empty(shape, dtype=np.float64))
+            else:
+                out = np.PyArray_SimpleNewFromData(1, &size, np.NPY_FLOAT64, &outs_proxy[i][0])
+                outs.append(out.copy().reshape(shape))
+        return tuple(outs)
+    
+    
     def calc_params(self):
         """calc_params(self)
         This sets the Enrichment parameters to the following 
@@ -591,6 +670,35 @@ cdef class Enrichment(fccomp.FCComp):
         (<cpp_enrichment.Enrichment *> self._inst).initialize((<cpp_enrichment_parameters.EnrichmentParameters *> ep_proxy._inst)[0])
     
     
+    def optimize_tails(self, feed_cost, SWU_cost):
+        """optimize_tails(self, feed_cost, SWU_cost)
+        Finds the tails fraction of the jth key component which minimizes the cost 
+        of feed and separative work per unit of product, for the current mat_feed 
+        and xP_j.  This is Newton's method on the derivative of the cost with respect 
+        to log(xW_j), safeguarded by bisection, where each cascade is started from 
+        the N, M, and M* of the one before.  Only a dozen or so cascades are solved.  
+        The component is left at the optimal cascade, with xW_j set to the optimum, 
+        while N0, M0, and Mstar_0 are unchanged.
+        
+        Parameters
+        ----------
+        feed_cost : float
+            Cost per unit mass of feed material.
+        SWU_cost : float
+            Cost per unit of separative work.
+        
+        Returns
+        -------
+        xW_j : float
+            The optimal tails fraction of the jth key component.  The optimal cost 
+            per unit product is feed_cost / (product over feed) plus 
+            SWU_cost * SWUperProduct.
+        """
+        cdef double rtnval
+        rtnval = (<cpp_enrichment.Enrichment *> self._inst).optimize_tails(<double> feed_cost, <double> SWU_cost)
+        return float(rtnval)
+    
+    
     def xP_i(self, i):
         """xP_i(self, i)
         no docstring for xP_i, please file a bug report!"""
@@ -18,6 +18,7 @@ from pyne cimport material
 
 from pyne import material
 import pyne.stlcontainers
+import warnings
 
 
 
@@ -94,7 +95,13 @@ cdef class FCComp:
         raise RuntimeError('method __init__() could not be dispatched')
     
     def __dealloc__(self):
-        if self._free_inst:
+        if self._free_inst and self._inst != NULL:
+            # free() skips the C++ destructor, so write out any buffered passes here.
+            try:
+                (<cpp_fccomp.FCComp *> self._inst).flush_hdf5()
+            except Exception as e:
+                warnings.warn("buffered HDF5 output of {0} could not be written: "
+                              "{1}".format(self.__class__.__name__, e), RuntimeWarning)
             free(self._inst)
 
     # attributes
@@ -400,6 +407,18 @@ cdef class FCComp:
         (<cpp_fccomp.FCComp *> self._inst).calc_params()
     
     
+    def flush_hdf5(self):
+        """flush_hdf5(self)
+        This method writes the passes held in the HDF5 output buffers to the 
+        output file.  The file is opened once and kept open between calls, and 
+        each run of consecutive passes is written with a single hyperslab per 
+        dataset.  Any passes still buffered when a component is garbage 
+        collected are written out then, but calling this explicitly is 
+        the only way to see errors from the write.
+        """
+        (<cpp_fccomp.FCComp *> self._inst).flush_hdf5()
+    
+    
     def write(self):
         """write(self)
         This is a convenience function that first increments up pass_num.
@@ -418,8 +437,13 @@ cdef class FCComp:
     
     def write_hdf5(self):
         """write_hdf5(self)
-        This method writes out the isotopic pass data to an HDF5 file. 
-        Then, if available, it also writes parameter data as well.  
+        This method adds the isotopic and parameter data of this pass to the 
+        HDF5 output buffers.  Once bright.bright_conf.hdf5_buffer_passes passes 
+        have been buffered, they are written out by flush_hdf5().  Within the 
+        output file, the component's group holds mat_feed/comp and mat_prod/comp 
+        arrays of shape (passes, nucs), where the nuclide columns are given by 
+        the nucs dataset, as well as mat_feed/Mass, mat_prod/Mass, and a 
+        dataset for each parameter in params_prior_calc and params_after_calc.
         Using write() instead is recommended.
         """
         (<cpp_fccomp.FCComp *> self._inst).write_hdf5()
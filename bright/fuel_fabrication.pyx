@@ -16,6 +16,7 @@ from bright cimport cpp_reactor1g
 from libcpp.map cimport map as cpp_map
 from libcpp.set cimport set as cpp_set
 from libcpp.string cimport string as std_string
+from libcpp.vector cimport vector as cpp_vector
 from pyne cimport cpp_material
 from pyne cimport material
 
@@ -54,7 +55,8 @@ cdef class FuelFabrication(fccomp.FCComp):
                 }
     
         would be valid for a light water reactor with half a percent of U-236 always 
-        present.
+        present.  When more than two weights are negative, their magnitudes give the 
+        preferred split of the remaining mass between those materials.
     r : Reactor1G or None, optional 
         An instance of a Reactor1G class to fabricate fuel for.
     paramtrack : list of str or None, optional 
@@ -193,7 +195,7 @@ cdef class FuelFabrication(fccomp.FCComp):
     
     property mass_weights_in:
         """A mapping representing the initial specification of the mass weights.  
-        Exactly two of these should have negative values."""
+        At least two of these should have negative values."""
         def __get__(self):
             cdef pyne.stlcontainers._MapStrDouble mass_weights_in_proxy
             if self._mass_weights_in is None:
@@ -396,11 +398,54 @@ cdef class FuelFabrication(fccomp.FCComp):
         (<cpp_fuel_fabrication.FuelFabrication *> self._inst).calc_deltaRs()
     
     
+    def calc_many(self, mws_ins):
+        """calc_many(self, mws_ins)
+        Calculates the mass weights out for each of many sets of mass weights in, as 
+        calc_mass_ratios() does for mass_weights_in.  The materials and reactor are 
+        shared by all of the problems, so the contribution of each material to the 
+        burnup parameters is computed only once.  This object is left unchanged.  
+        When bright is built with OpenMP and the reactor does not use the disadvantage 
+        factor, the problems are solved in parallel.
+        
+        Parameters
+        ----------
+        mws_ins : sequence of dicts
+            Mass weights in, with the same keys as materials.  Each must have two 
+            negative weights, as for mass_weights_in.
+        
+        Returns
+        -------
+        mws_outs : list of dicts
+            The mass weights out of each problem.  The two key weights of a problem 
+            which could not be solved are NaN.
+        """
+        cdef int i
+        cdef pyne.stlcontainers._MapStrDouble mws_in_proxy
+        cdef pyne.stlcontainers._MapStrDouble mws_out_proxy
+        cdef cpp_vector[cpp_map[std_string, double]] ins
+        cdef cpp_vector[cpp_map[std_string, double]] outs
+        for mws_in in mws_ins:
+            mws_in_proxy = pyne.stlcontainers.MapStrDouble(mws_in, not isinstance(mws_in, pyne.stlcontainers._MapStrDouble))
+            ins.push_back(mws_in_proxy.map_ptr[0])
+        (<cpp_fuel_fabrication.FuelFabrication *> self._inst).calc_many(ins, outs)
+        mws_outs = []
+        for i in range(outs.size()):
+            mws_out_proxy = pyne.stlcontainers.MapStrDouble(False, False)
+            mws_out_proxy.map_ptr = &outs[i]
+            mws_outs.append(dict(mws_out_proxy))
+        return mws_outs
+    
+    
     def calc_mass_ratios(self):
         """calc_mass_ratios(self)
         Calculates mass_weights_out by varying the values of the two parameter which had 
         negative values in mass_weights_in.  Therefore, this is the portion of the code that 
-        performs the optimization calculation.
+        performs the optimization calculation.  Since the two key weights fill the mass 
+        left over by the others, this is a root find for k = 1 in the first key weight, 
+        which is done with the Illinois method.  With more than two key weights, those 
+        closest in the least squares sense to the preferred split given by the magnitudes 
+        of the negative weights are found, subject to k = 1 and no weight being negative.  
+        The reactor is left fed with the resulting core input.
         """
         (<cpp_fuel_fabrication.FuelFabrication *> self._inst).calc_mass_ratios()
     
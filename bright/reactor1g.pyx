@@ -29,6 +29,7 @@ import fluence_point
 import numpy as np
 import pyne.stlcontainers
 import reactor_parameters
+import warnings
 
 np.import_array()
 
@@ -250,6 +251,17 @@ cdef class Reactor1G(fccomp.FCComp):
             (<cpp_reactor1g.Reactor1G *> self._inst).BUd = <double> value
     
     
+    property BUd_fallback:
+        """Flag (bool) for whether BUd_segment_method() falls back to 
+        BUd_bisection_method() when no segment of the burnup table brackets k = 1.  
+        If False, BadFuelForm is raised instead.  Defaults to True."""
+        def __get__(self):
+            return bool((<cpp_reactor1g.Reactor1G *> self._inst).BUd_fallback)
+    
+        def __set__(self, value):
+            (<cpp_reactor1g.Reactor1G *> self._inst).BUd_fallback = <bint> value
+    
+    
     property BUi_F_:
         """The burnup of each initial isotope in the core as a function of fluence.  
         This is a dictionary whose keys are initial nuclides and whose values are 
@@ -363,11 +375,15 @@ cdef class Reactor1G(fccomp.FCComp):
     
     
     property Mj_F_:
-        """The transmutation matrix of the fuel (specifically, mat_feed) into the jth nuclide 
-        as a function of fluence.  Used with the discharge fluence Fd to calculate mat_prod.  
-        This object is therefore a dictionary from zzaaam-integers to vectors of floats."""
+        """Deprecated.  The transmutation matrix of the fuel (specifically, mat_feed) into 
+        the jth nuclide as a function of fluence.  This object is therefore a dictionary 
+        from zzaaam-integers to vectors of floats.  It is no longer filled in by calc() or 
+        calc_mat_prod(), which compute mat_prod directly at the discharge fluence Fd, but 
+        only by the deprecated calc_Mj_F_()."""
         def __get__(self):
             cdef pyne.stlcontainers._MapIntVectorDouble Mj_F__proxy
+            warnings.warn("Mj_F_ is deprecated, use calc_Mj_Fd_() and mat_prod instead", 
+                          DeprecationWarning)
             if self._Mj_F_ is None:
                 Mj_F__proxy = pyne.stlcontainers.MapIntVectorDouble(False, False)
                 Mj_F__proxy.map_ptr = &(<cpp_reactor1g.Reactor1G *> self._inst).Mj_F_
@@ -376,6 +392,8 @@ cdef class Reactor1G(fccomp.FCComp):
     
         def __set__(self, value):
             cdef pyne.stlcontainers._MapIntVectorDouble value_proxy
+            warnings.warn("Mj_F_ is deprecated, use calc_Mj_Fd_() and mat_prod instead", 
+                          DeprecationWarning)
             value_proxy = pyne.stlcontainers.MapIntVectorDouble(value, not isinstance(value, pyne.stlcontainers._MapIntVectorDouble))
             (<cpp_reactor1g.Reactor1G *> self._inst).Mj_F_ = value_proxy.map_ptr[0]
             self._Mj_F_ = None
@@ -1328,16 +1346,33 @@ cdef class Reactor1G(fccomp.FCComp):
     # methods
     def BUd_bisection_method(self):
         """BUd_bisection_method(self)
-        Calculates the maximum discharge burnup via the Bisection Method for a 
-        given mat_feed in this reactor.  This iterates over values of BUd to find 
-        a batch averaged multiplication factor that is closest to 1.0.
+        Calculates the maximum discharge burnup for a given mat_feed in this 
+        reactor.  This iterates over values of BUd to find a batch averaged 
+        multiplication factor that is closest to 1.0.
         
-        Other root finding methods for determining maximum discharge burnup are 
-        certainly possible.
+        The root is first bracketed by stepping BUd several points at a time through 
+        batch_average_many() and the bracket is then closed with the Illinois variant 
+        of the method of false position, which converges superlinearly while keeping 
+        the root bracketed like bisection does.
         """
         (<cpp_reactor1g.Reactor1G *> self._inst).BUd_bisection_method()
     
     
+    def BUd_segment_method(self):
+        """BUd_segment_method(self)
+        Calculates the maximum discharge burnup for a given mat_feed in this 
+        reactor by finding where the batch averaged multiplication factor first 
+        crosses 1.0.  The discharge burnups at which some batch reaches a fluence 
+        point split the burnup table into segments.  Within each segment every batch 
+        has linear production and destruction rates and a fixed weight, so k(BUd) has 
+        a closed form.  The segments are scanned upward from zero burnup and the 
+        root inside the first crossing segment is found with a safeguarded Newton 
+        iteration on this closed form.  See BUd_fallback for when no segment 
+        crosses 1.0.
+        """
+        (<cpp_reactor1g.Reactor1G *> self._inst).BUd_segment_method()
+    
+    
     def batch_average(self, BUd, PDk_flag="K"):
         """batch_average(self, BUd, PDk_flag="K")
         Finds the batch-averaged P(F), D(F), or k(F) when at discharge burnup BUd.
@@ -1367,6 +1402,40 @@ cdef class Reactor1G(fccomp.FCComp):
         return float(rtnval)
     
     
+    def batch_average_many(self, BUds, PDk_flag="K"):
+        """batch_average_many(self, BUds, PDk_flag="K")
+        Finds the batch-averaged P(F), D(F), or k(F) for many discharge burnups 
+        at once.  This is equivalent to calling batch_average() for each BUd, but the 
+        flag is parsed only once and only the requested rates are interpolated.
+        
+        Parameters
+        ----------
+        BUds : sequence of floats
+            The discharge burnups [MWd/kgIHM] to obtain batch-averaged values for.
+        PDk_flag : str , optional
+            Flag that determines whether the neutron production rate "P" [n/s],  
+            the neutron destruction rate "D" [n/s], or the multiplication factor 
+            "K" is reported in the output.
+        
+        Returns
+        -------
+        PDk : 1d numpy float array 
+            The batch averaged values, one per entry in BUds.
+        
+        """
+        cdef cpp_vector[double] BUds_proxy
+        cdef cpp_vector[double] rtnval
+        cdef np.npy_intp shape[1]
+        for BUd in BUds:
+            BUds_proxy.push_back(<double> BUd)
+        PDk_flag_bytes = PDk_flag.encode()
+        rtnval = (<cpp_reactor1g.Reactor1G *> self._inst).batch_average_many(BUds_proxy, std_string(<char *> PDk_flag_bytes))
+        shape[0] = <np.npy_intp> rtnval.size()
+        if shape[0] == 0:
+            return np.empty(0, dtype=np.float64)
+        return np.PyArray_SimpleNewFromData(1, shape, np.NPY_FLOAT64, &rtnval[0]).copy()
+    
+    
     def batch_average_k(self, BUd):
         """batch_average_k(self, BUd)
         no docstring for batch_average_k, please file a bug report!"""
@@ -1445,19 +1514,24 @@ cdef class Reactor1G(fccomp.FCComp):
     
     def calc_Mj_F_(self):
         """calc_Mj_F_(self)
-        This function calculates and sets the ``Mj_F_`` attribute from mat_feed and the 
-        raw reactor data ``Tij_F_``.
+        Deprecated, use calc_Mj_Fd_() instead.  This function calculates and sets the 
+        ``Mj_F_`` attribute from mat_feed and the library's dense transmutation tensor, 
+        over the whole fluence grid.
         """
+        warnings.warn("calc_Mj_F_() is deprecated, use calc_Mj_Fd_() instead", 
+                      DeprecationWarning)
         (<cpp_reactor1g.Reactor1G *> self._inst).calc_Mj_F_()
     
     
     def calc_Mj_Fd_(self):
         """calc_Mj_Fd_(self)
-        This function evaluates ``Mj_F_`` calculated from calc_Mj_F_() at the 
-        discharge fluence Fd. The resultant isotopic dictionary is then converted 
-        into the mat_prod mass stream for this pass through the reactor.  Thus if 
-        ever you need to calculate mat_prod without going through calc(), use this 
-        function.
+        This function evaluates the transmutation matrix of mat_feed at the 
+        discharge fluence Fd.  This is done directly, as a single product of the mass 
+        weights with the library's dense transmutation tensor interpolated to Fd, and 
+        so does not need calc_Mj_F_() to have been called.  The resultant isotopic 
+        dictionary is then converted into the mat_prod mass stream for this pass 
+        through the reactor.  Thus if ever you need to calculate mat_prod without 
+        going through calc(), use this function.
         """
         (<cpp_reactor1g.Reactor1G *> self._inst).calc_Mj_Fd_()
     
@@ -1585,6 +1659,54 @@ cdef class Reactor1G(fccomp.FCComp):
             pass
         raise RuntimeError('method calc_deltaR() could not be dispatched')
     
+    def calc_many(self, feeds):
+        """calc_many(self, feeds)
+        Finds the discharge burnup and output isotopics for many feed materials 
+        at once.  The one-group burnup, production, destruction, and transmutation 
+        tables are laid out as dense matrices a single time and the mass weights 
+        of every feed are folded against them together.  This is much faster than 
+        calling calc() in a loop when evaluating many candidate fuels against the 
+        same library.  The other attributes of the reactor (mat_feed, BUd, BU_F_, 
+        etc.) are left at their values for the last feed.
+        
+        Parameters
+        ----------
+        feeds : sequence of dicts or Materials
+            The feed materials to burn up.  Nuclide dictionaries (zzaaam keys, 
+            float values) are first converted into Materials.
+        
+        Returns
+        -------
+        BUds : 1d numpy float array 
+            Discharge burnup of each feed [MWd/kgIHM].  This is NaN for feeds 
+            whose burnup could not be found.
+        nucs : 1d numpy int array 
+            The nuclides (zzaaam) that may be in mat_prod, ie the columns of prods.
+        prods : 2d numpy float array 
+            The (feeds x nucs) output isotopics of each feed, before normalization.
+            This is the same as calc(feeds[b]).comp[nucs[j]] for row b and column j.
+        """
+        cdef cpp_vector[cpp_material.Material] feeds_proxy
+        cdef cpp_vector[double] BUds_proxy
+        cdef cpp_vector[int] nucs_proxy
+        cdef cpp_vector[double] prods_proxy
+        cdef material._Material feed_proxy
+        cdef np.npy_intp shape[2]
+        for feed in feeds:
+            feed_proxy = material.Material(feed, free_mat=not isinstance(feed, material._Material))
+            feeds_proxy.push_back(feed_proxy.mat_pointer[0])
+        (<cpp_reactor1g.Reactor1G *> self._inst).calc_many(feeds_proxy, BUds_proxy, nucs_proxy, prods_proxy)
+        shape[0] = <np.npy_intp> BUds_proxy.size()
+        shape[1] = <np.npy_intp> nucs_proxy.size()
+        if shape[0] == 0 or shape[1] == 0:
+            return np.empty(shape[0], dtype=np.float64), np.empty(shape[1], dtype=np.int32), \
+                   np.empty((shape[0], shape[1]), dtype=np.float64)
+        BUds = np.PyArray_SimpleNewFromData(1, &shape[0], np.NPY_FLOAT64, &BUds_proxy[0]).copy()
+        nucs = np.PyArray_SimpleNewFromData(1, &shape[1], np.NPY_INT32, &nucs_proxy[0]).copy()
+        prods = np.PyArray_SimpleNewFromData(2, shape, np.NPY_FLOAT64, &prods_proxy[0]).copy()
+        return BUds, nucs, prods
+    
+    
     def calc_mat_prod(self):
         """calc_mat_prod(self)
         This is a convenience function that wraps the transmutation matrix methods.  
@@ -1593,10 +1715,10 @@ cdef class Reactor1G(fccomp.FCComp):
         .. code-block:: python
         
             #Wrapper to calculate discharge isotopics.
-            calc_Mj_F_()
             calc_Mj_Fd_()
         
-        This is mostly used internally.
+        The full Mj_F_ table is not computed, see calc_Mj_F_().  This is mostly used 
+        internally.
         """
         (<cpp_reactor1g.Reactor1G *> self._inst).calc_mat_prod()
     
@@ -1865,6 +1987,10 @@ cdef class Reactor1G(fccomp.FCComp):
         child reactor type object.  It must be called before attempting to do any real 
         computation.
         
+        Libraries are read in only once per process and then shared between all reactors 
+        that load the same file.  A library file which has been modified on disk since it 
+        was last read is read in again.
+        
         Parameters
         ----------
         lib : str 
@@ -1886,7 +2012,7 @@ cdef class Reactor1G(fccomp.FCComp):
         
             self.P_NL = pnl
             self.fold_mass_weights()
-            self.BUd_bisection_method()
+            self.BUd_segment_method()
         
         Parameters
         ----------
@@ -213,6 +213,21 @@ cdef class ReactorParameters:
             self._coolant_form = None
     
     
+    property depletion_solver:
+        """Flag (str) for the method used to solve the depletion equations over each 
+        burnup time step.  Accepted values are "cram" (Chebyshev Rational Approximation 
+        Method, the default), "pade" (scaling and squaring Pade approximant of the dense 
+        matrix exponential), and "bateman" (the legacy enumeration of transmutation chains, 
+        which is the only method that uses branch_ratio_cutoff)."""
+        def __get__(self):
+            return bytes(<char *> (<cpp_reactor_parameters.ReactorParameters *> self._inst).depletion_solver.c_str()).decode()
+    
+        def __set__(self, value):
+            cdef char * value_proxy
+            value_bytes = value.encode()
+            (<cpp_reactor_parameters.ReactorParameters *> self._inst).depletion_solver = std_string(<char *> value_bytes)
+    
+    
     property flux:
         """The nominal flux value (float) that the library for this reactor type was 
         generated with.   Often used to correctly weight batch-specific fluxes."""
@@ -45,6 +45,8 @@ cdef class ReactorMG(fccomp.FCComp):
     cdef public pyne.stlcontainers._MapStrDouble _chemical_form_clad
     cdef public pyne.stlcontainers._MapStrDouble _chemical_form_cool
     cdef public pyne.stlcontainers._MapStrDouble _chemical_form_fuel
+    cdef public np.ndarray _eigen_iterations_t
+    cdef public np.ndarray _eigen_residual_t
     cdef public np.ndarray _k_t
     cdef public pyne.stlcontainers._MapIntVectorDouble _m_clad_it
     cdef public pyne.stlcontainers._MapIntVectorDouble _m_cool_it
@@ -13,6 +13,7 @@ cimport fluence_point
 cimport numpy as np
 cimport pyne.stlcontainers
 cimport reactor_parameters
+from bright cimport cpp_bright
 from bright cimport cpp_fccomp
 from bright cimport cpp_fluence_point
 from bright cimport cpp_reactor_parameters
@@ -33,6 +34,25 @@ import reactor_parameters
 np.import_array()
 
 
+cdef object _sparse_to_triplets(cpp_vector[cpp_bright.SparseMatrix[double]] & ms):
+    # Copies a list of sparse matrices out to (rows, cols, vals) arrays.
+    cdef int t, n, N
+    cdef np.ndarray[np.int32_t, ndim=1] rows
+    cdef np.ndarray[np.int32_t, ndim=1] cols
+    cdef np.ndarray[np.float64_t, ndim=1] vals
+    triplets = []
+    for t in range(<int> ms.size()):
+        N = ms[t].size()
+        rows = np.empty(N, dtype=np.int32)
+        cols = np.empty(N, dtype=np.int32)
+        vals = np.empty(N, dtype=np.float64)
+        for n in range(N):
+            rows[n] = ms[t].sm[n].row
+            cols[n] = ms[t].sm[n].col
+            vals[n] = ms[t].sm[n].val
+        triplets.append((rows, cols, vals))
+    return triplets
+
 
 cdef class ReactorMG(fccomp.FCComp):
     """Multi-Group Reactor Fuel Cycle Component Class.  Daughter of FCComp class.
@@ -82,6 +102,8 @@ cdef class ReactorMG(fccomp.FCComp):
         self._chemical_form_clad = None
         self._chemical_form_cool = None
         self._chemical_form_fuel = None
+        self._eigen_iterations_t = None
+        self._eigen_residual_t = None
         self._k_t = None
         self._m_clad_it = None
         self._m_cool_it = None
@@ -301,6 +323,17 @@ cdef class ReactorMG(fccomp.FCComp):
             (<cpp_reactormg.ReactorMG *> self._inst).BUd = <double> value
     
     
+    property BUd_fallback:
+        """Flag (bool) for whether BUd_segment_method() falls back to 
+        BUd_bisection_method() when no segment of the burnup table brackets k = 1.  
+        If False, BadFuelForm is raised instead.  Defaults to True."""
+        def __get__(self):
+            return bool((<cpp_reactormg.ReactorMG *> self._inst).BUd_fallback)
+    
+        def __set__(self, value):
+            (<cpp_reactormg.ReactorMG *> self._inst).BUd_fallback = <bint> value
+    
+    
     property E_g:
         """Energy bin boundaries [MeV].  Vector of doubles."""
         def __get__(self):
@@ -539,6 +572,15 @@ cdef class ReactorMG(fccomp.FCComp):
             self._MW_fuel_t = None
     
     
+    property M_tij:
+        """Burnup matrix, T_int_tij plus the decay matrix, as a function of time.  This 
+        is a read-only list with one (rows, cols, vals) tuple of arrays per time step, 
+        with entries in row-major order.  Rows are the parent and columns the daughter 
+        nuclide, both indexed by K_ind."""
+        def __get__(self):
+            return _sparse_to_triplets((<cpp_reactormg.ReactorMG *> self._inst).M_tij)
+    
+    
     property N_clad_it:
         """Cladding Number Density [atoms/cm^3]."""
         def __get__(self):
@@ -698,6 +740,14 @@ cdef class ReactorMG(fccomp.FCComp):
             (<cpp_reactormg.ReactorMG *> self._inst).S_T = <double> value
     
     
+    property T_int_tij:
+        """Energy integral of the transmutation matrix [1/s], as a function of time.  
+        This is a read-only list with one (rows, cols, vals) tuple of arrays per time 
+        step, laid out as in M_tij."""
+        def __get__(self):
+            return _sparse_to_triplets((<cpp_reactormg.ReactorMG *> self._inst).T_int_tij)
+    
+    
     property T_it:
         """Transformation Matrix [kg_i/kgIHM]."""
         def __get__(self):
@@ -917,6 +967,118 @@ cdef class ReactorMG(fccomp.FCComp):
             (<cpp_reactormg.ReactorMG *> self._inst).deltaR = <double> value
     
     
+    property depletion_solver:
+        """Flag (str) for the method used to solve the depletion equations over each 
+        burnup time step.  Accepted values are "cram" (Chebyshev Rational Approximation 
+        Method, the default), "pade" (scaling and squaring Pade approximant of the dense 
+        matrix exponential), and "bateman" (the legacy enumeration of transmutation chains, 
+        which is the only method that uses branch_ratio_cutoff)."""
+        def __get__(self):
+            return bytes(<char *> (<cpp_reactormg.ReactorMG *> self._inst).depletion_solver.c_str()).decode()
+    
+        def __set__(self, value):
+            cdef char * value_proxy
+            value_bytes = value.encode()
+            (<cpp_reactormg.ReactorMG *> self._inst).depletion_solver = std_string(<char *> value_bytes)
+    
+    
+    property eigen_iterations_t:
+        """Number of eigenvalue iterations (int) taken by calc_criticality() at 
+        each time step."""
+        def __get__(self):
+            cdef np.ndarray eigen_iterations_t_proxy
+            cdef np.npy_intp eigen_iterations_t_proxy_shape[1]
+            if self._eigen_iterations_t is None:
+                eigen_iterations_t_proxy_shape[0] = <np.npy_intp> (<cpp_reactormg.ReactorMG *> self._inst).eigen_iterations_t.size()
+                eigen_iterations_t_proxy = np.PyArray_SimpleNewFromData(1, eigen_iterations_t_proxy_shape, np.NPY_INT32, &(<cpp_reactormg.ReactorMG *> self._inst).eigen_iterations_t[0])
+                self._eigen_iterations_t = eigen_iterations_t_proxy
+            return self._eigen_iterations_t
+    
+        def __set__(self, value):
+            cdef cpp_vector[int] value_proxy
+            cdef int i
+            cdef int value_size
+            cdef int * value_data
+            value_size = len(value)
+            if isinstance(value, np.ndarray) and (<np.ndarray> value).descr.type_num == np.NPY_INT32:
+                value_data = <int *> np.PyArray_DATA(<np.ndarray> value)
+                value_proxy = cpp_vector[int](<size_t> value_size)
+                for i in range(value_size):
+                    value_proxy[i] = value_data[i]
+            else:
+                value_proxy = cpp_vector[int](<size_t> value_size)
+                for i in range(value_size):
+                    value_proxy[i] = <int> value[i]
+            (<cpp_reactormg.ReactorMG *> self._inst).eigen_iterations_t = value_proxy
+            self._eigen_iterations_t = None
+    
+    
+    property eigen_max_iter:
+        """The maximum number of eigenvalue iterations (int) allowed per time step."""
+        def __get__(self):
+            return int((<cpp_reactormg.ReactorMG *> self._inst).eigen_max_iter)
+    
+        def __set__(self, value):
+            (<cpp_reactormg.ReactorMG *> self._inst).eigen_max_iter = <int> value
+    
+    
+    property eigen_residual_t:
+        """The final relative change in k and the flux reached by the eigenvalue 
+        solver at each time step."""
+        def __get__(self):
+            cdef np.ndarray eigen_residual_t_proxy
+            cdef np.npy_intp eigen_residual_t_proxy_shape[1]
+            if self._eigen_residual_t is None:
+                eigen_residual_t_proxy_shape[0] = <np.npy_intp> (<cpp_reactormg.ReactorMG *> self._inst).eigen_residual_t.size()
+                eigen_residual_t_proxy = np.PyArray_SimpleNewFromData(1, eigen_residual_t_proxy_shape, np.NPY_FLOAT64, &(<cpp_reactormg.ReactorMG *> self._inst).eigen_residual_t[0])
+                self._eigen_residual_t = eigen_residual_t_proxy
+            return self._eigen_residual_t
+    
+        def __set__(self, value):
+            cdef cpp_vector[double] value_proxy
+            cdef int i
+            cdef int value_size
+            cdef double * value_data
+            value_size = len(value)
+            if isinstance(value, np.ndarray) and (<np.ndarray> value).descr.type_num == np.NPY_FLOAT64:
+                value_data = <double *> np.PyArray_DATA(<np.ndarray> value)
+                value_proxy = cpp_vector[double](<size_t> value_size)
+                for i in range(value_size):
+                    value_proxy[i] = value_data[i]
+            else:
+                value_proxy = cpp_vector[double](<size_t> value_size)
+                for i in range(value_size):
+                    value_proxy[i] = <double> value[i]
+            (<cpp_reactormg.ReactorMG *> self._inst).eigen_residual_t = value_proxy
+            self._eigen_residual_t = None
+    
+    
+    property eigen_solver:
+        """Flag (str) for the iteration method used by calc_criticality() to find the 
+        fundamental mode.  Accepted values are "power" (plain power iteration), 
+        "wielandt" (Wielandt shifted power iteration, the default), and "anderson" 
+        (power iteration with Anderson mixing of the last few iterates).  Any other 
+        value makes calc_criticality() raise an error.  Each time step is warm 
+        started from the flux and eigenvalue of the one before it."""
+        def __get__(self):
+            return bytes(<char *> (<cpp_reactormg.ReactorMG *> self._inst).eigen_solver.c_str()).decode()
+    
+        def __set__(self, value):
+            cdef char * value_proxy
+            value_bytes = value.encode()
+            (<cpp_reactormg.ReactorMG *> self._inst).eigen_solver = std_string(<char *> value_bytes)
+    
+    
+    property eigen_tol:
+        """Convergence tolerance (float) on the relative change in k and the flux 
+        between eigenvalue iterations."""
+        def __get__(self):
+            return float((<cpp_reactormg.ReactorMG *> self._inst).eigen_tol)
+    
+        def __set__(self, value):
+            (<cpp_reactormg.ReactorMG *> self._inst).eigen_tol = <double> value
+    
+    
     property flux:
         """The nominal flux value (float) that the library for this reactor type was 
         generated with.  Used to correctly weight batch-specific fluxes."""
@@ -1229,7 +1391,9 @@ cdef class ReactorMG(fccomp.FCComp):
     
     property nearest_neighbors:
         """Attribute that denotes the indices of the perturbation table which are 
-        closest to the current state of the reactor (ie densities, burn_time, etc)."""
+        closest to the current state of the reactor (ie densities, burn_time, etc).
+        Holds the two nearest rows, nearest first, which are the ones that 
+        interpolate_cross_sections() uses."""
         def __get__(self):
             cdef np.ndarray nearest_neighbors_proxy
             cdef np.npy_intp nearest_neighbors_proxy_shape[1]
@@ -1431,6 +1595,19 @@ cdef class ReactorMG(fccomp.FCComp):
             (<cpp_reactormg.ReactorMG *> self._inst).specific_power = <double> value
     
     
+    property store_inverses:
+        """Flag (bool) for whether the explicit inverses of the absorption matrices 
+        (A_inv_tgh, A_inv_fuel_tgh, A_inv_clad_tgh, A_inv_cool_tgh, A_inv_F_tgh, and 
+        A_inv_F_fuel_tgh) are computed at each time step.  The criticality calculation 
+        solves against an LU factorization of A_tgh instead, so these are not needed 
+        and default to off (zeros)."""
+        def __get__(self):
+            return bool((<cpp_reactormg.ReactorMG *> self._inst).store_inverses)
+    
+        def __set__(self, value):
+            (<cpp_reactormg.ReactorMG *> self._inst).store_inverses = <bint> value
+    
+    
     property target_BU:
         """The reactor's target discharge burnup (float).  This is given 
         in units of [MWd/kgIHM].  Often the actual discharge burnup BUd does not 
@@ -1520,6 +1697,15 @@ cdef class ReactorMG(fccomp.FCComp):
             self._trans_consts = None
     
     
+    property transmutation_chains:
+        """The Bateman transmutation chains (dict) used by the "bateman" depletion 
+        solver, keyed by the initial and then the final nuclide of each chain, whose
+        values are lists of chains.  These are shared between all reactors that load
+        the same library, under transmutation_chains_key(), and are read only."""
+        def __get__(self):
+            return (<cpp_reactormg.ReactorMG *> self._inst).transmutation_chains
+    
+    
     property tru_cr:
         """The transuranic conversion ratio of the reactor (float).  
         This is set via the calc_tru_cr() method."""
@@ -1540,6 +1726,43 @@ cdef class ReactorMG(fccomp.FCComp):
             (<cpp_reactormg.ReactorMG *> self._inst).use_zeta = <bint> value
     
     
+    property xs_itg:
+        """Cross sections as a function of nuclide and burn_time [barns], as a flat 
+        zero-copy view of a dense [reaction][nuc][time][g] buffer with the same layout 
+        as xs_lib.  This is reallocated by init_core()."""
+        def __get__(self):
+            cdef np.ndarray xs_itg_proxy
+            cdef np.npy_intp xs_itg_proxy_shape[1]
+            xs_itg_proxy_shape[0] = <np.npy_intp> (<cpp_reactormg.ReactorMG *> self._inst).xs_itg.size()
+            if xs_itg_proxy_shape[0] == 0:
+                return np.empty(0, dtype=np.float64)
+            xs_itg_proxy = np.PyArray_SimpleNewFromData(1, xs_itg_proxy_shape, np.NPY_FLOAT64, &(<cpp_reactormg.ReactorMG *> self._inst).xs_itg[0])
+            return xs_itg_proxy
+    
+    
+    property xs_lib:
+        """Data library cross sections [barns], as a flat, read-only, zero-copy view of 
+        a dense [reaction][nuc][pert][g] buffer.  The nuc axis is indexed by K_ind and 
+        scattering, which is [g][h], is the last reaction.  See xs_views() for a 
+        per-reaction view.  This buffer is shared with all other reactors that use the 
+        same library."""
+        def __get__(self):
+            cdef np.ndarray xs_lib_proxy
+            cdef np.npy_intp xs_lib_proxy_shape[1]
+            xs_lib_proxy_shape[0] = <np.npy_intp> (<cpp_reactormg.ReactorMG *> self._inst).xs_lib_size
+            if xs_lib_proxy_shape[0] == 0:
+                return np.empty(0, dtype=np.float64)
+            xs_lib_proxy = np.PyArray_SimpleNewFromData(1, xs_lib_proxy_shape, np.NPY_FLOAT64, (<cpp_reactormg.ReactorMG *> self._inst).xs_lib)
+            xs_lib_proxy.flags.writeable = False
+            return xs_lib_proxy
+    
+    
+    property xs_lib_size:
+        """Number of doubles in xs_lib."""
+        def __get__(self):
+            return int((<cpp_reactormg.ReactorMG *> self._inst).xs_lib_size)
+    
+    
     # methods
     def BUd_bisection_method(self):
         """BUd_bisection_method(self)
@@ -1553,6 +1776,19 @@ cdef class ReactorMG(fccomp.FCComp):
         (<cpp_reactormg.ReactorMG *> self._inst).BUd_bisection_method()
     
     
+    def BUd_segment_method(self):
+        """BUd_segment_method(self)
+        Calculates the maximum discharge burnup for a given mat_feed in this 
+        reactor by finding where the batch averaged multiplication factor first 
+        crosses 1.0.  The discharge burnups at which some batch reaches a time step 
+        split the burnup table into segments.  Within each segment the k and phi of 
+        every batch are linear in BUd, so the flux weighted k(BUd) = 1.0 reduces to 
+        a quadratic equation which is solved exactly.  The segments are scanned 
+        upward from zero burnup.  See BUd_fallback for when no segment crosses 1.0.
+        """
+        (<cpp_reactormg.ReactorMG *> self._inst).BUd_segment_method()
+    
+    
     def add_transmutation_chains(self, tc):
         """add_transmutation_chains(self, tc)
         no docstring for add_transmutation_chains, please file a bug report!"""
@@ -1624,6 +1860,16 @@ cdef class ReactorMG(fccomp.FCComp):
         return float(rtnval)
     
     
+    def build_transmutation_chains(self):
+        """build_transmutation_chains(self)
+        Enumerates the transmutation chains from the burnup matrix and branch ratios 
+        of the current time step, and stores them in the transmutation_chains 
+        attribute.  The "bateman" depletion solver only does this when the library 
+        does not already have chains for transmutation_chains_key().
+        """
+        (<cpp_reactormg.ReactorMG *> self._inst).build_transmutation_chains()
+    
+    
     def burnup_core(self):
         """burnup_core(self)
         This method generates a time-dependent parameters from an reactor's initial conditions.
@@ -1640,7 +1886,7 @@ cdef class ReactorMG(fccomp.FCComp):
         
             self.mat_feed = input
             self.fold_mass_weights()
-            self.BUd_bisection_method()
+            self.BUd_segment_method()
             self.calc_mat_prod()
             return self.mat_prod
         
@@ -1675,7 +1921,7 @@ cdef class ReactorMG(fccomp.FCComp):
         
             self.mat_feed = input
             self.fold_mass_weights()
-            self.BUd_bisection_method()
+            self.BUd_segment_method()
             self.calc_mat_prod()
             return self.mat_prod
         
@@ -1712,7 +1958,7 @@ cdef class ReactorMG(fccomp.FCComp):
         
             self.mat_feed = input
             self.fold_mass_weights()
-            self.BUd_bisection_method()
+            self.BUd_segment_method()
             self.calc_mat_prod()
             return self.mat_prod
         
@@ -1753,7 +1999,7 @@ cdef class ReactorMG(fccomp.FCComp):
         
             self.mat_feed = input
             self.fold_mass_weights()
-            self.BUd_bisection_method()
+            self.BUd_segment_method()
             self.calc_mat_prod()
             return self.mat_prod
         
@@ -1809,7 +2055,9 @@ cdef class ReactorMG(fccomp.FCComp):
     
     def calc_criticality(self):
         """calc_criticality(self)
-        Performs the criticality calculation to find k for this time step.
+        Performs the criticality calculation to find k for this time step.  The 
+        fundamental mode is found with the method given by eigen_solver, starting 
+        from the flux and eigenvalue of the previous time step.
         """
         (<cpp_reactormg.ReactorMG *> self._inst).calc_criticality()
     
@@ -1833,7 +2081,9 @@ cdef class ReactorMG(fccomp.FCComp):
         """calc_nearest_neighbors(self)
         Calculates a sorted array that indexes the nearest neighbors of the 
         perturbations based off of the current state of the reactor.  The results may
-        be found in the neareest_neighbors attribute.
+        be found in the neareest_neighbors attribute.  Neighbors are found via a 
+        k-d tree that loadlib() builds over the normalized perturbed columns, so only
+        the two nearest rows (which are used for interpolation) are returned.
         """
         (<cpp_reactormg.ReactorMG *> self._inst).calc_nearest_neighbors()
     
@@ -1975,6 +2225,9 @@ cdef class ReactorMG(fccomp.FCComp):
         This method iterpolates the isotopic, time-dependent cross-sections based 
         on the current state of the burn_time, bt_s, and nearest_neighbors attributes.  
         It is prudent to call the calc_nearest_neighbors() method before this one.
+        When the perturbation table is a tensor-product grid, the cross sections are
+        multilinearly interpolated over the corners of the enclosing grid cell.
+        Otherwise the two nearest neighbors are linearly interpolated between.
         """
         (<cpp_reactormg.ReactorMG *> self._inst).interpolate_cross_sections()
     
@@ -2022,6 +2275,12 @@ cdef class ReactorMG(fccomp.FCComp):
         constructor of the child reactor type object.  It must be called before 
         attempting to do any real computation.
         
+        Each library is only read in once per process and is then shared, read-only, 
+        between all reactors which load the same file, so long as the file has not 
+        since been modified.  If a cross section sidecar written by write_xs_file() 
+        is present, the cross sections are memory mapped from it instead.  Files which 
+        are not HDF5 raise an error.
+        
         Parameters
         ----------
         lib : str, optional 
@@ -2043,7 +2302,7 @@ cdef class ReactorMG(fccomp.FCComp):
         
             self.P_NL = pnl
             self.fold_mass_weights()
-            self.BUd_bisection_method()
+            self.BUd_segment_method()
         
         Parameters
         ----------
@@ -2054,10 +2313,79 @@ cdef class ReactorMG(fccomp.FCComp):
         (<cpp_reactormg.ReactorMG *> self._inst).run_P_NL(<double> temp_pnl)
     
     
+    def transmutation_chains_key(self):
+        """transmutation_chains_key(self)
+        Names the transmutation chains for the current set of nuclides and 
+        branch_ratio_cutoff, along with the flux-dependent branch ratios 
+        that the chains are pruned on.  Reactors whose keys are the same share chains.
+        
+        Returns
+        -------
+        key : str
+            Key of the chains in the library and the chains sidecar file.
+        """
+        cdef std_string rtnval
+        rtnval = (<cpp_reactormg.ReactorMG *> self._inst).transmutation_chains_key()
+        return bytes(<char *> rtnval.c_str()).decode()
+    
+    
+    def write_chains_file(self):
+        """write_chains_file(self)
+        Writes the transmutation chains which have been built for the loaded library 
+        by the "bateman" depletion solver to an HDF5 sidecar file next to it, 
+        libfile + '.chains.h5'.  Chains are keyed by the nuclide set and the cut-off 
+        parameters, and later runs (in this or any other process) read them from this 
+        file rather than building them again.  The sidecar is ignored if it is older 
+        than the library.
+        """
+        (<cpp_reactormg.ReactorMG *> self._inst).write_chains_file()
+    
+    
+    def write_xs_file(self):
+        """write_xs_file(self)
+        Writes the cross sections of the loaded library to a flat binary sidecar 
+        file next to it, libfile + '.xs'.  Subsequent loads of the library (in this or 
+        any other process) memory map the cross sections from this file rather than 
+        reading them from HDF5.  The sidecar is ignored if it is older than the library 
+        or was written from a different nuc_data.h5.
+        """
+        (<cpp_reactormg.ReactorMG *> self._inst).write_xs_file()
+    
+    
 
     pass
 
+XS_REACTIONS = ('sigma_t', 'sigma_a', 'nubar_sigma_f', 'chi', 'sigma_f', 'sigma_gamma', 
+                'sigma_2n', 'sigma_3n', 'sigma_alpha', 'sigma_proton', 'sigma_gamma_x', 
+                'sigma_2n_x', 'sigma_s')
 
+def xs_views(rmg, per_time=False):
+    """Splits the dense cross section buffers of a reactor into per-reaction views.
+    No data is copied, so modifying the views of xs_itg modifies the reactor.  The
+    views of xs_lib are read-only since the library is shared between reactors.
 
+    Parameters
+    ----------
+    rmg : ReactorMG 
+        A reactor which has had its library loaded.
+    per_time : bool, optional 
+        If True, the views are of xs_itg rather than xs_lib.
 
+    Returns
+    -------
+    views : dict 
+        Keys are the names in XS_REACTIONS.  Values have shape (K_num, N, G), where
+        N is nperturbations or S, except for 'sigma_s' which is (K_num, N, G, G).
 
+    """
+    xs = rmg.xs_itg if per_time else rmg.xs_lib
+    N = rmg.S if per_time else rmg.nperturbations
+    K_num = rmg.K_num
+    G = rmg.G
+    size = K_num * N * G
+    views = {}
+    for r, rxn in enumerate(XS_REACTIONS[:-1]):
+        views[rxn] = xs[r*size:(r+1)*size].reshape(K_num, N, G)
+    r = len(XS_REACTIONS) - 1
+    views['sigma_s'] = xs[r*size:].reshape(K_num, N, G, G)
+    return views
@@ -10,18 +10,23 @@
 """
 cimport bright.typeconverters
 cimport fccomp
+cimport numpy as np
 cimport pyne.stlcontainers
 from bright cimport cpp_fccomp
 from libcpp.map cimport map as cpp_map
 from libcpp.string cimport string as std_string
+from libcpp.vector cimport vector as cpp_vector
 from pyne cimport cpp_material
 from pyne cimport material
 
 from pyne import material
 import bright.typeconverters
 import fccomp
+import numpy as np
 import pyne.stlcontainers
 
+np.import_array()
+
 
 
 cdef class Reprocess(fccomp.FCComp):
@@ -317,6 +322,49 @@ cdef class Reprocess(fccomp.FCComp):
             pass
         raise RuntimeError('method calc() could not be dispatched')
     
+    def calc_many(self, feeds):
+        """calc_many(feeds)
+        Separates each of many feed materials with sepeff at once.  Every 
+        feed is laid out as a dense vector over the nuclides of sepeff and 
+        multiplied through by the separation efficiencies, which are kept as a 
+        dense array.  This is much faster than calling calc() in a loop when 
+        running many reprocessing passes.  mat_feed and mat_prod are left at 
+        their values for the last feed.
+        
+        Parameters
+        ----------
+        feeds : sequence of dicts or Materials
+            The feed materials to separate.  Nuclide dictionaries (zzaaam keys, 
+            float values) are first converted into Materials.
+        
+        Returns
+        -------
+        nucs : 1d numpy int array 
+            The nuclides (zzaaam) of sepeff, ie the columns of prods.  Normally 
+            this is bright_conf.track_nucs_order.
+        prods : 2d numpy float array 
+            The (feeds x nucs) masses separated from each feed.  This is the same 
+            as calc(feeds[n]).comp[nucs[j]] times the mass of mat_prod, for row n 
+            and column j.
+        """
+        cdef cpp_vector[cpp_material.Material] feeds_proxy
+        cdef cpp_vector[int] nucs_proxy
+        cdef cpp_vector[double] prods_proxy
+        cdef material._Material feed_proxy
+        cdef np.npy_intp shape[2]
+        for feed in feeds:
+            feed_proxy = material.Material(feed, free_mat=not isinstance(feed, material._Material))
+            feeds_proxy.push_back(feed_proxy.mat_pointer[0])
+        (<cpp_reprocess.Reprocess *> self._inst).calc_many(feeds_proxy, nucs_proxy, prods_proxy)
+        shape[0] = <np.npy_intp> feeds_proxy.size()
+        shape[1] = <np.npy_intp> nucs_proxy.size()
+        if shape[0] == 0 or shape[1] == 0:
+            return np.empty(shape[1], dtype=np.int32), np.empty((shape[0], shape[1]), dtype=np.float64)
+        nucs = np.PyArray_SimpleNewFromData(1, &shape[1], np.NPY_INT32, &nucs_proxy[0]).copy()
+        prods = np.PyArray_SimpleNewFromData(2, shape, np.NPY_FLOAT64, &prods_proxy[0]).copy()
+        return nucs, prods
+    
+    
     def calc_params(self):
         """calc_params()
         Here the parameters for Reprocess are set.  For reprocessing, this amounts 
@@ -329,6 +377,40 @@ cdef class Reprocess(fccomp.FCComp):
         (<cpp_fccomp.FCComp *> self._inst).calc_params()
     
     
+    def calc_products(self, sepeffs):
+        """calc_products(sepeffs)
+        Separates mat_feed into several product streams at once, as a plant 
+        with more than one output would.  Each stream is given by its own 
+        separation efficiency dictionary, which is expanded over the nuclides of 
+        sepeff as in initialize().  All of the streams are found in a single pass 
+        over mat_feed.  mat_prod is left unchanged.
+        
+        Parameters
+        ----------
+        sepeffs : sequence of dicts
+            Separation efficiencies of each product stream.  The keys may be 
+            strings or ints, elements or nuclides, as for the constructor.
+        
+        Returns
+        -------
+        prods : list of Materials
+            The product streams, in the order of sepeffs.
+        """
+        cdef int i
+        cdef cpp_vector[cpp_map[int, double]] seds
+        cdef cpp_vector[cpp_material.Material] prods_proxy
+        cdef material._Material prod_proxy
+        for sed in sepeffs:
+            seds.push_back(bright.typeconverters.sepeff_py2c(sed))
+        prods_proxy = (<cpp_reprocess.Reprocess *> self._inst).calc_products(seds)
+        prods = []
+        for i in range(prods_proxy.size()):
+            prod_proxy = material.Material()
+            prod_proxy.mat_pointer[0] = prods_proxy[i]
+            prods.append(prod_proxy)
+        return prods
+    
+    
     def initialize(self, sed):
         """initialize(sepeff)
         The initialize() function calculates the sepeff from an integer-keyed 
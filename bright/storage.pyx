@@ -9,18 +9,23 @@
 """Python wrapper for Storage.
 """
 cimport fccomp
+cimport numpy as np
 cimport pyne.stlcontainers
 from bright cimport cpp_fccomp
 from libc.stdlib cimport free
 from libcpp.map cimport map as cpp_map
 from libcpp.string cimport string as std_string
+from libcpp.vector cimport vector as cpp_vector
 from pyne cimport cpp_material
 from pyne cimport material
 
 from pyne import material
 import fccomp
+import numpy as np
 import pyne.stlcontainers
 
+np.import_array()
+
 
 
 cdef class decay_nuc:
@@ -144,6 +149,19 @@ cdef class Storage(fccomp.FCComp):
             (<cpp_storage.Storage *> self._inst).decay_time = <double> value
     
     
+    property use_decay_matrix:
+        """Boolean flag for whether calc() decays mat_feed with the matrix exponential 
+        of the decay matrix, rather than by summing bateman() over every decay chain.  
+        The matrix exponential is found with the order 16 Chebyshev rational 
+        approximation method (CRAM), which is accurate even when decay constants in a 
+        chain are equal.  False by default."""
+        def __get__(self):
+            return bool((<cpp_storage.Storage *> self._inst).use_decay_matrix)
+    
+        def __set__(self, value):
+            (<cpp_storage.Storage *> self._inst).use_decay_matrix = <bint> value
+    
+    
     # methods
     def _storage_calc_0(self):
         """calc(self)
@@ -441,6 +459,45 @@ cdef class Storage(fccomp.FCComp):
             pass
         raise RuntimeError('method calc() could not be dispatched')
     
+    def calc_many(self, decay_times):
+        """calc_many(self, decay_times)
+        Decays mat_feed for each of many decay times with the matrix exponential of 
+        the decay matrix, whatever the value of use_decay_matrix.  The decay matrix is 
+        built once from the shared decay library, after which each time costs a single 
+        CRAM solve.  This makes cooling curves over many time points cheap.  mat_prod 
+        and decay_time are left at their values for the last time.
+        
+        Parameters
+        ----------
+        decay_times : sequence of floats
+            The times to decay mat_feed for [seconds].
+        
+        Returns
+        -------
+        nucs : 1d numpy int array 
+            The nuclides (zzaaam) in track_nucs which may be present, ie the columns 
+            of prods.
+        prods : 2d numpy float array 
+            The (decay_times x nucs) masses of each nuclide after each decay time.
+            This is the same as calc(decay_times[n]).comp[nucs[j]] times the mass 
+            of mat_prod, for row n and column j.
+        """
+        cdef cpp_vector[double] decay_times_proxy
+        cdef cpp_vector[int] nucs_proxy
+        cdef cpp_vector[double] prods_proxy
+        cdef np.npy_intp shape[2]
+        for t in decay_times:
+            decay_times_proxy.push_back(<double> t)
+        (<cpp_storage.Storage *> self._inst).calc_many(decay_times_proxy, nucs_proxy, prods_proxy)
+        shape[0] = <np.npy_intp> decay_times_proxy.size()
+        shape[1] = <np.npy_intp> nucs_proxy.size()
+        if shape[0] == 0 or shape[1] == 0:
+            return np.empty(shape[1], dtype=np.int32), np.empty((shape[0], shape[1]), dtype=np.float64)
+        nucs = np.PyArray_SimpleNewFromData(1, &shape[1], np.NPY_INT32, &nucs_proxy[0]).copy()
+        prods = np.PyArray_SimpleNewFromData(2, shape, np.NPY_FLOAT64, &prods_proxy[0]).copy()
+        return nucs, prods
+    
+    
     def calc_params(self):
         """calc_params(self)
         Here the parameters for Storage are set.  For storage, this amounts to just
@@ -456,7 +513,50 @@ cdef class Storage(fccomp.FCComp):
 
     pass
 
+def cram(A, N, t):
+    """Applies the matrix exponential of a lower triangular matrix to a vector, 
+    exp(A t) N, with the order 16 Chebyshev rational approximation (CRAM) that 
+    Storage uses for its decay matrix.  Unlike the Bateman formula, this does not 
+    break down when two nuclides in a chain have the same decay constant.
 
+    Parameters
+    ----------
+    A : 2d array of floats
+        The lower triangular (n x n) matrix, such as a decay matrix [1/s] 
+        whose parents come before their daughters.
+    N : sequence of floats
+        The (n) vector to apply the exponential to.
+    t : float
+        The time [s].
 
+    Returns
+    -------
+    N_t : 1d numpy float array
+        The vector exp(A t) N.
 
-
+    """
+    cdef int i, j, n
+    cdef cpp_vector[double] diag_proxy
+    cdef cpp_vector[int] ptr_proxy
+    cdef cpp_vector[int] col_proxy
+    cdef cpp_vector[double] val_proxy
+    cdef cpp_vector[int] rows_proxy
+    cdef cpp_vector[double] N_proxy
+    A = np.asarray(A, dtype=np.float64)
+    n = len(A)
+    if A.shape != (n, n) or len(N) != n:
+        raise ValueError("A must be square and the same size as N")
+    if (np.triu(A, 1) != 0.0).any():
+        raise ValueError("A must be lower triangular")
+    ptr_proxy.push_back(0)
+    for i in range(n):
+        for j in range(i):
+            if A[i, j] != 0.0:
+                col_proxy.push_back(j)
+                val_proxy.push_back(<double> A[i, j])
+        ptr_proxy.push_back(<int> col_proxy.size())
+        diag_proxy.push_back(<double> A[i, i])
+        rows_proxy.push_back(i)
+        N_proxy.push_back(<double> N[i])
+    cpp_storage.cram(diag_proxy, ptr_proxy, col_proxy, val_proxy, rows_proxy, N_proxy, <double> t)
+    return np.array([N_proxy[i] for i in range(n)], dtype=np.float64)
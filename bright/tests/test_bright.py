@@ -82,6 +82,12 @@ def test_write_text():
     bright_conf.write_text = 1
     assert_true(bright_conf.write_text)
     bright_conf.write_text = old_write
+
+def test_lazy_libraries():
+    assert_false(bright_conf.lazy_libraries)
+    bright_conf.lazy_libraries = True
+    assert_true(bright_conf.lazy_libraries)
+    bright_conf.lazy_libraries = False
         
 def test_output_filename():
     assert_equal( bright_conf.output_filename, 'fuel_cycle.h5')
@@ -140,5 +146,28 @@ def test_load_track_nucs_text_2():
     bright_conf.track_nucs = old_isos
 
 
+def test_solve_eigenvalue():
+    A = np.array([[ 0.12,  0.0,   0.0,   0.0 ], 
+                  [-0.03,  0.09,  0.0,   0.0 ], 
+                  [ 0.0,  -0.02,  0.15, -0.01], 
+                  [ 0.0,   0.0,  -0.06,  0.20]])
+    F = np.array([[0.010, 0.004, 0.050, 0.060], 
+                  [0.002, 0.001, 0.010, 0.012], 
+                  [0.0,   0.0,   0.0,   0.0  ], 
+                  [0.001, 0.0,   0.002, 0.003]])
+    w = F.sum(axis=0)
+    k_exact = max(np.linalg.eigvals(np.linalg.solve(A, F)).real)
+
+    k_power, phi_power, n_power, res_power = bright.bright_config.solve_eigenvalue(A, F, w, method="power")
+    k_wielandt, phi_wielandt, n_wielandt, res_wielandt = bright.bright_config.solve_eigenvalue(A, F, w)
+    assert_true(res_power < 1E-8)
+    assert_true(res_wielandt < 1E-8)
+    assert_almost_equal(k_power / k_exact, 1.0, 6)
+    assert_almost_equal(k_wielandt / k_power, 1.0, 6)
+    assert_true((np.abs(phi_wielandt - phi_power) < 1E-6).all())
+
+    assert_raises(RuntimeError, bright.bright_config.solve_eigenvalue, A, F, w, method="lanczos")
+
+
 if __name__ == "__main__":
     nose.main()
@@ -395,6 +395,151 @@ def test_sample_feed():
     assert_almost_equal(e.SWUperProduct / 8.0009119515,  1.0, 5)
 
 
+@with_setup(setup_enrichment1, teardown_enrichment)
+def test_sample_feed_mass_balance():
+    ep = bright.enrichment_parameters.uranium_enrichment_defaults()
+    ep.xP_j = 0.06
+    e = Enrichment(ep=ep, n='e')
+    mat = Material({
+            922320: 1.1 * (10.0**-9),
+            922340: 0.00021,
+            922350: 0.0092,
+            922360: 0.0042,
+            922380: 0.9863899989,
+            })
+    e.calc(mat)
+
+    assert_almost_equal(sum(e.mat_prod.comp.values()), 1.0, 10)
+    assert_almost_equal(sum(e.mat_tail.comp.values()), 1.0, 10)
+    for nuc in mat.comp:
+        feed = e.mat_feed.mass * e.mat_feed.comp[nuc]
+        prod = e.mat_prod.mass * e.mat_prod.comp[nuc]
+        tail = e.mat_tail.mass * e.mat_tail.comp[nuc]
+        assert_almost_equal((prod + tail) / feed, 1.0, 8)
+        assert_almost_equal(e.xP_i(nuc), e.mat_prod.comp[nuc], 10)
+        assert_almost_equal(e.xW_i(nuc), e.mat_tail.comp[nuc], 10)
+
+
+@with_setup(setup_enrichment1, teardown_enrichment)
+def test_Comp2UnitySecant():
+    ep = bright.enrichment_parameters.uranium_enrichment_defaults()
+    e = Enrichment(ep=ep, n='e')
+    e.mat_feed = Material({922340: 0.000055, 922350: 0.0072, 922380: 0.992745})
+    e.Mstar = ep.Mstar_0
+    e.N = ep.N0
+    e.M = ep.M0
+    e.SolveNM()
+    comp = dict(e.mat_prod.comp)
+
+    e.N = ep.N0
+    e.M = ep.M0
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        e.Comp2UnitySecant()
+        e.Comp2UnityOther()
+    assert_equal(len(w), 2)
+    assert_true(all(issubclass(x.category, DeprecationWarning) for x in w))
+    for nuc in comp:
+        assert_almost_equal(e.mat_prod.comp[nuc], comp[nuc], 10)
+
+
+@with_setup(setup_enrichment1, teardown_enrichment)
+def test_calc_many():
+    ep = bright.enrichment_parameters.uranium_enrichment_defaults()
+    mat = Material({
+            922320: 1.1 * (10.0**-9),
+            922340: 0.00021,
+            922350: 0.0092,
+            922360: 0.0042,
+            922380: 0.9863899989,
+            })
+
+    # give the calling component a cascade of its own
+    ep0 = bright.enrichment_parameters.uranium_enrichment_defaults()
+    ep0.xP_j = 0.035
+    ep0.xW_j = 0.003
+    e = Enrichment(ep=ep0, n='e')
+    e.calc(Material({922340: 0.000055, 922350: 0.0072, 922380: 0.992745}))
+    before = (e.N, e.M, e.Mstar, e.xP_j, e.xW_j)
+    prod_comp = dict(e.mat_prod.comp)
+    prod_mass = e.mat_prod.mass
+    tail_comp = dict(e.mat_tail.comp)
+
+    xP_js = np.array([0.04, 0.05, 0.06])
+    SWUperProduct, SWUperFeed, TotalPerFeed, N, M = e.calc_many(xP_js, 0.0025, mat)
+    assert_equal(SWUperProduct.shape, (3,))
+
+    for n, xP_j in enumerate(xP_js):
+        ep.xP_j = xP_j
+        e1 = Enrichment(ep=ep, n='e1')
+        e1.calc(mat)
+        assert_almost_equal(SWUperProduct[n] / e1.SWUperProduct, 1.0, 5)
+        assert_almost_equal(SWUperFeed[n]    / e1.SWUperFeed,    1.0, 5)
+        assert_almost_equal(TotalPerFeed[n]  / e1.TotalPerFeed,  1.0, 5)
+        assert_almost_equal(N[n] / e1.N, 1.0, 4)
+        assert_almost_equal(M[n] / e1.M, 1.0, 4)
+
+    # the calling component keeps its cascade, and only takes on the new feed
+    assert_equal((e.N, e.M, e.Mstar, e.xP_j, e.xW_j), before)
+    assert_equal(dict(e.mat_prod.comp), prod_comp)
+    assert_equal(e.mat_prod.mass, prod_mass)
+    assert_equal(dict(e.mat_tail.comp), tail_comp)
+    assert_equal(dict(e.mat_feed.comp), dict(mat.comp))
+
+
+@with_setup(setup_enrichment1, teardown_enrichment)
+def test_calc_many_unsolvable():
+    ep = bright.enrichment_parameters.uranium_enrichment_defaults()
+    e = Enrichment(ep=ep, n='e')
+    mat = Material({922340: 0.000055, 922350: 0.0072, 922380: 0.992745})
+    # tails above the feed fraction cannot be reached, and must not 
+    # pick up the flow rates of the solvable point before them.
+    xW_js = np.array([0.0025, 0.01])
+    SWUperProduct, SWUperFeed, TotalPerFeed, N, M = e.calc_many(0.05, xW_js, mat)
+    assert_false(np.isnan(TotalPerFeed[0]))
+    assert_true(np.isnan(SWUperProduct[1]))
+    assert_true(np.isnan(SWUperFeed[1]))
+    assert_true(np.isnan(TotalPerFeed[1]))
+
+
+@with_setup(setup_enrichment, teardown_enrichment)
+def test_optimize_tails():
+    ep = bright.enrichment_parameters.uranium_enrichment_defaults()
+    ep.xP_j = 0.045
+    e = Enrichment(ep=ep, n='e')
+    e.mat_feed = Material({922340: 0.000055, 922350: 0.0072, 922380: 0.992745})
+    xW_j = e.optimize_tails(100.0, 150.0)
+    assert_equal(e.xW_j, xW_j)
+    assert_almost_equal(xW_j / 0.0027315, 1.0, 3)
+    assert_almost_equal(e.mat_tail.comp[922350] / xW_j, 1.0, 5)
+    assert_equal(e.N0, ep.N0)
+    assert_equal(e.M0, ep.M0)
+
+    def cost(xW):
+        e1 = Enrichment(ep=ep, n='e1')
+        e1.xW_j = xW
+        e1.calc(e.mat_feed)
+        return 100.0 * e1.mat_feed.mass / e1.mat_prod.mass + 150.0 * e1.SWUperProduct
+
+    c = cost(xW_j)
+    assert_true(c < cost(0.95 * xW_j))
+    assert_true(c < cost(1.05 * xW_j))
+
+
+@with_setup(setup_enrichment, teardown_enrichment)
+def test_optimize_tails_unsolvable():
+    ep = bright.enrichment_parameters.uranium_enrichment_defaults()
+    # product below the feed fraction cannot be reached for any tails
+    ep.xP_j = 0.005
+    e = Enrichment(ep=ep, n='e')
+    e.mat_feed = Material({922340: 0.000055, 922350: 0.0072, 922380: 0.992745})
+    assert_raises(RuntimeError, e.optimize_tails, 100.0, 150.0)
+    assert_equal(e.N0, ep.N0)
+    assert_equal(e.M0, ep.M0)
+    assert_equal(e.Mstar_0, ep.Mstar_0)
+    assert_equal(e.xW_j, ep.xW_j)
+
+
 @with_setup(setup_enrichment1, teardown_enrichment)
 def test_NU():
     ep = bright.enrichment_parameters.uranium_enrichment_defaults()
@@ -12,6 +12,7 @@ import tables as tb
 import numpy as np
 
 import bright
+import bright.bright_config
 import bright.fccomp
 
 from pyne.material import Material
@@ -208,6 +209,88 @@ def test_write_hdf5_2():
     fcc.pass_num = 1
     fcc.write_hdf5()
 
+def teardown_fccomp_hdf5():
+    bright_conf.hdf5_buffer_passes = 1
+    bright_conf.write_hdf5 = False
+    bright.bright_config.close_output_hdf5()
+    teardown_fccomp()
+
+@with_setup(None, teardown_fccomp_hdf5)
+def test_flush_hdf5():
+    bright_conf.track_nucs = set([922350, 922380])
+    bright_conf.write_hdf5 = True
+    bright_conf.hdf5_buffer_passes = 3
+    fcc = FCComp(set(["Mass"]), 'fcc')
+    for p in range(1, 5):
+        fcc.mat_feed = Material({922350: 0.01 * p, 922380: 1.0 - 0.01 * p})
+        fcc.mat_prod = Material({922350: 0.5})
+        fcc.params_prior_calc = {"Mass": 1.0 * p}
+        fcc.params_after_calc = {"Mass": 0.5 * p}
+        fcc.pass_num = p
+        fcc.write_hdf5()
+    fcc.flush_hdf5()
+    bright.bright_config.close_output_hdf5()
+
+    f = tb.openFile('fuel_cycle.h5', 'r')
+    assert_equal(list(f.root.fcc.nucs[:]), [922350, 922380])
+    comp = f.root.fcc.mat_feed.comp[:]
+    assert_equal(comp.shape, (4, 2))
+    assert_true((np.abs(comp[:, 0] - [0.01, 0.02, 0.03, 0.04]) < 1E-12).all())
+    assert_true((np.abs(f.root.fcc.mat_prod.comp[:, 0] - 1.0) < 1E-12).all())
+    assert_equal(list(f.root.fcc.params_prior_calc.Mass[:]), [1.0, 2.0, 3.0, 4.0])
+    assert_equal(list(f.root.fcc.params_after_calc.Mass[:]), [0.5, 1.0, 1.5, 2.0])
+    f.close()
+
+@with_setup(None, teardown_fccomp_hdf5)
+def test_flush_hdf5_dealloc():
+    bright_conf.track_nucs = set([922350, 922380])
+    bright_conf.write_hdf5 = True
+    bright_conf.hdf5_buffer_passes = 3
+    fcc = FCComp(set(["Mass"]), 'fcc')
+    for p in range(1, 3):
+        fcc.mat_feed = Material({922350: 0.01 * p, 922380: 1.0 - 0.01 * p})
+        fcc.pass_num = p
+        fcc.write_hdf5()
+    del fcc
+    bright.bright_config.close_output_hdf5()
+
+    f = tb.openFile('fuel_cycle.h5', 'r')
+    assert_equal(f.root.fcc.mat_feed.comp.shape, (2, 2))
+    f.close()
+
+@with_setup(None, teardown_fccomp_hdf5)
+def test_flush_hdf5_reopen():
+    bright_conf.track_nucs = set([922350, 922380])
+    bright_conf.write_hdf5 = True
+    bright_conf.hdf5_buffer_passes = 2
+    fcc = FCComp(set(["Mass"]), 'fcc')
+    for p in range(1, 7):
+        fcc.mat_feed = Material({922350: 0.01 * p, 922380: 1.0 - 0.01 * p})
+        fcc.params_prior_calc = {"Mass": 1.0 * p}
+        fcc.pass_num = p
+        fcc.write_hdf5()
+        # the datasets are opened again in the reopened file
+        if p == 3:
+            bright.bright_config.close_output_hdf5()
+    bright.bright_config.close_output_hdf5()
+
+    f = tb.openFile('fuel_cycle.h5', 'r')
+    comp = f.root.fcc.mat_feed.comp[:]
+    assert_equal(comp.shape, (6, 2))
+    assert_true((np.abs(comp[:, 0] - 0.01 * np.arange(1, 7)) < 1E-12).all())
+    assert_equal(list(f.root.fcc.params_prior_calc.Mass[:]), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    f.close()
+
+@with_setup(None, teardown_fccomp_hdf5)
+def test_hdf5_nucs_mismatch():
+    bright_conf.track_nucs = set([922350, 922380])
+    bright_conf.write_hdf5 = True
+    fcc = FCComp(set(["Mass"]), 'fcc')
+    fcc.pass_num = 1
+    fcc.write_hdf5()
+    bright_conf.track_nucs = set([922350, 922380, 942390])
+    assert_raises(RuntimeError, FCComp, set(["Mass"]), 'fcc')
+
 @with_setup(None, teardown_fccomp)
 def test_write_1():
     "Text only."
@@ -283,6 +283,43 @@ def test_calc_mass_ratios():
     assert_almost_equal(core_input.comp[922350], ff.mass_weights_out["U235"])
     assert_almost_equal(core_input.comp[922380], ff.mass_weights_out["U238"])
 
+@with_setup(None, teardown_ff)
+def test_calc_many():
+    mws_outs = ff.calc_many([mws, {"U235": -1.0, "U238": -1.0}])
+    ff.calc_mass_ratios()
+
+    assert_equal(len(mws_outs), 2)
+    for mws_out in mws_outs:
+        assert_equal(set(mws_out.keys()), set(["U235", "U238"]))
+        assert_almost_equal(mws_out["U235"], ff.mass_weights_out["U235"])
+        assert_almost_equal(mws_out["U238"], ff.mass_weights_out["U238"])
+
+@with_setup(None, teardown_ff)
+def test_calc_many_no_zeta():
+    ff.reactor.use_zeta = False
+    mws_out = ff.calc_many([mws])[0]
+    ff.calc_mass_ratios()
+    ff.reactor.use_zeta = True
+
+    assert_almost_equal(mws_out["U235"] / ff.mass_weights_out["U235"], 1.0, 5)
+    assert_almost_equal(ff.reactor.batch_average_k(ff.reactor.target_BU), 1.0, 5)
+
+@with_setup(None, teardown_ff)
+def test_calc_mass_ratios_three_keys():
+    nu = Material({922350: 0.0072, 922380: 0.9928}, 1.0, name="NU")
+    ff.materials = {"U235": u235, "U238": u238, "NU": nu}
+    ff.mass_weights_in = {"U235": -1.0, "U238": -1.0, "NU": -2.0}
+    ff.calc_mass_ratios()
+
+    assert_equal(set(ff.mass_weights_out.keys()), set(["U235", "U238", "NU"]))
+    assert_almost_equal(sum(ff.mass_weights_out.values()), 1.0)
+    for key in ["U235", "U238", "NU"]:
+        assert(0.0 <= ff.mass_weights_out[key])
+    assert_almost_equal(ff.reactor.batch_average_k(ff.reactor.target_BU), 1.0, 5)
+
+    ff.materials = mats
+    ff.mass_weights_in = mws
+
 @with_setup(None, teardown_ff)
 def test_calc1():
     core_input = ff.calc()
@@ -669,6 +669,28 @@ def test_SigmaFtr_F_():
     "Can not do full test due to private sigma_a_therm data member."
     assert_equal(len(r1g.SigmaFtr_F_), len( r1g.F))
 
+@with_setup(None, teardown_r1g)
+def test_SigmaFtr_F_scattering():
+    "The transport XS only adds a fluence independent scattering term to absorption."
+    Sigma_str = np.array(r1g.SigmaFtr_F_) - np.array(r1g.SigmaFa_F_)
+    for f in range(len(r1g.F)):
+        assert(0.0 <= Sigma_str[f])
+        assert_almost_equal(Sigma_str[f] / Sigma_str[0], 1.0)
+
+@with_setup(setup_r1g_zeta, teardown_r1g)
+def test_calc_zeta_di_F_():
+    "calc_zeta() picks up edits to di_F_, as fold_mass_weights() does."
+    r1g.calc_zeta()
+    SigmaFa = np.array(r1g.SigmaFa_F_)
+    di = np.array(r1g.di_F_[922350])
+    r1g.di_F_[922350] = 2.0 * di
+    r1g.calc_zeta()
+    dSigmaFa = np.array(r1g.SigmaFa_F_) - SigmaFa
+    # Only the U-235 absorption changed, by its number density times di
+    for f in range(len(r1g.F)):
+        assert(0.0 < dSigmaFa[f])
+        assert_almost_equal((dSigmaFa[f] / di[f]) / (dSigmaFa[0] / di[0]), 1.0)
+
 @with_setup(None, teardown_r1g)
 def test_kappaF_F_():
     kappaF_F_ = r1g.kappaF_F_
@@ -765,11 +787,26 @@ def test_fold_mass_weights():
 @with_setup(setup_r1g_transmute, teardown_r1g_clear)
 def test_calc_Mj_Fd_():
     r1g.BUd_bisection_method()
-    r1g.calc_Mj_F_()
     r1g.calc_Mj_Fd_()
     assert(0.0 < r1g.mat_prod.mass)
     assert(r1g.mat_prod.mass < 1.0)
 
+@with_setup(setup_r1g_transmute, teardown_r1g_clear)
+def test_calc_Mj_Fd_matches_Mj_F_():
+    r1g.BUd_bisection_method()
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        r1g.calc_Mj_F_()
+        Mj_F_ = r1g.Mj_F_
+    assert_equal(len(w), 2)
+    assert_true(all(issubclass(x.category, DeprecationWarning) for x in w))
+    r1g.calc_Mj_Fd_()
+    F, Fd, fd = r1g.F, r1g.Fd, r1g.fd
+    f0 = fd - 1 if fd + 1 == len(F) else fd
+    for j, Mj in Mj_F_.items():
+        Mjd = Mj[f0] + (Mj[f0+1] - Mj[f0]) * (Fd - F[f0]) / (F[f0+1] - F[f0])
+        assert_almost_equal(r1g.mat_prod.comp[j] * r1g.mat_prod.mass, Mjd)
+
 
 
 #
@@ -798,6 +835,42 @@ def test_calc_sub_mats():
     assert(0.0 < r1g.mat_prod_lan.mass)
     assert(r1g.mat_prod_act.mass < 1.0)
 
+@with_setup(None, teardown_r1g)
+def test_calc_many():
+    feeds = [{922350: 0.05, 922380: 0.95}, {922350: 0.5, 922380: 0.5}]
+    BUds, nucs, prods = r1g.calc_many(feeds)
+    assert_equal(BUds.shape, (2,))
+    assert_equal(prods.shape, (2, len(nucs)))
+    for b, feed in enumerate(feeds):
+        prod = r1g.calc(Material(feed))
+        assert_almost_equal(BUds[b] / r1g.BUd, 1.0)
+        for j, nuc in enumerate(nucs):
+            assert_almost_equal(prods[b, j], prod.comp[nuc] * prod.mass)
+
+@with_setup(None, teardown_r1g)
+def test_calc_lazy_libraries():
+    feed = Material({922350: 0.05, 922380: 0.95})
+    prod_eager = r1g.calc(feed)
+    prod_eager = {nuc: prod_eager.comp[nuc] * prod_eager.mass for nuc in prod_eager.comp}
+
+    old_track_nucs = bright_conf.track_nucs
+    sub_track_nucs = set([922350, 922380, 942390, 942400, 942410])
+    try:
+        # The library is shared, so lazily loaded rows for a smaller set 
+        # of daughters must not leak into later eager calculations.
+        bright_conf.lazy_libraries = True
+        bright_conf.track_nucs = sub_track_nucs
+        prod_lazy = r1g.calc(feed)
+        for nuc in sub_track_nucs:
+            assert_almost_equal(prod_lazy.comp[nuc] * prod_lazy.mass, prod_eager[nuc])
+    finally:
+        bright_conf.lazy_libraries = False
+        bright_conf.track_nucs = old_track_nucs
+
+    prod = r1g.calc(feed)
+    for nuc, mass in prod_eager.items():
+        assert_almost_equal(prod.comp[nuc] * prod.mass, mass)
+
 @with_setup(None, teardown_r1g)
 def test_calc_tru_cr():
     r1g.calc()
@@ -850,6 +923,15 @@ def test_batch_average():
     assert_equal(k, kk)
     #assert_equal(p/d, k) # Averaging messes this up.
 
+@with_setup(None, teardown_r1g)
+def test_batch_average_many():
+    BUds = [0.5 * r1g.BUd, r1g.BUd, 1.5 * r1g.BUd]
+    for flag in ["P", "D", "K"]:
+        PDk = r1g.batch_average_many(BUds, flag)
+        assert_equal(len(PDk), len(BUds))
+        for BUd, val in zip(BUds, PDk):
+            assert_almost_equal(val, r1g.batch_average(BUd, flag))
+
 @with_setup(None, teardown_r1g)
 def test_batch_average_k():
     BUd = r1g.BUd
@@ -876,6 +958,19 @@ def test_BUd_bisection_method():
     assert_almost_equal(r1g.k, 1.0, 5)
     r1g.B = 3
 
+@with_setup(None, teardown_r1g)
+def test_BUd_segment_method():
+    r1g.BUd_bisection_method()
+    BUd = r1g.BUd
+    r1g.BUd_segment_method()
+    assert_almost_equal(r1g.k, 1.0, 8)
+    assert_almost_equal(r1g.BUd / BUd, 1.0, 2)
+    assert(r1g.BUd_fallback)
+    r1g.B = 1
+    r1g.BUd_segment_method()
+    assert_almost_equal(r1g.k, 1.0, 8)
+    r1g.B = 3
+
 
 @with_setup(None, teardown_r1g)
 def test_run_P_NL():
@@ -891,6 +986,10 @@ def test_calibrate_P_NL_to_BUd():
     r1g.calibrate_P_NL_to_BUd()
     assert_not_equal(r1g.P_NL, 0.98)
     assert_almost_equal(r1g.BUd / r1g.target_BU, 1.0, 1)
+    # A full run at the calibrated P_NL reproduces the rescaled burnup
+    bud = r1g.BUd
+    r1g.run_P_NL(r1g.P_NL)
+    assert_almost_equal(r1g.BUd / bud, 1.0, 5)
     
 
 #
@@ -39,6 +39,7 @@ def test_constructor():
     assert_almost_equal(rp.unit_cell_pitch, 0.0)
     assert_almost_equal(rp.open_slots, 0.0)
     assert_almost_equal(rp.total_slots, 0.0)
+    assert_equal(rp.depletion_solver, 'cram')
 
 def test_batches():
     rp = ReactorParameters()
@@ -103,6 +104,11 @@ def test_lattice_type():
     rp.lattice_type = 'Spherical'
     assert_equal(rp.lattice_type, 'Spherical')
 
+def test_depletion_solver():
+    rp = ReactorParameters()
+    rp.depletion_solver = 'pade'
+    assert_equal(rp.depletion_solver, 'pade')
+
 def test_rescale_hydrogen():
     rp = ReactorParameters()
     rp.rescale_hydrogen = True
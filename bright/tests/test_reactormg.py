@@ -19,7 +19,7 @@ import numpy as np
 from bright import bright_conf, load_track_nucs_hdf5
 from bright.reactor_parameters import ReactorParameters, lwr_defaults
 from bright.fluence_point import FluencePoint
-from bright.reactormg import ReactorMG
+from bright.reactormg import ReactorMG, XS_REACTIONS, xs_views
 from pyne.material import Material
 from pyne import nucname
 
@@ -262,6 +262,74 @@ def test_rescale_hydrogen_xs():
     rmg.rescale_hydrogen_xs = True
     assert_true(rmg.rescale_hydrogen_xs)
 
+@with_setup(None, teardown_rmg)
+def test_depletion_solver():
+    rmg = ReactorMG()
+    assert_equal(rmg.depletion_solver, 'cram')
+    rmg.depletion_solver = 'bateman'
+    assert_equal(rmg.depletion_solver, 'bateman')
+
+@with_setup(None, teardown_rmg)
+def test_store_inverses():
+    rmg = ReactorMG()
+    assert_false(rmg.store_inverses)
+    rmg.store_inverses = True
+    assert_true(rmg.store_inverses)
+
+@with_setup(None, teardown_rmg)
+def test_BUd_fallback():
+    rmg = ReactorMG()
+    assert_true(rmg.BUd_fallback)
+    rmg.BUd_fallback = False
+    assert_false(rmg.BUd_fallback)
+
+
+def setup_rmg_burnup(k_t):
+    rmg = ReactorMG()
+    rmg.B = 3
+    rmg.S = 5
+    rmg.burn_times = np.linspace(0.0, 400.0, 5)
+    rmg.BU_t = np.array([0.0, 10.0, 20.0, 30.0, 40.0])
+    rmg.Phi_t = np.array([0.0, 1.0, 2.0, 3.0, 4.0])
+    rmg.phi_t = np.array([1.0, 1.1, 1.2, 1.3, 1.4])
+    rmg.k_t = np.array(k_t)
+    return rmg
+
+@with_setup(None, teardown_rmg)
+def test_BUd_segment_method():
+    rmg = setup_rmg_burnup([1.3, 1.2, 1.1, 1.0, 0.9])
+    rmg.BUd_segment_method()
+    BUd = rmg.BUd
+    assert_true(35.0 < BUd < 50.0)
+    assert_almost_equal(rmg.batch_average_k(BUd), 1.0, 10)
+    assert_almost_equal(rmg.k, 1.0, 10)
+    rmg.BUd_bisection_method()
+    assert_almost_equal(rmg.BUd / BUd, 1.0, 5)
+
+@with_setup(None, teardown_rmg)
+def test_BUd_segment_method_fallback():
+    # k < 1 at zero burnup leaves no segment bracketing k = 1
+    rmg = setup_rmg_burnup([0.95, 1.25, 1.15, 1.0, 0.85])
+    rmg.BUd_fallback = False
+    assert_raises(RuntimeError, rmg.BUd_segment_method)
+    rmg.BUd_fallback = True
+    rmg.BUd_segment_method()
+    assert_true(40.0 < rmg.BUd < 45.0)
+    assert_almost_equal(rmg.batch_average_k(rmg.BUd), 1.0, 6)
+
+@with_setup(None, teardown_rmg)
+def test_eigen_solver():
+    rmg = ReactorMG()
+    assert_equal(rmg.eigen_solver, "wielandt")
+    assert_equal(rmg.eigen_tol, 1E-8)
+    assert_equal(rmg.eigen_max_iter, 500)
+    rmg.eigen_solver = "anderson"
+    assert_equal(rmg.eigen_solver, "anderson")
+    rmg.eigen_tol = 1E-6
+    assert_equal(rmg.eigen_tol, 1E-6)
+    rmg.eigen_max_iter = 100
+    assert_equal(rmg.eigen_max_iter, 100)
+
 @with_setup(None, teardown_rmg)
 def test_r():
     rmg = ReactorMG()
@@ -404,38 +472,202 @@ def test_Ti0():
         assert_equal(len(Ti0[iso]), nperturbations)
 
 
-@dec.skipif(True)
 @with_setup(None, teardown_rmg)
-def test_sigma_f_pg():
-    J = rmg.J
+def test_xs_lib():
     G = rmg.G
-    sigma_f_pg = rmg.sigma_f_pg
+    K_num = rmg.K_num
     nperturbations = rmg.nperturbations
-    for iso in sigma_f_pg.keys():
-        assert_equal(sigma_f_pg[iso].shape, (nperturbations, G))
+    xs_lib = rmg.xs_lib
+    assert_equal(len(xs_lib), (len(XS_REACTIONS) - 1 + G) * K_num * nperturbations * G)
 
 
-@dec.skipif(True)
 @with_setup(None, teardown_rmg)
-def test_nubar_sigma_f_pg():
-    J = rmg.J
+def test_xs_views():
     G = rmg.G
-    nubar_sigma_f_pg = rmg.nubar_sigma_f_pg
+    K_num = rmg.K_num
     nperturbations = rmg.nperturbations
-    for iso in nubar_sigma_f_pg.keys():
-        assert_equal(nubar_sigma_f_pg[iso].shape, (nperturbations, G))
+    views = xs_views(rmg)
+    assert_equal(set(views.keys()), set(XS_REACTIONS))
+    assert_equal(views['sigma_f'].shape, (K_num, nperturbations, G))
+    assert_equal(views['nubar_sigma_f'].shape, (K_num, nperturbations, G))
+    assert_equal(views['sigma_s'].shape, (K_num, nperturbations, G, G))
 
+    # The library is shared and so may not be written to
+    assert_false(views['sigma_f'].flags.writeable)
 
 
-@dec.skipif(True)
 @with_setup(None, teardown_rmg)
-def test_sigma_s_pgh():
-    J = rmg.J
-    G = rmg.G
-    sigma_s_pgh = rmg.sigma_s_pgh
-    nperturbations = rmg.nperturbations
-    for iso in sigma_s_pgh.keys():
-        assert_equal(sigma_s_pgh[iso].shape, (nperturbations, G, G))
+def test_xs_lib_shared():
+    libfile = os.getenv("BRIGHT_DATA") + '/lwr_base.h5'
+    rmg2 = ReactorMG()
+    rmg2.loadlib(libfile)
+    assert_equal(rmg2.xs_lib_size, rmg.xs_lib_size)
+    assert_equal(rmg2.xs_lib.ctypes.data, rmg.xs_lib.ctypes.data)
+    assert_equal(dict(rmg2.K_ind), dict(rmg.K_ind))
+
+
+@with_setup(None, teardown_rmg)
+def test_loadlib_not_hdf5():
+    with open('not_a_lib.h5', 'w') as f:
+        f.write('not hdf5')
+    rmg = ReactorMG()
+    try:
+        assert_raises(RuntimeError, rmg.loadlib, 'not_a_lib.h5')
+    finally:
+        os.remove('not_a_lib.h5')
+
+
+@with_setup(None, teardown_rmg)
+def test_transmutation_chains_cache():
+    libfile = os.getenv("BRIGHT_DATA") + '/lwr_base.h5'
+    rp = lwr_defaults()
+    rp.burn_times = np.array([0.0, 100.0])
+    rp.depletion_solver = 'bateman'
+
+    def burn(x=0.04):
+        r = ReactorMG(rp=rp, n='rmg')
+        r.loadlib(libfile)
+        r.mat_feed = Material({922350: x, 922380: 1.0 - x})
+        r.burnup_core()
+        return r
+
+    # The second reactor gets its chains from the shared library
+    r1 = burn()
+    r2 = burn()
+    assert_equal(r2.transmutation_chains_key(), r1.transmutation_chains_key())
+    chains = r2.transmutation_chains
+    assert_true(0 < len(chains))
+    assert_equal(chains, r1.transmutation_chains)
+    for nuc in r1.T_it.keys():
+        assert_array_equal(r2.T_it[nuc], r1.T_it[nuc])
+
+    # and these match what a fresh build finds, since with two 
+    # burn times the only transmutation step is the first one.
+    r2.bt_s = 0
+    r2.build_transmutation_chains()
+    assert_equal(r2.transmutation_chains, chains)
+
+    # Chains are pruned on the flux-dependent branch ratios, 
+    # so a different spectrum gets its own chains.
+    r3 = burn(0.08)
+    assert_not_equal(r3.transmutation_chains_key(), r1.transmutation_chains_key())
+    r3.bt_s = 0
+    r3.build_transmutation_chains()
+    r4 = burn(0.08)
+    assert_equal(r4.transmutation_chains, r3.transmutation_chains)
+
+
+@with_setup(None, teardown_rmg)
+def test_assemble_transmutation_matrices():
+    libfile = os.getenv("BRIGHT_DATA") + '/lwr_base.h5'
+    rp = lwr_defaults()
+    rp.burn_times = np.array([0.0, 100.0, 200.0])
+    rp.depletion_solver = 'bateman'
+    r = ReactorMG(rp=rp, n='rmg')
+    r.loadlib(libfile)
+    r.mat_feed = Material({922350: 0.04, 922380: 0.96})
+    r.burnup_core()
+
+    T = r.T_int_tij
+    M = r.M_tij
+    assert_equal(len(T), r.S)
+    assert_equal(len(M), r.S)
+
+    decay = None
+    for t in range(r.S):
+        for rows, cols, vals in (T[t], M[t]):
+            # entries are unique, in row-major order, and on the K_ind layout
+            flat = rows.astype(np.int64) * r.K_num + cols
+            assert_true((0 < np.diff(flat)).all())
+            assert_true((0 <= rows).all() and (rows < r.K_num).all())
+            assert_true((0 <= cols).all() and (cols < r.K_num).all())
+            assert_true((vals != 0.0).all())
+
+        # the parents only lose nuclides and the daughters only gain them
+        rows, cols, vals = T[t]
+        diag = (rows == cols)
+        assert_true(diag.any())
+        assert_true((vals[diag] < 0.0).all())
+        assert_true((0.0 < vals[~diag]).all())
+
+        # and the decay matrix, M - T, does not depend on the flux, to 
+        # within the round off of adding it to T.
+        d = dict(zip(zip(M[t][0], M[t][1]), M[t][2]))
+        for i, j, v in zip(*T[t]):
+            d[i, j] = d.get((i, j), 0.0) - v
+        tol = 1E-12 * np.abs(vals).max()
+        if decay is None:
+            decay, decay_tol = d, tol
+            assert_true(0 < len([v for v in decay.values() if v != 0.0]))
+        else:
+            for ij in set(d) | set(decay):
+                assert_true(abs(d.get(ij, 0.0) - decay.get(ij, 0.0)) <= tol + decay_tol)
+
+    # Re-assembling a time step gives back the same matrices
+    r.bt_s = 0
+    r.assemble_transmutation_matrices()
+    for new, old in ((r.T_int_tij[0], T[0]), (r.M_tij[0], M[0])):
+        for a, b in zip(new, old):
+            assert_array_equal(a, b)
+
+
+@with_setup(None, teardown_rmg)
+def test_calibrate_P_NL_to_BUd_rescale():
+    libfile = os.getenv("BRIGHT_DATA") + '/lwr_base.h5'
+    rp = lwr_defaults()
+    rp.BUt = 40.0
+    rp.burn_times = np.linspace(0.0, 2100.0, 8)
+    r = ReactorMG(rp=rp, n='rmg')
+    r.loadlib(libfile)
+    r.mat_feed = Material({922350: 0.04, 922380: 0.96})
+    r.calibrate_P_NL_to_BUd()
+    assert_not_equal(r.P_NL, 0.98)
+    assert_almost_equal(r.BUd / r.target_BU, 1.0, 5)
+
+    # The calibration burns the core up once and rescales k_t for each 
+    # trial P_NL, so a full run at the calibrated P_NL gives the same burnup.
+    bud = r.BUd
+    k_t = np.array(r.k_t)
+    r.run_P_NL(r.P_NL)
+    assert_array_almost_equal(r.k_t, k_t)
+    assert_almost_equal(r.BUd / bud, 1.0, 5)
+
+
+@with_setup(None, teardown_rmg)
+def test_nearest_neighbors_kdtree():
+    libfile = os.getenv("BRIGHT_DATA") + '/lwr_base.h5'
+    f = tb.openFile(libfile, 'r')
+    pert = f.root.perturbations
+    cols = [c for c in pert.colnames if 0.0 < rmg.perturbed_fields[c][2]]
+    points = np.array([pert.col(c) / rmg.perturbed_fields[c][2] for c in cols]).T
+    f.close()
+
+    attrs = {'fuel_density': 'rho_fuel', 'clad_density': 'rho_clad', 'cool_density': 'rho_cool', 
+             'fuel_cell_radius': 'r_fuel', 'void_cell_radius': 'r_void', 
+             'clad_cell_radius': 'r_clad', 'unit_cell_pitch': 'pitch', 
+             'burn_regions': 'burn_regions', 'fuel_specific_power': 'specific_power', 
+             'burn_times': 'burn_time'}
+
+    def state(c):
+        if c in attrs:
+            return getattr(rmg, attrs[c])
+        nuc = nucname.zzaaam(c[8:])
+        return rmg.mat_feed.comp[nuc] if nuc in rmg.mat_feed.comp else 0.0
+
+    # Compare the k-d tree against a brute force search, at states between table rows
+    rmg.mat_feed = Material({922350: 0.04, 922380: 0.96})
+    for q in range(0, rmg.nperturbations - 1, max(1, rmg.nperturbations // 10)):
+        for c, x in zip(cols, (points[q] + points[q+1]) / 2.0):
+            if c in attrs:
+                setattr(rmg, attrs[c], x * rmg.perturbed_fields[c][2])
+        x = np.array([state(c) / rmg.perturbed_fields[c][2] for c in cols])
+        dist = np.sqrt(((points - x)**2).sum(axis=1))
+
+        rmg.calc_nearest_neighbors()
+        nn = list(rmg.nearest_neighbors)
+        assert_equal(len(nn), min(2, rmg.nperturbations))
+        assert_not_equal(nn[0], nn[1])
+        assert_array_almost_equal(dist[nn], np.sort(dist)[:2])
 
 
 
@@ -452,6 +684,7 @@ def setup_class():
     bright.load_track_nucs_hdf5(libfile)
     rmg = ReactorMG(rp=default_rp, n='rmg')
     rmg.loadlib(libfile)
+    rmg.store_inverses = True
     rmg.mat_feed = MassStream({922350: 0.05, 922380: 0.95})
 #    rmg.mat_feed = MassStream({922350: 0.03, 922380: 0.97})
     rmg.burnup_core()
@@ -464,7 +697,8 @@ def teardown_class():
 
 
 def test_calc_nearest_neighbors():
-    assert_equal(len(rmg.nearest_neighbors), rmg.nperturbations)
+    assert_equal(len(rmg.nearest_neighbors), min(2, rmg.nperturbations))
+    assert_not_equal(rmg.nearest_neighbors[0], rmg.nearest_neighbors[1])
 
 
 def test_interpolate_cross_sections():
@@ -120,6 +120,33 @@ def test_calc_2():
     assert_equal(r.mat_prod.mass, 0.99)
     assert_equal(r.mat_prod.comp[942390], 1.0) # Recall ms.comp is normalized
 
+@with_setup(None, teardown_rep)
+def test_calc_many():
+    bright_conf.track_nucs = set([922350, 922380, 942390])
+    r = Reprocess(sepeff={"U235": 0.9, "922380": 0.999, "94239": 0.99})
+    feeds = [Material({942390: 1.0}), {922350: 0.5, 922380: 0.5}]
+    nucs, prods = r.calc_many(feeds)
+    assert_equal(list(nucs), [922350, 922380, 942390])
+    assert_equal(prods.shape, (2, 3))
+    assert_almost_equal(prods[0, 2], 0.99)
+    assert_almost_equal(prods[1, 0], 0.45)
+    assert_almost_equal(prods[1, 1], 0.4995)
+    assert_almost_equal(prods[1, 2], 0.0)
+    assert_almost_equal(r.mat_prod.mass, 0.9495)
+
+@with_setup(None, teardown_rep)
+def test_calc_products():
+    bright_conf.track_nucs = set([922350, 922380, 942390])
+    r = Reprocess(sepeff={"U": 0.999, "PU": 0.99})
+    r.mat_feed = Material({922350: 0.01, 922380: 0.89, 942390: 0.1})
+    mass = r.mat_prod.mass
+    u, pu = r.calc_products([{"U": 0.999, "PU": 0.0}, {"U": 0.0, "PU": 0.99}])
+    assert_almost_equal(u.mass, 0.8991)
+    assert_almost_equal(u.comp[942390], 0.0)
+    assert_almost_equal(pu.mass, 0.099)
+    assert_almost_equal(pu.comp[942390], 1.0)
+    assert_equal(r.mat_prod.mass, mass)
+
 @with_setup(None, teardown_rep)
 def test_initialize_1():
     bright_conf.track_nucs = set()
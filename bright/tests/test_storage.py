@@ -109,6 +109,58 @@ def test_calc_4():
     assert(s.mat_prod.mass < 1.0)
     assert_almost_equal(s.mat_prod.comp[942390], 0.5, 3) 
 
+@with_setup(None, teardown_storage)
+def test_calc_shared_library():
+    bright_conf.track_nucs = set([922350, 922380, 942390])
+    s1 = Storage()
+    s1.calc(Material({942390: 1.0}), 24110*365.25*24*3600)
+    s2 = Storage()
+    s2.calc(Material({942390: 1.0, 922380: 1.0}), 24110*365.25*24*3600)
+    s3 = Storage()
+    s3.calc(Material({942390: 1.0}), 24110*365.25*24*3600)
+    assert_equal(s1.mat_prod.mass, s3.mat_prod.mass)
+    assert_equal(s1.mat_prod.comp[942390], s3.mat_prod.comp[942390])
+    assert_almost_equal(s2.mat_prod.mass, s1.mat_prod.mass + 1.0, 4)
+
+@with_setup(None, teardown_storage)
+def test_calc_decay_matrix():
+    bright_conf.track_nucs = set([922350, 922380, 942390])
+    s = Storage()
+    s.calc(Material({942390: 1.0}), 24110*365.25*24*3600)
+    s.use_decay_matrix = True
+    mat_prod = s.calc(Material({942390: 1.0}), 24110*365.25*24*3600)
+    assert_almost_equal(mat_prod.mass / s.mat_prod.mass, 1.0, 8)
+    assert_almost_equal(mat_prod.comp[942390], 0.5, 3)
+
+@with_setup(None, teardown_storage)
+def test_calc_many():
+    bright_conf.track_nucs = set([922350, 922380, 942390])
+    s = Storage()
+    s.mat_feed = Material({942390: 1.0})
+    t = np.array([0.0, 1.0, 2.0]) * 24110*365.25*24*3600
+    nucs, prods = s.calc_many(t)
+    assert_equal(prods.shape, (3, len(nucs)))
+    j = list(nucs).index(942390)
+    assert_almost_equal(prods[0, j], 1.0)
+    assert_almost_equal(prods[1, j], 0.5, 3)
+    assert_almost_equal(prods[2, j], 0.25, 3)
+    assert_equal(s.decay_time, t[-1])
+
+def test_cram_equal_decay_constants():
+    # A branching chain whose parent and first daughter share a decay constant, 
+    # where the Bateman formula is singular, against its analytic solution.
+    l, b, t = 1E-3, 0.3, 2000.0
+    A = np.array([[-l,            0.0, 0.0],
+                  [b * l,          -l, 0.0],
+                  [(1.0 - b) * l,   l, 0.0]])
+    N = bright.storage.cram(A, [1.0, 0.0, 0.0], t)
+    e = np.exp(-l * t)
+    assert_almost_equal(N[0] / e, 1.0, 12)
+    assert_almost_equal(N[1] / (b * l * t * e), 1.0, 12)
+    assert_almost_equal(N[2] / (1.0 - e - (b * l * t * e)), 1.0, 12)
+    assert_almost_equal(N.sum(), 1.0, 12)
+    assert_raises(ValueError, bright.storage.cram, A.T, [1.0, 0.0, 0.0], t)
+
 @with_setup(None, teardown_storage)
 def test_calc_params():
     bright_conf.track_nucs = set([922350, 922380, 942390])
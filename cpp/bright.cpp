@@ -35,9 +35,55 @@ void bright::bright_start()
 int bright::verbosity  = 0;
 int bright::write_text = 1;
 int bright::write_hdf5 = 0;
+bool bright::lazy_libraries = false;
 
 std::string bright::output_filename = "fuel_cycle.h5";
 
+int bright::hdf5_buffer_passes = 1;
+int bright::hdf5_chunk_passes  = 10;
+int bright::hdf5_compression   = 0;
+
+
+// The output file, which is shared by all components
+static H5::H5File * output_file = NULL;
+static std::string output_file_name;
+
+H5::H5File * bright::open_output_hdf5()
+{
+  // Reopen the file if output_filename has changed, or if it was removed out from under us.
+  if (output_file != NULL && (output_file_name != output_filename || !pyne::file_exists(output_filename)))
+    close_output_hdf5();
+
+  if (output_file == NULL)
+  {
+    // Turn off annoying HDF5 errors
+    H5::Exception::dontPrint();
+
+    // Closing the file also closes the datasets which components keep open in it.
+    H5::FileAccPropList fapl;
+    fapl.setFcloseDegree(H5F_CLOSE_STRONG);
+
+    if (pyne::file_exists(output_filename))
+      output_file = new H5::H5File(output_filename, H5F_ACC_RDWR, H5::FileCreatPropList::DEFAULT, fapl);
+    else
+      output_file = new H5::H5File(output_filename, H5F_ACC_TRUNC, H5::FileCreatPropList::DEFAULT, fapl);
+    output_file_name = output_filename;
+  };
+
+  return output_file;
+};
+
+
+void bright::close_output_hdf5()
+{
+  if (output_file == NULL)
+    return;
+
+  output_file->close();
+  delete output_file;
+  output_file = NULL;
+};
+
 
 void bright::sort_track_nucs()
 {
@@ -526,6 +572,116 @@ std::vector< std::vector<double> > bright::matrix_inverse(std::vector< std::vect
 
 
 
+void bright::lu_decomposition(std::vector< std::vector<double> > & a, std::vector<int> & piv)
+{
+  // Factors the square matrix a in place into PA = LU, with partial pivoting.
+  // L (unit diagonal) is stored below the diagonal and U on and above it, while 
+  // piv[i] is the original row that ended up in row i.  Columns which are already 
+  // zero below the diagonal are skipped, so triangular and block-triangular 
+  // matrices (such as downscatter-only removal matrices) factor in O(I^2).
+  int i, j, k, p;
+  int I = a.size();
+
+  if (I <= 0)
+    throw VectorSizeError();
+
+  piv = std::vector<int>(I);
+  for (i = 0; i < I; i++)
+    piv[i] = i;
+
+  double l_ik;
+  for (k = 0; k < I; k++)
+  {
+    // Find the pivot
+    p = k;
+    for (i = k + 1; i < I; i++)
+      if (fabs(a[p][k]) < fabs(a[i][k]))
+        p = i;
+
+    if (p != k)
+    {
+      std::swap(a[p], a[k]);
+      std::swap(piv[p], piv[k]);
+    };
+
+    // Same small value as matrix_inverse() for singular matrices
+    if ((a[k][k] < 1e-12) && (a[k][k] > -1e-12))
+      a[k][k] = 1e-12;
+
+    // Eliminate below the pivot
+    for (i = k + 1; i < I; i++)
+    {
+      if (a[i][k] == 0.0)
+        continue;
+
+      l_ik = a[i][k] / a[k][k];
+      a[i][k] = l_ik;
+      for (j = k + 1; j < I; j++)
+        a[i][j] -= l_ik * a[k][j];
+    };
+  };
+};
+
+
+
+std::vector<double> bright::lu_solve(std::vector< std::vector<double> > & lu, std::vector<int> & piv, std::vector<double> b)
+{
+  // Solves Ax = b given the factors of A from lu_decomposition().
+  int i, j;
+  int I = lu.size();
+
+  if (I != b.size() || I != piv.size())
+    throw VectorSizeError();
+
+  std::vector<double> x (I, 0.0);
+
+  // Forward substitution
+  for (i = 0; i < I; i++)
+  {
+    x[i] = b[piv[i]];
+    for (j = 0; j < i; j++)
+      x[i] -= lu[i][j] * x[j];
+  };
+
+  // Back substitution
+  for (i = I - 1; 0 <= i; i--)
+  {
+    for (j = i + 1; j < I; j++)
+      x[i] -= lu[i][j] * x[j];
+    x[i] /= lu[i][i];
+  };
+
+  return x;
+};
+
+
+
+std::vector< std::vector<double> > bright::lu_inverse(std::vector< std::vector<double> > & lu, std::vector<int> & piv)
+{
+  // Computes the inverse of A from its lu_decomposition(), one column at a time.
+  int i, j;
+  int I = lu.size();
+
+  std::vector< std::vector<double> > a_inv (I, std::vector<double>(I, 0.0)); 
+  std::vector<double> e (I, 0.0);
+  std::vector<double> col;
+
+  for (j = 0; j < I; j++)
+  {
+    e[j] = 1.0;
+    col = lu_solve(lu, piv, e);
+    e[j] = 0.0;
+
+    for (i = 0; i < I; i++)
+      a_inv[i][j] = col[i];
+  };
+
+  return a_inv;
+};
+
+
+
+
 
 std::vector< std::vector<double> > bright::matrix_addition(std::vector< std::vector<double> > a, std::vector< std::vector<double> > b)
 {
@@ -633,6 +789,419 @@ std::vector<double> bright::scalar_matrix_vector_product(double a, std::vector<
 
 
 
+/* 
+ * KD-Tree
+ */
+
+bright::KDTree::KDTree()
+{
+  npoints = 0;
+  ndims = 0;
+};
+
+
+bright::KDTree::KDTree(std::vector< std::vector<double> > pts)
+{
+  points = pts;
+  npoints = points.size();
+  if (npoints == 0)
+    ndims = 0;
+  else
+    ndims = points[0].size();
+
+  index = std::vector<int> (npoints);
+  for (int n = 0; n < npoints; n++)
+    index[n] = n;
+
+  split = std::vector<int> (npoints, 0);
+  build(0, npoints);
+};
+
+
+bright::KDTree::~KDTree()
+{
+};
+
+
+
+namespace bright {
+  // Orders point indices along a single dimension, for use with std::nth_element
+  class kdtree_dim_comparator
+  {
+  public:
+    std::vector< std::vector<double> > * pts;
+    int dim;
+
+    kdtree_dim_comparator(std::vector< std::vector<double> > * p, int d)
+    {
+      pts = p;
+      dim = d;
+    };
+
+    bool operator() (int a, int b)
+    {
+      return (*pts)[a][dim] < (*pts)[b][dim];
+    };
+  };
+};
+
+
+
+void bright::KDTree::build(int lo, int hi)
+{
+  // Recursively median-splits index[lo:hi] along the dimension of largest spread
+  if (hi - lo <= 1)
+    return;
+
+  int n, d;
+  int dim = 0;
+  double spread, max_spread = -1.0;
+  double dmin, dmax;
+  for (d = 0; d < ndims; d++)
+  {
+    dmin = points[index[lo]][d];
+    dmax = dmin;
+    for (n = lo + 1; n < hi; n++)
+    {
+      if (points[index[n]][d] < dmin)
+        dmin = points[index[n]][d];
+      else if (dmax < points[index[n]][d])
+        dmax = points[index[n]][d];
+    };
+
+    spread = dmax - dmin;
+    if (max_spread < spread)
+    {
+      max_spread = spread;
+      dim = d;
+    };
+  };
+
+  int mid = (lo + hi) / 2;
+  if (0 < ndims)
+    std::nth_element(index.begin() + lo, index.begin() + mid, index.begin() + hi, kdtree_dim_comparator(&points, dim));
+  split[mid] = dim;
+
+  build(lo, mid);
+  build(mid + 1, hi);
+};
+
+
+
+void bright::KDTree::search(int lo, int hi, std::vector<double> & x, int k, std::vector< std::pair<double, int> > & heap)
+{
+  // Branch-and-bound descent that keeps the k best (distance^2, index) pairs in a max-heap
+  if (hi <= lo)
+    return;
+
+  int mid = (lo + hi) / 2;
+  int p = index[mid];
+
+  double dist2 = 0.0;
+  double diff;
+  for (int d = 0; d < ndims; d++)
+  {
+    diff = x[d] - points[p][d];
+    dist2 += diff * diff;
+  };
+
+  std::pair<double, int> cand (dist2, p);
+  if ((int) heap.size() < k)
+  {
+    heap.push_back(cand);
+    std::push_heap(heap.begin(), heap.end());
+  }
+  else if (cand < heap.front())
+  {
+    std::pop_heap(heap.begin(), heap.end());
+    heap.back() = cand;
+    std::push_heap(heap.begin(), heap.end());
+  };
+
+  if (hi - lo == 1)
+    return;
+
+  double plane_diff = 0.0;
+  if (0 < ndims)
+    plane_diff = x[split[mid]] - points[p][split[mid]];
+
+  // Search the near side first, then the far side only if it could hold a closer point
+  if (plane_diff < 0.0)
+  {
+    search(lo, mid, x, k, heap);
+    if (((int) heap.size() < k) || (plane_diff * plane_diff <= heap.front().first))
+      search(mid + 1, hi, x, k, heap);
+  }
+  else
+  {
+    search(mid + 1, hi, x, k, heap);
+    if (((int) heap.size() < k) || (plane_diff * plane_diff <= heap.front().first))
+      search(lo, mid, x, k, heap);
+  };
+};
+
+
+
+std::vector<int> bright::KDTree::nearest(std::vector<double> x, int k)
+{
+  // Returns the indices of the k points nearest to x, sorted from nearest to farthest.
+  if ((int) x.size() != ndims)
+    throw VectorSizeError();
+
+  if (npoints < k)
+    k = npoints;
+
+  std::vector< std::pair<double, int> > heap;
+  heap.reserve(k);
+  search(0, npoints, x, k, heap);
+
+  std::sort_heap(heap.begin(), heap.end());
+
+  std::vector<int> nn (heap.size());
+  for (int n = 0; n < (int) heap.size(); n++)
+    nn[n] = heap[n].second;
+
+  return nn;
+};
+
+
+
+
+
+/* 
+ * Eigenvalue Solver
+ */
+
+int bright::solve_eigenvalue(std::vector< std::vector<double> > & A, std::vector< std::vector<double> > & F, 
+                             std::vector<double> & w, std::vector<double> & phi, double & k, 
+                             std::string method, double tol, int max_iter, double * residual)
+{
+  // Factors A and then finds the fundamental mode of A phi = (1/k) F phi, see below.
+  std::vector< std::vector<double> > A_lu = A;
+  std::vector<int> A_piv;
+  lu_decomposition(A_lu, A_piv);
+  return solve_eigenvalue(A, A_lu, A_piv, F, w, phi, k, method, tol, max_iter, residual);
+};
+
+
+
+int bright::solve_eigenvalue(std::vector< std::vector<double> > & A, std::vector< std::vector<double> > & A_lu, 
+                             std::vector<int> & A_piv, std::vector< std::vector<double> > & F, 
+                             std::vector<double> & w, std::vector<double> & phi, double & k, 
+                             std::string method, double tol, int max_iter, double * residual)
+{
+  // Finds the fundamental mode of A phi = (1/k) F phi, starting from the phi and k 
+  // that are passed in, which are then overwritten with the answer.  A_lu and A_piv
+  // are the factors of A from lu_decomposition().  The weights w (typically 
+  // nubar Sigma_f) are used to update k from one iteration to the next.
+  // The method is one of:
+  //   "power"    - plain power iteration, phi <- A^-1 F phi.
+  //   "wielandt" - power iteration on (A - F/k_s)^-1 F, with the shift k_s set 10% 
+  //                above the estimate of k.  The shifted operator is only refactored 
+  //                when k has moved more than 1% from the estimate the shift was set at.
+  //   "anderson" - power iteration with Anderson mixing of the last few iterates.
+  // Returns the number of iterations taken.  The final relative change in k and phi 
+  // is stored in residual, if given; convergence is when this drops below tol.
+  int g, h, n, m, p;
+  int I = A.size();
+
+  if (method != "power" && method != "wielandt" && method != "anderson")
+    throw BadEigenSolver(method);
+
+  if (I != F.size() || I != w.size() || I != phi.size() || I != A_lu.size() || I != A_piv.size())
+    throw VectorSizeError();
+
+  // Normalize the initial guess
+  double phi_tot = 0.0;
+  for (g = 0; g < I; g++)
+    phi_tot += fabs(phi[g]);
+  for (g = 0; g < I; g++)
+    phi[g] = (phi_tot == 0.0) ? 1.0 / I : fabs(phi[g]) / phi_tot;
+
+  if (k <= 0.0)
+    k = 1.0;
+
+  // Wielandt shifted operator, and the shift it was last factored with
+  std::vector< std::vector<double> > lu_s;
+  std::vector<int> piv_s;
+  double k_s;
+  double k_lu_s = 0.0;
+
+  // Anderson history of iterate and residual differences
+  int depth = 3;
+  std::vector< std::vector<double> > dX, dR;
+  std::vector<double> x_last, r_last, r (I);
+
+  double k_new, mu, w_phi, w_psi, res = 1.0;
+  std::vector<double> F_phi (I), psi, phi_new;
+
+  for (n = 1; n <= max_iter; n++)
+  {
+    // Fission source
+    for (g = 0; g < I; g++)
+    {
+      F_phi[g] = 0.0;
+      for (h = 0; h < I; h++)
+        F_phi[g] += F[g][h] * phi[h];
+    };
+
+    w_phi = 0.0;
+    for (g = 0; g < I; g++)
+      w_phi += w[g] * phi[g];
+
+    // Apply the operator; Wielandt waits for a few plain iterations to settle k first
+    if ((method == "wielandt") && (3 < n))
+    {
+      if ((k_lu_s == 0.0) || (0.01 < fabs(1.0 - (1.1 * k / k_lu_s))))
+      {
+        k_lu_s = 1.1 * k;
+        lu_s = A;
+        for (g = 0; g < I; g++)
+          for (h = 0; h < I; h++)
+            lu_s[g][h] -= F[g][h] / k_lu_s;
+        lu_decomposition(lu_s, piv_s);
+      };
+      k_s = k_lu_s;
+      psi = lu_solve(lu_s, piv_s, F_phi);
+    }
+    else
+    {
+      k_s = 0.0;
+      psi = lu_solve(A_lu, A_piv, F_phi);
+    };
+
+    w_psi = 0.0;
+    for (g = 0; g < I; g++)
+      w_psi += w[g] * psi[g];
+
+    if (w_phi == 0.0)
+      k_new = 0.0;
+    else if (k_s == 0.0)
+      k_new = w_psi / w_phi;
+    else
+    {
+      mu = w_psi / w_phi;
+      k_new = 1.0 / ((1.0 / mu) + (1.0 / k_s));
+    };
+
+    // Normalize the next iterate
+    phi_tot = 0.0;
+    for (g = 0; g < I; g++)
+      phi_tot += fabs(psi[g]);
+    phi_new = std::vector<double>(I, 1.0 / I);
+    if (phi_tot != 0.0)
+      for (g = 0; g < I; g++)
+        phi_new[g] = psi[g] / phi_tot;
+
+    // Mix in the previous iterates
+    if (method == "anderson")
+    {
+      for (g = 0; g < I; g++)
+        r[g] = phi_new[g] - phi[g];
+
+      if (!r_last.empty())
+      {
+        dX.push_back(std::vector<double>(I));
+        dR.push_back(std::vector<double>(I));
+        for (g = 0; g < I; g++)
+        {
+          dX.back()[g] = phi[g] - x_last[g];
+          dR.back()[g] = r[g] - r_last[g];
+        };
+
+        if (depth < (int) dR.size())
+        {
+          dX.erase(dX.begin());
+          dR.erase(dR.begin());
+        };
+      };
+      x_last = phi;
+      r_last = r;
+
+      m = dR.size();
+      if (0 < m)
+      {
+        // Least squares for the mixing coefficients, via the normal equations
+        std::vector< std::vector<double> > RtR (m, std::vector<double>(m, 0.0));
+        std::vector<double> Rtr (m, 0.0);
+        for (p = 0; p < m; p++)
+        {
+          for (g = 0; g < I; g++)
+            Rtr[p] += dR[p][g] * r[g];
+
+          for (h = 0; h < m; h++)
+            for (g = 0; g < I; g++)
+              RtR[p][h] += dR[p][g] * dR[h][g];
+        };
+
+        std::vector<int> piv_m;
+        lu_decomposition(RtR, piv_m);
+        std::vector<double> gamma = lu_solve(RtR, piv_m, Rtr);
+
+        std::vector<double> phi_mix (I);
+        bool positive = true;
+        phi_tot = 0.0;
+        for (g = 0; g < I; g++)
+        {
+          phi_mix[g] = phi[g] + r[g];
+          for (p = 0; p < m; p++)
+            phi_mix[g] -= gamma[p] * (dX[p][g] + dR[p][g]);
+          positive = positive && (0.0 < phi_mix[g]);
+          phi_tot += phi_mix[g];
+        };
+
+        // Fall back to the plain iterate, and start the history over, if mixing misbehaves
+        if (positive)
+          for (g = 0; g < I; g++)
+            phi_new[g] = phi_mix[g] / phi_tot;
+        else
+        {
+          dX.clear();
+          dR.clear();
+        };
+      };
+    };
+
+    // Relative change in k and phi
+    res = (k_new == 0.0) ? 0.0 : fabs(1.0 - (k / k_new));
+    for (g = 0; g < I; g++)
+      if (phi_new[g] != 0.0 && res < fabs(1.0 - (phi[g] / phi_new[g])))
+        res = fabs(1.0 - (phi[g] / phi_new[g]));
+
+    phi = phi_new;
+    k = k_new;
+
+    if (res < tol)
+      break;
+  };
+
+  if (residual != NULL)
+    *residual = res;
+
+  return (max_iter < n) ? max_iter : n;
+};
+
+
+
+
+
+/* 
+ * Library Cache
+ */
+
+time_t bright::file_mtime(std::string filename)
+{
+  // Returns the last modification time of a file, or 0 if it cannot be stat'd.
+  struct stat st;
+  if (stat(filename.c_str(), &st) != 0)
+    return 0;
+  return st.st_mtime;
+};
+
+
+
+
+
 /* 
  * Array Helpers
  */
@@ -13,6 +13,7 @@
 #include <stdlib.h>
 #include <iostream>
 #include <cmath>
+#include <complex>
 #include <exception>
 #include <sys/stat.h> 
 #include <set>
@@ -21,6 +22,10 @@
 #include <algorithm>
 #include <typeinfo>
 
+#ifdef _OPENMP
+  #include <omp.h>
+#endif
+
 // HDF5 includes
 #include "hdf5.h"
 #include "hdf5_hl.h"
@@ -51,9 +56,18 @@ namespace bright {
   extern int verbosity;			//How much should the components talk to us? 0 = None, 1 = a little, 2 = a lot!, etc.
   extern int write_text;
   extern int write_hdf5;
+  extern bool lazy_libraries;  // Whether reactor libraries read their transmutation data only as it is needed
 
   extern std::string output_filename;
 
+  // HDF5 output tuning
+  extern int hdf5_buffer_passes;  // Passes each component holds in memory before writing them out
+  extern int hdf5_chunk_passes;   // Passes per chunk of the output datasets
+  extern int hdf5_compression;    // gzip level (1-9) of the output datasets, 0 for none
+
+  extern H5::H5File * open_output_hdf5();  // Opens output_filename once, and keeps it open for the session
+  extern void close_output_hdf5();         // Closes output_filename, if it is open
+
   // Some useful typedefs...
   typedef std::set<int> nuc_set;
   typedef nuc_set::iterator nuc_iter;
@@ -133,6 +147,9 @@ namespace bright {
 
   std::vector< std::vector<double> > vector_outer_product(std::vector<double>, std::vector<double>);
   std::vector< std::vector<double> > matrix_inverse(std::vector< std::vector<double> >);
+  void lu_decomposition(std::vector< std::vector<double> > &, std::vector<int> &);
+  std::vector<double> lu_solve(std::vector< std::vector<double> > &, std::vector<int> &, std::vector<double>);
+  std::vector< std::vector<double> > lu_inverse(std::vector< std::vector<double> > &, std::vector<int> &);
   std::vector< std::vector<double> > matrix_addition(std::vector< std::vector<double> >, std::vector< std::vector<double> >);
   std::vector< std::vector<double> > matrix_multiplication(std::vector< std::vector<double> >, std::vector< std::vector<double> >);
 
@@ -242,6 +259,37 @@ namespace bright {
 
 
 
+
+
+  class BadEigenSolver : public std::exception
+  {
+  //Exception for when an unknown eigenvalue iteration method is asked for.
+  public:
+    BadEigenSolver ()
+    {
+      errstr = "Eigenvalue solver not recognized.";
+    };
+    BadEigenSolver (std::string method)
+    {
+      errstr = "Eigenvalue solver '" + method + "' not recognized; use power, wielandt, or anderson.";
+    };
+    ~BadEigenSolver () throw () {};
+
+    static char * name ()
+    {
+      return (char *) "BadEigenSolver";
+    };
+
+    virtual const char* what() const throw()
+    {
+      return (const char *) errstr.c_str();
+    };
+  private:
+    std::string errstr;
+  };
+
+
+
   /***************************/
   /*** Sparse Matrix Stuff ***/
   /***************************/
@@ -402,7 +450,7 @@ namespace bright {
       // Calculate indices to remove
       for (n = N - 1; 0 <= n; n--)
       {
-        if ((sm[n].row == sm[n-1].row) && (sm[n].col == sm[n-1].col))
+        if ((0 < n) && (sm[n].row == sm[n-1].row) && (sm[n].col == sm[n-1].col))
           bad_ind.push_back(n);
         else if (sm[n].val == 0.0)
           bad_ind.push_back(n);
@@ -761,6 +809,418 @@ namespace bright {
 
       return new_vec;
     };
+
+
+    void solve_shifted(double t, std::complex<double> shift, std::vector< std::complex<double> > & b)
+    {
+      // Solves (t*A - shift*I) x = b in place via sparse Gaussian elimination.
+      // Rows are factored in order (IKJ Doolittle) and fill-in is only 
+      // created where it is actually needed, so this is cheap for the nearly 
+      // triangular matrices that come out of decay and transmutation.
+      int n, i, k;
+      int N = size();
+      int P = b.size();
+
+      if (P != nrows || P != ncols)
+        throw VectorSizeError();
+
+      typedef std::map<int, std::complex<double> > lu_row;
+      typename lu_row::iterator l_iter, u_iter;
+      std::vector<lu_row> lu (P);
+
+      for (n = 0; n < N; n++)
+        lu[sm[n].row][sm[n].col] += t * sm[n].val;
+      for (i = 0; i < P; i++)
+        lu[i][i] -= shift;
+
+      // Factor, storing L below and U on/above the diagonal
+      std::complex<double> l_ik;
+      for (i = 0; i < P; i++)
+      {
+        for (l_iter = lu[i].begin(); l_iter != lu[i].end() && (*l_iter).first < i; l_iter++)
+        {
+          k = (*l_iter).first;
+          l_ik = (*l_iter).second / lu[k][k];
+          (*l_iter).second = l_ik;
+
+          for (u_iter = lu[k].upper_bound(k); u_iter != lu[k].end(); u_iter++)
+            lu[i][(*u_iter).first] -= l_ik * (*u_iter).second;
+        };
+      };
+
+      // Forward substitution
+      for (i = 0; i < P; i++)
+        for (l_iter = lu[i].begin(); l_iter != lu[i].end() && (*l_iter).first < i; l_iter++)
+          b[i] -= (*l_iter).second * b[(*l_iter).first];
+
+      // Back substitution
+      for (i = P - 1; 0 <= i; i--)
+      {
+        for (u_iter = lu[i].upper_bound(i); u_iter != lu[i].end(); u_iter++)
+          b[i] -= (*u_iter).second * b[(*u_iter).first];
+        b[i] /= lu[i][i];
+      };
+    };
+
+
+    std::vector<double> exp_cram(std::vector<double> vec, double t = 1.0)
+    {
+      // Calculates exp(t*A)*vec via the 16th order Chebyshev Rational Approximation 
+      // Method (CRAM) in partial fraction form [Pusa & Leppanen, NSE 164 (2010)].
+      // This costs exactly 8 complex sparse solves, no matter how stiff the 
+      // matrix is or how the decay chains are connected.
+      static const double theta_re [8] = {-1.0843917078696988026e+1, -5.2649713434426468895e+0, 
+        5.9481522689511774808e+0, 3.5091036084149180974e+0, 6.4161776990994341923e+0, 
+        1.4193758971856659786e+0, 4.9931747377179963991e+0, -1.4139284624888862114e+0};
+      static const double theta_im [8] = {1.9277446167181652284e+1, 1.6220221473167927305e+1, 
+        3.5874573620183222829e+0, 8.4361989858843750826e+0, 1.1941223933701386874e+0, 
+        1.0925363484496722585e+1, 5.9968817136039422260e+0, 1.3497725698892745389e+1};
+      static const double alpha_re [8] = {-5.0901521865224915650e-7, 2.1151742182466030907e-4, 
+        1.1339775178483930527e+2, 1.5059585270023467528e+1, -6.4500878025539646595e+1, 
+        -1.4793007113557999718e+0, -6.2518392463207918892e+1, 4.1023136835410021273e-2};
+      static const double alpha_im [8] = {-2.4220017652852287970e-5, 4.3892969647380673918e-3, 
+        1.0194721704215856450e+2, -5.7514052776421819979e+0, -2.2459440762652096056e+2, 
+        1.7686588323782937906e+0, -1.1190391094283228480e+1, -1.5743466173455468191e-1};
+      static const double alpha_0 = 2.1248537104952237488e-16;
+
+      int p, q;
+      int P = vec.size();
+
+      if (P != nrows || P != ncols)
+        throw VectorSizeError();
+
+      std::vector<double> new_vec (P, 0.0);
+      std::vector< std::complex<double> > b (P);
+      std::complex<double> alpha;
+
+      for (p = 0; p < P; p++)
+        new_vec[p] = alpha_0 * vec[p];
+
+      for (q = 0; q < 8; q++)
+      {
+        for (p = 0; p < P; p++)
+          b[p] = vec[p];
+
+        solve_shifted(t, std::complex<double>(theta_re[q], theta_im[q]), b);
+
+        alpha = std::complex<double>(alpha_re[q], alpha_im[q]);
+        for (p = 0; p < P; p++)
+          new_vec[p] += 2.0 * (alpha * b[p]).real();
+      };
+
+      return new_vec;
+    };
+
+
+    std::vector<double> exp_pade(std::vector<double> vec, double t = 1.0, int q = 6)
+    {
+      // Calculates exp(t*A)*vec via the scaling and squaring method with a 
+      // diagonal (q, q) Pade approximant.  This works on the dense form of the 
+      // matrix and so is best suited for smaller systems.
+      int i, j, k, s;
+      int P = vec.size();
+
+      if (P != nrows || P != ncols)
+        throw VectorSizeError();
+
+      std::vector< std::vector<double> > X = scalar_matrix_product(t, todense());
+
+      // Scale the matrix down so that its infinity-norm is at most 1/2
+      double row_sum, norm = 0.0;
+      for (i = 0; i < P; i++)
+      {
+        row_sum = 0.0;
+        for (j = 0; j < P; j++)
+          row_sum += fabs(X[i][j]);
+        if (norm < row_sum)
+          norm = row_sum;
+      };
+
+      s = 0;
+      if (0.5 < norm)
+        s = (int) ceil(log(2.0 * norm) / log(2.0));
+      X = scalar_matrix_product(pow(2.0, -s), X);
+
+      // Build the numerator and denominator of the approximant
+      std::vector< std::vector<double> > N (P, std::vector<double>(P, 0.0));
+      std::vector< std::vector<double> > D (P, std::vector<double>(P, 0.0));
+      std::vector< std::vector<double> > X_k = N;
+      for (i = 0; i < P; i++)
+      {
+        N[i][i] = 1.0;
+        D[i][i] = 1.0;
+        X_k[i][i] = 1.0;
+      };
+
+      double c = 1.0;
+      for (k = 1; k <= q; k++)
+      {
+        c = c * (q - k + 1) / (k * (2.0*q - k + 1));
+        X_k = matrix_multiplication(X_k, X);
+        N = matrix_addition(N, scalar_matrix_product(c, X_k));
+        D = matrix_addition(D, scalar_matrix_product((k%2 == 0) ? c : -c, X_k));
+      };
+
+      std::vector< std::vector<double> > E = matrix_multiplication(matrix_inverse(D), N);
+
+      // Square back up
+      for (k = 0; k < s; k++)
+        E = matrix_multiplication(E, E);
+
+      std::vector<double> new_vec (P, 0.0);
+      for (i = 0; i < P; i++)
+        for (j = 0; j < P; j++)
+          new_vec[i] += E[i][j] * vec[j];
+
+      return new_vec;
+    };
+  };
+
+
+
+  /*********************/
+  /*** KD-Tree Stuff ***/
+  /*********************/
+
+  class KDTree
+  {
+  /** Static k-dimensional tree over a fixed set of points.
+   *  Built once, then answers k-nearest-neighbor queries in
+   *  roughly logarithmic time using the Euclidean distance.
+   */
+  public:
+    KDTree();
+    KDTree(std::vector< std::vector<double> > pts);
+    ~KDTree();
+
+    int npoints;  // Number of points in the tree
+    int ndims;    // Dimensionality of each point
+    std::vector< std::vector<double> > points;  // Point coordinates, [point][dim]
+
+    std::vector<int> nearest(std::vector<double> x, int k = 1);
+
+  private:
+    std::vector<int> index;  // Permutation of the points, median-ordered by node
+    std::vector<int> split;  // Splitting dimension of the node stored at each index position
+
+    void build(int lo, int hi);
+    void search(int lo, int hi, std::vector<double> & x, int k, std::vector< std::pair<double, int> > & heap);
+  };
+
+
+
+
+  /********************************/
+  /*** Eigenvalue Solver Stuff ***/
+  /********************************/
+
+  // Finds the fundamental mode of A phi = (1/k) F phi via "power", "wielandt", or "anderson" iteration.
+  int solve_eigenvalue(std::vector< std::vector<double> > & A, std::vector< std::vector<double> > & F, 
+                       std::vector<double> & w, std::vector<double> & phi, double & k, 
+                       std::string method = "wielandt", double tol = 1E-8, int max_iter = 500, 
+                       double * residual = NULL);
+
+  // As above, but with A already factored by lu_decomposition() into A_lu and A_piv.
+  int solve_eigenvalue(std::vector< std::vector<double> > & A, std::vector< std::vector<double> > & A_lu, 
+                       std::vector<int> & A_piv, std::vector< std::vector<double> > & F, 
+                       std::vector<double> & w, std::vector<double> & phi, double & k, 
+                       std::string method = "wielandt", double tol = 1E-8, int max_iter = 500, 
+                       double * residual = NULL);
+
+
+
+
+  /****************************/
+  /*** Library Cache Stuff ***/
+  /****************************/
+
+  time_t file_mtime(std::string filename);  // Last modification time of a file, 0 if it cannot be stat'd.
+
+  class LibraryLock
+  {
+  /** Holds an OpenMP nestable lock for as long as it is in scope, so that it is also 
+   *  released when an exception is thrown.  Without OpenMP this does nothing.
+   */
+  public:
+  #ifdef _OPENMP
+    LibraryLock(omp_nest_lock_t & l) : lock(l) { omp_set_nest_lock(&lock); };
+    ~LibraryLock() { omp_unset_nest_lock(&lock); };
+  private:
+    omp_nest_lock_t & lock;
+  #else
+    LibraryLock(int & l) {};
+    ~LibraryLock() {};
+  #endif
+  };
+
+
+  template <class T>
+  class LibraryCache
+  {
+  /** Process-wide cache of data libraries, keyed by file path and modification time.
+   *  The library type T must be constructable from the path of the file.  Components 
+   *  hold the libraries they use through a LibraryHandle, which counts the users of 
+   *  each library.  A library whose file has changed on disk is superseded by a fresh 
+   *  load.  Libraries which have been superseded or evict()ed are deleted once their 
+   *  last user lets go of them, while cached libraries are kept for later loads even 
+   *  when they are unused.  The cache may be used from several threads at once.
+   */
+  public:
+    LibraryCache()
+    {
+      #ifdef _OPENMP
+        omp_init_nest_lock(&lock);
+      #endif
+    };
+
+    ~LibraryCache()
+    {
+      #ifdef _OPENMP
+        omp_destroy_nest_lock(&lock);
+      #endif
+    };
+
+    T * load(std::string filename)
+    {
+      // Returns the library for a file, with one more user.
+      LibraryLock guard (lock);
+      time_t mtime = file_mtime(filename);
+      typename std::map<std::string, std::pair<time_t, T *> >::iterator entry = entries.find(filename);
+      if (entry != entries.end() && (entry->second).first == mtime)
+      {
+        users[(entry->second).second] += 1;
+        return (entry->second).second;
+      };
+
+      T * lib = new T(filename);
+      if (entry != entries.end())
+        evict(filename);
+      entries[filename] = std::pair<time_t, T *>(mtime, lib);
+      users[lib] = 1;
+      return lib;
+    };
+
+    void acquire(T * lib)
+    {
+      // Adds a user to a library that has already been loaded.
+      LibraryLock guard (lock);
+      typename std::map<T *, int>::iterator user = users.find(lib);
+      if (user != users.end())
+        user->second += 1;
+    };
+
+    void release(T * lib)
+    {
+      // Drops a user of a library, deleting it if it is no longer cached or used.
+      LibraryLock guard (lock);
+      typename std::map<T *, int>::iterator user = users.find(lib);
+      if (user == users.end())
+        return;
+
+      if (0 < user->second)
+        user->second -= 1;
+
+      if (user->second == 0 && !cached(lib))
+      {
+        users.erase(user);
+        delete lib;
+      };
+    };
+
+    bool contains(std::string filename)
+    {
+      LibraryLock guard (lock);
+      typename std::map<std::string, std::pair<time_t, T *> >::iterator entry = entries.find(filename);
+      return (entry != entries.end() && (entry->second).first == file_mtime(filename));
+    };
+
+    void evict(std::string filename)
+    {
+      // Drops a file from the cache, so that the next load reads it afresh.  The 
+      // library itself is deleted as soon as no component is using it.
+      LibraryLock guard (lock);
+      typename std::map<std::string, std::pair<time_t, T *> >::iterator entry = entries.find(filename);
+      if (entry == entries.end())
+        return;
+
+      T * lib = (entry->second).second;
+      entries.erase(entry);
+      if (users[lib] == 0)
+      {
+        users.erase(lib);
+        delete lib;
+      };
+    };
+
+    void clear()
+    {
+      // Evicts every file from the cache.
+      LibraryLock guard (lock);
+      while (!entries.empty())
+        evict((entries.begin())->first);
+    };
+
+  private:
+    std::map<std::string, std::pair<time_t, T *> > entries;
+    std::map<T *, int> users;  // Number of components using each library
+    #ifdef _OPENMP
+      omp_nest_lock_t lock;
+    #else
+      int lock;
+    #endif
+
+    LibraryCache(const LibraryCache &);
+    LibraryCache & operator= (const LibraryCache &);
+
+    bool cached(T * lib)
+    {
+      typename std::map<std::string, std::pair<time_t, T *> >::iterator entry;
+      for (entry = entries.begin(); entry != entries.end(); entry++)
+        if ((entry->second).second == lib)
+          return true;
+      return false;
+    };
+  };
+
+
+  template <class T, LibraryCache<T> & cache>
+  class LibraryHandle
+  {
+  /** A component's reference to a library in cache.  Assigning a pointer returned by 
+   *  cache.load() hands that use of the library over to the handle.  Copying a handle, 
+   *  as when a component is copied, adds a user to the library, and destroying or 
+   *  reassigning it drops one, so a library is never deleted while a copy still 
+   *  points into it.
+   */
+  public:
+    LibraryHandle() : lib(NULL) {};
+    LibraryHandle(const LibraryHandle & other) : lib(other.lib) { cache.acquire(lib); };
+    ~LibraryHandle() { cache.release(lib); };
+
+    LibraryHandle & operator= (const LibraryHandle & other)
+    {
+      if (lib != other.lib)
+      {
+        cache.acquire(other.lib);
+        cache.release(lib);
+        lib = other.lib;
+      };
+      return *this;
+    };
+
+    LibraryHandle & operator= (T * loaded)
+    {
+      T * old = lib;
+      lib = loaded;
+      cache.release(old);
+      return *this;
+    };
+
+    T * operator-> () const { return lib; };
+    operator T * () const { return lib; };
+
+  private:
+    T * lib;
   };
 
 
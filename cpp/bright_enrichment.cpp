@@ -1,5 +1,8 @@
 // Enrichment Component Class
 
+#include <algorithm>
+#include <limits>
+
 #include "bright_enrichment.h"
 
 
@@ -37,6 +40,9 @@ void bright::Enrichment::initialize(EnrichmentParameters ep)
 bright::Enrichment::Enrichment(std::string n) : bright::FCComp(enr_p2track, n)
 {
   // Enrichmenting Fuel Cycle Component.  Applies Separation Efficiencies.
+  feed_Mstar = 0.0;
+  feed_j = -1;
+  feed_k = -1;
   initialize(bright::UraniumEnrichmentDefaults);
 }
 
@@ -44,6 +50,9 @@ bright::Enrichment::Enrichment(std::string n) : bright::FCComp(enr_p2track, n)
 bright::Enrichment::Enrichment(bright::EnrichmentParameters ep, std::string n) : bright::FCComp(enr_p2track, n)
 {
   // Enrichmenting Fuel Cycle Component.  Applies Separation Efficiencies.
+  feed_Mstar = 0.0;
+  feed_j = -1;
+  feed_k = -1;
   initialize(ep);
 };
 
@@ -112,6 +121,76 @@ pyne::Material bright::Enrichment::calc (pyne::Material mat)
 }
 
 
+void bright::Enrichment::calc_many(std::vector<double> & xP_js, std::vector<double> & xW_js, 
+                                   std::vector<double> & SWUperProducts, std::vector<double> & SWUperFeeds, 
+                                   std::vector<double> & TotalPerFeeds, std::vector<double> & Ns, 
+                                   std::vector<double> & Ms)
+{
+  /** Enriches mat_feed to each of many pairs of product and tails fractions of the jth 
+   *  key component, without changing the cascade of this object.  Each cascade is solved 
+   *  from the N, M, and M* of the one before it, so the grid should be ordered such that
+   *  neighboring points are close.  Cascades which cannot be solved are NaN.  When built 
+   *  with OpenMP, the points are split into contiguous blocks, one per thread, each with 
+   *  its own copy of this object.
+   */
+  int NP = xP_js.size();
+  if (xW_js.size() != NP)
+    throw VectorSizeError();
+
+  double nan = std::numeric_limits<double>::quiet_NaN();
+  SWUperProducts.assign(NP, nan);
+  SWUperFeeds.assign(NP, nan);
+  TotalPerFeeds.assign(NP, nan);
+  Ns.assign(NP, nan);
+  Ms.assign(NP, nan);
+
+  // Lay out the feed arrays here, so that the copies share them rather than each 
+  // thread looking up atomic masses at once, which is not thread safe.
+  try
+  {
+    update_feed();
+  }
+  catch (std::exception & err)
+  {
+    return;
+  };
+
+  #pragma omp parallel
+  {
+    Enrichment e (*this);
+
+    #pragma omp for schedule(static)
+    for (int n = 0; n < NP; n++)
+    {
+      e.xP_j = xP_js[n];
+      e.xW_j = xW_js[n];
+      try
+      {
+        e.MstarOptimize();
+      }
+      catch (std::exception & err)
+      {
+        continue;
+      };
+
+      if (isnan(e.TotalPerFeed) || isnan(e.N) || isnan(e.M))
+        continue;
+
+      SWUperProducts[n] = e.SWUperProduct;
+      SWUperFeeds[n] = e.SWUperFeed;
+      TotalPerFeeds[n] = e.TotalPerFeed;
+      Ns[n] = e.N;
+      Ms[n] = e.M;
+
+      // Warm start the next point from this one
+      e.N0 = e.N;
+      e.M0 = e.M;
+      e.Mstar_0 = e.Mstar;
+    };
+  };
+};
+
+
 double bright::Enrichment::PoverF(double x_F, double x_P, double x_W)
 {
   // Product over Feed Enrichment Ratio
@@ -144,72 +223,171 @@ double bright::Enrichment::get_Si (double M_i)
   return ((alphastar_i - 1.0)/(pow(alphastar_i, M+1) - 1.0));
 };
 
+void bright::Enrichment::update_feed()
+{
+  /** Lays out mat_feed as arrays of mass fractions, atomic masses, and log(alphastar_i), 
+   *  so that the cascade equations need no map lookups, atomic mass lookups, or powers 
+   *  of alpha_0.  The arrays are only rebuilt when mat_feed has changed, and the 
+   *  log(alphastar_i) only when Mstar has changed.
+   */
+  int n = 0;
+  bool changed = (feed_nucs.size() != mat_feed.comp.size());
+  for (pyne::comp_iter i = mat_feed.comp.begin(); i != mat_feed.comp.end() && !changed; i++, n++)
+    changed = (feed_nucs[n] != i->first || feed_x[n] != i->second);
+
+  if (changed)
+  {
+    feed_nucs.clear();
+    feed_x.clear();
+    feed_A.clear();
+    feed_j = -1;
+    feed_k = -1;
+    for (pyne::comp_iter i = mat_feed.comp.begin(); i != mat_feed.comp.end(); i++)
+    {
+      if (i->first == j)
+        feed_j = feed_nucs.size();
+      if (i->first == k)
+        feed_k = feed_nucs.size();
+      feed_nucs.push_back(i->first);
+      feed_x.push_back(i->second);
+      feed_A.push_back(pyne::atomic_mass(i->first));
+    };
+    feed_lnalpha.assign(feed_nucs.size(), 0.0);
+    feed_e.assign(feed_nucs.size(), 0.0);
+    feed_de_dN.assign(feed_nucs.size(), 0.0);
+    feed_de_dM.assign(feed_nucs.size(), 0.0);
+  };
+
+  if (feed_j < 0 || feed_k < 0)
+    throw EnrichmentIterationNaN();
+
+  if (changed || feed_Mstar != Mstar)
+  {
+    double lnalpha_0 = log(alpha_0);
+    for (n = 0; n < feed_nucs.size(); n++)
+      feed_lnalpha[n] = (Mstar - feed_A[n]) * lnalpha_0;
+    feed_Mstar = Mstar;
+  };
+};
+
+
+void bright::Enrichment::cut(double N_i, double M_i, double & f_P, double & f_W, double J [2][2])
+{
+  /** Evaluates the product and tails fractions of every component of the cascade with 
+   *  N_i enriching and M_i stripping stages at once.  Returns the errors in the key 
+   *  component fractions, f_P = x^P_j - xP_j and f_W = x^W_j - xW_j, and their Jacobian
+   *  with respect to (N, M).  Here x^P_j = x_j e_j / P and x^W_j = x_j (1 - e_j) / (1 - P), 
+   *  where P = sum_i x_i e_i is the product over feed flow rate.
+   */
+  int NF = feed_nucs.size();
+  double P = 0.0;
+  double dP_dN = 0.0;
+  double dP_dM = 0.0;
+  for (int n = 0; n < NF; n++)
+  {
+    double a = exp((M_i + 1.0) * feed_lnalpha[n]);
+    double c = exp(-N_i * feed_lnalpha[n]);
+    double d = a - c;
+    feed_e[n] = (a - 1.0) / d;
+    feed_de_dN[n] = -(a - 1.0) * c * feed_lnalpha[n] / (d * d);
+    feed_de_dM[n] = a * (1.0 - c) * feed_lnalpha[n] / (d * d);
+    P     += feed_x[n] * feed_e[n];
+    dP_dN += feed_x[n] * feed_de_dN[n];
+    dP_dM += feed_x[n] * feed_de_dM[n];
+  };
+  feed_PoF = P;
+
+  double x_j = feed_x[feed_j];
+  double e_j = feed_e[feed_j];
+  f_P = (x_j * e_j / P) - xP_j;
+  f_W = (x_j * (1.0 - e_j) / (1.0 - P)) - xW_j;
+
+  J[0][0] = x_j * ((feed_de_dN[feed_j] * P) - (e_j * dP_dN)) / (P * P);
+  J[0][1] = x_j * ((feed_de_dM[feed_j] * P) - (e_j * dP_dM)) / (P * P);
+  J[1][0] = x_j * (((1.0 - e_j) * dP_dN) - (feed_de_dN[feed_j] * (1.0 - P))) / ((1.0 - P) * (1.0 - P));
+  J[1][1] = x_j * (((1.0 - e_j) * dP_dM) - (feed_de_dM[feed_j] * (1.0 - P))) / ((1.0 - P) * (1.0 - P));
+};
+
+
 void bright::Enrichment::FindNM()
 {
-  // This give the order-of-exactness to which N and M are solved for.
-  double ooe = 7.0;
+  /** Finds the number of enriching and stripping stages, N and M, for which the jth key 
+   *  component has its target product and tails fractions, when every component of the 
+   *  feed is accounted for.  This is Newton's method on (N, M), starting from their 
+   *  current values, with the analytic Jacobian from cut().  Steps are halved while they 
+   *  would make N or M negative or fail to reduce the error.
+   */
+  update_feed();
+
+  // This give the order-of-exactness to which N and M are solved for.  This is 
+  // well below the usual 1E-10 because MstarOptimize() takes second differences 
+  // of L/F with a step of h = 0.001, which multiply the error in N and M by 1/h^2.  
+  // Steps which can no longer reduce an error that is already below 1E-10 are 
+  // taken to have hit the round-off floor, rather than to have failed.
+  double ooe = 14.0;
   double tolerance = pow(10.0, -ooe);
+  double err_floor = 1E-10;
 
-  double PoF = PoverF(mat_feed.comp[j], xP_j, xW_j);
-  double WoF = WoverF(mat_feed.comp[j], xP_j, xW_j);
-  double alphastar_j = get_alphastar_i(pyne::atomic_mass(j));
+  if (!(0.0 < N) || !(0.0 < M) || isnan(N) || isnan(M))
+  {
+    N = N0;
+    M = M0;
+  };
 
-  // Save original state of N & M
-  double origN = N;
-  double origM = M;
+  double f_P, f_W, J [2][2];
+  cut(N, M, f_P, f_W, J);
+  double err = sqrt(pow(f_P / xP_j, 2) + pow(f_W / xW_j, 2));
 
   if (2 < bright::verbosity)
     std::cout << "    <---- N = " << N << "\tM = " << M << "\n";     
 
-  double lhsP = PoF * xP_j / mat_feed.comp[j];
-  double rhsP = (pow(alphastar_j, M+1.0) - 1.0) / (pow(alphastar_j, M+1.0) - pow(alphastar_j, -N));
-  double lhsW = WoF * xW_j / mat_feed.comp[j];
-  double rhsW = (1.0 - pow(alphastar_j, -N)) / (pow(alphastar_j, M+1.0) - pow(alphastar_j, -N));
-
-  double n = 1.0;
-  while (tolerance < fabs(lhsP - rhsP) && tolerance < fabs(lhsW - rhsW))
+  int q = 0;
+  while (tolerance < err)
   {
-    if (tolerance < fabs(lhsP - rhsP))
-    {
-      N = N - ((lhsP - rhsP) * N);
-      rhsP = (pow(alphastar_j, M+1.0) - 1.0) / (pow(alphastar_j, M+1.0) - pow(alphastar_j, -N));
-    };
+    if (100 <= q)
+      throw EnrichmentIterationLimit();
+    q = q + 1;
 
-    if (tolerance < fabs(lhsW - rhsW))
-    {
-      M = M - ((lhsW - rhsW) * M);
-      rhsW = (1.0 - pow(alphastar_j, -N)) / (pow(alphastar_j, M+1.0) - pow(alphastar_j, -N));
-    };
+    double det = (J[0][0] * J[1][1]) - (J[0][1] * J[1][0]);
+    double dN = -((J[1][1] * f_P) - (J[0][1] * f_W)) / det;
+    double dM = -((J[0][0] * f_W) - (J[1][0] * f_P)) / det;
+    if (isnan(dN) || isnan(dM))
+      throw EnrichmentIterationNaN();
 
-    // print summary
-    if (3 < bright::verbosity)
+    double step = 1.0;
+    double newN, newM, new_err;
+    while (true)
     {
-      std::cout << "            N = " << N << "\tlhsP = " << lhsP << "\trhsP = " << rhsP << "\n";
-      std::cout << "            M = " << M << "\tlhsW = " << lhsW << "\trhsW = " << rhsW << "\n";
+      newN = N + (step * dN);
+      newM = M + (step * dM);
+      if (0.0 < newN && 0.0 < newM)
+      {
+        cut(newN, newM, f_P, f_W, J);
+        new_err = sqrt(pow(f_P / xP_j, 2) + pow(f_W / xW_j, 2));
+        if (new_err < err)
+          break;
+      };
+      step = step / 2.0;
+      if (step < err_floor)
+        break;
     };
 
-    if (N < tolerance)
+    if (step < err_floor)
     {
-      N = origN + n;
-      M = origM + n;
-      n = n + 1.0;
+      if (err_floor <= err)
+        throw EnrichmentIterationLimit();
 
-      if (2 < bright::verbosity)
-        std::cout << "          N set n equal to " << n << "\n";
+      // Leave the (N, M) cut as it was at the best point found
+      cut(N, M, f_P, f_W, J);
+      break;
     };
 
-    if (M < tolerance)
-    {
-      N = origN + n;
-      M = origM + n;
-      n = n + 1.0;
-
-      if (2 < bright::verbosity)
-        std::cout << "          M set n equal to " << n << "\n";
-    };
+    N = newN;
+    M = newM;
+    err = new_err;
 
-    if (2 < bright::verbosity)
-      std::cout << "    ----- N = " << N << "\tM = " << M << "\n";     
+    if (3 < bright::verbosity)
+      std::cout << "            N = " << N << "\tM = " << M << "\terr = " << err << "\n";
   };
 
   if (2 < bright::verbosity)
@@ -220,19 +398,27 @@ void bright::Enrichment::FindNM()
 
 double bright::Enrichment::xP_i(int i)
 {
-  double alphastar_i = get_alphastar_i(pyne::atomic_mass(i));
-  double numerator = mat_feed.comp[i]*(pow(alphastar_i, M+1.0) - 1.0);
-  double denominator = (pow(alphastar_i, M+1.0) - pow(alphastar_i, -N)) / PoverF(mat_feed.comp[j], xP_j, xW_j);
-  return numerator / denominator;
+  // Product fraction of the ith component at the current N and M
+  update_feed();
+  double f_P, f_W, J [2][2];
+  cut(N, M, f_P, f_W, J);
+  int n = std::lower_bound(feed_nucs.begin(), feed_nucs.end(), i) - feed_nucs.begin();
+  if (n == feed_nucs.size() || feed_nucs[n] != i)
+    return 0.0;
+  return feed_x[n] * feed_e[n] / feed_PoF;
 };
 
 
 double bright::Enrichment::xW_i(int i)
 {
-  double alphastar_i = get_alphastar_i(pyne::atomic_mass(i));
-  double numerator = mat_feed.comp[i] * (1.0 - pow(alphastar_i, -N));
-	double denominator = (pow(alphastar_i, M+1.0) - pow(alphastar_i, -N)) / WoverF(mat_feed.comp[j], xP_j, xW_j);
-  return numerator / denominator;
+  // Tails fraction of the ith component at the current N and M
+  update_feed();
+  double f_P, f_W, J [2][2];
+  cut(N, M, f_P, f_W, J);
+  int n = std::lower_bound(feed_nucs.begin(), feed_nucs.end(), i) - feed_nucs.begin();
+  if (n == feed_nucs.size() || feed_nucs[n] != i)
+    return 0.0;
+  return feed_x[n] * (1.0 - feed_e[n]) / (1.0 - feed_PoF);
 };
 
 
@@ -249,10 +435,10 @@ void bright::Enrichment::SolveNM()
   pyne::comp_map compP;
   pyne::comp_map compW;
 
-  for (pyne::comp_iter i = mat_feed.comp.begin(); i != mat_feed.comp.end(); i++)
+  for (int n = 0; n < feed_nucs.size(); n++)
   {
-    compP[i->first] = xP_i(i->first);
-    compW[i->first] = xW_i(i->first);
+    compP[feed_nucs[n]] = feed_x[n] * feed_e[n] / feed_PoF;
+    compW[feed_nucs[n]] = feed_x[n] * (1.0 - feed_e[n]) / (1.0 - feed_PoF);
   };
 
   mat_prod  = pyne::Material(compP);
@@ -264,203 +450,17 @@ void bright::Enrichment::SolveNM()
 
 void bright::Enrichment::Comp2UnitySecant()
 {
-  // This function actually solves the whole system of equations.  It uses SolveNM 
-  // to find the roots for the enriching and stripping stage numbers.  It then 
-  // checks to see if the product and waste streams meet their target enrichments
-  // for the jth component like they should.  If they don't then it trys other values 
-  // of N and M varied by Newton's Method.  Rinse and repeat as needed.
-
-  // This give the order-of-exactness to which N and M are solved for.
-  double ooe = 7.0;
-  double tolerance = pow(10.0, -ooe);
-
-  // Is the hisorty of N and M that has been input
-  std::vector<double> historyN;
-  std::vector<double> historyM;
-
-  // Start iteration Counter
-  int counter = 0;
-
-  // Set first two points
-  double lastN = N0 + 1.0;
-  double lastM = M0 + 1.0;
-  double currN = N0;
-  double currM = M0;
-
-  // Initialize 'last' point
-  N = lastN;
-  M = lastM;
-  SolveNM();
-  double lastxP_j = mat_prod.comp[j];
-  double lastxW_j = mat_tail.comp[j];
-  historyN.push_back(N);
-  historyN.push_back(M);
-
-  // Initialize 'current' point
-  N = currN;
-  M = currM;
+  // Deprecated.  The secant search for the N and M at which the stream compositions 
+  // sum to unity is now part of the Newton iteration in FindNM(), so this just solves
+  // the cascade with SolveNM().
   SolveNM();
-  double currxP_j = mat_prod.comp[j];
-  double currxW_j = mat_tail.comp[j];
-  historyN.push_back(N);
-  historyN.push_back(M);
-
-  // My guess is that what we are checkin here is that the isotopic compositions
-  // make sense with abs(1.0 - massCurrP) rather than calculatign the 
-  // relative product to watse mass streams.
-  double tempCurrN = 0.0;
-  double tempCurrM = 0.0;
-  double tempLastN = 0.0;
-  double tempLastM = 0.0;
-
-  while (tolerance < fabs(xP_j - currxP_j) || tolerance < fabs(xW_j - currxW_j))
-  {
-    if (1 < bright::verbosity)
-      std::cout << "--------------------\n";
-
-    if (tolerance <= fabs(xP_j - currxP_j))
-    {
-      // Make a new guess for N
-      tempCurrN = currN;
-      tempLastN = lastN;
-      currN = currN + (xP_j - currxP_j)*((currN - lastN)/(currxP_j - lastxP_j));
-      lastN = tempCurrN;
-
-      // If the new value of N is less than zero, reset.
-      if (currN < 0.0)
-      {
-        currN = (tempCurrN + tempLastN)/2.0;
-        if (1 < bright::verbosity)
-          std::cout << "    N < 0, resetting.\n";
-      };
-    };
-
-    if (tolerance <= fabs(xW_j - currxW_j))
-    {
-      // Make a new guess for M
-      tempCurrM = currM;
-      tempLastM = lastM;
-      currM = currM + (xW_j - currxW_j)*((currM - lastM)/(currxW_j - lastxW_j));
-      lastM = tempCurrM;
-
-      // If the new value of M is less than zero, reset.
-      if (M < 0.0)
-      {
-        currM = (tempCurrM + tempLastM)/2.0;
-        if (1 < bright::verbosity)
-          std::cout << "    M < 0, resetting.\n";
-      };
-    };
-
-    // Check for infinite loops
-    for (int h = 0; h < historyN.size(); h++)
-    {
-      if (historyN[h] == currN && historyM[h] == currM)
-      {
-        if (1 < bright::verbosity)
-          std::cout << "~~~ Infinite loop found and exception thrown! ~~~.\n";
-        throw EnrichmentInfiniteLoopError();
-      };
-    };
-
-    if (150 <= historyN.size())
-    {
-      historyN.erase(historyN.begin());
-      historyM.erase(historyM.begin());
-    };
-    historyN.push_back(N);
-    historyM.push_back(M);
-
-    if (10000 < counter)
-    {
-      if (1 < bright::verbosity)
-        std::cout << "~~~ Secant method counter limit hit! ~~~.\n";
-      throw EnrichmentIterationLimit();
-    }
-    else
-    {
-      counter = counter + 1;
-    };
-
-    // Calculate new isotopics for valid (N, M)        
-    lastxP_j = currxP_j;
-    lastxW_j = currxW_j;
-
-    N = currN;
-    M = currM;
-    SolveNM();
-    currxP_j = mat_prod.comp[j];
-    currxW_j = mat_tail.comp[j];
-
-    if (1 < bright::verbosity)
-    {
-      std::cout << "Product Mass: " << currxP_j << "\tWaste Mass: " << currxW_j << "\n";
-      std::cout << "====================\n";
-    };
-  };
-
-  return;
 };
 
 
-// I have serious doubts that this works...
 void bright::Enrichment::Comp2UnityOther()
 {
-  // This give the order-of-exactness to which N and M are solved for.
-  double ooe = 5.0;
-  double tolerance = pow(10.0, -ooe);
-
-  // Is the hisorty of N and M that has been input
-  std::vector<double> historyN;
-  std::vector<double> historyM;
-
-  // Initial point
-  N = N0;
-  M = M0;
+  // Deprecated, see Comp2UnitySecant().
   SolveNM();
-  double massP = mat_prod.mass;
-  double massW = mat_tail.mass;
-
-  while (tolerance < fabs(1.0 - massP) && tolerance < fabs(1.0 - massW) )
-  {
-    if (tolerance <= fabs(1.0 - massP))
-      N = N - (1.0 - massP)/(1.0 + massP);
-
-    if (tolerance <= fabs(1.0 - massW))
-      M = M + (1.0 - massW)/(1.0 + massW);
-
-    // Note this infinite loop checker does not raise an exception
-    // Thus the exception cannot be caught by a try statement and then another
-    // root finding Comp2Unity method tried.
-    // This simply leaves N and M in whatever their current state is at the time.
-    // This is fine for M* = 235.1 for U, since M* won't be optimized here as an outlier 
-    // and since it is looping it is probably signalling around some actual value.
-
-    // Check for infinite loops
-    for (int h = 0; h < historyN.size(); h++)
-    {
-      if (historyN[h] == N && historyM[h] == M)
-      {
-        //throw EnrichmentInfiniteLoopError(); //Possible future use.
-        return;
-      };
-
-      if (150 <= historyN.size())
-      {
-        historyN.erase(historyN.begin());
-        historyM.erase(historyM.begin());
-      };
-    };
-    historyN.push_back(N);
-    historyM.push_back(M);
-
-    // Calculate new masses
-    SolveNM();
-    massP = mat_prod.mass;
-    massW = mat_tail.mass;
-  };
-
-  return;
 };
 
 
@@ -486,47 +486,51 @@ void bright::Enrichment::LoverF()
 
   try
   {
-    // Try secant method first
-    if (0 < bright::verbosity)
-      std::cout << "Attempting Secant Method in L/F Calculation...\n";
-    Comp2UnitySecant();
+    SolveNM();
     compConverged = true;
   }
   catch (...)
   {
-    try
-    {
-      // Then try other cr8zy method
-      if (0 < bright::verbosity)
-        std::cout << "Attempting Another Method in L/F Calculation...\n";
-      Comp2UnityOther();
-    	compConverged = true;
-    }
-		catch (...)
-    {
-      // No other methods to try!
-      compConverged = false;
-    };
+    // No other methods to try!  The flow rates of the last cascade no longer 
+    // apply, so they are set to NaN rather than being left as they were.
+    if (0 < bright::verbosity)
+      std::cout << "N and M could not be found in L/F Calculation...\n";
+    compConverged = false;
+
+    double nan = std::numeric_limits<double>::quiet_NaN();
+    feed_PoF = nan;
+    TotalPerFeed = nan;
+    SWUperFeed = nan;
+    SWUperProduct = nan;
   };
 
   if (compConverged)
   {
-    double PoF = PoverF(mat_feed.comp[j], xP_j, xW_j);
-    double WoF = WoverF(mat_feed.comp[j], xP_j, xW_j);
+    double PoF = feed_PoF;
+    double WoF = 1.0 - feed_PoF;
 
     // Matched Flow Ratios
-    double RF = mat_feed.comp[j]   / mat_feed.comp[k];
-    double RP = mat_prod.comp[j]  / mat_prod.comp[k];
-    double RW = mat_tail.comp[j] / mat_tail.comp[k];
+    double RF = feed_x[feed_j] / feed_x[feed_k];
+    double RP = (feed_e[feed_j] * feed_x[feed_j]) / (feed_e[feed_k] * feed_x[feed_k]);
+    double RW = ((1.0 - feed_e[feed_j]) * feed_x[feed_j]) / ((1.0 - feed_e[feed_k]) * feed_x[feed_k]);
+    double logRF = log(RF);
+    double logRP = log(RP);
+    double logRW = log(RW);
 
     double LtotalOverF = 0.0;
     double SWUoverF = 0.0;
     double tempNumerator = 0.0; 
 
-    for (pyne::comp_iter i = mat_feed.comp.begin(); i != mat_feed.comp.end(); i++)
+    // Stage separative power per unit flow, as in deltaU_i_OverG()
+    double lnalpha_j = feed_lnalpha[feed_j];
+
+    for (int n = 0; n < feed_nucs.size(); n++)
     {
-      tempNumerator = (PoF*mat_prod.comp[i->first]*log(RP) + WoF*mat_tail.comp[i->first]*log(RW) - mat_feed.comp[i->first]*log(RF));
-      LtotalOverF = LtotalOverF + (tempNumerator / deltaU_i_OverG(i->first));
+      double x_P = feed_x[n] * feed_e[n] / PoF;
+      double x_W = feed_x[n] * (1.0 - feed_e[n]) / WoF;
+      double alphastar_i = exp(feed_lnalpha[n]);
+      tempNumerator = (PoF*x_P*logRP + WoF*x_W*logRW - feed_x[n]*logRF);
+      LtotalOverF = LtotalOverF + (tempNumerator / (lnalpha_j * ((alphastar_i - 1.0)/(alphastar_i + 1.0))));
       SWUoverF = SWUoverF + tempNumerator;
     };
 
@@ -557,122 +561,178 @@ void bright::Enrichment::MstarOptimize()
   // The MstarOptimize function finds a value of Mstar by minimzing the seperative power.  
   // Note that Mstar0 represents an intial guess at what Mstar might be.
   // This is the final function that actually solves for an optimized M* that makes the cascade!
-
-  // History table that has Mstar, LoF, and slope between this point and the last one 
-  // hist = []
+  //
+  // Newton's method is used on dL/dM* = 0, with the first and second derivatives of L/F
+  // found from central differences.  N and M are carried over from one L/F evaluation to 
+  // the next, so each needs only a step or two of FindNM().  M* is kept between the masses 
+  // of the two key components, where the cascade is defined.
 
   // This give the order-of-exactness to which M* is solved for.
   double ooe = 7.0;
   double tolerance = pow(10.0, -ooe);
+  double h = 0.001;
 
-  // xpn is the exponential index index
-  double xpn = 1.0;
-
-  // Initialize 'last' point
-  double lastMstar = Mstar_0;
-  Mstar = lastMstar;
-  LoverF();
-  double lastLoverF = TotalPerFeed;
-
-  // Initialize 'current' point
-  double currMstar = Mstar_0 + 0.1;
-  Mstar = currMstar;
-  LoverF();
-  double currLoverF = TotalPerFeed;
-
-  double m = pyne::slope(currMstar, currLoverF, lastMstar, lastLoverF);
-  double m_sign = m / fabs(m);
+  N = N0;
+  M = M0;
+  Mstar = Mstar_0;
+  update_feed();
+  double Mstar_lo = std::min(feed_A[feed_j], feed_A[feed_k]) + h;
+  double Mstar_hi = std::max(feed_A[feed_j], feed_A[feed_k]) - h;
+
+  double currMstar = Mstar_0;
+  double currLoverF, plusLoverF, minusLoverF;
+  double step = 1.0;
+  int q = 0;
+  while (tolerance < fabs(step) && q < 50)
+  {
+    q = q + 1;
 
-  double tempMstar;
-  double tempLoverF;
-  double tempm;
-  double tempm_sign;
+    Mstar = currMstar;
+    LoverF();
+    currLoverF = TotalPerFeed;
 
-  if (0.0 < m_sign)
-  {
-    tempMstar  = lastMstar;
-    tempLoverF = lastLoverF;
-    lastMstar  = currMstar;
-    lastLoverF = currLoverF;
-    currMstar  = tempMstar;
-    currLoverF = tempLoverF;
-  };
+    Mstar = currMstar + h;
+    LoverF();
+    plusLoverF = TotalPerFeed;
 
-  // print points
-  if (0 < bright::verbosity)
-  {
-    std::cout << "Last Point: M* = " << lastMstar << "\tL/F = " << lastLoverF << "\n";
-    std::cout << "Curr Point: M* = " << currMstar << "\tL/F = " << currLoverF << "\n";
-  };
+    Mstar = currMstar - h;
+    LoverF();
+    minusLoverF = TotalPerFeed;
 
-  // Start iterations.    
-  while (xpn < ooe)
-  {
     // Check that parameters are still well-formed
-    if ( isnan(currMstar) || isnan(currLoverF) || isnan(lastMstar) || isnan(lastLoverF) )
+    if ( isnan(currMstar) || isnan(currLoverF) || isnan(plusLoverF) || isnan(minusLoverF) )
       throw EnrichmentIterationNaN();
 
-    lastMstar  = currMstar;
-    lastLoverF = currLoverF;
+    double dLdM = (plusLoverF - minusLoverF) / (2.0 * h);
+    double d2LdM2 = (plusLoverF - (2.0 * currLoverF) + minusLoverF) / (h * h);
 
-    currMstar = currMstar - (m_sign * pow(10.0, -xpn));
-    Mstar = currMstar;
-    LoverF();
-    currLoverF = TotalPerFeed;
+    // Take the Newton step where L/F is convex, otherwise head downhill
+    if (0.0 < d2LdM2)
+      step = -dLdM / d2LdM2;
+    else
+      step = (0.0 < dLdM) ? -0.1 : 0.1;
+    step = std::max(-1.0, std::min(1.0, step));
+
+    while (currMstar + step < Mstar_lo || Mstar_hi < currMstar + step)
+      step = step / 2.0;
+    currMstar = currMstar + step;
 
     // print Point
     if (0 < bright::verbosity)
       std::cout << "Next Point: M* = " << currMstar << "\tL/F = " << currLoverF << "\n";
+  };
 
-    if (lastLoverF < currLoverF)
-    {
-      tempMstar = currMstar - (m_sign * pow(10.0, -xpn));
-      Mstar = tempMstar;
-      LoverF();
-      tempLoverF = TotalPerFeed; 
+  // Leave the cascade at the optimized M*
+  Mstar = currMstar;
+  LoverF();
+  return;
+};
 
-      tempm = pyne::slope(currMstar, currLoverF, tempMstar, tempLoverF);
-      if (tempm == 0.0)
-      {
-        lastMstar  = currMstar;
-        lastLoverF = currLoverF;
-        currMstar  = tempMstar;
-        currLoverF = tempLoverF;
-
-        // print Point
-        if (0 < bright::verbosity)
-          std::cout << "Next Point: M* = " << currMstar << "\tL/F = " << currLoverF << "\n";
-        break;
-      };
 
-      tempm_sign = tempm / fabs(tempm);
-      if (m_sign != tempm_sign)
-      {
-        xpn = xpn + 1;
-
-        tempMstar = lastMstar + (m_sign * pow(10.0, -xpn));
-        Mstar = tempMstar;
-        LoverF();
-        tempLoverF = TotalPerFeed;
-        tempm = pyne::slope(lastMstar, lastLoverF, tempMstar, tempLoverF);
-
-        if (tempm == 0.0)
-        {
-          currMstar  = tempMstar;
-          currLoverF = tempLoverF;
-
-          // print Point
-          if (0 < bright::verbosity)
-            std::cout << "Next Point: M* = " << currMstar << "\tL/F = " << currLoverF << "\n";
-          break;
-        };
 
-        m_sign = tempm / fabs(tempm);
-      };
+double bright::Enrichment::product_cost(double ln_xW, double feed_cost, double SWU_cost)
+{
+  /** Solves the cascade with a tails fraction of exp(ln_xW) for the jth key component 
+   *  and returns the cost of feed and separative work per unit of product.  The cascade
+   *  is started from the N, M, and M* of the previous solve.  Cascades which cannot 
+   *  be solved, and so have NaN flow rates, throw EnrichmentIterationNaN.
+   */
+  xW_j = exp(ln_xW);
+  MstarOptimize();
+
+  if (isnan(TotalPerFeed) || isnan(SWUperProduct) || isnan(feed_PoF))
+    throw EnrichmentIterationNaN();
+
+  N0 = N;
+  M0 = M;
+  Mstar_0 = Mstar;
+  return (feed_cost / feed_PoF) + (SWU_cost * SWUperProduct);
+};
+
+
+double bright::Enrichment::optimize_tails(double feed_cost, double SWU_cost)
+{
+  /** Finds the tails fraction of the jth key component, xW_j, which minimizes the 
+   *  cost of feed and separative work per unit of product at the current xP_j.  
+   *  Newton's method is used on the derivative of the cost with respect to log(xW_j),
+   *  with the first and second derivatives found from central differences.  The 
+   *  minimum is kept bracketed between vanishing tails and the feed fraction, and 
+   *  steps which leave the bracket are replaced by bisection.  Each cascade is warm
+   *  started from the last, so a solve takes only a few full cascade calculations.
+   *  The component is left at the optimal cascade, and xW_j is returned.
+   */
+  // This give the order-of-exactness to which log(xW_j) is solved for.
+  double ooe = 6.0;
+  double tolerance = pow(10.0, -ooe);
+  double h = 0.001;
+
+  // Save the user's initial guesses, which are used as warm starts below,
+  // and the tails, which are put back if no optimum is found.
+  double orig_N0 = N0;
+  double orig_M0 = M0;
+  double orig_Mstar_0 = Mstar_0;
+  double orig_xW_j = xW_j;
+
+  update_feed();
+  double ln_xF = log(feed_x[feed_j]);
+  double lo = ln_xF + log(1E-4);
+  double hi = ln_xF - (2.0 * h);
+
+  double u = log(xW_j);
+  if (!(lo < u && u < hi))
+    u = ln_xF - log(2.0);
+
+  double curr_cost, plus_cost, minus_cost;
+  double step = 1.0;
+  int q = 0;
+  try
+  {
+    while (tolerance < fabs(step))
+    {
+      if (50 <= q)
+        throw EnrichmentIterationLimit();
+      q = q + 1;
+
+      minus_cost = product_cost(u - h, feed_cost, SWU_cost);
+      curr_cost = product_cost(u, feed_cost, SWU_cost);
+      plus_cost = product_cost(u + h, feed_cost, SWU_cost);
+
+      double dCdu = (plus_cost - minus_cost) / (2.0 * h);
+      double d2Cdu2 = (plus_cost - (2.0 * curr_cost) + minus_cost) / (h * h);
+
+      // Narrow the bracket on the minimum
+      if (0.0 < dCdu)
+        hi = u;
+      else
+        lo = u;
+
+      // Take the Newton step where the cost is convex, otherwise bisect
+      if (0.0 < d2Cdu2)
+        step = -dCdu / d2Cdu2;
+      if (!(0.0 < d2Cdu2) || !(lo < u + step && u + step < hi))
+        step = ((lo + hi) / 2.0) - u;
+      if (hi - lo < tolerance)
+        step = 0.0;
+      u = u + step;
+
+      if (0 < bright::verbosity)
+        std::cout << "Next Point: xW_j = " << exp(u) << "\tcost = " << curr_cost << "\n";
     };
+
+    // Leave the cascade at the optimal tails
+    product_cost(u, feed_cost, SWU_cost);
+  }
+  catch (...)
+  {
+    N0 = orig_N0;
+    M0 = orig_M0;
+    Mstar_0 = orig_Mstar_0;
+    xW_j = orig_xW_j;
+    throw;
   };
 
-  Mstar        = currMstar;
-  TotalPerFeed = currLoverF;
-  return;
+  N0 = orig_N0;
+  M0 = orig_M0;
+  Mstar_0 = orig_Mstar_0;
+  return xW_j;
 };
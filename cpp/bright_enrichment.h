@@ -55,6 +55,10 @@ namespace bright {
     pyne::Material calc();
     pyne::Material calc(pyne::comp_map incomp);
     pyne::Material calc(pyne::Material mat);	
+    void calc_many(std::vector<double> & xP_js, std::vector<double> & xW_js, 
+                   std::vector<double> & SWUperProducts, std::vector<double> & SWUperFeeds, 
+                   std::vector<double> & TotalPerFeeds, std::vector<double> & Ns, 
+                   std::vector<double> & Ms);
 
     double PoverF(double x_F, double x_P, double x_W);
     double WoverF(double x_F, double x_P, double x_W);
@@ -68,26 +72,40 @@ namespace bright {
     double xP_i(int i);
     double xW_i(int i);
     void SolveNM();
-    void Comp2UnitySecant();
-    void Comp2UnityOther();
+    void Comp2UnitySecant();  // Deprecated, same as SolveNM()
+    void Comp2UnityOther();   // Deprecated, same as SolveNM()
     double deltaU_i_OverG(int i);
     void LoverF();
     void MstarOptimize();
+    double optimize_tails(double feed_cost, double SWU_cost);
+
+  protected:
+    // Per-nuclide data of mat_feed, which is set up once per feed by update_feed().
+    std::vector<int> feed_nucs;         // Nuclides in mat_feed
+    std::vector<double> feed_x;         // Mass fraction of each nuclide in mat_feed
+    std::vector<double> feed_A;         // Atomic mass of each nuclide
+    std::vector<double> feed_lnalpha;   // log(alphastar_i) of each nuclide at feed_Mstar
+    double feed_Mstar;                  // Mstar at which feed_lnalpha was found
+    int feed_j;                         // Index of the jth key component in the arrays above
+    int feed_k;                         // Index of the kth key component in the arrays above
+
+    // The fraction of the feed flow of each nuclide that leaves in the product, 
+    // e_i = (alphastar_i^(M+1) - 1) / (alphastar_i^(M+1) - alphastar_i^-N), and 
+    // its derivatives, at the last (N, M) given to cut().
+    std::vector<double> feed_e;
+    std::vector<double> feed_de_dN;
+    std::vector<double> feed_de_dM;
+    double feed_PoF;                    // Product over feed flow rate, sum_i x_i e_i
+
+    void update_feed();
+    void cut(double N_i, double M_i, double & f_P, double & f_W, double J [2][2]);
+    double product_cost(double ln_xW, double feed_cost, double SWU_cost);
   };
 
 
   /******************/
   /*** Exceptions ***/
   /******************/
-  class EnrichmentInfiniteLoopError: public std::exception
-  {
-    virtual const char* what() const throw()
-    {
-      return "Inifinite loop found while calculating enrichment cascade!  Breaking...";
-    };
-  };
-
-
   class EnrichmentIterationLimit: public std::exception
   {
     virtual const char* what() const throw()
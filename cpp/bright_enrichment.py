@@ -170,6 +170,66 @@ output : Material
 
 """
 
+desc['docstrings']['methods']['calc_many'] = \
+"""Enriches mat_feed to each of many product and tails fractions of the jth 
+key component, as calc() does.  This is for tables of SWU and feed ratios 
+over grids of assays.  Each cascade is solved starting from the N, M, and M* 
+of the point before it, so the points should be ordered such that neighbors 
+are close.  Only mat_feed is changed, when input is given; the cascade of 
+this object (N, M, Mstar, xP_j, xW_j, mat_prod, and mat_tail) is left as 
+it was.  The C++ solve runs without the GIL, and when bright is built with 
+OpenMP the points are split into blocks that are solved in parallel.
+
+Parameters
+----------
+xP_js : float or array_like
+    Product fractions of the jth key component.
+xW_js : float or array_like
+    Tails fractions of the jth key component.  This is broadcast against 
+    xP_js.
+input : dict or Material or None, optional
+    If input is present, it is set as the component's mat_feed.
+
+Returns
+-------
+SWUperProduct : numpy array 
+    SWU per unit of product at each point, with the broadcast shape of 
+    xP_js and xW_js.
+SWUperFeed : numpy array 
+    SWU per unit of feed at each point.
+TotalPerFeed : numpy array 
+    Total flow rate per feed rate at each point.
+N : numpy array 
+    Number of enriching stages at each point.
+M : numpy array 
+    Number of stripping stages at each point.  Points which could not be 
+    solved are NaN in all of the arrays.
+"""
+
+desc['docstrings']['methods']['optimize_tails'] = \
+"""Finds the tails fraction of the jth key component which minimizes the cost 
+of feed and separative work per unit of product, for the current mat_feed 
+and xP_j.  This is Newton's method on the derivative of the cost with respect 
+to log(xW_j), safeguarded by bisection, where each cascade is started from 
+the N, M, and M* of the one before.  Only a dozen or so cascades are solved.  
+The component is left at the optimal cascade, with xW_j set to the optimum, 
+while N0, M0, and Mstar_0 are unchanged.
+
+Parameters
+----------
+feed_cost : float
+    Cost per unit mass of feed material.
+SWU_cost : float
+    Cost per unit of separative work.
+
+Returns
+-------
+xW_j : float
+    The optimal tails fraction of the jth key component.  The optimal cost 
+    per unit product is feed_cost / (product over feed) plus 
+    SWU_cost * SWUperProduct.
+"""
+
 desc['docstrings']['methods']['PoverF'] = \
 r"""Solves for the product over feed enrichment ratio.
 
@@ -215,3 +275,13 @@ wfratio : float
     As calculated above.
 
 """
+
+desc['docstrings']['methods']['Comp2UnitySecant'] = \
+"""Deprecated, use SolveNM() instead.  The stream compositions are now made to 
+sum to unity as part of the Newton iteration in FindNM(), so this just calls 
+SolveNM()."""
+
+desc['docstrings']['methods']['Comp2UnityOther'] = \
+"""Deprecated, use SolveNM() instead.  The stream compositions are now made to 
+sum to unity as part of the Newton iteration in FindNM(), so this just calls 
+SolveNM()."""
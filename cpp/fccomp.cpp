@@ -22,6 +22,8 @@ void bright::FCComp::initialize (std::set<std::string> paramtrack, std::string n
     natural_name = "this_is_not_a_name";
     
   pass_num = 0;
+  hdf5_owner = NULL;
+  hdf5_file_id = -1;
 
   if (bright::write_text)
     initialize_text();
@@ -57,31 +59,65 @@ void bright::FCComp::initialize_text()
 
 void bright::FCComp::initialize_hdf5 ()
 {
-  // Turn off annoying HDF5 errors
-  H5::Exception::dontPrint();
-
-  // Create 1D arrays of doubles.
-  const int     RANK = 1;
-  hsize_t dims[1]    = {0};               // dataset dimensions at creation
-  hsize_t maxdims[1] = {H5S_UNLIMITED};
-  H5::DataSpace ext_1D_space(RANK, dims, maxdims);
-
-  // Create new/open datafile.
-  H5::H5File dbFile;
-  if (pyne::file_exists(bright::output_filename))
-    dbFile = H5::H5File(bright::output_filename, H5F_ACC_RDWR);
-  else
-    dbFile = H5::H5File(bright::output_filename, H5F_ACC_TRUNC);
+  // Sets up the output buffers of this component, and opens or creates its groups 
+  // and datasets in the output file.  The nuclide and parameter columns are fixed
+  // here, from track_nucs and track_params.  The datasets are kept open in hdf5_dsets.
+  hdf5_owner = this;
+  hdf5_nucs = std::vector<int> (bright::track_nucs.begin(), bright::track_nucs.end());
+  hdf5_params = std::vector<std::string> (track_params.begin(), track_params.end());
+
+  hdf5_passes.clear();
+  hdf5_feed_mass.clear();
+  hdf5_prod_mass.clear();
+  hdf5_feed_comp.clear();
+  hdf5_prod_comp.clear();
+  hdf5_prior_params.clear();
+  hdf5_after_params.clear();
+
+  H5::H5File * db = bright::open_output_hdf5();
+  hdf5_file_id = -1;
+  open_hdf5_datasets(db, hdf5_dsets);
+  hdf5_file_id = db->getId();
+};
+
+
+H5::DataSet bright::FCComp::hdf5_dataset(H5::H5File * db, std::string path, hsize_t ncols)
+{
+  // Opens the dataset at path, or else creates it as an extendible array over passes,
+  // which is 2D (passes x ncols) when ncols is not zero.
+  try
+    { return db->openDataSet(path); }
+  catch (H5::Exception fgerror)
+    { }
+
+  int rank = (0 < ncols) ? 2 : 1;
+  hsize_t dims[2]    = {0, ncols};
+  hsize_t maxdims[2] = {H5S_UNLIMITED, ncols};
+  H5::DataSpace ext_space(rank, dims, maxdims);
 
   // Modify dataset creation properties.
   H5::DSetCreatPropList double_params;
 
-  hsize_t chunk_dims[1] = {10};
-  double_params.setChunk(RANK, chunk_dims);
+  hsize_t chunk_dims[2] = {(hsize_t) std::max(1, bright::hdf5_chunk_passes), ncols};
+  double_params.setChunk(rank, chunk_dims);
 
   double fill_val = -1.0;
   double_params.setFillValue(H5::PredType::NATIVE_DOUBLE, &fill_val);
 
+  if (0 < bright::hdf5_compression)
+    double_params.setDeflate(bright::hdf5_compression);
+
+  return db->createDataSet(path, H5::PredType::NATIVE_DOUBLE, ext_space, double_params);
+};
+
+
+void bright::FCComp::open_hdf5_datasets(H5::H5File * db, std::vector<H5::DataSet> & dsets)
+{
+  // Opens the output datasets of this component, creating them and their groups as 
+  // needed.  These are, in order, mat_feed/Mass, mat_prod/Mass, mat_feed/comp, and 
+  // mat_prod/comp when there are nuclides to track, followed by each parameter in 
+  // params_prior_calc and then in params_after_calc.
+
   /***
     NOTE!  All of the stupid try/catch, open/create stuff is simply to test 
            if a group or dataset already exist.  If it does, open() passes.
@@ -93,96 +129,82 @@ void bright::FCComp::initialize_hdf5 ()
   std::string comp_path ("/" + natural_name);
   H5::Group gFCComp;
   try 
-    { gFCComp = dbFile.openGroup(comp_path); }
+    { gFCComp = db->openGroup(comp_path); }
   catch (H5::Exception fgerror) 
-    { gFCComp = dbFile.createGroup(comp_path); }
+    { gFCComp = db->createGroup(comp_path); }
+
+  dsets.clear();
+  hsize_t NN = hdf5_nucs.size();
 
   // Initialize the IsoStreams 
-  if (!bright::track_nucs.empty())
+  if (0 < NN)
   {
     // Open/Create mat_feed group
     H5::Group gmat_feed;
     try
-      { gmat_feed = dbFile.openGroup(comp_path + "/mat_feed"); }
+      { gmat_feed = db->openGroup(comp_path + "/mat_feed"); }
     catch (H5::Exception fgerror)
-      { gmat_feed = dbFile.createGroup(comp_path + "/mat_feed"); }
+      { gmat_feed = db->createGroup(comp_path + "/mat_feed"); }
 
     // Open/Create mat_prod group
     H5::Group gmat_prod;
     try
-      { gmat_prod = dbFile.openGroup(comp_path + "/mat_prod"); }
-    catch (H5::Exception fgerror)
-      { gmat_prod = dbFile.createGroup(comp_path + "/mat_prod"); }
-
-    // Open/Create /mat_feed/Mass Dataset
-    H5::DataSet dsmat_feedMass;
-    try 
-      { dsmat_feedMass = dbFile.openDataSet(comp_path + "/mat_feed/Mass"); }
+      { gmat_prod = db->openGroup(comp_path + "/mat_prod"); }
     catch (H5::Exception fgerror)
-      { dsmat_feedMass = dbFile.createDataSet(comp_path + "/mat_feed/Mass",  H5::PredType::NATIVE_DOUBLE, ext_1D_space, double_params); }
+      { gmat_prod = db->createGroup(comp_path + "/mat_prod"); }
 
-    // Open/Create /mat_prod/Mass Dataset
-    H5::DataSet dsmat_prodMass;
+    // Open/Create the nuclide (zzaaam) columns of the comp datasets.  Rows are only 
+    // appended to existing comp datasets whose columns are the nuclides being written.
+    H5::DataSet dsnucs;
     try
-      { dsmat_prodMass = dbFile.openDataSet(comp_path + "/mat_prod/Mass"); }
+    { 
+      dsnucs = db->openDataSet(comp_path + "/nucs"); 
+    }
     catch (H5::Exception fgerror)
-      { dsmat_prodMass = dbFile.createDataSet(comp_path + "/mat_prod/Mass", H5::PredType::NATIVE_DOUBLE, ext_1D_space, double_params); }
-
-    // Open/Create /Isos[In|Out]/iso Datasets
-    H5::DataSet dsmat_feedIso;
-    H5::DataSet dsmat_prodIso;
-    for (std::set<int>::iterator iso = bright::track_nucs.begin(); iso != bright::track_nucs.end(); iso++)
     {
-      std::string isoLL = pyne::nucname::name(*iso);
+      hsize_t nucs_dims[1] = {NN};
+      H5::DataSpace nucs_space(1, nucs_dims);
+      dsnucs = db->createDataSet(comp_path + "/nucs", H5::PredType::NATIVE_INT, nucs_space);
+      dsnucs.write(&hdf5_nucs[0], H5::PredType::NATIVE_INT);
+    }
 
-      try
-        { dsmat_feedIso = dbFile.openDataSet(comp_path + "/mat_feed/" + isoLL); }
-      catch (H5::Exception fgerror)
-        { dsmat_feedIso = dbFile.createDataSet(comp_path + "/mat_feed/" + isoLL, H5::PredType::NATIVE_DOUBLE, ext_1D_space, double_params); }
+    H5::DataSpace nucs_space = dsnucs.getSpace();
+    if (1 != nucs_space.getSimpleExtentNdims() || NN != nucs_space.getSimpleExtentNpoints())
+      throw HDF5NucsMismatch(comp_path + "/nucs");
 
-      try
-        { dsmat_prodIso = dbFile.openDataSet(comp_path + "/mat_prod/" + isoLL); }
-      catch (H5::Exception fgerror)
-        { dsmat_prodIso = dbFile.createDataSet(comp_path + "/mat_prod/" + isoLL, H5::PredType::NATIVE_DOUBLE, ext_1D_space, double_params); }
-    };
+    std::vector<int> file_nucs (NN);
+    dsnucs.read(&file_nucs[0], H5::PredType::NATIVE_INT);
+    if (file_nucs != hdf5_nucs)
+      throw HDF5NucsMismatch(comp_path + "/nucs");
+
+    dsets.push_back(hdf5_dataset(db, comp_path + "/mat_feed/Mass", 0));
+    dsets.push_back(hdf5_dataset(db, comp_path + "/mat_prod/Mass", 0));
+    dsets.push_back(hdf5_dataset(db, comp_path + "/mat_feed/comp", NN));
+    dsets.push_back(hdf5_dataset(db, comp_path + "/mat_prod/comp", NN));
   };
 
   // Initiallize the Parameters
-  if (!track_params.empty())
+  if (!hdf5_params.empty())
   {	
     // Open/Create params_prior_calc group
     H5::Group gparams_prior_calc;
     try
-      { gparams_prior_calc = dbFile.openGroup(comp_path + "/params_prior_calc"); }
+      { gparams_prior_calc = db->openGroup(comp_path + "/params_prior_calc"); }
     catch (H5::Exception fgerror)
-      { gparams_prior_calc = dbFile.createGroup(comp_path + "/params_prior_calc"); }
+      { gparams_prior_calc = db->createGroup(comp_path + "/params_prior_calc"); }
 
     // Open/Create params_after_calc group
     H5::Group gparams_after_calc;
     try
-      { gparams_after_calc = dbFile.openGroup(comp_path + "/params_after_calc"); }
+      { gparams_after_calc = db->openGroup(comp_path + "/params_after_calc"); }
     catch (H5::Exception fgerror)
-      { gparams_after_calc = dbFile.createGroup(comp_path + "/params_after_calc"); }
+      { gparams_after_calc = db->createGroup(comp_path + "/params_after_calc"); }
 
-    // Open/Create /Params[In|Out]/param Datasets
-    H5::DataSet dsparams_prior_calcParam;
-    H5::DataSet dsparams_after_calcParam;
-    for ( std::set<std::string>::iterator p = track_params.begin(); p != track_params.end(); p++)
-    {
-      try
-        { dsparams_prior_calcParam = dbFile.openDataSet(comp_path + "/params_prior_calc/"  + *p); }
-      catch (H5::Exception fgerror)
-        { dsparams_prior_calcParam = dbFile.createDataSet(comp_path + "/params_prior_calc/"  + *p, H5::PredType::NATIVE_DOUBLE, ext_1D_space, double_params); }
-
-      try
-        { dsparams_after_calcParam = dbFile.openDataSet(comp_path + "/params_after_calc/" + *p); }
-      catch (H5::Exception fgerror)
-        { dsparams_after_calcParam = dbFile.createDataSet(comp_path + "/params_after_calc/" + *p, H5::PredType::NATIVE_DOUBLE, ext_1D_space, double_params); }
-    };
+    for (int p = 0; p < hdf5_params.size(); p++)
+      dsets.push_back(hdf5_dataset(db, comp_path + "/params_prior_calc/" + hdf5_params[p], 0));
+    for (int p = 0; p < hdf5_params.size(); p++)
+      dsets.push_back(hdf5_dataset(db, comp_path + "/params_after_calc/" + hdf5_params[p], 0));
   };
-
-  // Close out thr HDF5 database file
-  dbFile.close();
 };
 
 
@@ -208,6 +230,15 @@ bright::FCComp::FCComp (std::set<std::string> ptrack, std::string n)
 
 bright::FCComp::~FCComp ()
 {
+  // Write out any passes which are still buffered.  Copies of a component leave this
+  // to the original.
+  if (hdf5_owner == this)
+  {
+    try
+      { flush_hdf5(); }
+    catch (...)
+      { }
+  };
 };
 
 
@@ -317,63 +348,135 @@ void bright::FCComp::write_text()
 };
 
 
-void bright::FCComp::appendHDF5array(H5::H5File *dbFile, std::string set_name, \
-  double *append_value, const int *rank, hsize_t dims[], hsize_t offset[], \
-  hsize_t extend_size[])
+void bright::FCComp::append_hdf5_rows(H5::DataSet & ds, std::vector<double> & buf, hsize_t ncols, 
+                                      hsize_t col, hsize_t row, hsize_t nrows, hsize_t pass)
 {
-  H5::DataSet array_set = (*dbFile).openDataSet(set_name);
-  array_set.extend(extend_size);
-
-  H5::DataSpace append_space = array_set.getSpace();
-  append_space.selectHyperslab(H5S_SELECT_SET, dims, offset);
+  // Writes nrows rows of buf, a row-major (passes x ncols) buffer, starting at row,
+  // into ds at pass, extending ds as needed.  For 1D datasets only column col is written.
+  H5::DataSpace file_space = ds.getSpace();
+  int rank = file_space.getSimpleExtentNdims();
+  hsize_t file_dims[2] = {0, ncols};
+  file_space.getSimpleExtentDims(file_dims);
+  if (file_dims[0] < pass - 1 + nrows)
+  {
+    file_dims[0] = pass - 1 + nrows;
+    ds.extend(file_dims);
+    file_space = ds.getSpace();
+  };
 
-  H5::DataSpace value_space(*rank, dims);
+  hsize_t file_offset[2] = {pass - 1, 0};
+  hsize_t file_count[2]  = {nrows, ncols};
+  file_space.selectHyperslab(H5S_SELECT_SET, file_count, file_offset);
 
-  double data_value[1] = { *append_value };
-  array_set.write(data_value, H5::PredType::NATIVE_DOUBLE, value_space, append_space);
+  hsize_t mem_dims[2]   = {buf.size() / ncols, ncols};
+  hsize_t mem_offset[2] = {row, (rank == 1) ? col : 0};
+  hsize_t mem_count[2]  = {nrows, (rank == 1) ? 1 : ncols};
+  H5::DataSpace mem_space(2, mem_dims);
+  mem_space.selectHyperslab(H5S_SELECT_SET, mem_count, mem_offset);
 
-  array_set.close();
+  ds.write(&buf[0], H5::PredType::NATIVE_DOUBLE, mem_space, file_space);
 };
 
 
 void bright::FCComp::write_hdf5 ()
 {
-  // Writes the fuel cycle component to an HDF5 file
-  const int    RANK   = 1;
-  hsize_t dims[1]     = {1};
-  hsize_t offset[1]   = {pass_num - 1};
-  hsize_t ext_size[1] = {pass_num};
-        
-  // Open the HDF5 file
-  H5::H5File dbFile (bright::output_filename, H5F_ACC_RDWR);
-  std::string comp_path ("/" + natural_name);
+  // Adds this pass to the HDF5 output buffers.  These are written to the output file
+  // by flush_hdf5() once bright::hdf5_buffer_passes passes have been buffered.
+  if (hdf5_owner != this)
+    initialize_hdf5();
 
-  // Write the isotopic component input and output streams
-  if (!bright::track_nucs.empty())
+  hdf5_passes.push_back(pass_num);
+
+  // Buffer the isotopic component input and output streams
+  if (!hdf5_nucs.empty())
   {
-    appendHDF5array(&dbFile, comp_path + "/mat_feed/Mass",  &(mat_feed.mass),  &RANK, dims, offset, ext_size);
-    appendHDF5array(&dbFile, comp_path + "/mat_prod/Mass", &(mat_prod.mass), &RANK, dims, offset, ext_size);
+    hdf5_feed_mass.push_back(mat_feed.mass);
+    hdf5_prod_mass.push_back(mat_prod.mass);
 
-    for (std::set<int>::iterator iso = bright::track_nucs.begin(); iso != bright::track_nucs.end(); iso++)
+    pyne::comp_iter feed_end = mat_feed.comp.end();
+    pyne::comp_iter prod_end = mat_prod.comp.end();
+    for (std::vector<int>::iterator iso = hdf5_nucs.begin(); iso != hdf5_nucs.end(); iso++)
     {
-      std::string isoLL = pyne::nucname::name(*iso);
-      appendHDF5array(&dbFile, comp_path + "/mat_feed/"  + isoLL, &(mat_feed.comp[*iso]),  &RANK, dims, offset, ext_size);
-      appendHDF5array(&dbFile, comp_path + "/mat_prod/" + isoLL, &(mat_prod.comp[*iso]), &RANK, dims, offset, ext_size);
-    }
-  }    
+      pyne::comp_iter ci = mat_feed.comp.find(*iso);
+      hdf5_feed_comp.push_back((ci == feed_end) ? 0.0 : ci->second);
+      ci = mat_prod.comp.find(*iso);
+      hdf5_prod_comp.push_back((ci == prod_end) ? 0.0 : ci->second);
+    };
+  };
 
-  // Write the parameter tracking
-  if (!track_params.empty())
+  // Buffer the parameter tracking
+  for (std::vector<std::string>::iterator p = hdf5_params.begin(); p != hdf5_params.end(); p++)
   {
-    for ( std::set<std::string>::iterator p = track_params.begin(); p != track_params.end(); p++)
+    param_dict_iter pi = params_prior_calc.find(*p);
+    hdf5_prior_params.push_back((pi == params_prior_calc.end()) ? 0.0 : pi->second);
+    pi = params_after_calc.find(*p);
+    hdf5_after_params.push_back((pi == params_after_calc.end()) ? 0.0 : pi->second);
+  };
+
+  if (bright::hdf5_buffer_passes <= (int) hdf5_passes.size())
+    flush_hdf5();
+};
+
+
+void bright::FCComp::flush_hdf5 ()
+{
+  // Writes the buffered passes to the output file, which is kept open between calls.  
+  // Each run of consecutive passes is written as a single hyperslab per dataset.  
+  // The datasets are only opened again when the output file itself has been reopened.
+  // Copies of a component leave the passes which they were copied with to the original.
+  int NR = hdf5_passes.size();
+  if (NR == 0 || hdf5_owner != this)
+    return;
+
+  H5::H5File * db = bright::open_output_hdf5();
+  if (db->getId() != hdf5_file_id)
+  {
+    hdf5_file_id = -1;
+    open_hdf5_datasets(db, hdf5_dsets);
+    hdf5_file_id = db->getId();
+  };
+  std::vector<H5::DataSet> & dsets = hdf5_dsets;
+
+  hsize_t NN = hdf5_nucs.size();
+  hsize_t NP = hdf5_params.size();
+  int d = (0 < NN) ? 4 : 0;
+
+  int r0 = 0;
+  int r1;
+  while (r0 < NR)
+  {
+    r1 = r0 + 1;
+    while (r1 < NR && hdf5_passes[r1] == hdf5_passes[r1-1] + 1)
+      r1++;
+
+    hsize_t nrows = r1 - r0;
+    hsize_t pass = hdf5_passes[r0];
+    if (0 < NN)
     {
-      appendHDF5array(&dbFile, comp_path + "/params_prior_calc/"  + (*p), &(params_prior_calc[*p]),  &RANK, dims, offset, ext_size);
-      appendHDF5array(&dbFile, comp_path + "/params_after_calc/" + (*p), &(params_after_calc[*p]), &RANK, dims, offset, ext_size);
-    }
-  }
+      append_hdf5_rows(dsets[0], hdf5_feed_mass, 1, 0, r0, nrows, pass);
+      append_hdf5_rows(dsets[1], hdf5_prod_mass, 1, 0, r0, nrows, pass);
+      append_hdf5_rows(dsets[2], hdf5_feed_comp, NN, 0, r0, nrows, pass);
+      append_hdf5_rows(dsets[3], hdf5_prod_comp, NN, 0, r0, nrows, pass);
+    };
+
+    for (hsize_t p = 0; p < NP; p++)
+    {
+      append_hdf5_rows(dsets[d + p], hdf5_prior_params, NP, p, r0, nrows, pass);
+      append_hdf5_rows(dsets[d + NP + p], hdf5_after_params, NP, p, r0, nrows, pass);
+    };
+
+    r0 = r1;
+  };
+
+  db->flush(H5F_SCOPE_LOCAL);
 
-  // close the HDF5 File
-  dbFile.close();   
+  hdf5_passes.clear();
+  hdf5_feed_mass.clear();
+  hdf5_prod_mass.clear();
+  hdf5_feed_comp.clear();
+  hdf5_prod_comp.clear();
+  hdf5_prior_params.clear();
+  hdf5_after_params.clear();
 };
 
 
@@ -21,14 +21,29 @@ namespace bright {
   protected:
     // Protected access data
 
+    // HDF5 output buffers, which hold passes until flush_hdf5() writes them out.
+    FCComp * hdf5_owner;                    // Component which set up the buffers, copies do not write them
+    std::vector<int> hdf5_nucs;             // Nuclide columns of mat_feed/comp and mat_prod/comp
+    std::vector<std::string> hdf5_params;   // Parameters which are written out
+    std::vector<int> hdf5_passes;           // Pass numbers of the buffered rows
+    std::vector<double> hdf5_feed_mass;     // [pass]
+    std::vector<double> hdf5_prod_mass;     // [pass]
+    std::vector<double> hdf5_feed_comp;     // [pass, nuclide]
+    std::vector<double> hdf5_prod_comp;     // [pass, nuclide]
+    std::vector<double> hdf5_prior_params;  // [pass, param]
+    std::vector<double> hdf5_after_params;  // [pass, param]
+    hid_t hdf5_file_id;                     // Output file which hdf5_dsets were opened in
+    std::vector<H5::DataSet> hdf5_dsets;    // Output datasets, from open_hdf5_datasets()
+
     // Protected function data
     void initialize(std::set<std::string> paramtrack, std::string n=""); // initializes empty variables
     void initialize_text();	                                  // initializes Text output files
     void initialize_hdf5();	                                  // initializes HDF5 output files
 
-    void appendHDF5array(H5::H5File * dbFile, std::string set_name, \
-      double * append_value, const int * rank, hsize_t dims [], hsize_t offset[], \
-      hsize_t extend_size[]);
+    H5::DataSet hdf5_dataset(H5::H5File * db, std::string path, hsize_t ncols);
+    void open_hdf5_datasets(H5::H5File * db, std::vector<H5::DataSet> & dsets);
+    void append_hdf5_rows(H5::DataSet & ds, std::vector<double> & buf, hsize_t ncols, 
+                          hsize_t col, hsize_t row, hsize_t nrows, hsize_t pass);
 
   public:
     // FCComp Constructors
@@ -52,12 +67,42 @@ namespace bright {
     void write_params_pass();
     void write_text();
     void write_hdf5();
+    void flush_hdf5();
     void write();
     virtual pyne::Material calc();
     virtual pyne::Material calc(pyne::comp_map incomp);
     virtual pyne::Material calc(pyne::Material mat);
   };
 
+
+
+  class HDF5NucsMismatch : public std::exception
+  {
+  //Exception for when the nuclides of existing HDF5 output do not match those being written.
+  public:
+    HDF5NucsMismatch ()
+    {
+      errstr = "The nuclides of the existing HDF5 output do not match bright::track_nucs.";
+    };
+    HDF5NucsMismatch (std::string path)
+    {
+      errstr = "The nuclides in " + path + " of the existing HDF5 output do not match bright::track_nucs.";
+    };
+    ~HDF5NucsMismatch () throw () {};
+
+    static char * name ()
+    {
+      return (char *) "HDF5NucsMismatch";
+    };
+
+    virtual const char* what() const throw()
+    {
+      return (const char *) errstr.c_str();
+    };
+  private:
+    std::string errstr;
+  };
+
 // end bright
 };
 
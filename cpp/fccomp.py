@@ -134,11 +134,25 @@ text-based output.  However, using write() is recommended.
 """
 
 desc['docstrings']['methods']['write_hdf5'] = \
-"""This method writes out the isotopic pass data to an HDF5 file. 
-Then, if available, it also writes parameter data as well.  
+"""This method adds the isotopic and parameter data of this pass to the 
+HDF5 output buffers.  Once bright.bright_conf.hdf5_buffer_passes passes 
+have been buffered, they are written out by flush_hdf5().  Within the 
+output file, the component's group holds mat_feed/comp and mat_prod/comp 
+arrays of shape (passes, nucs), where the nuclide columns are given by 
+the nucs dataset, as well as mat_feed/Mass, mat_prod/Mass, and a 
+dataset for each parameter in params_prior_calc and params_after_calc.
 Using write() instead is recommended.
 """
 
+desc['docstrings']['methods']['flush_hdf5'] = \
+"""This method writes the passes held in the HDF5 output buffers to the 
+output file.  The file is opened once and kept open between calls, and 
+each run of consecutive passes is written with a single hyperslab per 
+dataset.  Any passes still buffered when a component is garbage 
+collected are written out then, but calling this explicitly is 
+the only way to see errors from the write.
+"""
+
 desc['docstrings']['methods']['write'] = \
 """This is a convenience function that first increments up pass_num.
 Then, it checks to see if there are any parameters for this component.
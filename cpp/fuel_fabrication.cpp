@@ -1,5 +1,7 @@
 // Fuel Fabrication Class
 
+#include <limits>
+
 #include "fuel_fabrication.h"
 
 /*** Common Function ***/
@@ -24,21 +26,25 @@ std::set<std::string> bright::make_fuel_fab_params_set(material_dict * mats, std
 
 bright::FuelFabrication::FuelFabrication(std::string n) : bright::FCComp(n)
 {
+  contrib_valid = false;
 };
 
 
 bright::FuelFabrication::FuelFabrication(std::set<std::string> paramtrack, std::string n) : bright::FCComp(paramtrack, n)
 {
+  contrib_valid = false;
 };
 
 bright::FuelFabrication::FuelFabrication(material_dict mats, mass_weight_dict mws_in, Reactor1G r, std::string n) : bright::FCComp(bright::make_fuel_fab_params_set(&mats), n)
 {
+  contrib_valid = false;
   initialize(mats, mws_in, r);
 };
 
 
 bright::FuelFabrication::FuelFabrication(material_dict mats, mass_weight_dict mws_in, Reactor1G r, std::set<std::string> paramtrack, std::string n) : bright::FCComp(bright::make_fuel_fab_params_set(&mats, paramtrack), n)
 {
+  contrib_valid = false;
   initialize(mats, mws_in, r);
 };
 
@@ -81,129 +87,529 @@ void bright::FuelFabrication::calc_deltaRs()
 };
 
 
-pyne::Material bright::FuelFabrication::calc_core_input()
+pyne::Material bright::FuelFabrication::mix_materials(mass_weight_dict & mws)
 {
+  // Mixes the materials together according to the mass weights mws.
   pyne::comp_map cm;
   pyne::Material core_input (cm, 0.0);
 
-  for (mass_weight_dict::iterator mws = mass_weights_out.begin(); mws != mass_weights_out.end(); mws++)
-    core_input = core_input + ( (*materials[(*mws).first]) * (*mws).second );
+  for (mass_weight_dict::iterator mw = mws.begin(); mw != mws.end(); mw++)
+    core_input = core_input + ( (*materials[(*mw).first]) * (*mw).second );
 
   core_input.normalize();
   return core_input;
 };
 
 
-void bright::FuelFabrication::calc_mass_ratios()
+pyne::Material bright::FuelFabrication::calc_core_input()
 {
-  // Find the key mass stremas based on which two have weights that are less than zero
-  std::string key_a;
-  std::string key_b;
+  return mix_materials(mass_weights_out);
+};
 
-  bool found_a = false;
 
-  for (mass_weight_dict::iterator mws = mass_weights_in.begin(); mws != mass_weights_in.end(); mws++)
+
+void bright::FuelFabrication::calc_contributions()
+{
+  /** Tabulates the contribution of each material to BU(F), P(F), d^F(F), and d^C(F) 
+   *  of the reactor.  Since the fuel mass weights are proportional to 1/A_IHM, these 
+   *  are not linear in the mixture, but they are once that factor is pulled out.  With
+   *  h_m the sum of x_i / A_i over the IHM nuclides of material m,
+   *
+   *      BU_m(F) = cf_IHM * sum_{i in I} x_i * A_i * BU_i(F)
+   *      BU_0(F) = sum_{k in fuel form} cf_k * A_k * BU_k(F)
+   *
+   *  and likewise for P and d^F.  When the reactor uses the disadvantage factor zeta,
+   *  which depends on the full number densities, the tables are not used.
+   */
+  contrib_valid = !reactor.use_zeta;
+  contrib_keys.clear();
+  contrib_mass.clear();
+  contrib_h.clear();
+  contrib_BU.clear();
+  contrib_P.clear();
+  contrib_dF.clear();
+  if (!contrib_valid)
+    return;
+
+  int f;
+  int NF = reactor.F.size();
+  data_F_ zeros (NF, 0.0);
+  nuc_fluence_iter BUi, pi, di;
+
+  // Split the fuel chemical form into the IHM and the rest
+  contrib_cf_IHM = 0.0;
+  contrib_MW_0 = 0.0;
+  pyne::comp_map ni_0;
+  for (std::map<std::string, double>::iterator key = reactor.fuel_chemical_form.begin(); key != reactor.fuel_chemical_form.end(); key++)
   {
-    if ((*mws).second < 0.0)
+    if ( (key->first) == "IHM")
     {
-      if (!found_a)
-      {
-        key_a = (*mws).first;
-        found_a = true;
-      }
-      else
+      contrib_cf_IHM = key->second;
+      continue;
+    };
+
+    int key_zz = pyne::nucname::zzaaam(key->first);
+    ni_0[key_zz] = key->second;
+    contrib_MW_0 = contrib_MW_0 + (key->second * pyne::atomic_mass(key_zz));
+
+    // The fold overwrites rather than adds the weight of a nuclide which 
+    // is in both the IHM and the rest of the chemical form.
+    if (0 < reactor.I.count(key_zz))
+      contrib_valid = false;
+  };
+  if (!contrib_valid)
+    return;
+
+  // Contributions of each material
+  for (material_dict::iterator mat = materials.begin(); mat != materials.end(); mat++)
+  {
+    double h_m = 0.0;
+    data_F_ BU_m (zeros);
+    data_F_ P_m (zeros);
+    data_F_ dF_m (zeros);
+
+    for (pyne::comp_iter iso = (*mat).second->comp.begin(); iso != (*mat).second->comp.end(); iso++)
+    {
+      if (0 == reactor.I.count(iso->first) || 0.0 == iso->second)
+        continue;
+
+      double A_i = pyne::atomic_mass(iso->first);
+      h_m = h_m + (iso->second / A_i);
+
+      BUi = reactor.BUi_F_.find(iso->first);
+      pi = reactor.pi_F_.find(iso->first);
+      di = reactor.di_F_.find(iso->first);
+      if (BUi == reactor.BUi_F_.end() || pi == reactor.pi_F_.end() || di == reactor.di_F_.end())
+        continue;
+
+      double w = contrib_cf_IHM * iso->second * A_i;
+      for (f = 0; f < NF; f++)
       {
-        key_b = (*mws).first;
-        break;
+        BU_m[f] += w * BUi->second[f];
+        P_m[f] += w * pi->second[f];
+        dF_m[f] += w * di->second[f];
       };
     };
+
+    contrib_keys.push_back((*mat).first);
+    contrib_mass.push_back((*mat).second->mass);
+    contrib_h.push_back(h_m);
+    contrib_BU.push_back(BU_m);
+    contrib_P.push_back(P_m);
+    contrib_dF.push_back(dF_m);
+  };
+
+  // The constant contribution of the rest of the fuel chemical form
+  data_F_ BU_0 (zeros);
+  data_F_ P_0 (zeros);
+  data_F_ dF_0 (zeros);
+  for (pyne::comp_iter iso = ni_0.begin(); iso != ni_0.end(); iso++)
+  {
+    BUi = reactor.BUi_F_.find(iso->first);
+    pi = reactor.pi_F_.find(iso->first);
+    di = reactor.di_F_.find(iso->first);
+    if (0.0 == iso->second || BUi == reactor.BUi_F_.end() || pi == reactor.pi_F_.end() || di == reactor.di_F_.end())
+      continue;
+
+    double w = iso->second * pyne::atomic_mass(iso->first);
+    for (f = 0; f < NF; f++)
+    {
+      BU_0[f] += w * BUi->second[f];
+      P_0[f] += w * pi->second[f];
+      dF_0[f] += w * di->second[f];
+    };
   };
+  contrib_BU.push_back(BU_0);
+  contrib_P.push_back(P_0);
+  contrib_dF.push_back(dF_0);
+
+  // The coolant, whose mass weights scale with the fuel molecular weight h * MWF
+  double MWC = 0.0;
+  for (std::map<std::string, double>::iterator key = reactor.coolant_chemical_form.begin(); key != reactor.coolant_chemical_form.end(); key++)
+    MWC = MWC + (key->second * pyne::atomic_mass(pyne::nucname::zzaaam(key->first)));
+  double rel_Vol_coef = (reactor.rhoC * reactor.VC) / (reactor.rhoF * MWC * reactor.VF);
+
+  contrib_dC = zeros;
+  contrib_dC_H = zeros;
+  for (std::map<std::string, double>::iterator key = reactor.coolant_chemical_form.begin(); key != reactor.coolant_chemical_form.end(); key++)
+  {
+    int key_zz = pyne::nucname::zzaaam(key->first);
+    di = reactor.di_F_.find(key_zz);
+    if (0.0 == key->second || di == reactor.di_F_.end())
+      continue;
+
+    double w = key->second * pyne::atomic_mass(key_zz) * rel_Vol_coef;
+    data_F_ & dC = (reactor.rescale_hydrogen_xs && key_zz == 10010) ? contrib_dC_H : contrib_dC;
+    for (f = 0; f < NF; f++)
+      dC[f] += w * di->second[f];
+  };
+};
 
-  // deltaR for key a
-  pyne::Material mat_a = *materials[key_a];
-  mat_a.normalize();
-  double dR_a = reactor.calc_deltaR( mat_a );
 
-  // deltaR for key b
-  pyne::Material mat_b = *materials[key_b];
-  mat_b.normalize();
-  double dR_b = reactor.calc_deltaR( mat_b );
 
-  //First Guess for key mass stream masses; each get half of the remaining mass space.
-  double top_up_mass_space = 1.0; 
-  for (mass_weight_dict::iterator mws = mass_weights_in.begin(); mws != mass_weights_in.end(); mws++)
+double bright::FuelFabrication::mix_k(mass_weight_dict & mws, Reactor1G & r)
+{
+  /** Calculates the batch-averaged k of reactor r at its target burnup when fed 
+   *  with the materials mixed according to mws.  The precomputed contributions are 
+   *  used when they are valid, which only touches the burnup parameters of r.  
+   *  Otherwise the mixture is fully folded into r.
+   */
+  if (!contrib_valid)
   {
-    if (0.0 <= (*mws).second)
-      top_up_mass_space = top_up_mass_space - (*mws).second;
+    r.calc_deltaR(mix_materials(mws));
+    return r.batch_average_k(r.target_BU);
   };
 
+  int f, m;
+  int NM = contrib_keys.size();
+  int NF = r.F.size();
 
-  // Initialize mass_weights_out as a copy of mass_weights_in
-  for (mass_weight_dict::iterator mws = mass_weights_in.begin(); mws != mass_weights_in.end(); mws++)
-    mass_weights_out[(*mws).first] = (*mws).second;
+  // Mass fractions of each material in the core and the inverse IHM atomic weight
+  std::vector<double> alpha (NM, 0.0);
+  double alpha_sum = 0.0;
+  for (mass_weight_dict::iterator mw = mws.begin(); mw != mws.end(); mw++)
+  {
+    m = std::lower_bound(contrib_keys.begin(), contrib_keys.end(), (*mw).first) - contrib_keys.begin();
+    if (m == NM || contrib_keys[m] != (*mw).first)
+      continue;
+    alpha[m] = alpha[m] + ((*mw).second * contrib_mass[m]);
+    alpha_sum = alpha_sum + ((*mw).second * contrib_mass[m]);
+  };
+
+  double h = 0.0;
+  for (m = 0; m < NM; m++)
+  {
+    alpha[m] = alpha[m] / alpha_sum;
+    h = h + (alpha[m] * contrib_h[m]);
+  };
+
+  r.BU_F_.assign(contrib_BU[NM].begin(), contrib_BU[NM].end());
+  r.P_inf_F_.assign(contrib_P[NM].begin(), contrib_P[NM].end());
+  r.dF_F_.assign(contrib_dF[NM].begin(), contrib_dF[NM].end());
+  for (m = 0; m < NM; m++)
+  {
+    if (0.0 == alpha[m])
+      continue;
+    for (f = 0; f < NF; f++)
+    {
+      r.BU_F_[f] += alpha[m] * contrib_BU[m][f];
+      r.P_inf_F_[f] += alpha[m] * contrib_P[m][f];
+      r.dF_F_[f] += alpha[m] * contrib_dF[m][f];
+    };
+  };
+
+  double c = contrib_cf_IHM + (h * contrib_MW_0);
+  r.P_F_.resize(NF);
+  r.dC_F_.resize(NF);
+  r.D_F_.resize(NF);
+  r.k_F_.resize(NF);
+  r.zeta_F_.assign(NF, 0.0);
+  for (f = 0; f < NF; f++)
+  {
+    r.BU_F_[f] = h * r.BU_F_[f];
+    r.P_inf_F_[f] = h * r.P_inf_F_[f];
+    r.dF_F_[f] = h * r.dF_F_[f];
+    r.P_F_[f] = r.P_NL * r.P_inf_F_[f];
+    r.dC_F_[f] = c * (contrib_dC[f] + (contrib_dC_H[f] * (1.36927 - (0.01119 * r.BU_F_[f]))));
+    r.D_F_[f] = r.dF_F_[f] + r.dC_F_[f];
+    r.k_F_[f] = r.P_F_[f] / r.D_F_[f];
+  };
+
+  return r.batch_average_k(r.target_BU);
+};
 
-  double dR_guess;
-  pyne::Material core_input;
 
-  double k_a, k_b;
-  double sign_a, sign_b;
 
+double bright::FuelFabrication::solve_mass_ratios(mass_weight_dict & mws_in, mass_weight_dict & mws_out, Reactor1G & r)
+{
+  /** Finds the weights of the key mass streams, those with weights less than zero 
+   *  in mws_in, such that the batch-averaged k of r is one at its target burnup.
+   *  When there are two key streams they fill the remaining mass space together, so 
+   *  this is a root find in the weight of the first one, which is done with the 
+   *  Illinois method.  More key streams are handled by solve_key_weights().  The k 
+   *  of the weights found is returned.
+   */
+  std::vector<std::string> keys;
+  std::vector<double> w_pref;
+  for (mass_weight_dict::iterator mw = mws_in.begin(); mw != mws_in.end(); mw++)
+  {
+    if ((*mw).second < 0.0)
+    {
+      keys.push_back((*mw).first);
+      w_pref.push_back(-(*mw).second);
+    };
+  };
+
+  if (keys.size() < 2)
+    throw BadFuelWeights(0.0, 0.0);
+
+  // The key mass streams fill whatever mass space is left over
+  double top_up_mass_space = 1.0; 
+  for (mass_weight_dict::iterator mw = mws_in.begin(); mw != mws_in.end(); mw++)
+  {
+    if (0.0 <= (*mw).second)
+      top_up_mass_space = top_up_mass_space - (*mw).second;
+  };
+
+  // Initialize mws_out as a copy of mws_in
+  mws_out = mws_in;
+
+  if (2 < keys.size())
+    return solve_key_weights(keys, w_pref, top_up_mass_space, mws_out, r);
+
+  std::string key_a = keys[0];
+  std::string key_b = keys[1];
 
   // Find bound for All Mass Stream A
-  mass_weights_out[key_a] = top_up_mass_space;
-  mass_weights_out[key_b] = 0.0;
-  core_input = calc_core_input();
-  dR_guess = reactor.calc_deltaR( core_input );
-  k_a = reactor.batch_average_k( reactor.target_BU );
-  sign_a = (1.0 - k_a) / fabs(1.0 - k_a);
+  double x_a = top_up_mass_space;
+  mws_out[key_a] = top_up_mass_space;
+  mws_out[key_b] = 0.0;
+  double k_a = mix_k(mws_out, r);
 
   // Find bound for All Mass Stream B
-  mass_weights_out[key_a] = 0.0;
-  mass_weights_out[key_b] = top_up_mass_space;
-  core_input = calc_core_input();
-  dR_guess = reactor.calc_deltaR( core_input );
-  k_b = reactor.batch_average_k( reactor.target_BU );
-  sign_b = (1.0 - k_b) / fabs(1.0 - k_b);
+  double x_b = 0.0;
+  mws_out[key_a] = 0.0;
+  mws_out[key_b] = top_up_mass_space;
+  double k_b = mix_k(mws_out, r);
 
   // Ensure calculation is possible
-  if (sign_a == sign_b)
+  if ( ((1.0 < k_a) == (1.0 < k_b)) && (k_a != 1.0) && (k_b != 1.0) )
     throw BadFuelWeights(k_a, k_b);
 
-  // Continue nomrally
-  mass_weights_out[key_a] = top_up_mass_space * 0.5;
-  mass_weights_out[key_b] = top_up_mass_space - mass_weights_out[key_a];
+  // Close the bracket with the Illinois method
+  double DoA = pow(10.0, -7);	// Degree of accuracy to carry out calculations to.
+  double g_a = k_a - 1.0;
+  double g_b = k_b - 1.0;
+  double x_c = x_b;
+  double k_c = k_b;
+  int side = 0;
+  int q = 0;
+  while ( (DoA < fabs(1.0 - k_c)) && (0.0 < fabs(x_a - x_b)) && (q < 100) )
+  {
+    x_c = ((x_a * g_b) - (x_b * g_a)) / (g_b - g_a);
+    mws_out[key_a] = x_c;
+    mws_out[key_b] = top_up_mass_space - x_c;
+    k_c = mix_k(mws_out, r);
+    q = q + 1;
+    if (1 < bright::verbosity)
+      std::cout << q << ") " << k_c << "\n";
+
+    double g_c = k_c - 1.0;
+    if (g_c == 0.0)
+      break;
+
+    if ( (0.0 < g_c) == (0.0 < g_b) )
+    {
+      x_b = x_c;
+      g_b = g_c;
+      if (side == -1)
+        g_a = g_a / 2.0;
+      side = -1;
+    }
+    else
+    {
+      x_a = x_c;
+      g_a = g_c;
+      if (side == 1)
+        g_b = g_b / 2.0;
+      side = 1;
+    };
+  };
+
+  mws_out[key_a] = x_c;
+  mws_out[key_b] = top_up_mass_space - x_c;
+  return k_c;
+};
 
-  // Calculate delta R for the Guess
-  core_input = calc_core_input();
-  dR_guess = reactor.calc_deltaR( core_input );
 
-  int n;
-  double k;
-  double dMass;
-  
-  k = reactor.batch_average_k( reactor.target_BU );
-  n = 0;
-  if (0 < bright::verbosity)
-    std::cout << n << ") " << k << " "; 
 
-  while (0.001 < fabs(1.0 - k) && n < 10)
+double bright::FuelFabrication::solve_key_weights(std::vector<std::string> & keys, std::vector<double> & w_pref, 
+                                                  double top_up_mass_space, mass_weight_dict & mws_out, Reactor1G & r)
+{
+  /** Finds the weights w of more than two key mass streams.  Since the weights must 
+   *  sum to top_up_mass_space and give k = 1, there are as many solutions as there 
+   *  are key streams less two.  Of these, the one closest in the least squares sense 
+   *  to the preferred split t, which divides top_up_mass_space in proportion to 
+   *  w_pref, is found.  At each step k is linearized about the current weights with 
+   *  the gradient g = dk/dw, and the next weights minimize |w - t|^2 subject to
+   *
+   *      sum(w) = top_up_mass_space,    g . w = g . w_0 + 1 - k_0,    w >= 0
+   *
+   *  Streams whose weight would be negative are fixed at zero, most negative first.
+   *  The gradient is found by finite differences through mix_k(), so each step costs 
+   *  N + 1 evaluations of k.  These are cheap when the contributions are valid, but 
+   *  when the reactor uses zeta each one is a full fold of the core into r.  The k 
+   *  of the weights found is returned.
+   */
+  int m;
+  int N = keys.size();
+  double DoA = pow(10.0, -7);	// Degree of accuracy to carry out calculations to.
+  double delta = pow(10.0, -6) * top_up_mass_space;
+
+  std::vector<double> t (N, 0.0);
+  double pref_sum = 0.0;
+  for (m = 0; m < N; m++)
+    pref_sum = pref_sum + w_pref[m];
+  for (m = 0; m < N; m++)
+    t[m] = top_up_mass_space * w_pref[m] / pref_sum;
+
+  // Ensure calculation is possible, ie that k = 1 lies between the pure key streams
+  double k_min = 0.0;
+  double k_max = 0.0;
+  for (m = 0; m < N; m++)
+  {
+    for (int n = 0; n < N; n++)
+      mws_out[keys[n]] = (n == m) ? top_up_mass_space : 0.0;
+    double k_m = mix_k(mws_out, r);
+    if (m == 0 || k_m < k_min)
+      k_min = k_m;
+    if (m == 0 || k_max < k_m)
+      k_max = k_m;
+  };
+  if (1.0 < k_min || k_max < 1.0)
+    throw BadFuelWeights(k_min, k_max);
+
+  std::vector<double> w (t);
+  std::vector<double> w_next (N, 0.0);
+  std::vector<double> g (N, 0.0);
+  std::vector<bool> is_free (N, true);
+  for (m = 0; m < N; m++)
+    mws_out[keys[m]] = w[m];
+  double k = mix_k(mws_out, r);
+
+  int q = 0;
+  double step = top_up_mass_space;
+  while ( ((DoA < fabs(1.0 - k)) || (delta < step)) && (q < 100) )
   {
-    // Adjust Masses based on pertubation guess.
-    dMass = - dR_guess / (dR_a - dR_b);
-    mass_weights_out[key_a] = mass_weights_out[key_a] + dMass;
-    mass_weights_out[key_b] = mass_weights_out[key_b] - dMass;
+    // Gradient of k with respect to the weights
+    double gw = 0.0;
+    for (m = 0; m < N; m++)
+    {
+      mws_out[keys[m]] = w[m] + delta;
+      g[m] = (mix_k(mws_out, r) - k) / delta;
+      mws_out[keys[m]] = w[m];
+      gw = gw + (g[m] * w[m]);
+    };
 
-    // Recalculate core parameters for new masses guess
-    core_input = calc_core_input();
-    dR_guess = reactor.calc_deltaR( core_input );
-    k = reactor.batch_average_k( reactor.target_BU );
-    n = n+1;
-    if (0 < bright::verbosity)
-      std::cout << k << " ";
+    // Least squares step on the streams which are not fixed at zero
+    is_free.assign(N, true);
+    int nfree = N;
+    while (true)
+    {
+      double Sg = 0.0, Sgg = 0.0, St = 0.0, Sgt = 0.0;
+      for (m = 0; m < N; m++)
+      {
+        if (!is_free[m])
+          continue;
+        Sg = Sg + g[m];
+        Sgg = Sgg + (g[m] * g[m]);
+        St = St + t[m];
+        Sgt = Sgt + (g[m] * t[m]);
+      };
+      double det = (nfree * Sgg) - (Sg * Sg);
+      if (nfree < 2 || det <= 0.0)
+        throw BadFuelWeights(k_min, k_max);
+
+      double rhs_1 = top_up_mass_space - St;
+      double rhs_2 = gw + (1.0 - k) - Sgt;
+      double lambda_1 = ((Sgg * rhs_1) - (Sg * rhs_2)) / det;
+      double lambda_2 = ((nfree * rhs_2) - (Sg * rhs_1)) / det;
+
+      int m_neg = -1;
+      for (m = 0; m < N; m++)
+      {
+        w_next[m] = is_free[m] ? t[m] + lambda_1 + (lambda_2 * g[m]) : 0.0;
+        if (w_next[m] < 0.0 && (m_neg < 0 || w_next[m] < w_next[m_neg]))
+          m_neg = m;
+      };
+      if (m_neg < 0)
+        break;
+      is_free[m_neg] = false;
+      nfree = nfree - 1;
+    };
+
+    step = 0.0;
+    for (m = 0; m < N; m++)
+    {
+      step = std::max(step, fabs(w_next[m] - w[m]));
+      w[m] = w_next[m];
+      mws_out[keys[m]] = w[m];
+    };
+    k = mix_k(mws_out, r);
+    q = q + 1;
+    if (1 < bright::verbosity)
+      std::cout << q << ") " << k << "\n";
   };
 
+  if ((0 < bright::verbosity) && ((DoA < fabs(1.0 - k)) || (delta < step)))
+    std::cout << "!!!Warning!!! key stream weights did not converge in " << q << \
+                 " iterations, k = " << k << "\n";
+
+  return k;
+};
+
+
+
+void bright::FuelFabrication::calc_mass_ratios()
+{
+  // Finds the key mass stream weights which make the reactor critical at its target burnup.
+  calc_contributions();
+  double k = solve_mass_ratios(mass_weights_in, mass_weights_out, reactor);
+
+  // Leave the reactor in the state of the final core input
+  reactor.calc_deltaR(calc_core_input());
+
   if (0 < bright::verbosity)
-    std::cout << "\n\n";
+    std::cout << "k = " << k << "\n\n";
+};
+
+
+
+void bright::FuelFabrication::calc_many(std::vector<mass_weight_dict> & mws_ins, std::vector<mass_weight_dict> & mws_outs)
+{
+  /** Finds the mass weights out for each of many mass weights in, as calc_mass_ratios()
+   *  does, without changing the state of this object.  Problems which cannot be solved 
+   *  have NaN for their weights.  When built with OpenMP, and the reactor does not use 
+   *  zeta, the problems are solved in parallel, each thread with its own reactor copy.
+   */
+  int N = mws_ins.size();
+  double nan = std::numeric_limits<double>::quiet_NaN();
+
+  calc_contributions();
+  mws_outs.assign(N, mass_weight_dict());
+
+  // The reactor copies are made and destroyed outside of the parallel region.
+  int nthreads = 1;
+  #ifdef _OPENMP
+    if (contrib_valid)
+      nthreads = omp_get_max_threads();
+  #endif
+  std::vector<Reactor1G> rs (nthreads, reactor);
+
+  #pragma omp parallel num_threads(nthreads) if (contrib_valid)
+  {
+    int tid = 0;
+    #ifdef _OPENMP
+      tid = omp_get_thread_num();
+    #endif
+    Reactor1G & r = rs[tid];
+
+    #pragma omp for schedule(dynamic)
+    for (int n = 0; n < N; n++)
+    {
+      try
+      {
+        solve_mass_ratios(mws_ins[n], mws_outs[n], r);
+      }
+      catch (std::exception & e)
+      {
+        mws_outs[n] = mws_ins[n];
+        for (mass_weight_dict::iterator mw = mws_outs[n].begin(); mw != mws_outs[n].end(); mw++)
+          if ((*mw).second < 0.0)
+            (*mw).second = nan;
+      };
+    };
+  };
 };
 
 
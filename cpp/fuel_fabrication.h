@@ -49,9 +49,36 @@ namespace bright {
     void calc_deltaRs();
     pyne::Material calc_core_input();
     void calc_mass_ratios();
+    void calc_many(std::vector<mass_weight_dict> & mws_ins, std::vector<mass_weight_dict> & mws_outs);
 
     pyne::Material calc();
     pyne::Material calc(material_dict mats, mass_weight_dict mws_in, Reactor1G r);
+
+  protected:
+    // Contributions of each material to the burnup parameters of the reactor, so that
+    // it need not be refolded for every trial set of mass weights.  If alpha_m is the
+    // mass fraction of material m in the core and h = sum_m alpha_m h_m is the inverse 
+    // atomic weight of the IHM, then Reactor1G::fold_mass_weights() gives X(F) = h * (X_0(F) + 
+    // sum_m alpha_m X_m(F)) for X = BU, P / P_NL, and d^F, while the coolant has 
+    // d^C(F) = (cf_IHM + h * MW_0) * contrib_dC(F).  See calc_contributions().
+    bool contrib_valid;                 // Whether the tables below may be used, ie the reactor does not use zeta
+    std::vector<std::string> contrib_keys;  // Material keys, in the order of the tables below
+    std::vector<double> contrib_mass;   // [m] Mass of each material
+    std::vector<double> contrib_h;      // [m] Sum of x_i / A_i over the IHM nuclides of each material
+    std::vector<data_F_> contrib_BU;    // [m][f] BU_m(F), with BU_0(F) as the last entry
+    std::vector<data_F_> contrib_P;     // [m][f] P_m(F) / P_NL, with P_0(F) / P_NL as the last entry
+    std::vector<data_F_> contrib_dF;    // [m][f] d^F_m(F), with d^F_0(F) as the last entry
+    data_F_ contrib_dC;     // Coolant destruction rate per unit of (cf_IHM + h * MW_0)
+    data_F_ contrib_dC_H;   // Hydrogen part of contrib_dC, which is rescaled by burnup if requested
+    double contrib_cf_IHM;  // IHM fraction of the fuel chemical form
+    double contrib_MW_0;    // Molecular weight of the rest of the fuel chemical form
+
+    void calc_contributions();
+    pyne::Material mix_materials(mass_weight_dict & mws);
+    double mix_k(mass_weight_dict & mws, Reactor1G & r);
+    double solve_mass_ratios(mass_weight_dict & mws_in, mass_weight_dict & mws_out, Reactor1G & r);
+    double solve_key_weights(std::vector<std::string> & keys, std::vector<double> & w_pref, 
+                             double top_up_mass_space, mass_weight_dict & mws_out, Reactor1G & r);
   };
 
 
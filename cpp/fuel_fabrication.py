@@ -26,7 +26,8 @@ mws_in : dict or map or None, optional
             }
 
     would be valid for a light water reactor with half a percent of U-236 always 
-    present.
+    present.  When more than two weights are negative, their magnitudes give the 
+    preferred split of the remaining mass between those materials.
 r : Reactor1G or None, optional 
     An instance of a Reactor1G class to fabricate fuel for.
 paramtrack : list of str or None, optional 
@@ -54,7 +55,7 @@ desc['docstrings']['attrs']['materials'] = \
 
 desc['docstrings']['attrs']['mass_weights_in'] = \
 """A mapping representing the initial specification of the mass weights.  
-Exactly two of these should have negative values."""
+At least two of these should have negative values."""
 
 desc['docstrings']['attrs']['mass_weights_out'] = \
 """A mapping representing the mass weights that are calculated to generate 
@@ -118,7 +119,33 @@ core_input : Material
 desc['docstrings']['methods']['calc_mass_ratios'] = \
 """Calculates mass_weights_out by varying the values of the two parameter which had 
 negative values in mass_weights_in.  Therefore, this is the portion of the code that 
-performs the optimization calculation.
+performs the optimization calculation.  Since the two key weights fill the mass 
+left over by the others, this is a root find for k = 1 in the first key weight, 
+which is done with the Illinois method.  With more than two key weights, those 
+closest in the least squares sense to the preferred split given by the magnitudes 
+of the negative weights are found, subject to k = 1 and no weight being negative.  
+The reactor is left fed with the resulting core input.
+"""
+
+desc['docstrings']['methods']['calc_many'] = \
+"""Calculates the mass weights out for each of many sets of mass weights in, as 
+calc_mass_ratios() does for mass_weights_in.  The materials and reactor are 
+shared by all of the problems, so the contribution of each material to the 
+burnup parameters is computed only once.  This object is left unchanged.  
+When bright is built with OpenMP and the reactor does not use the disadvantage 
+factor, the problems are solved in parallel.
+
+Parameters
+----------
+mws_ins : sequence of dicts
+    Mass weights in, with the same keys as materials.  Each must have two 
+    negative weights, as for mass_weights_in.
+
+Returns
+-------
+mws_outs : list of dicts
+    The mass weights out of each problem.  The two key weights of a problem 
+    which could not be solved are NaN.
 """
 
 desc['docstrings']['methods']['calc'] = \
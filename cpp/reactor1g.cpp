@@ -1,27 +1,57 @@
 // One Group Reactor Component Class
 #include "reactor1g.h"
 
+#include <limits>
+
+// Batch-averaged k at fraction t along a discharge burnup segment and its derivative dk/dt.
+// Within a segment each batch has a fixed weight w_b and linear production and destruction rates.
+static double segment_k(double t, std::vector<double> & w_b, std::vector<double> & P_b, std::vector<double> & dP_b, 
+                        std::vector<double> & D_b, std::vector<double> & dD_b, double & dk_dt)
+{
+  double numerator = 0.0;
+  double dnumerator = 0.0;
+  double denominator = 0.0;
+  for (int b = 0; b < w_b.size(); b++)
+  {
+    double p = P_b[b] + t * dP_b[b];
+    double d = D_b[b] + t * dD_b[b];
+    numerator   += w_b[b] * p / d;
+    dnumerator  += w_b[b] * (dP_b[b] * d - p * dD_b[b]) / (d * d);
+    denominator += w_b[b];
+  };
+  dk_dt = dnumerator / denominator;
+  return numerator / denominator;
+};
+
 /***********************************************/
 /*** Reactor1G Component Class and Functions ***/
 /***********************************************/
 bright::Reactor1G::Reactor1G(std::string n) : bright::FCComp(n)
 {
+  library = NULL;
+  BUd_fallback = true;
 };
 
 
 bright::Reactor1G::Reactor1G(std::set<std::string> paramtrack, std::string n) : bright::FCComp(paramtrack, n)
 {
+  library = NULL;
+  BUd_fallback = true;
 };
 
 
 bright::Reactor1G::Reactor1G(ReactorParameters rp, std::string n) : bright::FCComp(n)
 {
+  library = NULL;
+  BUd_fallback = true;
   initialize(rp);
 };
 
 
 bright::Reactor1G::Reactor1G(ReactorParameters rp, std::set<std::string> paramtrack, std::string n) : bright::FCComp(paramtrack, n)
 {
+  library = NULL;
+  BUd_fallback = true;
   initialize(rp);
 };
 
@@ -64,9 +94,18 @@ void bright::Reactor1G::initialize(ReactorParameters rp)
 
 
 
-void bright::Reactor1G::loadlib(std::string lib)
+/******************************************/
+/*** Reactor1G Shared Library Functions ***/
+/******************************************/
+
+bright::LibraryCache<bright::Reactor1GLibrary> bright::reactor1g_libraries;
+
+
+bright::Reactor1GLibrary::Reactor1GLibrary(std::string lib)
 {
-  // Loads Apporiate Libraries for Reactor and makes them into Burnup Parameters [F, pi(F), di(F), BUi(F), Tij(F)].
+  // Reads in a reactor library and makes it into Burnup Parameters [F, pi(F), di(F), BUi(F), Tij(F)].
+  // When bright::lazy_libraries is set, Tij(F) is only read in as it is needed, see load_transmutation().
+  libfile = lib;
 
   // HDF5 types
   hid_t  rlib;
@@ -151,24 +190,236 @@ void bright::Reactor1G::loadlib(std::string lib)
     rstat = H5LTread_dataset_float(rlib, ("/Destruction/" + iso).c_str(), tempdi);		
     di_F_[*i].assign(&tempdi[0], &tempdi[lenF]);
     di_F_[*i][0] = pyne::solve_line(0.0, F[2], di_F_[*i][2], F[1], di_F_[*i][1]);
-        
-    // Build Tij_F_
-    for (int jn = 0; jn < dimToIso[0] ; jn++)
+  };
+
+  // Set up the dense transmutation tensor, whose rows are read in from the 
+  // still open file either now or, for lazy libraries, as they are needed.
+  h5file = rlib;
+  ToIso_ord.assign(&ToIso[0], &ToIso[dimToIso[0]]);
+  init_transmutation_tensor();
+
+  if (!bright::lazy_libraries)
+  {
+    for (int i = 0; i < I.size(); i++)
+      load_transmutation(i);
+  };
+  close_file();
+};
+
+
+
+void bright::Reactor1GLibrary::init_transmutation_tensor()
+{
+  // Lays out the (all zero) dense transmutation tensor, with the fluence index 
+  // outermost so that each fluence point is a contiguous (I x J) matrix.
+  int NF = F.size();
+  int NI = I.size();
+  int NJ = J.size();
+
+  I_ind.clear();
+  I_ord = std::vector<int>(I.begin(), I.end());
+  for (int i = 0; i < NI; i++)
+    I_ind[I_ord[i]] = i;
+  J_ord = std::vector<int>(J.begin(), J.end());
+
+  T_fij = std::vector<double>(NF*NI*NJ, 0.0);
+  T_loaded = std::vector<bool>(NI, false);
+  T_daughters.clear();
+  if (bright::lazy_libraries)
+    T_daughters = bright::track_nucs;
+};
+
+
+void bright::Reactor1GLibrary::check_daughters()
+{
+  // The library is shared by every reactor, so rows which were read in for a different 
+  // set of daughters than the current one (all of J, unless lazy libraries are used 
+  // with a non-empty track_nucs) are thrown out, to be read in again as needed.
+  nuc_set daughters;
+  if (bright::lazy_libraries)
+    daughters = bright::track_nucs;
+
+  if (daughters == T_daughters)
+    return;
+
+  T_daughters = daughters;
+  std::fill(T_fij.begin(), T_fij.end(), 0.0);
+  std::fill(T_loaded.begin(), T_loaded.end(), false);
+};
+
+
+void bright::Reactor1GLibrary::close_file()
+{
+  // Closes libfile, which is reopened by load_transmutation() when it is next needed.
+  if (h5file < 0)
+    return;
+
+  H5Fclose(h5file);
+  h5file = -1;
+};
+
+
+
+void bright::Reactor1GLibrary::load_transmutation(int i)
+{
+  /** Reads in the transmutation data of the ith nuclide in I, if it has not been already.
+   *  If the library has a 2D /TransmutationMatrix/<i> array (ToIso x Fluence), the 
+   *  needed rows are pulled in with a single hyperslab read.  Otherwise each 
+   *  /Transmutation/<i>/<j> dataset is read in on its own.  For lazy libraries, 
+   *  only the daughters in bright::track_nucs (if it is not empty) are read.  
+   *  libfile is left open for further reads; see close_file().
+   */
+  check_daughters();
+  if (T_loaded[i])
+    return;
+
+  int f, j, r;
+  int NF = F.size();
+  int NI = I.size();
+  int NJ = J.size();
+  int NR = ToIso_ord.size();
+  herr_t rstat;
+
+  if (h5file < 0)
+    h5file = H5Fopen(libfile.c_str(), H5F_ACC_RDONLY, H5P_DEFAULT);
+
+  std::string iso = pyne::nucname::name(I_ord[i]);
+
+  // Figure out which rows of the file need to be read, and where they go
+  std::vector<int> rows;
+  std::vector<int> row_j;
+  for (r = 0; r < NR; r++)
+  {
+    int jnuc = ToIso_ord[r];
+    if (!T_daughters.empty() && 0 == T_daughters.count(jnuc))
+      continue;
+    std::vector<int>::iterator jn = std::lower_bound(J_ord.begin(), J_ord.end(), jnuc);
+    if (jn == J_ord.end() || *jn != jnuc)
+      continue;
+    rows.push_back(r);
+    row_j.push_back(jn - J_ord.begin());
+  };
+
+  std::vector<float> buf (rows.size()*NF + 1, 0.0);
+  std::string mat_path = "/TransmutationMatrix/" + iso;
+  if (0 < rows.size() && 0 < H5Lexists(h5file, "/TransmutationMatrix", H5P_DEFAULT) && \
+      0 < H5Lexists(h5file, mat_path.c_str(), H5P_DEFAULT))
+  {
+    // Select the needed rows as a union of contiguous runs, and read them all at once
+    hid_t dset = H5Dopen2(h5file, mat_path.c_str(), H5P_DEFAULT);
+    hid_t fspace = H5Dget_space(dset);
+    H5Sselect_none(fspace);
+
+    int n = 0;
+    while (n < rows.size())
+    {
+      int m = n + 1;
+      while (m < rows.size() && rows[m] == rows[m-1] + 1)
+        m++;
+      hsize_t start [2] = {(hsize_t) rows[n], 0};
+      hsize_t count [2] = {(hsize_t) (m - n), (hsize_t) NF};
+      H5Sselect_hyperslab(fspace, H5S_SELECT_OR, start, NULL, count, NULL);
+      n = m;
+    };
+
+    hsize_t mdims [2] = {(hsize_t) rows.size(), (hsize_t) NF};
+    hid_t mspace = H5Screate_simple(2, mdims, NULL);
+    rstat = H5Dread(dset, H5T_NATIVE_FLOAT, mspace, fspace, H5P_DEFAULT, &buf[0]);
+
+    H5Sclose(mspace);
+    H5Sclose(fspace);
+    H5Dclose(dset);
+  }
+  else
+  {
+    for (int n = 0; n < rows.size(); n++)
+    {
+      std::string jso = pyne::nucname::name(ToIso_ord[rows[n]]);
+      rstat = H5LTread_dataset_float(h5file, ("/Transmutation/" + iso + "/" + jso).c_str(), &buf[n*NF]);
+    };
+  };
+
+  for (f = 0; f < NF; f++)
+    std::fill(&T_fij[(f*NI + i)*NJ], &T_fij[(f*NI + i)*NJ] + NJ, 0.0);
+
+  for (int n = 0; n < rows.size(); n++)
+  {
+    j = row_j[n];
+    for (f = 0; f < NF; f++)
+      T_fij[(f*NI + i)*NJ + j] = buf[n*NF + f];
+  };
+  T_loaded[i] = true;
+};
+
+
+
+void bright::Reactor1GLibrary::transmute(const std::vector< std::pair<int, double> > & w, int f, double a, double * M_j)
+{
+  /** Computes M_j = sum_i w_i [(1 - a) T_ij(F_f) + a T_ij(F_{f+1})], which is Mj 
+   *  linearly interpolated (or extrapolated) to a fluence between points f and f+1.
+   *  w holds the (index into I, mass weight) pairs of the feed.  For a == 0.0, 
+   *  only fluence point f is used.  M_j must have room for J.size() values.
+   */
+  int NI = I.size();
+  int NJ = J.size();
+
+  // Fault in any transmutation data that has not been read yet
+  check_daughters();
+  for (int n = 0; n < w.size(); n++)
+  {
+    if (!T_loaded[w[n].first])
+      load_transmutation(w[n].first);
+  };
+  close_file();
+
+  std::fill(M_j, M_j + NJ, 0.0);
+  for (int n = 0; n < w.size(); n++)
+  {
+    const double * T0 = &T_fij[(f*NI + w[n].first)*NJ];
+    if (a == 0.0)
     {
-      int j = ToIso[jn];
-      std::string jso = pyne::nucname::name(j);
-
-      #ifdef _WIN32
-        float * tempTij;
-        tempTij = new float [lenF];
-      #else
-        float tempTij [lenF];
-      #endif
-      rstat = H5LTread_dataset_float(rlib, ("/Transmutation/" + iso + "/" + jso).c_str(), tempTij);
-      Tij_F_[*i][j].assign(&tempTij[0], &tempTij[lenF]);
+      const double w0 = w[n].second;
+      for (int j = 0; j < NJ; j++)
+        M_j[j] += w0 * T0[j];
+    }
+    else
+    {
+      const double * T1 = &T_fij[((f+1)*NI + w[n].first)*NJ];
+      const double w0 = w[n].second * (1.0 - a);
+      const double w1 = w[n].second * a;
+      for (int j = 0; j < NJ; j++)
+        M_j[j] += (w0 * T0[j]) + (w1 * T1[j]);
     };
   };
-  rstat = H5Fclose(rlib);
+};
+
+
+bright::Reactor1GLibrary::~Reactor1GLibrary()
+{
+  close_file();
+};
+
+
+
+void bright::Reactor1G::loadlib(std::string lib)
+{
+  // Loads Apporiate Libraries for Reactor and makes them into Burnup Parameters [F, pi(F), di(F), BUi(F), Tij(F)].
+  // The library is only read in the first time that it is used, after which it is shared between reactors.
+  library = bright::reactor1g_libraries.load(lib);
+  bright::Reactor1GLibrary * rlib = library;
+
+  I = rlib->I;
+  J = rlib->J;
+  F = rlib->F;
+  BUi_F_ = rlib->BUi_F_;
+  pi_F_ = rlib->pi_F_;
+  di_F_ = rlib->di_F_;
+
+  zeta_ind.clear();
+  sigma_a_zeta.clear();
+  sigma_str_zeta.clear();
+  di_zeta.clear();
+  di_zeta_set.clear();
 
   // Now get microscopic XS data from KAERI...
   // ...But only if the disadvantage factor is used.
@@ -249,10 +500,10 @@ void bright::Reactor1G::loadlib(std::string lib)
 };
 
 
-void bright::Reactor1G::fold_mass_weights()
+void bright::Reactor1G::calc_mass_weights()
 {
-  /** Multiplies the burnup parameters by the mass weights."
-   *  Calculates BU(F), P(F), D(F), and k(F)"
+  /** Calculates the atomic weight of the IHM, the fuel and coolant molecular weights, 
+   *  and the number weights, mass weights, and number densities from mat_feed.
    */
 
   // First Things First, Let's calculate the atomic weight of the IHM
@@ -349,6 +600,18 @@ void bright::Reactor1G::fold_mass_weights()
   NiC.clear();
   for (pyne::comp_iter iso = niC.begin(); iso != niC.end(); iso++)
     NiC[iso->first] = niC[iso->first] * rhoC * (pyne::N_A) / MWC;
+};
+
+
+
+
+void bright::Reactor1G::fold_mass_weights()
+{
+  /** Multiplies the burnup parameters by the mass weights."
+   *  Calculates BU(F), P(F), D(F), and k(F)"
+   */
+
+  calc_mass_weights();
 
   // BU(F)
   BU_F_.clear();
@@ -359,15 +622,20 @@ void bright::Reactor1G::fold_mass_weights()
       BU_F_[f] = BU_F_[f] + (miF[i->first] * BUi_F_[i->first][f]);
   };
 
-  // P(F)
-  P_F_.clear();
-  P_F_.assign( F.size(), 0.0 );
+  // P(F), which is the only place P_NL enters
+  P_inf_F_.clear();
+  P_inf_F_.assign( F.size(), 0.0 );
   for (pyne::comp_iter i = miF.begin(); i != miF.end(); i++)
   {
-    for (int f = 0; f < P_F_.size(); f++)
-      P_F_[f] = P_F_[f] + (P_NL * miF[i->first] * pi_F_[i->first][f]);
+    for (int f = 0; f < P_inf_F_.size(); f++)
+      P_inf_F_[f] = P_inf_F_[f] + (miF[i->first] * pi_F_[i->first][f]);
   };
 
+  P_F_.clear();
+  P_F_.assign( F.size(), 0.0 );
+  for (int f = 0; f < P_F_.size(); f++)
+    P_F_[f] = P_NL * P_inf_F_[f];
+
   // d^F(F)
   dF_F_.clear();
   dF_F_.assign( F.size(), 0.0 );
@@ -424,21 +692,46 @@ void bright::Reactor1G::fold_mass_weights()
 
 
 
+std::vector< std::pair<int, double> > bright::Reactor1G::transmutation_weights()
+{
+  // Gathers the mass weights of the nuclides in mat_feed that may be transmuted, 
+  // as (index into the library's I, miF) pairs.
+  std::vector< std::pair<int, double> > w;
+  if (library == NULL)
+    return w;
+
+  for(pyne::comp_iter i = mat_feed.comp.begin(); i != mat_feed.comp.end(); i++)
+  {
+    pyne::comp_iter mi = miF.find(i->first);
+    if ( (0 < I.count(i->first)) && (0 < library->I_ind.count(i->first)) && (mi != miF.end()) )
+      w.push_back(std::pair<int, double>(library->I_ind[i->first], mi->second));
+  };
+  return w;
+};
+
+
+
+
 void bright::Reactor1G::calc_Mj_F_()
 {
-  // Generates the Mj(F) table.
+  // Generates the Mj(F) table.  Deprecated, since calc_mat_prod() no longer needs it.
   Mj_F_.clear();
-  for (nuc_iter j = J.begin(); j != J.end(); j++ )
+  if (library == NULL)
+    return;
+
+  int NF = F.size();
+  int NJ = library->J_ord.size();
+  std::vector< std::pair<int, double> > w = transmutation_weights();
+
+  for (int j = 0; j < NJ; j++)
+    Mj_F_[library->J_ord[j]].assign( NF, 0.0 );
+
+  std::vector<double> M_j (NJ, 0.0);
+  for (int f = 0; f < NF; f++)
   {
-    Mj_F_[*j].assign( F.size(), 0.0 );
-    for(pyne::comp_iter i = mat_feed.comp.begin(); i != mat_feed.comp.end(); i++)
-    {
-      if (0 < I.count(i->first))
-      {
-        for (int f = 0; f < Mj_F_[*j].size(); f++)
-          Mj_F_[*j][f] = Mj_F_[*j][f] + (miF[i->first] * Tij_F_[i->first][*j][f]);
-      };
-    };
+    library->transmute(w, f, 0.0, &M_j[0]);
+    for (int j = 0; j < NJ; j++)
+      Mj_F_[library->J_ord[j]][f] = M_j[j];
   };
 };
 
@@ -449,22 +742,29 @@ void bright::Reactor1G::calc_Mj_Fd_()
 {
   /** Calculates the output isotopics of Mj(Fd).
    *  NOTE: Mj(Fd) is effectively the same variable as mat_prod before normalization!
+   *  This is computed directly at the discharge fluence from the dense transmutation 
+   *  tensor, as one interpolated product, and so does not need Mj_F_.
    */
 
   pyne::comp_map tempOut;
+  if (library == NULL)
+  {
+    mat_prod = pyne::Material(tempOut);
+    return;
+  };
 
   // Checks to see if the discharge index in at the end of the fluence table
-  bool fdLast = false;
+  int f0 = fd;
   if ( (fd+1) == F.size() )
-    fdLast = true;			
+    f0 = fd - 1;
+  double a = (Fd - F[f0]) / (F[f0+1] - F[f0]);
 
-  for (nuc_iter j = J.begin(); j != J.end(); j++ )
-  {
-    if (fdLast)
-      tempOut[*j] = pyne::solve_line(Fd, F[fd], Mj_F_[*j][fd], F[fd-1], Mj_F_[*j][fd-1]);
-    else
-      tempOut[*j] = pyne::solve_line(Fd, F[fd+1], Mj_F_[*j][fd+1], F[fd], Mj_F_[*j][fd]);
-  };
+  int NJ = library->J_ord.size();
+  std::vector<double> M_j (NJ, 0.0);
+  library->transmute(transmutation_weights(), f0, a, &M_j[0]);
+
+  for (int j = 0; j < NJ; j++)
+    tempOut[library->J_ord[j]] = M_j[j];
 
   mat_prod = pyne::Material(tempOut);	
 };
@@ -475,7 +775,7 @@ void bright::Reactor1G::calc_Mj_Fd_()
 void bright::Reactor1G::calc_mat_prod()
 {
   // Wrapper to calculate discharge isotopics.
-  calc_Mj_F_();
+  // The full Mj(F) table is not needed for this, see calc_Mj_F_().
   calc_Mj_Fd_();
 };
 
@@ -553,17 +853,13 @@ bright::FluencePoint bright::Reactor1G::fluence_at_BU(double BU)
    *  	FI.f: index imeadiately lower than where BU achieved (int),
    *  	FI.F: flunece itself (double),
    *  	FI.m: slope dBU/dF bewteen points f and f+1 (double)
+   *  Since BU(F) increases monotonically, the lower index is found by binary search.
    */
 
   bright::FluencePoint fp;
 
   // Finds the lower index
-  fp.f = 0;
-  while ( (fp.f < BU_F_.size()) && (BU_F_[fp.f] < BU) )
-  {
-        fp.f = fp.f + 1;
-  };
-  fp.f = fp.f - 1;
+  fp.f = (std::lower_bound(BU_F_.begin(), BU_F_.end(), BU) - BU_F_.begin()) - 1;
 
   if (fp.f < 0)
     fp.f = 0;
@@ -584,65 +880,62 @@ bright::FluencePoint bright::Reactor1G::fluence_at_BU(double BU)
 double bright::Reactor1G::batch_average(double BUd, std::string PDk_flag)
 {
   // Finds the batch-averaged P(F), D(F), or k(F) when at discharge burnup BUd.
-  std::string PDk = pyne::to_upper(PDk_flag); 
+  std::vector<double> BUds (1, BUd);
+  return batch_average_many(BUds, PDk_flag)[0];
+};
 
-  // For B batches (indexed from 0 -> B-1) calculate BU of each batch.
-  std::vector<double> bu (B, 0.0);
-  for (int b = 0; b < B; b++)
-    bu[b] = ((double) b + 1) * BUd / ((double) B);
 
-  // Calculate Fluence points for each BU
-  std::vector<FluencePoint> fps; 
-  fps.resize(B);
-  for (int b = 0; b < B; b++)
-    fps[b] = fluence_at_BU(bu[b]);
 
-  std::vector<double> PDks (B, 0.0);
-  for (int b = 0; b < B; b++)
+
+std::vector<double> bright::Reactor1G::batch_average_many(std::vector<double> & BUds, std::string PDk_flag)
+{
+  // Finds the batch-averaged P(F), D(F), or k(F) at each of many discharge burnups.
+  std::string PDk = pyne::to_upper(PDk_flag); 
+  if ( (PDk != "K") && (PDk != "P") && (PDk != "D") )
   {
-    double p;
-    double d;
+    if (1 < bright::verbosity) 
+      std::cout << "PDk flag is wrong: " << PDk << "\nUsing default of k.\n";
+    PDk = "K";
+  };
+  bool use_p = (PDk != "D");
+  bool use_d = (PDk != "P");
 
-    if ( (fps[b].f + 1) == F.size() )
-    {
-      p = pyne::solve_line(fps[b].F, F[fps[b].f], P_F_[fps[b].f], F[fps[b].f-1], P_F_[fps[b].f-1]);
-      d = pyne::solve_line(fps[b].F, F[fps[b].f], D_F_[fps[b].f], F[fps[b].f-1], D_F_[fps[b].f-1]);
-    }
-    else
-    {
-      p = pyne::solve_line(fps[b].F, F[fps[b].f+1], P_F_[fps[b].f+1], F[fps[b].f], P_F_[fps[b].f]);
-      d = pyne::solve_line(fps[b].F, F[fps[b].f+1], D_F_[fps[b].f+1], F[fps[b].f], D_F_[fps[b].f]);
-    };
+  int NF = F.size();
+  std::vector<double> averages (BUds.size(), 0.0);
+  for (int n = 0; n < BUds.size(); n++)
+  {
+    double numerator = 0.0;
+    double denominator = 0.0;
 
-    if (PDk == "K")
-      PDks[b] = (p/d);
-    else if (PDk == "P")
-      PDks[b] = p;
-    else if (PDk == "D")
-      PDks[b] = d;
-    else
+    // For B batches (indexed from 0 -> B-1) calculate BU of each batch, 
+    // the fluence point where it occurs, and P, D, or k there.
+    for (int b = 0; b < B; b++)
     {
-      if (1 < bright::verbosity) 
-        std::cout << "PDk flag is wrong: " << PDk << "\nUsing default of k.\n";
-      PDks[b] = (p/d);
+      bright::FluencePoint fp = fluence_at_BU(((double) b + 1) * BUds[n] / ((double) B));
+      int f0 = ((fp.f + 1) == NF) ? fp.f - 1 : fp.f;
+
+      double PDk_b;
+      if (use_p && use_d)
+        PDk_b = pyne::solve_line(fp.F, F[f0+1], P_F_[f0+1], F[f0], P_F_[f0]) / \
+                pyne::solve_line(fp.F, F[f0+1], D_F_[f0+1], F[f0], D_F_[f0]);
+      else if (use_p)
+        PDk_b = pyne::solve_line(fp.F, F[f0+1], P_F_[f0+1], F[f0], P_F_[f0]);
+      else
+        PDk_b = pyne::solve_line(fp.F, F[f0+1], D_F_[f0+1], F[f0], D_F_[f0]);
+
+      numerator   = numerator   + (PDk_b / fp.m);
+      denominator = denominator + (1.0 / fp.m);
     };
-  };
 
-  double numerator = 0.0;
-  double denominator = 0.0;
-  for (int b = 0; b < B; b++)
-  {
-    numerator   = numerator   + (PDks[b] / fps[b].m);
-    denominator = denominator + (1.0 / fps[b].m);
+    averages[n] = numerator/denominator;
   };
 
-  return numerator/denominator;
+  return averages;
 };
 
 
 
 
-
 double bright::Reactor1G::batch_average_k(double BUd) 
 {
   return batch_average(BUd, "K");
@@ -653,11 +946,17 @@ double bright::Reactor1G::batch_average_k(double BUd)
 
 void bright::Reactor1G::BUd_bisection_method()
 {
-  // Calculates the maximum discharge burnup via the Bisection Method.
+  /** Calculates the maximum discharge burnup, where the batch-averaged k is one.
+   *  The root is first bracketed by stepping out from an initial guess in 5 MWd/kgIHM 
+   *  increments, several of which are evaluated at a time.  The bracket is then 
+   *  closed with the Illinois variant of the false position method, which needs 
+   *  far fewer k evaluations than bisection.
+   */
+  int n;
   int tempk = 1;
   double BUd_a, k_a, sign_a;
   double BUd_b, k_b, sign_b;
-  double BUd_c, k_c, sign_c;
+  double BUd_c, k_c;
     
   // First Find a BUd that serves as an initial first guess
   while ( (tempk < k_F_.size()) && (1.0 < k_F_[tempk]) )
@@ -676,106 +975,98 @@ void bright::Reactor1G::BUd_bisection_method()
   else
     sign_a = (k_a - 1.0) / fabs(k_a - 1.0);
     
-  // Find a BUd that serves as a valid second guess.  Remember, this is the bisection method here.
-  BUd_b = BUd_a + sign_a * 5.0;
-  k_b = batch_average_k( BUd_b );
-  if (k_b == 1.0)
-  {
-    BUd = BUd_b;
-    return;
-  }
-  else
-    sign_b = (k_b - 1.0) / fabs(k_b - 1.0);
-
-  if (1 < bright::verbosity)
+  // Step away from the first guess until k crosses one.  
+  // The last point on the same side as the first guess is kept as a.
+  int nsteps = 4;
+  std::vector<double> BUd_steps (nsteps, 0.0);
+  std::vector<double> k_steps;
+  bool bracketed = false;
+  while (!bracketed)
   {
-    std::cout << "BUd_a = " << BUd_a << "\tk_a = " << k_a << "\tsign_a = " << sign_a << "\n";
-    std::cout << "BUd_b = " << BUd_b << "\tk_b = " << k_b << "\tsign_b = " << sign_b << "\n";
-    std::cout << "\n";
-  };
+    for (n = 0; n < nsteps; n++)
+      BUd_steps[n] = BUd_a + sign_a * 5.0 * ((double) n + 1);
+    k_steps = batch_average_many(BUd_steps, "K");
 
-
-  while (sign_a == sign_b)
-  {
-    BUd_b = BUd_b + sign_a * 5.0;
-    k_b = batch_average_k( BUd_b );
-    if (k_b == 1.0)
+    for (n = 0; n < nsteps; n++)
     {
-      BUd = BUd_b;
-      return;
-    }
-    else
+      BUd_b = BUd_steps[n];
+      k_b = k_steps[n];
+      if (k_b == 1.0)
+      {
+        BUd = BUd_b;
+        return;
+      };
+
       sign_b = (k_b - 1.0) / fabs(k_b - 1.0);
 
-    if (1 < bright::verbosity)
-    {
-      std::cout << "BUd_a = " << BUd_a << "\tk_a = " << k_a << "\tsign_a = " << sign_a << "\n";
-      std::cout << "BUd_b = " << BUd_b << "\tk_b = " << k_b << "\tsign_b = " << sign_b << "\n";
-      std::cout << "\n";
-    };
+      if (1 < bright::verbosity)
+      {
+        std::cout << "BUd_a = " << BUd_a << "\tk_a = " << k_a << "\tsign_a = " << sign_a << "\n";
+        std::cout << "BUd_b = " << BUd_b << "\tk_b = " << k_b << "\tsign_b = " << sign_b << "\n";
+        std::cout << "\n";
+      };
 
-    if ( (BUd_b < 0.0) || (1000.0 < BUd_b) )
-      throw bright::BadFuelForm ();
-  };
+      if (sign_a != sign_b)
+      {
+        bracketed = true;
+        break;
+      };
+
+      if ( (BUd_b < 0.0) || (1000.0 < BUd_b) )
+        throw bright::BadFuelForm ();
 
-  BUd_c = 0.0;
-  k_c = 0.0;
+      BUd_a = BUd_b;
+      k_a = k_b;
+    };
+  };
 
-  // Ok now that we have valid and hopefully close initial conditions, let's do it!
-  double DoA = pow(10.0, -7);	//Degree of accuracy to carry out calculations to.
-  int q = 0;			//index for number of iterations
-  while ( ((DoA < fabs(1.0 - k_a)) || (DoA < fabs(1.0 - k_b))) && (0.0 < fabs(BUd_a - BUd_b)) && (q < 100) )
+  // Ok now that we have a valid bracket, let's close it with the Illinois method.
+  double DoA = pow(10.0, -7);	// Degree of accuracy to carry out calculations to.
+  double g_a = k_a - 1.0;
+  double g_b = k_b - 1.0;
+  int side = 0;
+  int q = 0;			// index for number of iterations
+  BUd_c = BUd_b;
+  k_c = k_b;
+  while ( (DoA < fabs(1.0 - k_c)) && (0.0 < fabs(BUd_a - BUd_b)) && (q < 100) )
   {
-    BUd_c = (BUd_a + BUd_b) / 2.0;
+    BUd_c = ((BUd_a * g_b) - (BUd_b * g_a)) / (g_b - g_a);
     k_c = batch_average_k( BUd_c );
-    if (k_c == 1.0)
-    {
-      sign_c = 0.0;
-      break;
-    }
-    else
-      sign_c = (k_c - 1.0) / fabs(k_c - 1.0);
-
     q = q + 1;
 
-    if ( (sign_a == sign_c) && (sign_b != sign_c) )
-    {
-      BUd_a = BUd_c;
-      k_a = k_c;
-      sign_a = sign_c;
-    }
-    else if ( (sign_b == sign_c) && (sign_a != sign_c) )
+    double g_c = k_c - 1.0;
+    if (g_c == 0.0)
+      break;
+
+    if ( (0.0 < g_c) == (0.0 < g_b) )
     {
       BUd_b = BUd_c;
-      k_b = k_c;
-      sign_b = sign_c;
+      g_b = g_c;
+      if (side == -1)
+        g_a = g_a / 2.0;
+      side = -1;
     }
     else
     {
-      if (0 < bright::verbosity)
-      {
-        std::cout << "\n";
-        std::cout << "SOMEWHERE WHILE FINDING k SOMETHING WENT WRONG!!!\n";
-        std::cout << "Here is some information that might help you debug ^_^\n";
-        std::cout << "BUd_a = " << BUd_a << "\tk_a = " << k_a << "\tsign_a = " << sign_a << "\n";
-        std::cout << "BUd_b = " << BUd_b << "\tk_b = " << k_b << "\tsign_b = " << sign_b << "\n";
-        std::cout << "BUd_c = " << BUd_c << "\tk_c = " << k_c << "\tsign_c = " << sign_c << "\n";
-        std::cout << "\n";
-      };
+      BUd_a = BUd_c;
+      g_a = g_c;
+      if (side == 1)
+        g_b = g_b / 2.0;
+      side = 1;
     };
   };
 
-  // If c-set of variables wasn't altered, raise an exception.
-  if ( (BUd_c == 0.0) && (k_c == 0.0) )
+  // If the iteration blew up, raise an exception.
+  if (isnan(BUd_c) || isnan(k_c))
   {
     if (0 < bright::verbosity)
     {
       std::cout << "\n";
       std::cout << "SOMEWHERE WHILE FINDING k SOMETHING WENT WRONG!!!\n";
       std::cout << "Here is some information that might help you debug ^_^\n";
-      std::cout << "BUd_a = " << BUd_a << "\tk_a = " << k_a << "\tsign_a = " << sign_a << "\n";
-      std::cout << "BUd_b = " << BUd_b << "\tk_b = " << k_b << "\tsign_b = " << sign_b << "\n";
-      std::cout << "BUd_c = " << BUd_c << "\tk_c = " << k_c << "\tsign_c = " << sign_c << "\n";
+      std::cout << "BUd_a = " << BUd_a << "\tg_a = " << g_a << "\n";
+      std::cout << "BUd_b = " << BUd_b << "\tg_b = " << g_b << "\n";
+      std::cout << "BUd_c = " << BUd_c << "\tk_c = " << k_c << "\n";
       std::cout << "\n";
     };
     throw bright::BisectionMethodNotPerformed ("Burnup");
@@ -784,53 +1075,178 @@ void bright::Reactor1G::BUd_bisection_method()
   // print results, if desired.
   if (0 < bright::verbosity)
   {
-    std::cout << "Final Result of Burnup Bisection Method Calculation:\n";
-    std::cout << "BUd_a = " << BUd_a << "\tk_a = " << k_a << "\tsign_a = " << sign_a << "\n";
-    std::cout << "BUd_b = " << BUd_b << "\tk_b = " << k_b << "\tsign_b = " << sign_b << "\n";
-    std::cout << "BUd_c = " << BUd_c << "\tk_c = " << k_c << "\tsign_c = " << sign_c << "\n";
+    std::cout << "Final Result of Burnup Illinois Method Calculation:\n";
+    std::cout << "Number of iterations q = " << q << "\n";
+    std::cout << "BUd_c = " << BUd_c << "\tk_c = " << k_c << "\n";
     std::cout << "\n";
   };
 
-  // Sort to find closest value among results.
-  if (sign_c == 0.0)
+  BUd = BUd_c;
+  k = k_c;
+
+  if ( (0 < bright::verbosity) && (DoA < fabs(k_c - 1.0)) )
   {
-    BUd = BUd_c;
-    k = k_c;
-  }
-  else if ( fabs(k_a - 1.0) < DoA )
+    std::cout << "k did not converge with the Illinois Method to an accuracy of " << DoA << " in " << q << " iterations.\n";
+    if (fabs(k_c - 1.0) < 0.01)
+      std::cout << "However, k_c is within 1% of 1; using these values.\n";
+    else
+      std::cout << "Alright.  It really didn't converge. k_c is not within 1% of 1. Program will likely fail!\n";
+  };
+
+  bright::FluencePoint fp = fluence_at_BU(BUd);
+  fd = fp.f;				//lower index of fluence at discharge
+  Fd = fp.F;				//Fluence at discharge
+  return;
+};
+
+
+
+
+void bright::Reactor1G::batch_segment(double BUd_lo, double BUd_hi, std::vector<double> & w_b, 
+                                      std::vector<double> & P_b, std::vector<double> & dP_b, 
+                                      std::vector<double> & D_b, std::vector<double> & dD_b)
+{
+  /** Finds the fluence weight of each batch and its production and destruction rates 
+   *  at BUd_lo, along with their change over the segment to BUd_hi.  The segment must 
+   *  not contain a breakpoint, so that every batch stays on the fluence interval it 
+   *  occupies at the segment midpoint and P and D are linear in the discharge burnup.
+   */
+  int NF = F.size();
+  double BUd_mid = (BUd_lo + BUd_hi) / 2.0;
+
+  w_b.resize(B);
+  P_b.resize(B);
+  dP_b.resize(B);
+  D_b.resize(B);
+  dD_b.resize(B);
+
+  for (int b = 0; b < B; b++)
   {
-    BUd = BUd_a;
-    k = k_a;
-  }
-  else if ( fabs(k_b - 1.0) < DoA )
+    double frac = ((double) b + 1.0) / ((double) B);
+    FluencePoint fp = fluence_at_BU(frac * BUd_mid);
+    int f0 = fp.f;
+    if ( (f0 + 1) == NF )
+      f0 = f0 - 1;
+
+    double F_lo = ((frac * BUd_lo - BU_F_[fp.f]) / fp.m) + F[fp.f];
+    double F_hi = ((frac * BUd_hi - BU_F_[fp.f]) / fp.m) + F[fp.f];
+    double P_hi = pyne::solve_line(F_hi, F[f0+1], P_F_[f0+1], F[f0], P_F_[f0]);
+    double D_hi = pyne::solve_line(F_hi, F[f0+1], D_F_[f0+1], F[f0], D_F_[f0]);
+
+    w_b[b] = 1.0 / fp.m;
+    P_b[b] = pyne::solve_line(F_lo, F[f0+1], P_F_[f0+1], F[f0], P_F_[f0]);
+    D_b[b] = pyne::solve_line(F_lo, F[f0+1], D_F_[f0+1], F[f0], D_F_[f0]);
+    dP_b[b] = P_hi - P_b[b];
+    dD_b[b] = D_hi - D_b[b];
+  };
+};
+
+
+
+
+void bright::Reactor1G::BUd_segment_method()
+{
+  /** Calculates the maximum discharge burnup by finding the segment of the burnup 
+   *  table in which the batch-averaged k crosses unity and solving inside of it.
+   *  Segment ends are the discharge burnups B*BU(F_f)/(b+1) at which some batch 
+   *  reaches a fluence point.  Between them each batch keeps a fixed weight and 
+   *  linear P and D, so k(BUd) has a closed form that a safeguarded Newton iteration
+   *  solves in a few steps.  Segments are scanned upwards from zero burnup, so the 
+   *  first crossing of k = 1 is always the one found.  When there is none, this 
+   *  falls back to BUd_bisection_method() if BUd_fallback is set.
+   */
+  int NF = F.size();
+  double BUd_max = 1000.0;
+
+  // Discharge burnups at which some batch crosses an interior fluence point
+  std::vector<double> nodes (1, 0.0);
+  for (int f = 1; f < NF - 1; f++)
   {
-    BUd = BUd_b;
-    k = k_b;
-  }
-  else
+    for (int b = 0; b < B; b++)
+    {
+      double node = ((double) B) * BU_F_[f] / ((double) b + 1.0);
+      if ( (0.0 < node) && (node < BUd_max) )
+        nodes.push_back(node);
+    };
+  };
+  nodes.push_back(BUd_max);
+  std::sort(nodes.begin(), nodes.end());
+  nodes.erase(std::unique(nodes.begin(), nodes.end()), nodes.end());
+  int N = nodes.size();
+
+  std::vector<double> w_b, P_b, dP_b, D_b, dD_b;
+  double dk_dt, g_lo, g_hi;
+  double g_prev = 1.0;
+  double t = -1.0;
+
+  // Scan the segments in order of increasing burnup for the first one where k reaches unity
+  int n = 0;
+  for (n = 0; n < N - 1; n++)
   {
-    if (0 < bright::verbosity)
-      std::cout << "k did not converge with the Bisection Method to an accuracy of " << DoA << " in " << q << " iterations.\n";
+    batch_segment(nodes[n], nodes[n+1], w_b, P_b, dP_b, D_b, dD_b);
+    g_lo = segment_k(0.0, w_b, P_b, dP_b, D_b, dD_b, dk_dt) - 1.0;
+    g_hi = segment_k(1.0, w_b, P_b, dP_b, D_b, dD_b, dk_dt) - 1.0;
 
-    if ( (fabs(k_a - 1.0) < 0.01) && (fabs(k_a - 1.0) < fabs(k_b -1.0)) )
-    {
-      BUd = BUd_a;
-      k = k_a;
-      if (0 < bright::verbosity)
-        std::cout << "However, k_a is within 1% of 1 and closer to 1 than k_b; using these values.\n";
-    }
-    else if ( (fabs(k_b - 1.0) < 0.01) && (fabs(k_b - 1.0) < fabs(k_a -1.0)) )
+    // The batch weights change at the nodes, so k may jump across unity there
+    if ( (g_lo <= 0.0) && (0.0 < g_prev) )
     {
-      BUd = BUd_b;
-      k = k_b;
-      if (0 < bright::verbosity)
-        std::cout << "However, k_b is within 1% of 1 and closer to 1 than k_a; using these values.\n";
-    }
-    else
+      if (0 < n)
+        t = 0.0;
+      break;
+    };
+
+    if (g_hi <= 0.0)
     {
-      if (0 < bright::verbosity)
-        std::cout << "Alright.  It really didn't converge. Neither k_a nor k_b is within 1% of 1. Program will likely fail!\n";
+      t = g_lo / (g_lo - g_hi);
+      break;
     };
+    g_prev = g_hi;
+  };
+
+  // Solve within the segment by Newton's method, safeguarded by bisection on t
+  double t_a = 0.0;
+  double t_b = 1.0;
+  int q = 0;
+  while ( (0.0 < t) && (q < 50) )
+  {
+    double g = segment_k(t, w_b, P_b, dP_b, D_b, dD_b, dk_dt) - 1.0;
+    if (fabs(g) < 1E-12)
+      break;
+    if (0.0 < g)
+      t_a = t;
+    else
+      t_b = t;
+
+    double t_new = t - g / dk_dt;
+    if ( !((t_a < t_new) && (t_new < t_b)) )
+      t_new = (t_a + t_b) / 2.0;
+    if (fabs(t_new - t) < 1E-15)
+      break;
+    t = t_new;
+    q = q + 1;
+  };
+
+  if (t < 0.0)
+  {
+    if (0 < bright::verbosity)
+      std::cout << "No burnup segment brackets k = 1.\n";
+    if (!BUd_fallback)
+      throw bright::BadFuelForm ();
+    if (0 < bright::verbosity)
+      std::cout << "Falling back to the bisection method.\n";
+    BUd_bisection_method();
+    return;
+  };
+
+  BUd = nodes[n] + t * (nodes[n+1] - nodes[n]);
+  k = batch_average_k(BUd);
+
+  if (0 < bright::verbosity)
+  {
+    std::cout << "Final Result of Burnup Segment Method Calculation:\n";
+    std::cout << "Segment = [" << nodes[n] << ", " << nodes[n+1] << "]\tNewton iterations q = " << q << "\n";
+    std::cout << "BUd = " << BUd << "\tk = " << k << "\n";
+    std::cout << "\n";
   };
 
   bright::FluencePoint fp = fluence_at_BU(BUd);
@@ -851,7 +1267,25 @@ void bright::Reactor1G::run_P_NL(double temp_pnl)
 
   P_NL = temp_pnl;
   fold_mass_weights();
-  BUd_bisection_method();
+  BUd_segment_method();
+};
+
+
+
+
+void bright::Reactor1G::rescale_P_NL(double temp_pnl)
+{
+  /** Sets P_NL and recomputes only the quantities that depend on it, P(F) and k(F).
+   *  The remaining mass weighted data does not depend on P_NL.  Thus this may 
+   *  be used in place of fold_mass_weights() once the weights have been folded.
+   */
+
+  P_NL = temp_pnl;
+  for (int f = 0; f < P_F_.size(); f++)
+  {
+    P_F_[f] = P_NL * P_inf_F_[f];
+    k_F_[f] = P_F_[f] / D_F_[f];
+  };
 };
 
 
@@ -861,12 +1295,16 @@ void bright::Reactor1G::calibrate_P_NL_to_BUd()
 {
   /** Calibrates the non-leakage probability of a reactors to hit a target burnup.
    *  Calibration proceeds by bisection method...
+   *  The mass weights are folded once and each trial P_NL only rescales P(F).
    */
 
   double pnl_a, bud_a, sign_a;
   double pnl_b, bud_b, sign_b;
   double pnl_c, bud_c, sign_c;
 
+  // Fold the mass weights, which are independent of P_NL
+  fold_mass_weights();
+
   // Find an acceptable lower bound
   pnl_a = 0.05;
   bool FoundA = false;
@@ -874,7 +1312,8 @@ void bright::Reactor1G::calibrate_P_NL_to_BUd()
   {
     try
     {
-      run_P_NL(pnl_a);
+      rescale_P_NL(pnl_a);
+      BUd_segment_method();
       bud_a = BUd;
       sign_a = (bud_a - target_BU) / fabs(bud_a - target_BU);
       FoundA = true;
@@ -896,7 +1335,8 @@ void bright::Reactor1G::calibrate_P_NL_to_BUd()
   {
     try
     {
-      run_P_NL(pnl_b);
+      rescale_P_NL(pnl_b);
+      BUd_segment_method();
       bud_b = BUd;
       sign_b = (bud_b - target_BU) / fabs(bud_b - target_BU);
       FoundB = true;
@@ -918,7 +1358,8 @@ void bright::Reactor1G::calibrate_P_NL_to_BUd()
   while ( (DoA < fabs(pnl_a - pnl_b)) && (DoA < fabs(bud_a - bud_b)) && (q < 100) )
   {
     pnl_c = (pnl_a + pnl_b) / 2.0;
-    run_P_NL(pnl_c);
+    rescale_P_NL(pnl_c);
+    BUd_segment_method();
     bud_c = BUd;
     sign_c = (bud_c - target_BU) / fabs(bud_c - target_BU);
 
@@ -973,7 +1414,7 @@ pyne::Material bright::Reactor1G::calc()
   // Finds BUd and output isotopics.
   fold_mass_weights();
 
-  BUd_bisection_method();
+  BUd_segment_method();
 
   calc_mat_prod();
 
@@ -1001,6 +1442,198 @@ pyne::Material bright::Reactor1G::calc (pyne::Material mat)
 
 
 
+void bright::Reactor1G::calc_many(std::vector<pyne::Material> & feeds, std::vector<double> & BUds, 
+                                  std::vector<int> & nucs, std::vector<double> & prods)
+{
+  /** Finds the discharge burnup and output isotopics for many feed materials at once.
+   *  The per-nuclide burnup, production, and destruction tables are laid out as 
+   *  dense matrices a single time, and the mass weights of all of the feeds are 
+   *  folded against them (and the library's dense transmutation tensor) together, 
+   *  rather than through the comp_map lookups of fold_mass_weights() feed by feed.
+   *
+   *  On return, BUds[b] is the discharge burnup of feeds[b], nucs holds the 
+   *  nuclides in J (in order), and prods is the row-major (feeds x nucs) matrix of 
+   *  product mass weights, such that prods[b*nucs.size() + j] is the same as 
+   *  calc(feeds[b]).comp[nucs[j]] before normalization.  Feeds for which the 
+   *  burnup could not be found have a BUd and products of NaN.  The other 
+   *  attributes of the reactor are left at their values for the last feed.
+   */
+  int b, n, f, j;
+  int nfeeds = feeds.size();
+  int NF = F.size();
+  double nan = std::numeric_limits<double>::quiet_NaN();
+
+  // Index the nuclides which have one-group data, and lay it out densely
+  std::map<int, int> nuc_ind;
+  for (nuc_fluence_iter nfi = di_F_.begin(); nfi != di_F_.end(); nfi++)
+    nuc_ind[nfi->first] = 0;
+  for (nuc_fluence_iter nfi = BUi_F_.begin(); nfi != BUi_F_.end(); nfi++)
+    nuc_ind[nfi->first] = 0;
+  for (nuc_fluence_iter nfi = pi_F_.begin(); nfi != pi_F_.end(); nfi++)
+    nuc_ind[nfi->first] = 0;
+
+  int N = 0;
+  for (std::map<int, int>::iterator ni = nuc_ind.begin(); ni != nuc_ind.end(); ni++)
+  {
+    ni->second = N;
+    N++;
+  };
+
+  std::vector<double> BUi (N*NF, 0.0);
+  std::vector<double> pi (N*NF, 0.0);
+  std::vector<double> di (N*NF, 0.0);
+  for (nuc_fluence_iter nfi = BUi_F_.begin(); nfi != BUi_F_.end(); nfi++)
+    std::copy(nfi->second.begin(), nfi->second.begin() + std::min((int) nfi->second.size(), NF), BUi.begin() + nuc_ind[nfi->first]*NF);
+  for (nuc_fluence_iter nfi = pi_F_.begin(); nfi != pi_F_.end(); nfi++)
+    std::copy(nfi->second.begin(), nfi->second.begin() + std::min((int) nfi->second.size(), NF), pi.begin() + nuc_ind[nfi->first]*NF);
+  for (nuc_fluence_iter nfi = di_F_.begin(); nfi != di_F_.end(); nfi++)
+    std::copy(nfi->second.begin(), nfi->second.begin() + std::min((int) nfi->second.size(), NF), di.begin() + nuc_ind[nfi->first]*NF);
+
+  // The dense transmutation tensor comes from the library
+  std::vector<int> no_nucs;
+  nucs = (library == NULL) ? no_nucs : library->J_ord;
+  int NJ = nucs.size();
+
+  // Gather the sparse mass weights of every feed
+  int h_ind = (rescale_hydrogen_xs && 0 < nuc_ind.count(10010)) ? nuc_ind[10010] : -1;
+  std::vector< std::vector< std::pair<int, double> > > wF (nfeeds), wC (nfeeds), wT (nfeeds);
+  std::vector<double> wH (nfeeds, 0.0);
+  std::vector< std::vector<double> > zetas (nfeeds);
+  for (b = 0; b < nfeeds; b++)
+  {
+    mat_feed = feeds[b];
+    calc_mass_weights();
+
+    for (pyne::comp_iter iso = miF.begin(); iso != miF.end(); iso++)
+      if (0 < nuc_ind.count(iso->first))
+        wF[b].push_back(std::pair<int, double>(nuc_ind[iso->first], iso->second));
+
+    for (pyne::comp_iter iso = miC.begin(); iso != miC.end(); iso++)
+    {
+      if (0 == nuc_ind.count(iso->first))
+        continue;
+      n = nuc_ind[iso->first];
+      if (n == h_ind)
+        wH[b] = iso->second;
+      else
+        wC[b].push_back(std::pair<int, double>(n, iso->second));
+    };
+
+    wT[b] = transmutation_weights();
+
+    if (use_zeta)
+    {
+      calc_zeta();
+      zetas[b] = zeta_F_;
+    };
+  };
+
+  // Fold the whole batch, BU = wF BUi, P = P_NL wF pi, D = wF di + zeta wC di
+  std::vector<double> BU_b (nfeeds*NF, 0.0);
+  std::vector<double> P_b (nfeeds*NF, 0.0);
+  std::vector<double> dF_b (nfeeds*NF, 0.0);
+  std::vector<double> dC_b (nfeeds*NF, 0.0);
+  for (b = 0; b < nfeeds; b++)
+  {
+    double * BU_row = &BU_b[b*NF];
+    double * P_row = &P_b[b*NF];
+    double * dF_row = &dF_b[b*NF];
+    double * dC_row = &dC_b[b*NF];
+
+    for (n = 0; n < wF[b].size(); n++)
+    {
+      const double w = wF[b][n].second;
+      const double * BUi_row = &BUi[wF[b][n].first*NF];
+      const double * pi_row = &pi[wF[b][n].first*NF];
+      const double * di_row = &di[wF[b][n].first*NF];
+      for (f = 0; f < NF; f++)
+      {
+        BU_row[f] += w * BUi_row[f];
+        P_row[f] += w * pi_row[f];
+        dF_row[f] += w * di_row[f];
+      };
+    };
+
+    for (n = 0; n < wC[b].size(); n++)
+    {
+      const double w = wC[b][n].second;
+      const double * di_row = &di[wC[b][n].first*NF];
+      for (f = 0; f < NF; f++)
+        dC_row[f] += w * di_row[f];
+    };
+
+    if (0.0 != wH[b])
+    {
+      const double * di_row = &di[h_ind*NF];
+      for (f = 0; f < NF; f++)
+        dC_row[f] += wH[b] * di_row[f] * (1.36927 - (0.01119 * BU_row[f]));
+    };
+  };
+
+  // Find the discharge burnup and products of each feed
+  BUds.assign(nfeeds, nan);
+  prods.assign(nfeeds*NJ, nan);
+  BU_F_.resize(NF);
+  P_inf_F_.resize(NF);
+  P_F_.resize(NF);
+  dF_F_.resize(NF);
+  dC_F_.resize(NF);
+  D_F_.resize(NF);
+  k_F_.resize(NF);
+  for (b = 0; b < nfeeds; b++)
+  {
+    std::copy(BU_b.begin() + b*NF, BU_b.begin() + (b+1)*NF, BU_F_.begin());
+    std::copy(P_b.begin() + b*NF, P_b.begin() + (b+1)*NF, P_inf_F_.begin());
+    std::copy(dF_b.begin() + b*NF, dF_b.begin() + (b+1)*NF, dF_F_.begin());
+    std::copy(dC_b.begin() + b*NF, dC_b.begin() + (b+1)*NF, dC_F_.begin());
+    if (use_zeta)
+      zeta_F_ = zetas[b];
+    else
+      zeta_F_.assign(NF, 0.0);
+
+    for (f = 0; f < NF; f++)
+    {
+      if (use_zeta)
+        dC_F_[f] = zeta_F_[f] * dC_F_[f];
+      P_F_[f] = P_NL * P_inf_F_[f];
+      D_F_[f] = dF_F_[f] + dC_F_[f];
+      k_F_[f] = P_F_[f] / D_F_[f];
+    };
+
+    try
+    {
+      BUd_segment_method();
+    }
+    catch (bright::BadFuelForm e)
+    {
+      continue;
+    }
+    catch (bright::BisectionMethodNotPerformed e)
+    {
+      continue;
+    };
+    BUds[b] = BUd;
+
+    // Mj(Fd), interpolated between the two fluence points about Fd
+    if (0 == NJ)
+      continue;
+    int f0 = ((fd + 1) == NF) ? fd - 1 : fd;
+    double a = (Fd - F[f0]) / (F[f0+1] - F[f0]);
+    library->transmute(wT[b], f0, a, &prods[b*NJ]);
+  };
+
+  // Leave the product of the last feed in mat_prod
+  if (0 < nfeeds)
+  {
+    pyne::comp_map last_prod;
+    for (j = 0; j < NJ; j++)
+      last_prod[nucs[j]] = prods[(nfeeds-1)*NJ + j];
+    mat_prod = pyne::Material(last_prod);
+  };
+};
+
+
+
 
 
 
@@ -1013,6 +1646,8 @@ void bright::Reactor1G::lattice_E_planar(double a, double b)
   {
     if (0.0 == kappaC_F_[f])
       lattice_E_F_[f] = 0.0;
+    else if ( (0 < f) && (kappaC_F_[f] == kappaC_F_[f-1]) )
+      lattice_E_F_[f] = lattice_E_F_[f-1];
     else
       lattice_E_F_[f] = kappaC_F_[f] * (b - a) * pyne::coth(kappaC_F_[f]*(b-a));
   };
@@ -1030,6 +1665,8 @@ void bright::Reactor1G::lattice_F_planar(double a, double b)
   {
     if (0.0 == kappaF_F_[f])
       lattice_F_F_[f] = 0.0;
+    else if ( (0 < f) && (kappaF_F_[f] == kappaF_F_[f-1]) )
+      lattice_F_F_[f] = lattice_F_F_[f-1];
     else
       lattice_F_F_[f] = kappaF_F_[f] * a * pyne::coth(kappaF_F_[f]*a) ;
   };
@@ -1044,15 +1681,20 @@ void bright::Reactor1G::lattice_E_spherical(double a, double b)
   lattice_E_F_.clear(); 
   lattice_E_F_.assign( F.size(), 0.0 );
 
+  double b3_a3 = (b*b*b) - (a*a*a);
   for (int f = 0; f < F.size(); f++)
   {
-    if (0.0 == kappaC_F_[f])
+    double kappa = kappaC_F_[f];
+    if (0.0 == kappa)
             lattice_E_F_[f] = 0.0;
+    else if ( (0 < f) && (kappa == kappaC_F_[f-1]) )
+      lattice_E_F_[f] = lattice_E_F_[f-1];
     else
     {
-      double coef = pow(kappaC_F_[f], 3) * (pow(b,3) - pow(a,3)) / (3*kappaC_F_[f]*a);
-      double num = 1.0 - ( kappaC_F_[f] * b * pyne::coth(kappaC_F_[f]*(b-a)) );
-      double den = 1.0 - (pow(kappaC_F_[f], 2)*a*b) - ( kappaC_F_[f]*(b-a) * pyne::coth(kappaC_F_[f]*(b-a)) );
+      double coth_ba = pyne::coth(kappa*(b-a));
+      double coef = kappa * kappa * b3_a3 / (3.0*a);
+      double num = 1.0 - ( kappa * b * coth_ba );
+      double den = 1.0 - (kappa*kappa*a*b) - ( kappa*(b-a) * coth_ba );
       lattice_E_F_[f] = coef * num / den;
     };
   };
@@ -1068,9 +1710,16 @@ void bright::Reactor1G::lattice_F_spherical(double a, double b)
 
   for (int f = 0; f < F.size(); f++)
   {
-    double coef = pow(kappaF_F_[f], 2) * pow(a, 2) / 3.0;
-    double num = pyne::tanh(kappaF_F_[f]*a); 
-    double den = (kappaF_F_[f]*a) - pyne::tanh(kappaF_F_[f]*a); 
+    double kappa = kappaF_F_[f];
+    if ( (0 < f) && (kappa == kappaF_F_[f-1]) )
+    {
+      lattice_F_F_[f] = lattice_F_F_[f-1];
+      continue;
+    };
+    double tanh_a = pyne::tanh(kappa*a);
+    double coef = kappa * kappa * a * a / 3.0;
+    double num = tanh_a; 
+    double den = (kappa*a) - tanh_a; 
     lattice_F_F_[f] = coef * num / den;
   };
   return; 
@@ -1085,17 +1734,27 @@ void bright::Reactor1G::lattice_E_cylindrical(double a, double b)
   lattice_E_F_.clear();
   lattice_E_F_.assign( F.size(), 0.0 );
 
+  double b2_a2 = (b*b) - (a*a);
   for (int f = 0; f < F.size(); f++)
   {
-    if (0.0 == kappaC_F_[f])
+    double kappa = kappaC_F_[f];
+    if (0.0 == kappa)
       lattice_E_F_[f] = 0.0;
+    else if ( (0 < f) && (kappa == kappaC_F_[f-1]) )
+      lattice_E_F_[f] = lattice_E_F_[f-1];
     else
     {
-      double coef = kappaC_F_[f] * (pow(b,2) - pow(a,2)) / (2.0*a);
-      double num = (bm::cyl_bessel_i(0, kappaC_F_[f]*a) * bm::cyl_bessel_k(1, kappaC_F_[f]*b)) + \
-                   (bm::cyl_bessel_k(0, kappaC_F_[f]*a) * bm::cyl_bessel_i(1, kappaC_F_[f]*b));
-      double den = (bm::cyl_bessel_i(1, kappaC_F_[f]*b) * bm::cyl_bessel_k(1, kappaC_F_[f]*a)) - \
-                   (bm::cyl_bessel_k(1, kappaC_F_[f]*b) * bm::cyl_bessel_i(1, kappaC_F_[f]*a));
+      // Each Bessel function is only evaluated once per fluence point
+      double I0_a = bm::cyl_bessel_i(0, kappa*a);
+      double K0_a = bm::cyl_bessel_k(0, kappa*a);
+      double I1_a = bm::cyl_bessel_i(1, kappa*a);
+      double K1_a = bm::cyl_bessel_k(1, kappa*a);
+      double I1_b = bm::cyl_bessel_i(1, kappa*b);
+      double K1_b = bm::cyl_bessel_k(1, kappa*b);
+
+      double coef = kappa * b2_a2 / (2.0*a);
+      double num = (I0_a * K1_b) + (K0_a * I1_b);
+      double den = (I1_b * K1_a) - (K1_b * I1_a);
       lattice_E_F_[f] = coef * num / den;
     };
   };
@@ -1113,12 +1772,15 @@ void bright::Reactor1G::lattice_F_cylindrical(double a, double b)
 
   for (int f = 0; f < F.size(); f++)
   {
-    if (0.0 == kappaF_F_[f])
-      lattice_E_F_[f] = 0.0;
+    double kappa = kappaF_F_[f];
+    if (0.0 == kappa)
+      lattice_F_F_[f] = 0.0;
+    else if ( (0 < f) && (kappa == kappaF_F_[f-1]) )
+      lattice_F_F_[f] = lattice_F_F_[f-1];
     else
     {
-      double num =  kappaF_F_[f] * a * bm::cyl_bessel_i(0, kappaF_F_[f]*a);
-      double den = 2.0 * bm::cyl_bessel_i(1, kappaF_F_[f]*a);
+      double num =  kappa * a * bm::cyl_bessel_i(0, kappa*a);
+      double den = 2.0 * bm::cyl_bessel_i(1, kappa*a);
       lattice_F_F_[f] = num / den;
     };
   };
@@ -1128,93 +1790,155 @@ void bright::Reactor1G::lattice_F_cylindrical(double a, double b)
 
 
 
-void bright::Reactor1G::calc_zeta()
+int bright::Reactor1G::zeta_row(int nuc)
 {
-  // Computes the thermal disadvantage factor
+  /** Returns the row of nuc in the thermal cross section tables used by calc_zeta(), 
+   *  building it on first use.  These only depend on the library data and di_F_, so 
+   *  each nuclide's row is computed once rather than at every fluence point of every 
+   *  call.  See check_zeta_rows() for when di_F_ changes.
+   */
+  std::map<int, int>::iterator zi = zeta_ind.find(nuc);
+  if (zi != zeta_ind.end())
+    return zi->second;
+
+  int NF = F.size();
+  int n = zeta_ind.size();
+  zeta_ind[nuc] = n;
+  sigma_a_zeta.resize((n + 1) * NF, 0.0);
+  sigma_str_zeta.push_back(0.0);
+  di_zeta.resize((n + 1) * NF, 0.0);
+  di_zeta_set.push_back(false);
+  fill_zeta_row(nuc, n);
+  return n;
+};
 
-  // Prepare data sets to calculate the disadvantage factor
-  // For Fuel...
-  SigmaFa_F_.clear();
-  SigmaFtr_F_.clear();
-  kappaF_F_.clear();
 
-  SigmaFa_F_.assign( F.size(), 0.0 );
-  SigmaFtr_F_.assign( F.size(), 0.0 );
-  kappaF_F_.assign( F.size(), 0.0 );
 
-  for (int f = 0; f < F.size(); f++)
+void bright::Reactor1G::fill_zeta_row(int nuc, int n)
+{
+  // Computes row n of the thermal cross section tables for nuc from the current di_F_.
+  int NF = F.size();
+
+  // Thermal XS from the KAERI data, which are zero for nuclides that it does not have
+  double sig_a_therm = 0.0;
+  double sig_s_therm = 0.0;
+  std::map<int, double>::iterator sa = sigma_a_therm.find(nuc);
+  if (sa != sigma_a_therm.end())
+    sig_a_therm = sa->second;
+  std::map<int, double>::iterator ss = sigma_s_therm.find(nuc);
+  if (ss != sigma_s_therm.end())
+    sig_s_therm = ss->second;
+
+  sigma_str_zeta[n] = sig_s_therm * (1.0 - 2.0/(3.0*pyne::atomic_mass(nuc)));
+
+  nuc_fluence_iter di = di_F_.find(nuc);
+  di_zeta_set[n] = (di != di_F_.end());
+  for (int f = 0; f < NF; f++)
+    di_zeta[n*NF + f] = di_zeta_set[n] ? di->second[f] : 0.0;
+
+  int zz = nuc / 10000;
+  double * sig_a = &sigma_a_zeta[n * NF];
+  if ( (57 <= zz && zz <= 71) || (89 <= zz) )
   {
-    // Calculate the following...
-    //  * Macroscopic abspobtion XS in Fuel
-    //  * Macroscopic transport XS in Fuel
-    for(pyne::comp_iter iso = niF.begin(); iso != niF.end(); iso++)
-    {
-      // If Lanthanide or Actinide, use ORIGEN Data as sigma_a
-      // Else use KAERI Data for sigma_a
-      if (570000 < iso->first < 720000 || 890000 < iso->first)
-      {
-        SigmaFa_F_[f]  = SigmaFa_F_[f]  + (NiF[iso->first] * di_F_[iso->first][f] * pyne::cm2_per_barn);
+    // If Lanthanide or Actinide, use ORIGEN Data as sigma_a
+    for (int f = 0; f < NF; f++)
+      sig_a[f] = di_zeta[n*NF + f];
+  }
+  else
+  {
+    // Else use KAERI Data for sigma_a, renormalized for each fluence
+    for (int f = 0; f < NF; f++)
+      sig_a[f] = sig_a_therm;
+    if ( di_zeta_set[n] && (di_zeta[n*NF] != 0.0) )
+      for (int f = 0; f < NF; f++)
+        sig_a[f] = sig_a_therm * di_zeta[n*NF + f] / di_zeta[n*NF];
+  };
+};
 
-        SigmaFtr_F_[f] = SigmaFtr_F_[f] + (NiF[iso->first] * pyne::cm2_per_barn * (di_F_[iso->first][f] + \
-                         sigma_s_therm[iso->first]*(1.0 - 2.0/(3.0*pyne::atomic_mass(iso->first))) ) );
-      }
-      else
-      {
-        // renormalize sigma_a for this fluenece
-        double sig_a = sigma_a_therm[iso->first] * di_F_[iso->first][f] / di_F_[iso->first][0];
 
-        SigmaFa_F_[f]  = SigmaFa_F_[f]  + (NiF[iso->first] * sig_a * pyne::cm2_per_barn);
 
-        SigmaFtr_F_[f] = SigmaFtr_F_[f] + (NiF[iso->first] * pyne::cm2_per_barn * (sig_a + \
-                         sigma_s_therm[iso->first]*(1.0 - 2.0/(3.0*pyne::atomic_mass(iso->first))) ) );
-      };
-    };
+void bright::Reactor1G::check_zeta_rows()
+{
+  /** Rebuilds the rows of the thermal cross section tables whose di_F_ has changed 
+   *  since they were built, as it may have been edited in place.  The tables are 
+   *  thrown away when the fluence grid changes; the thermal XS themselves only 
+   *  change in loadlib(), which also clears them.
+   */
+  int NF = F.size();
+  if (sigma_a_zeta.size() != zeta_ind.size() * NF)
+  {
+    zeta_ind.clear();
+    sigma_a_zeta.clear();
+    sigma_str_zeta.clear();
+    di_zeta.clear();
+    di_zeta_set.clear();
+    return;
+  };
 
-    // Calculate kappa
-    kappaF_F_[f] = sqrt( 3.0 * SigmaFtr_F_[f] * SigmaFa_F_[f] );
+  for (std::map<int, int>::iterator zi = zeta_ind.begin(); zi != zeta_ind.end(); zi++)
+  {
+    int n = zi->second;
+    nuc_fluence_iter di = di_F_.find(zi->first);
+    bool same = (di_zeta_set[n] == (di != di_F_.end()));
+    for (int f = 0; f < NF && same && di_zeta_set[n]; f++)
+      same = (di->second[f] == di_zeta[n*NF + f]);
+    if (!same)
+      fill_zeta_row(zi->first, n);
   };
+};
 
 
-  // For Coolant...
-  SigmaCa_F_.clear();
-  SigmaCtr_F_.clear();
-  kappaC_F_.clear();
 
-  SigmaCa_F_.assign( F.size(), 0.0 );
-  SigmaCtr_F_.assign( F.size(), 0.0 );
-  kappaC_F_.assign( F.size(), 0.0 );
+void bright::Reactor1G::calc_macro_xs(pyne::comp_map & ni, pyne::comp_map & Ni, data_F_ & Sigma_a, 
+                                      data_F_ & Sigma_tr, data_F_ & kappa)
+{
+  /** Calculates the macroscopic absorption and transport cross sections and kappa 
+   *  of a region over all fluence points.  Sigma_a is the product of the tabulated 
+   *  microscopic absorption XS with the number densities, while the transport XS 
+   *  differs from it only by a scattering term that is the same at every fluence.
+   */
+  int NF = F.size();
+  Sigma_a.assign(NF, 0.0);
+  Sigma_tr.assign(NF, 0.0);
+  kappa.assign(NF, 0.0);
 
-  for (int f = 0; f < F.size(); f++)
+  double Sigma_str = 0.0;
+  for (pyne::comp_iter iso = ni.begin(); iso != ni.end(); iso++)
   {
-    // Calculate the following...
-    //  * Macroscopic abspobtion XS in Coolant
-    //  * Macroscopic transport XS in Coolant
-    for(pyne::comp_iter iso = niC.begin(); iso != niC.end(); iso++)
-    {
-      // If Lanthanide or Actinide, use ORIGEN Data as sigma_a
-      // Else use KAERI Data for sigma_a
-      if (570000 < iso->first < 720000 || 890000 < iso->first)
-      {
-        SigmaCa_F_[f]  = SigmaCa_F_[f]  + (NiC[iso->first] * di_F_[iso->first][f] * pyne::cm2_per_barn);
+    int n = zeta_row(iso->first);
+    pyne::comp_iter Niso = Ni.find(iso->first);
+    if (Niso == Ni.end())
+      continue;
 
-        SigmaCtr_F_[f] = SigmaCtr_F_[f] + (NiC[iso->first] * pyne::cm2_per_barn * (di_F_[iso->first][f] + \
-                         sigma_s_therm[iso->first]*(1.0 - 2.0/(3.0*pyne::atomic_mass(iso->first))) ) );
-      }
-      else
-      {
-        // renormalize sigma_a for this fluenece
-        double sig_a = sigma_a_therm[iso->first] * di_F_[iso->first][f] / di_F_[iso->first][0];
+    double N = Niso->second * pyne::cm2_per_barn;
+    double * sig_a = &sigma_a_zeta[n * NF];
+    for (int f = 0; f < NF; f++)
+      Sigma_a[f] += N * sig_a[f];
+    Sigma_str += N * sigma_str_zeta[n];
+  };
 
-        SigmaCa_F_[f]  = SigmaCa_F_[f]  + (NiC[iso->first] * sig_a * pyne::cm2_per_barn);
+  for (int f = 0; f < NF; f++)
+  {
+    Sigma_tr[f] = Sigma_a[f] + Sigma_str;
+    kappa[f] = sqrt( 3.0 * Sigma_tr[f] * Sigma_a[f] );
+  };
+};
 
-        SigmaCtr_F_[f] = SigmaCtr_F_[f] + (NiC[iso->first] * pyne::cm2_per_barn * (sig_a + \
-                         sigma_s_therm[iso->first]*(1.0 - 2.0/(3.0*pyne::atomic_mass(iso->first))) ) );
-      };
-    };
 
-    // Calculate kappa
-    kappaC_F_[f]   = sqrt( 3.0 * SigmaCtr_F_[f] * SigmaCa_F_[f] );
-  };
+
+
+void bright::Reactor1G::calc_zeta()
+{
+  // Computes the thermal disadvantage factor
+
+  // Bring the thermal XS tables up to date with F and di_F_
+  check_zeta_rows();
+
+  // Macroscopic abspobtion and transport XS and kappa in the Fuel...
+  calc_macro_xs(niF, NiF, SigmaFa_F_, SigmaFtr_F_, kappaF_F_);
+
+  // ...and in the Coolant
+  calc_macro_xs(niC, NiC, SigmaCa_F_, SigmaCtr_F_, kappaC_F_);
 
   // Calculate the lattice_flag Functions
   double a, b;
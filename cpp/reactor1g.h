@@ -23,12 +23,59 @@ namespace bright {
 
   typedef std::vector<double> data_F_;
 
+
+  class Reactor1GLibrary
+  {
+  /** Burnup data that Reactor1G reads in from a one-group reactor library.
+   *  This is loaded once per library file and then shared between all of the 
+   *  reactors which use that file.  See reactor1g_libraries.
+   */
+  public:
+    Reactor1GLibrary(std::string lib);
+    ~Reactor1GLibrary();
+
+    std::string libfile;  // Path to the reactor library
+    nuc_set I;            // Set of isotopes that may be in mat_feed.
+    nuc_set J;            // Set of isotopes that may be in mat_prod.
+    std::vector<double> F;    // Fluence in [n/kb]
+    nuc_fluence_dict BUi_F_;  // Burnup [MWd/kgIHM]
+    nuc_fluence_dict pi_F_;   // Production rate [n/s]
+    nuc_fluence_dict di_F_;   // Destruction rate [n/s]
+
+    // Dense transmutation tensor
+    std::map<int, int> I_ind;   // Index of each nuclide in I into T_fij
+    std::vector<int> I_ord;     // Nuclides in I, in the order of T_fij
+    std::vector<int> J_ord;     // Nuclides in J, in the order of T_fij
+    std::vector<double> T_fij;  // Transformation Matrix [kg_i/kgIHM], T_fij[(f*I.size() + i)*J.size() + j]
+    std::vector<bool> T_loaded; // Whether the data for each nuclide in I has been read into T_fij yet
+    nuc_set T_daughters;        // Daughters which the loaded rows of T_fij were read for, empty for all of J
+
+    void load_transmutation(int i);
+    void transmute(const std::vector< std::pair<int, double> > & w, int f, double a, double * M_j);
+
+  private:
+    hid_t h5file;                 // Handle to libfile while rows of T_fij are being read, else -1
+    std::vector<int> ToIso_ord;   // Nuclides in J, in the order of the library file
+
+    void init_transmutation_tensor();
+    void check_daughters();
+    void close_file();
+  };
+
+  extern LibraryCache<Reactor1GLibrary> reactor1g_libraries;  // Process-wide cache of Reactor1G libraries
+
+  class FuelFabrication;
+
+
   class Reactor1G : public FCComp
   {
   /** Reactor class
    *  Basic One-Group Reactor Model.  Computes one Burnup Calculationn with the option of computing output isotopics.
    *  Specific reactor types inherit this class and change base parameters.
    */
+  // FuelFabrication folds its precomputed contributions directly into the burnup parameters.
+  friend class FuelFabrication;
+
   protected:
     // Protected data
     nuc_set I;  // Set of isotopes that may be in mat_feed.
@@ -39,8 +86,28 @@ namespace bright {
     std::map<int, double> sigma_a_therm;  // Microscopic Thermal Absorption XS 
     std::map<int, double> sigma_s_therm;  // Microscopic Thermal Scattering XS 
 
-    // temporarily protected until auto-bidning can be written.
-    std::map<int, nuc_fluence_dict> Tij_F_; //T ransformation Matrix [kg_i/kgIHM]
+    // Per-nuclide thermal XS used by calc_zeta(), built from di_F_ and the above on first use
+    std::map<int, int> zeta_ind;          // Row of each nuclide in the tables below
+    std::vector<double> sigma_a_zeta;     // Absorption XS [barn] at each fluence, sigma_a_zeta[n*F.size() + f]
+    std::vector<double> sigma_str_zeta;   // Transport correction of the scattering XS [barn], sigma_s*(1 - 2/(3A))
+    std::vector<double> di_zeta;          // The di_F_ that each row was built from, laid out as sigma_a_zeta
+    std::vector<bool> di_zeta_set;        // Whether di_F_ had the nuclide of each row when it was built
+    int zeta_row(int nuc);
+    void fill_zeta_row(int nuc, int n);
+    void check_zeta_rows();
+    void calc_macro_xs(pyne::comp_map & ni, pyne::comp_map & Ni, data_F_ & Sigma_a, 
+                       data_F_ & Sigma_tr, data_F_ & kappa);
+
+    LibraryHandle<Reactor1GLibrary, reactor1g_libraries> library;  // Shared data library, set by loadlib()
+
+    std::vector<double> P_inf_F_; // Production rate before P_NL is applied, P_F_ = P_NL * P_inf_F_
+    void rescale_P_NL(double temp_pnl);
+
+    void calc_mass_weights();
+    void batch_segment(double BUd_lo, double BUd_hi, std::vector<double> & w_b, 
+                       std::vector<double> & P_b, std::vector<double> & dP_b, 
+                       std::vector<double> & D_b, std::vector<double> & dD_b);
+    std::vector< std::pair<int, double> > transmutation_weights();
 
   public:
     // Reactor1G Constructors
@@ -92,13 +159,14 @@ namespace bright {
     data_F_ P_F_;   // Production Rate P(F)
     data_F_ D_F_;   // Destruction Rate P(F)
     data_F_ k_F_;   // k(F) -- almost meaningless
-    std::map<int, data_F_ > Mj_F_;  // Transmuted to Matrix Mj(F)
+    std::map<int, data_F_ > Mj_F_;  // Transmuted to Matrix Mj(F), deprecated and only filled by calc_Mj_F_()
     data_F_ zeta_F_;  // Disadvantage Factor zeta(F)
 
     int fd;			// Lower index of discharge fluence
     double Fd;	// Discharge Fluence
     double BUd; // Discharge Burnup
     double k;   // Multiplication factor 
+    bool BUd_fallback;  // Use BUd_bisection_method() when BUd_segment_method() cannot bracket k = 1
 
     pyne::Material mat_feed_u;    // Input Uranium pyne::Material
     pyne::Material mat_feed_tru;  // Input Transuranic pyne::Material
@@ -129,7 +197,7 @@ namespace bright {
     void loadlib(std::string lib="Reactor.h5");
     void fold_mass_weights();
 
-    void calc_Mj_F_();
+    void calc_Mj_F_();   // Deprecated, mat_prod only needs calc_Mj_Fd_()
     void calc_Mj_Fd_();
 
     void   calc_mat_prod();
@@ -142,14 +210,18 @@ namespace bright {
 
     FluencePoint fluence_at_BU(double BU);
     double batch_average(double BUd, std::string PDk_flag="K");
+    std::vector<double> batch_average_many(std::vector<double> & BUds, std::string PDk_flag="K");
     double batch_average_k(double BUd);
     void BUd_bisection_method();
+    void BUd_segment_method();
     void run_P_NL(double temp_pnl);
     void calibrate_P_NL_to_BUd();
 
     pyne::Material calc();
     pyne::Material calc(pyne::comp_map incomp);
     pyne::Material calc(pyne::Material mat);	
+    void calc_many(std::vector<pyne::Material> & feeds, std::vector<double> & BUds, 
+                   std::vector<int> & nucs, std::vector<double> & prods);
 
     void lattice_E_planar(double a, double b);
     void lattice_F_planar(double a, double b);
@@ -164,17 +164,6 @@ of fluence. This is a dictionary whose keys are initial nuclides and whose value
 are vectors of floats.  This data has units of [n/s] and is read in from libfile.
 """
 
-desc['docstrings']['attrs']['Tij_F_'] = \
-"""The transmutation matrix of each initial isotope in the core into daughter 
-nuclides as a function of fluence. This is a dictionary whose keys are initial 
-nuclides and whose values also dictionaries.  These nested dictionaries have 
-keys that are final nuclides and whose values are vectors of floats.  This data 
-has units of [kg_i/kgIHM] or kilogram of each initial nuclide per kg of total 
-initial heavy metal. This matrix is read in from libfile."""
-
-
-
-
 desc['docstrings']['attrs']['A_IHM'] = \
 """The atomic weight of the initial heavy metal (float)."""
 
@@ -243,9 +232,11 @@ desc['docstrings']['attrs']['k_F_'] = \
 
 
 desc['docstrings']['attrs']['Mj_F_'] = \
-"""The transmutation matrix of the fuel (specifically, mat_feed) into the jth nuclide 
-as a function of fluence.  Used with the discharge fluence Fd to calculate mat_prod.  
-This object is therefore a dictionary from zzaaam-integers to vectors of floats."""
+"""Deprecated.  The transmutation matrix of the fuel (specifically, mat_feed) into 
+the jth nuclide as a function of fluence.  This object is therefore a dictionary 
+from zzaaam-integers to vectors of floats.  It is no longer filled in by calc() or 
+calc_mat_prod(), which compute mat_prod directly at the discharge fluence Fd, but 
+only by the deprecated calc_Mj_F_()."""
 
 desc['docstrings']['attrs']['zeta_F_'] = \
 """The thermal disadvantage factor as a function of fluence.  This attribute is 
@@ -262,6 +253,11 @@ desc['docstrings']['attrs']['BUd'] = \
 """The discharge burnup [MWd/kgIHM] (float).  Unless something went very wrong,
 this should be rather close in value to target_BU."""
 
+desc['docstrings']['attrs']['BUd_fallback'] = \
+"""Flag (bool) for whether BUd_segment_method() falls back to 
+BUd_bisection_method() when no segment of the burnup table brackets k = 1.  
+If False, BadFuelForm is raised instead.  Defaults to True."""
+
 desc['docstrings']['attrs']['k'] = \
 """This is the multiplication factor of the reactor at discharge.  This should 
 be very close in value to 1.0."""
@@ -347,6 +343,10 @@ information from it. This method is typically called by the constructor of the
 child reactor type object.  It must be called before attempting to do any real 
 computation.
 
+Libraries are read in only once per process and then shared between all reactors 
+that load the same file.  A library file which has been modified on disk since it 
+was last read is read in again.
+
 Parameters
 ----------
 lib : str 
@@ -370,16 +370,19 @@ There is no harm in calling this method multiple times.
 """
 
 desc['docstrings']['methods']['calc_Mj_F_'] = \
-"""This function calculates and sets the ``Mj_F_`` attribute from mat_feed and the 
-raw reactor data ``Tij_F_``.
+"""Deprecated, use calc_Mj_Fd_() instead.  This function calculates and sets the 
+``Mj_F_`` attribute from mat_feed and the library's dense transmutation tensor, 
+over the whole fluence grid.
 """
 
 desc['docstrings']['methods']['calc_Mj_Fd_'] = \
-"""This function evaluates ``Mj_F_`` calculated from calc_Mj_F_() at the 
-discharge fluence Fd. The resultant isotopic dictionary is then converted 
-into the mat_prod mass stream for this pass through the reactor.  Thus if 
-ever you need to calculate mat_prod without going through calc(), use this 
-function.
+"""This function evaluates the transmutation matrix of mat_feed at the 
+discharge fluence Fd.  This is done directly, as a single product of the mass 
+weights with the library's dense transmutation tensor interpolated to Fd, and 
+so does not need calc_Mj_F_() to have been called.  The resultant isotopic 
+dictionary is then converted into the mat_prod mass stream for this pass 
+through the reactor.  Thus if ever you need to calculate mat_prod without 
+going through calc(), use this function.
 """
 
 desc['docstrings']['methods']['calc_mat_prod'] = \
@@ -389,10 +392,10 @@ It is equivalent to:
 .. code-block:: python
 
     #Wrapper to calculate discharge isotopics.
-    calc_Mj_F_()
     calc_Mj_Fd_()
 
-This is mostly used internally.
+The full Mj_F_ table is not computed, see calc_Mj_F_().  This is mostly used 
+internally.
 """
 
 desc['docstrings']['methods']['calc_sub_mats'] = \
@@ -449,7 +452,7 @@ desc['docstrings']['methods']['fluence_at_BU'] = \
 The fluence point is an amalgamation of data where the at which the burnup occurs.
 This object instance FP contains three pieces of information::
     
-    FP.f    #Index immediately lower than where BU achieved (int)
+    FP.f    #Index immediately lower than where BU achieved (int), found by binary search
     FP.F    #Fluence value itself (float)
     FP.m    #Slope dBU/dF between points f and f+1 (double)
 
@@ -502,13 +505,48 @@ k : float
 
 """
 
+desc['docstrings']['methods']['batch_average_many'] = \
+"""Finds the batch-averaged P(F), D(F), or k(F) for many discharge burnups 
+at once.  This is equivalent to calling batch_average() for each BUd, but the 
+flag is parsed only once and only the requested rates are interpolated.
+
+Parameters
+----------
+BUds : sequence of floats
+    The discharge burnups [MWd/kgIHM] to obtain batch-averaged values for.
+PDk_flag : str , optional
+    Flag that determines whether the neutron production rate "P" [n/s],  
+    the neutron destruction rate "D" [n/s], or the multiplication factor 
+    "K" is reported in the output.
+
+Returns
+-------
+PDk : 1d numpy float array 
+    The batch averaged values, one per entry in BUds.
+
+"""
+
 desc['docstrings']['methods']['BUd_bisection_method'] = \
-"""Calculates the maximum discharge burnup via the Bisection Method for a 
-given mat_feed in this reactor.  This iterates over values of BUd to find 
-a batch averaged multiplication factor that is closest to 1.0.
+"""Calculates the maximum discharge burnup for a given mat_feed in this 
+reactor.  This iterates over values of BUd to find a batch averaged 
+multiplication factor that is closest to 1.0.
 
-Other root finding methods for determining maximum discharge burnup are 
-certainly possible.
+The root is first bracketed by stepping BUd several points at a time through 
+batch_average_many() and the bracket is then closed with the Illinois variant 
+of the method of false position, which converges superlinearly while keeping 
+the root bracketed like bisection does.
+"""
+
+desc['docstrings']['methods']['BUd_segment_method'] = \
+"""Calculates the maximum discharge burnup for a given mat_feed in this 
+reactor by finding where the batch averaged multiplication factor first 
+crosses 1.0.  The discharge burnups at which some batch reaches a fluence 
+point split the burnup table into segments.  Within each segment every batch 
+has linear production and destruction rates and a fixed weight, so k(BUd) has 
+a closed form.  The segments are scanned upward from zero burnup and the 
+root inside the first crossing segment is found with a safeguarded Newton 
+iteration on this closed form.  See BUd_fallback for when no segment 
+crosses 1.0.
 """
 
 desc['docstrings']['methods']['run_P_NL'] = \
@@ -520,7 +558,7 @@ This function amounts to the following code::
 
     self.P_NL = pnl
     self.fold_mass_weights()
-    self.BUd_bisection_method()
+    self.BUd_segment_method()
 
 Parameters
 ----------
@@ -543,7 +581,7 @@ reactor calculations, the calc() method is relatively simple::
 
     self.mat_feed = input
     self.fold_mass_weights()
-    self.BUd_bisection_method()
+    self.BUd_segment_method()
     self.calc_mat_prod()
     return self.mat_prod
 
@@ -564,6 +602,33 @@ output : Material
 
 """
 
+desc['docstrings']['methods']['calc_many'] = \
+"""Finds the discharge burnup and output isotopics for many feed materials 
+at once.  The one-group burnup, production, destruction, and transmutation 
+tables are laid out as dense matrices a single time and the mass weights 
+of every feed are folded against them together.  This is much faster than 
+calling calc() in a loop when evaluating many candidate fuels against the 
+same library.  The other attributes of the reactor (mat_feed, BUd, BU_F_, 
+etc.) are left at their values for the last feed.
+
+Parameters
+----------
+feeds : sequence of dicts or Materials
+    The feed materials to burn up.  Nuclide dictionaries (zzaaam keys, 
+    float values) are first converted into Materials.
+
+Returns
+-------
+BUds : 1d numpy float array 
+    Discharge burnup of each feed [MWd/kgIHM].  This is NaN for feeds 
+    whose burnup could not be found.
+nucs : 1d numpy int array 
+    The nuclides (zzaaam) that may be in mat_prod, ie the columns of prods.
+prods : 2d numpy float array 
+    The (feeds x nucs) output isotopics of each feed, before normalization.
+    This is the same as calc(feeds[b]).comp[nucs[j]] for row b and column j.
+"""
+
 desc['docstrings']['methods']['lattice_E_planar'] = \
 """Calculates the lattice function E(F) for planar geometry.  
 
@@ -39,6 +39,7 @@ bright::ReactorParameters::ReactorParameters()
   total_slots = 0.0;
 
   branch_ratio_cutoff = 0.0;
+  depletion_solver = "cram";
 };
 
 
@@ -136,6 +137,7 @@ bright::ReactorParameters bright::fill_lwr_defaults ()
   lwrd.total_slots = 289.0;
 
   lwrd.branch_ratio_cutoff = 1E-20;
+  lwrd.depletion_solver = "cram";
 
   return lwrd;
 };
@@ -184,6 +186,7 @@ bright::ReactorParameters bright::fill_fr_defaults ()
   frd.total_slots = 163.0;
 
   frd.branch_ratio_cutoff = 1E-20;
+  frd.depletion_solver = "cram";
 
   return frd;
 };
@@ -50,6 +50,7 @@ namespace bright {
     double total_slots;
 
     double branch_ratio_cutoff;
+    std::string depletion_solver;
   };
 
 
@@ -115,6 +115,13 @@ desc['docstrings']['attrs']['burnup_via_constant'] = \
 desc['docstrings']['attrs']['branch_ratio_cutoff'] = \
 """The cutoff value (float) below which the bateman equations are not solved."""
 
+desc['docstrings']['attrs']['depletion_solver'] = \
+"""Flag (str) for the method used to solve the depletion equations over each 
+burnup time step.  Accepted values are "cram" (Chebyshev Rational Approximation 
+Method, the default), "pade" (scaling and squaring Pade approximant of the dense 
+matrix exponential), and "bateman" (the legacy enumeration of transmutation chains, 
+which is the only method that uses branch_ratio_cutoff)."""
+
 
 desc['docstrings']['attrs']['fuel_radius'] = \
 """The radius (float) of the fuel region [cm]."""
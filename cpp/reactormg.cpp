@@ -1,5 +1,14 @@
 // Multi-Group Reactor Component Class
 #include "reactormg.h"
+#include <cstdio>
+#include <cstring>
+
+// Memory mapping of cross section sidecar files
+#ifndef _WIN32
+  #include <fcntl.h>
+  #include <unistd.h>
+  #include <sys/mman.h>
+#endif
 
 
 
@@ -9,22 +18,56 @@
 
 bright::ReactorMG::ReactorMG(std::string n) : FCComp(n)
 {
+  library = NULL;
+  xs_lib = NULL;
+  xs_lib_size = 0;
+  depletion_solver = "cram";
+  store_inverses = false;
+  eigen_solver = "wielandt";
+  eigen_tol = 1E-8;
+  eigen_max_iter = 500;
+  BUd_fallback = true;
 };
 
 
 bright::ReactorMG::ReactorMG(std::set<std::string> paramtrack, std::string n) : bright::FCComp(paramtrack, n)
 {
+  library = NULL;
+  xs_lib = NULL;
+  xs_lib_size = 0;
+  depletion_solver = "cram";
+  store_inverses = false;
+  eigen_solver = "wielandt";
+  eigen_tol = 1E-8;
+  eigen_max_iter = 500;
+  BUd_fallback = true;
 };
 
 
 bright::ReactorMG::ReactorMG(ReactorParameters rp, std::string n) : bright::FCComp(n)
 {
+  library = NULL;
+  xs_lib = NULL;
+  xs_lib_size = 0;
+  store_inverses = false;
+  eigen_solver = "wielandt";
+  eigen_tol = 1E-8;
+  eigen_max_iter = 500;
+  BUd_fallback = true;
   initialize(rp);
 };
 
 
 bright::ReactorMG::ReactorMG(ReactorParameters rp, std::set<std::string> paramtrack, std::string n) : bright::FCComp(paramtrack, n)
 {
+  library = NULL;
+  xs_lib = NULL;
+  xs_lib_size = 0;
+  store_inverses = false;
+  eigen_solver = "wielandt";
+  eigen_tol = 1E-8;
+  eigen_max_iter = 500;
+  BUd_fallback = true;
   initialize(rp);
 };
 
@@ -66,6 +109,7 @@ void bright::ReactorMG::initialize(ReactorParameters rp)
   rescale_hydrogen_xs = rp.rescale_hydrogen;	//Rescale the Hydrogen-1 XS?
   burnup_via_constant = rp.burnup_via_constant;  // power or flux
   branch_ratio_cutoff = rp.branch_ratio_cutoff; // Cut-off for bateman chains
+  depletion_solver = rp.depletion_solver; // cram, pade, or bateman
 
   // Calculates Volumes
   r_fuel = rp.fuel_radius;    // Fuel region radius
@@ -88,21 +132,32 @@ void bright::ReactorMG::initialize(ReactorParameters rp)
 
 
 
-void bright::ReactorMG::loadlib(std::string lib)
+/****************************************/
+/*** ReactorMG Shared Library Classes ***/
+/****************************************/
+
+bright::LibraryCache<bright::ReactorMGLibrary> bright::reactormg_libraries;
+
+
+bright::ReactorMGLibrary::ReactorMGLibrary(std::string lib)
 {
-  // Loads Apporiate Libraries for ReactorMG
+  // Reads in a reactor data library and the nuclear data that goes with it.
+  libfile = lib;
+  xs_file = lib + ".xs";
+  chains_file = lib + ".chains.h5";
+  xs_lib = NULL;
+  xs_lib_size = 0;
+  xs_mapped = false;
+  xs_map = NULL;
+  xs_map_size = 0;
 
   // Check that the file is there
   if (!pyne::file_exists(lib))
     throw pyne::FileNotFound(lib);
 
-  //Check to see if the file is in HDF5 format.
   bool isH5 = H5::H5File::isHdf5(lib);
   if (!isH5)
-  {
-    std::cout << "!!!Warning!!! " << lib << " is not a valid HDF5 file!\n";
-    return;
-  };
+    throw h5wrap::FileNotHDF5(lib);
 
   // Turn off the exceptions
   H5::Exception::dontPrint();
@@ -147,6 +202,70 @@ void bright::ReactorMG::loadlib(std::string lib)
     perturbed_fields[*col][2] = perturbed_fields[*col][1] - perturbed_fields[*col][0];
   };
 
+  // Build the nearest neighbor index over the perturbed columns, 
+  // normalized by their ranges so that all dimensions are comparable.
+  perturbed_cols.clear();
+  for (std::vector<std::string>::iterator col = perturbations.cols.begin(); col != perturbations.cols.end(); col++)
+  {
+    if (perturbed_fields[*col][2] != 0.0)
+      perturbed_cols.push_back(*col);
+  };
+
+  int pc, PC, q;
+  PC = perturbed_cols.size();
+  std::vector< std::vector<double> > pert_points (nperturbations, std::vector<double>(PC, 0.0));
+  for (pc = 0; pc < PC; pc++)
+  {
+    col_vec = perturbations[perturbed_cols[pc]];
+    for (q = 0; q < nperturbations; q++)
+      pert_points[q][pc] = col_vec[q] / perturbed_fields[perturbed_cols[pc]][2];
+  };
+  perturbation_tree = bright::KDTree(pert_points);
+
+  // Detect whether the perturbed columns form a tensor-product grid.  If they do, 
+  // every combination of the unique column values appears exactly once in the 
+  // table and cross sections may be multilinearly interpolated.
+  int n;
+  double ncells = 1.0;
+  std::vector<double> axis;
+  pert_axes.clear();
+  for (pc = 0; pc < PC; pc++)
+  {
+    axis = std::vector<double> (nperturbations, 0.0);
+    for (q = 0; q < nperturbations; q++)
+      axis[q] = pert_points[q][pc];
+    std::sort(axis.begin(), axis.end());
+    axis.erase(std::unique(axis.begin(), axis.end()), axis.end());
+    pert_axes.push_back(axis);
+    ncells *= axis.size();
+  };
+
+  pert_grid.clear();
+  pert_is_grid = (0 < PC) && (ncells == nperturbations);
+  if (pert_is_grid)
+  {
+    int cell;
+    pert_grid = std::vector<int> (nperturbations, -1);
+    for (q = 0; q < nperturbations && pert_is_grid; q++)
+    {
+      cell = 0;
+      for (pc = 0; pc < PC; pc++)
+      {
+        n = std::lower_bound(pert_axes[pc].begin(), pert_axes[pc].end(), pert_points[q][pc]) - pert_axes[pc].begin();
+        cell = (cell * pert_axes[pc].size()) + n;
+      };
+
+      // Duplicate rows mean that some other cell is missing
+      if (pert_grid[cell] != -1)
+        pert_is_grid = false;
+      else
+        pert_grid[cell] = q;
+    };
+
+    if (!pert_is_grid)
+      pert_grid.clear();
+  };
+
   // Load in energy structure
   pert_data_g full_E_g = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/energy");
   E_g = full_E_g[0];
@@ -161,59 +280,23 @@ void bright::ReactorMG::loadlib(std::string lib)
   time0 = h5wrap::h5_array_to_cpp_vector_1d<double>(rmglibid, "/time0");
   BU0 = h5wrap::h5_array_to_cpp_vector_1d<double>(rmglibid, "/BU0");
 
-  // Clear transmutation vectors and cross sections before reading in
-  Ti0.clear();
-  sigma_t_pg.clear();
-  sigma_a_pg.clear();
-  nubar_sigma_f_pg.clear();
-  chi_pg.clear();
-  sigma_s_pgh.clear();
-  sigma_f_pg.clear();
-  sigma_gamma_pg.clear();
-  sigma_2n_pg.clear();
-  sigma_3n_pg.clear();
-  sigma_alpha_pg.clear();
-  sigma_proton_pg.clear();
-  sigma_gamma_x_pg.clear();
-  sigma_2n_x_pg.clear();
-
-  // Load transmutation vectors and cross sections that are based off of isotope
+  // Load transmutation vectors that are based off of isotope
   int iso_zz;
   std::string iso_LL;
+  Ti0.clear();
   for(nuc_iter nuciter = J.begin(); nuciter != J.end(); nuciter++)
   {
     iso_zz = *nuciter;
     iso_LL = pyne::nucname::name(iso_zz);
-
-    // Add transmutation vector
     Ti0[iso_zz] = h5wrap::h5_array_to_cpp_vector_1d<double>(rmglibid, "/Ti0/" + iso_LL);
-
-    // Add cross sections
-    sigma_t_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_t/" + iso_LL);
-    sigma_a_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_a/" + iso_LL);
-    nubar_sigma_f_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/nubar_sigma_f/" + iso_LL);
-    chi_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/chi/" + iso_LL);
-    sigma_s_pgh[iso_zz] = h5wrap::h5_array_to_cpp_vector_3d<double>(rmglibid, "/sigma_s_gh/" + iso_LL);
-    sigma_f_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_f/" + iso_LL);
-    sigma_gamma_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_gamma/" + iso_LL);
-    sigma_2n_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_2n/" + iso_LL);
-    sigma_3n_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_3n/" + iso_LL);
-    sigma_alpha_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_alpha/" + iso_LL);
-    sigma_proton_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_proton/" + iso_LL);
-    sigma_gamma_x_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_gamma_x/" + iso_LL);
-    sigma_2n_x_pg[iso_zz] = h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_2n_x/" + iso_LL);
   };
 
-  // close the reactor library
-  rmglib.close();
+  // The cross sections are read in once K_ind is known, see below.
 
 
   //
   // Create a decay matrix from a file based off of the J isotopes
   //
-  std::string nuc_data_file; 
-  std::string nuc_data_file_bright = bright::BRIGHT_DATA + "/nuc_data.h5";
-
   //Check to see if the file is in HDF5 format.
   if (pyne::file_exists(pyne::NUC_DATA_PATH))
     nuc_data_file = pyne::NUC_DATA_PATH;
@@ -263,6 +346,43 @@ void bright::ReactorMG::loadlib(std::string lib)
   for (k = 0; k < K_num; k++)
     K_ind[K_ord[k]] = k;
 
+  //
+  // Load the cross sections into the dense buffer, preferably by mapping in 
+  // a sidecar file.  Otherwise they are read from the data library and 
+  // nuclides without data are left as zeros.
+  //
+  xs_lib_size = ((size_t) (NXS - 1 + G)) * K_num * nperturbations * G;
+  xs_mapped = map_xs_file();
+  if (!xs_mapped)
+  {
+    xs_data = xs_block (xs_lib_size, 0.0);
+    xs_lib = &xs_data[0];
+  };
+
+  for(nuc_iter nuciter = J.begin(); nuciter != J.end() && !xs_mapped; nuciter++)
+  {
+    iso_zz = *nuciter;
+    iso_LL = pyne::nucname::name(iso_zz);
+    knd = K_ind[iso_zz];
+
+    set_xs(XS_T, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_t/" + iso_LL));
+    set_xs(XS_A, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_a/" + iso_LL));
+    set_xs(XS_NUBAR_F, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/nubar_sigma_f/" + iso_LL));
+    set_xs(XS_CHI, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/chi/" + iso_LL));
+    set_xs(XS_S, knd, h5wrap::h5_array_to_cpp_vector_3d<double>(rmglibid, "/sigma_s_gh/" + iso_LL));
+    set_xs(XS_F, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_f/" + iso_LL));
+    set_xs(XS_GAMMA, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_gamma/" + iso_LL));
+    set_xs(XS_2N, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_2n/" + iso_LL));
+    set_xs(XS_3N, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_3n/" + iso_LL));
+    set_xs(XS_ALPHA, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_alpha/" + iso_LL));
+    set_xs(XS_PROTON, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_proton/" + iso_LL));
+    set_xs(XS_GAMMA_X, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_gamma_x/" + iso_LL));
+    set_xs(XS_2N_X, knd, h5wrap::h5_array_to_cpp_vector_2d<double>(rmglibid, "/sigma_2n_x/" + iso_LL));
+  };
+
+  // close the reactor library
+  rmglib.close();
+
   // Make decay_martrix from this data.
   decay_matrix = bright::SparseMatrix<double>(2*decay_data_length, K_num, K_num);
 
@@ -419,15 +539,9 @@ void bright::ReactorMG::loadlib(std::string lib)
 
   // Copy the data over
   double Eng_g;
-  nuc_set xs_isos;
   std::vector<double> sig_t, sig_a, sig_f, nu_sig_f, sig_gamma, sig_2n, sig_3n, sig_alpha, sig_proton;
-  std::vector< std::vector<double> > zeros_pg;
-  std::vector< std::vector< std::vector<double> > > zeros_pgh;
 
-  zeros_pg = std::vector< std::vector<double> >(nperturbations, std::vector<double> (G,  0.0));
-  zeros_pgh =  std::vector< std::vector< std::vector<double> > >(nperturbations, std::vector< std::vector<double> > (G,  std::vector<double> (G, 0.0)));
-
-  for (l = 0; l < xs_1g_fast_length; l++)
+  for (l = 0; l < xs_1g_fast_length && !xs_mapped; l++)
   {
     i = xs_1g_thermal_array[l].nuc_zz;
 
@@ -437,7 +551,7 @@ void bright::ReactorMG::loadlib(std::string lib)
     if (K.count(i) == 0)
       continue;
 
-    xs_isos.insert(i);
+    knd = K_ind[i];
 
     // Init the interpolation arrays
     sig_t = std::vector<double>(G);
@@ -490,306 +604,740 @@ void bright::ReactorMG::loadlib(std::string lib)
         sig_proton[g] = 0.0;
     };
 
-    // Copy back the data to the XS library
-    sigma_t_pg[i] = std::vector< std::vector<double> >(nperturbations, sig_t);
-    sigma_a_pg[i] = std::vector< std::vector<double> >(nperturbations, sig_a);
-    sigma_f_pg[i] = std::vector< std::vector<double> >(nperturbations, sig_f);
-    nubar_sigma_f_pg[i] = std::vector< std::vector<double> >(nperturbations, nu_sig_f);
-    sigma_gamma_pg[i] = std::vector< std::vector<double> >(nperturbations, sig_gamma);
-    sigma_2n_pg[i] = std::vector< std::vector<double> >(nperturbations, sig_2n);
-    sigma_3n_pg[i] = std::vector< std::vector<double> >(nperturbations, sig_3n);
-    sigma_alpha_pg[i] = std::vector< std::vector<double> >(nperturbations, sig_alpha);
-    sigma_proton_pg[i] = std::vector< std::vector<double> >(nperturbations, sig_proton);
-
-    // Fill in zeros is places where data is not avilable
-    chi_pg[i] = zeros_pg;
-    sigma_s_pgh[i] = zeros_pgh;
-    sigma_gamma_x_pg[i] = zeros_pg;
-    sigma_2n_x_pg[i] = zeros_pg;
-  };
-
-  // Zero out XS for isos present in decay but not XS data
-  for (nuc_iter iso = K.begin(); iso != K.end(); iso++)
-  {
-    i = *iso;
-    if ((xs_isos.count(i) == 1) || (J.count(i) == 1))
-      continue;
-
-    sigma_t_pg[i] = zeros_pg;
-    sigma_a_pg[i] = zeros_pg;
-    nubar_sigma_f_pg[i] = zeros_pg;
-    chi_pg[i] = zeros_pg;
-    sigma_f_pg[i] = zeros_pg;
-    sigma_s_pgh[i] = zeros_pgh;
-    sigma_gamma_pg[i] = zeros_pg;
-    sigma_2n_pg[i] = zeros_pg;
-    sigma_3n_pg[i] = zeros_pg;
-    sigma_alpha_pg[i] = zeros_pg;
-    sigma_proton_pg[i] = zeros_pg;
-    sigma_gamma_x_pg[i] = zeros_pg;
-    sigma_2n_x_pg[i] = zeros_pg;
+    // Copy back the data to the XS library, chi, scattering, 
+    // and the excited state reactions are left as zeros.
+    set_xs(XS_T, knd, pert_data_g(nperturbations, sig_t));
+    set_xs(XS_A, knd, pert_data_g(nperturbations, sig_a));
+    set_xs(XS_F, knd, pert_data_g(nperturbations, sig_f));
+    set_xs(XS_NUBAR_F, knd, pert_data_g(nperturbations, nu_sig_f));
+    set_xs(XS_GAMMA, knd, pert_data_g(nperturbations, sig_gamma));
+    set_xs(XS_2N, knd, pert_data_g(nperturbations, sig_2n));
+    set_xs(XS_3N, knd, pert_data_g(nperturbations, sig_3n));
+    set_xs(XS_ALPHA, knd, pert_data_g(nperturbations, sig_alpha));
+    set_xs(XS_PROTON, knd, pert_data_g(nperturbations, sig_proton));
   };
 
   // close the nuc_data library
   nuc_data_h5.close();
 
+  build_burnup_pattern();
+
   return;
 };
 
 
+bright::ReactorMGLibrary::~ReactorMGLibrary()
+{
+  #ifndef _WIN32
+    if (xs_map != NULL)
+      munmap(xs_map, xs_map_size);
+  #endif
+};
 
 
 
-void bright::ReactorMG::calc_nearest_neighbors()
+/*
+ * The non-fission transmutation reactions and the change in zzaaam that each causes,
+ * relative to the ground state of the target.
+ */
+
+static const int transmutation_rxns [bright::NTRANS] = {bright::XS_GAMMA, bright::XS_2N, 
+  bright::XS_3N, bright::XS_ALPHA, bright::XS_PROTON, bright::XS_GAMMA_X, bright::XS_2N_X};
+static const int transmutation_dzz [bright::NTRANS] = {10, -10, -20, -20030, -10000, 11, -9};
+
+
+void bright::ReactorMGLibrary::build_burnup_pattern()
 {
-  /**
-   * Returns a vector of the indices sorted, sorted by nearest neighbor
-   */
+  // Lays out the CSR structure of the burnup matrix, the union of the diagonal, 
+  // the transmutation products, the fission products, and the decay matrix.
+  int g, n, N, r, i, j, ind, jnd, src;
+  int ind_PU239 = (0 < K.count(942390)) ? K_ind[942390] : -1;
+
+  // Row pointers into the yield matrices, which are sorted by row
+  fpy_row_ptr = std::vector< std::vector<int> > (G, std::vector<int> (K_num + 1, 0));
+  fpy_source = std::vector< std::vector<int> > (G, std::vector<int> (K_num, -1));
+  for (g = 0; g < G; g++)
+  {
+    N = fission_product_yield_matrix[g].size();
+    for (n = 0; n < N; n++)
+      fpy_row_ptr[g][fission_product_yield_matrix[g].sm[n].row + 1]++;
+    for (ind = 0; ind < K_num; ind++)
+      fpy_row_ptr[g][ind + 1] += fpy_row_ptr[g][ind];
 
-  // Initialize
-  std::map<std::string, std::vector<double> > deltas;
-  std::vector<double> rss (nperturbations, 0.0);
-  nearest_neighbors.clear();
+    // Deafult to Pu239 FP if yields not available
+    for (ind = 0; ind < K_num; ind++)
+    {
+      if (fpy_row_ptr[g][ind] < fpy_row_ptr[g][ind + 1])
+        fpy_source[g][ind] = ind;
+      else if ((0 <= ind_PU239) && (fpy_row_ptr[g][ind_PU239] < fpy_row_ptr[g][ind_PU239 + 1]))
+        fpy_source[g][ind] = ind_PU239;
+    };
+  };
+
+  // Only nuclides which fission somewhere in the library get fission products
+  int width = nperturbations * G;
+  std::vector<bool> fissions (K_num, false);
+  for (ind = 0; ind < K_num; ind++)
+    for (n = 0; n < width && !fissions[ind]; n++)
+      fissions[ind] = (xs_lib[(((size_t) XS_F) * K_num * width) + (((size_t) ind) * width) + n] != 0.0);
 
-  // Calcumlate normailized deltas
-  if (perturbed_fields["fuel_density"][2] != 0.0)
-    deltas["fuel_density"] = bright::delta_vector(rho_fuel, perturbations["fuel_density"]);
+  // Collect the columns of each row
+  std::vector< std::set<int> > cols (K_num);
+  for (ind = 0; ind < K_num; ind++)
+  {
+    i = K_ord[ind];
+    cols[ind].insert(ind);
 
-  if (perturbed_fields["clad_density"][2] != 0.0)
-    deltas["clad_density"] = bright::delta_vector(rho_clad, perturbations["clad_density"]);
+    for (r = 0; r < NTRANS; r++)
+    {
+      j = (10 * (i/10)) + transmutation_dzz[r];
+      if (0 < K.count(j))
+        cols[ind].insert(K_ind[j]);
+    };
 
-  if (perturbed_fields["cool_density"][2] != 0.0)
-    deltas["cool_density"] = bright::delta_vector(rho_cool, perturbations["cool_density"]);
+    if (!fissions[ind])
+      continue;
 
+    for (g = 0; g < G; g++)
+    {
+      src = fpy_source[g][ind];
+      if (src < 0)
+        continue;
 
-  if (perturbed_fields["fuel_cell_radius"][2] != 0.0)
-    deltas["fuel_cell_radius"] = bright::delta_vector(r_fuel, perturbations["fuel_cell_radius"]);
+      for (n = fpy_row_ptr[g][src]; n < fpy_row_ptr[g][src + 1]; n++)
+        cols[ind].insert(fission_product_yield_matrix[g].sm[n].col);
+    };
+  };
 
-  if (perturbed_fields["void_cell_radius"][2] != 0.0)
-    deltas["void_cell_radius"] = bright::delta_vector(r_void, perturbations["void_cell_radius"]);
+  N = decay_matrix.size();
+  for (n = 0; n < N; n++)
+    cols[decay_matrix.sm[n].row].insert(decay_matrix.sm[n].col);
 
-  if (perturbed_fields["clad_cell_radius"][2] != 0.0)
-    deltas["clad_cell_radius"] = bright::delta_vector(r_clad, perturbations["clad_cell_radius"]);
+  // Flatten into CSR
+  burnup_row_ptr = std::vector<int> (K_num + 1, 0);
+  burnup_col_ind.clear();
+  for (ind = 0; ind < K_num; ind++)
+  {
+    burnup_col_ind.insert(burnup_col_ind.end(), cols[ind].begin(), cols[ind].end());
+    burnup_row_ptr[ind + 1] = burnup_col_ind.size();
+  };
 
+  // Find the slots of the diagonal and the transmutation products
+  std::vector<int>::iterator row_beg, row_end;
+  burnup_diag = std::vector<int> (K_num, -1);
+  reaction_slot = std::vector<int> (K_num * NTRANS, -1);
+  for (ind = 0; ind < K_num; ind++)
+  {
+    i = K_ord[ind];
+    row_beg = burnup_col_ind.begin() + burnup_row_ptr[ind];
+    row_end = burnup_col_ind.begin() + burnup_row_ptr[ind + 1];
+    burnup_diag[ind] = std::lower_bound(row_beg, row_end, ind) - burnup_col_ind.begin();
 
-  if (perturbed_fields["unit_cell_pitch"][2] != 0.0)
-    deltas["unit_cell_pitch"] = bright::delta_vector(pitch, perturbations["unit_cell_pitch"]);
+    for (r = 0; r < NTRANS; r++)
+    {
+      j = (10 * (i/10)) + transmutation_dzz[r];
+      if (K.count(j) == 0)
+        continue;
+      jnd = K_ind[j];
+      reaction_slot[ind*NTRANS + r] = std::lower_bound(row_beg, row_end, jnd) - burnup_col_ind.begin();
+    };
+  };
 
-  if (perturbed_fields["burn_regions"][2] != 0.0)
-    deltas["burn_regions"] = bright::delta_vector(burn_regions, perturbations["burn_regions"]);
+  // Lay the decay matrix out on the slots
+  burnup_decay = std::vector<double> (burnup_col_ind.size(), 0.0);
+  for (n = 0; n < N; n++)
+  {
+    ind = decay_matrix.sm[n].row;
+    row_beg = burnup_col_ind.begin() + burnup_row_ptr[ind];
+    row_end = burnup_col_ind.begin() + burnup_row_ptr[ind + 1];
+    burnup_decay[std::lower_bound(row_beg, row_end, decay_matrix.sm[n].col) - burnup_col_ind.begin()] += decay_matrix.sm[n].val;
+  };
+};
 
-  if (perturbed_fields["fuel_specific_power"][2] != 0.0)
-    deltas["fuel_specific_power"] = bright::delta_vector(specific_power, perturbations["fuel_specific_power"]);
 
 
-  // Calc pertubations for initial mass streams
-  if (10 < perturbations.shape[1])
+void bright::ReactorMGLibrary::set_xs(int rxn, int knd, pert_data_g data)
+{
+  // Copies [pert][g] library data for the nuclide at K_ind index knd into xs_lib.
+  int p, g;
+  double * xs;
+  for (p = 0; p < nperturbations; p++)
   {
-    int iso_zz;
-    std::string iso_LL;
-    std::string iso_col;
-    double iso_mass;
+    xs = &xs_lib[(((size_t) rxn) * K_num * nperturbations * G) + (((((size_t) knd) * nperturbations) + p) * G)];
+    for (g = 0; g < G; g++)
+      xs[g] = data[p][g];
+  };
+};
 
-    for (int p = 9; p < perturbations.shape[1] - 1; p++)
-    {
-      // Grab some names
-      iso_col = perturbations.cols[p];
-      iso_LL = perturbations.cols[p];
-      iso_LL.replace(0, 8, "");
-      iso_zz = pyne::nucname::zzaaam(iso_LL);
-
-      // Determine the mass of the isotope in the feed
-      if (0 < mat_feed.comp.count(iso_zz))
-        iso_mass = mat_feed.comp[iso_zz];
-      else
-        iso_mass = 0.0;
 
-      // Calculate the delta if appropriate.
-      if (perturbed_fields[iso_col][2] != 0.0)
-        deltas[iso_col] = bright::delta_vector(iso_mass, perturbations[iso_col]);            
+
+void bright::ReactorMGLibrary::set_xs(int rxn, int knd, pert_data_gh data)
+{
+  // Copies [pert][g][h] library data for the nuclide at K_ind index knd into xs_lib.
+  int p, g, h;
+  double * xs;
+  for (p = 0; p < nperturbations; p++)
+  {
+    xs = &xs_lib[(((size_t) rxn) * K_num * nperturbations * G) + (((((size_t) knd) * nperturbations) + p) * G * G)];
+    for (g = 0; g < G; g++)
+      for (h = 0; h < G; h++)
+        xs[g*G + h] = data[p][g][h];
+  };
+};
+
+
+
+/*
+ * The cross section sidecar file is laid out as:
+ *
+ *     char[8]     magic, "BRIGHTXS"
+ *     int[6]      version, NXS, K_num, nperturbations, G, P
+ *     char[P]     nuc_data.h5 provenance, its path and modification time
+ *     int[K_num]  K_ord
+ *     padding to a multiple of 8 bytes
+ *     double[]    xs_lib
+ *
+ * Since K depends on nuc_data.h5, the stored provenance and K_ord must match the
+ * library's for the file to be used.  The file must also be newer than the library.
+ */
+
+static const char xs_file_magic [8] = {'B', 'R', 'I', 'G', 'H', 'T', 'X', 'S'};
+static const int xs_file_version = 2;
+
+static std::string xs_file_provenance(std::string nuc_data_file)
+{
+  std::ostringstream prov;
+  prov << nuc_data_file << "\n" << bright::file_mtime(nuc_data_file);
+  return prov.str();
+};
+
+
+bool bright::ReactorMGLibrary::map_xs_file()
+{
+  // Memory maps the cross section sidecar, if it is present and up to date.
+  #ifdef _WIN32
+    return false;
+  #else
+  if (!pyne::file_exists(xs_file))
+    return false;
+
+  if (bright::file_mtime(xs_file) < bright::file_mtime(libfile))
+    return false;
+
+  int fd = open(xs_file.c_str(), O_RDONLY);
+  if (fd < 0)
+    return false;
+
+  struct stat st;
+  if (fstat(fd, &st) != 0)
+  {
+    close(fd);
+    return false;
+  };
+
+  std::string prov = xs_file_provenance(nuc_data_file);
+  int P = prov.size();
+  size_t header_size = sizeof(xs_file_magic) + 6 * sizeof(int) + P + K_num * sizeof(int);
+  size_t data_offset = ((header_size + 7) / 8) * 8;
+  if ((size_t) st.st_size != data_offset + (xs_lib_size * sizeof(double)))
+  {
+    close(fd);
+    return false;
+  };
+
+  void * map = mmap(NULL, st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+  close(fd);
+  if (map == MAP_FAILED)
+    return false;
+
+  // Validate the header
+  char * header = (char *) map;
+  int dims [6];
+  memcpy(dims, header + sizeof(xs_file_magic), sizeof(dims));
+  bool valid = (memcmp(header, xs_file_magic, sizeof(xs_file_magic)) == 0) && \
+               (dims[0] == xs_file_version) && (dims[1] == NXS) && (dims[2] == K_num) && \
+               (dims[3] == nperturbations) && (dims[4] == G) && (dims[5] == P);
+
+  char * file_prov = header + sizeof(xs_file_magic) + sizeof(dims);
+  valid = valid && (prov.compare(0, P, file_prov, P) == 0);
+
+  int file_ord;
+  char * file_K_ord = file_prov + P;
+  for (int k = 0; k < K_num && valid; k++)
+  {
+    memcpy(&file_ord, file_K_ord + k * sizeof(int), sizeof(int));
+    valid = (file_ord == K_ord[k]);
+  };
+
+  if (!valid)
+  {
+    munmap(map, st.st_size);
+    return false;
+  };
+
+  xs_map = map;
+  xs_map_size = st.st_size;
+  xs_lib = (double *) (header + data_offset);
+  return true;
+  #endif
+};
+
+
+
+void bright::ReactorMGLibrary::write_xs_file()
+{
+  // Writes xs_lib to the sidecar file so that later loads may map it in.  The file 
+  // is written beside the sidecar and then renamed over it, since truncating a file 
+  // that another process has mapped would crash that process on its next read.
+  if (xs_mapped)
+    return;
+
+  std::ostringstream tmp_name;
+  tmp_name << xs_file << ".tmp";
+  #ifndef _WIN32
+    tmp_name << "." << getpid();
+  #endif
+  std::string tmp_file = tmp_name.str();
+
+  std::ofstream f (tmp_file.c_str(), std::ios::out | std::ios::binary | std::ios::trunc);
+  if (!f.is_open())
+    throw pyne::FileNotFound(tmp_file);
+
+  std::string prov = xs_file_provenance(nuc_data_file);
+  int P = prov.size();
+  int dims [6] = {xs_file_version, NXS, K_num, nperturbations, G, P};
+  f.write(xs_file_magic, sizeof(xs_file_magic));
+  f.write((char *) dims, sizeof(dims));
+  f.write(prov.data(), P);
+  f.write((char *) &K_ord[0], K_num * sizeof(int));
+
+  size_t header_size = sizeof(xs_file_magic) + sizeof(dims) + P + K_num * sizeof(int);
+  size_t data_offset = ((header_size + 7) / 8) * 8;
+  char pad [8] = {0, 0, 0, 0, 0, 0, 0, 0};
+  f.write(pad, data_offset - header_size);
+
+  f.write((char *) xs_lib, xs_lib_size * sizeof(double));
+  f.close();
+  if (f.fail())
+  {
+    std::remove(tmp_file.c_str());
+    throw pyne::FileNotFound(tmp_file);
+  };
+
+  #ifdef _WIN32
+    std::remove(xs_file.c_str());
+  #endif
+  if (std::rename(tmp_file.c_str(), xs_file.c_str()) != 0)
+  {
+    std::remove(tmp_file.c_str());
+    throw pyne::FileNotFound(xs_file);
+  };
+};
+
+
+
+
+/* 
+ * Transmutation chain sidecar file.  Each set of chains is stored as a flat int 
+ * dataset named by its key: the number of chains followed by, for each chain, 
+ * its length and then its nuclides.  The file is ignored if it is older than 
+ * the library.
+ */
+
+bool bright::ReactorMGLibrary::load_transmutation_chains(std::string key)
+{
+  // Makes sure that the chains for key are in memory, reading them from the 
+  // sidecar file if need be.  Returns whether or not the chains are available.
+  if (0 < transmutation_chains.count(key))
+    return true;
+
+  if (!pyne::file_exists(chains_file))
+    return false;
+
+  if (bright::file_mtime(chains_file) < bright::file_mtime(libfile))
+    return false;
+
+  if (!H5::H5File::isHdf5(chains_file))
+    return false;
+
+  hid_t cfile = H5Fopen(chains_file.c_str(), H5F_ACC_RDONLY, H5P_DEFAULT);
+  if (cfile < 0)
+    return false;
+
+  bool found = (H5LTfind_dataset(cfile, key.c_str()) == 1);
+  if (found)
+  {
+    hsize_t dims [1];
+    H5LTget_dataset_info(cfile, key.c_str(), dims, NULL, NULL);
+    std::vector<int> flat (dims[0], 0);
+    H5LTread_dataset_int(cfile, key.c_str(), &flat[0]);
+
+    chain_map & chains = transmutation_chains[key];
+    int c, len;
+    int C = flat[0];
+    int n = 1;
+    for (c = 0; c < C; c++)
+    {
+      len = flat[n];
+      std::vector<int> chain (flat.begin() + n + 1, flat.begin() + n + 1 + len);
+      chains[chain[0]][chain[len - 1]].push_back(chain);
+      n += len + 1;
     };
   };
 
-  if (perturbed_fields["burn_times"][2] != 0.0)
-    deltas["burn_times"] = bright::delta_vector(burn_time, perturbations["burn_times"]);
+  H5Fclose(cfile);
+  return found;
+};
+
+
 
+void bright::ReactorMGLibrary::write_chains_file()
+{
+  // Adds all of the chains in memory to the sidecar file, starting 
+  // the file over if it is out of date with respect to the library.
+  hid_t cfile;
+  if (pyne::file_exists(chains_file) && H5::H5File::isHdf5(chains_file) && \
+      (bright::file_mtime(libfile) <= bright::file_mtime(chains_file)))
+    cfile = H5Fopen(chains_file.c_str(), H5F_ACC_RDWR, H5P_DEFAULT);
+  else
+    cfile = H5Fcreate(chains_file.c_str(), H5F_ACC_TRUNC, H5P_DEFAULT, H5P_DEFAULT);
 
-  // Now that we have the normalized deltas for each index
-  // We want to calculate the 'distance' from the curent point
-  // This is done by taking the root of the sum of squares for 
-  // each index.
-  std::string key;
-  double norm_factor_sqrd;
-  for (std::map<std::string, std::vector<double> >::iterator d = deltas.begin(); d != deltas.end(); d++)
+  if (cfile < 0)
+    throw pyne::FileNotFound(chains_file);
+
+  std::map<std::string, chain_map>::iterator key_iter;
+  std::map<int, std::map<int, std::vector< std::vector<int> > > >::iterator i_iter;
+  std::map<int, std::vector< std::vector<int> > >::iterator j_iter;
+  int c, C;
+  for (key_iter = transmutation_chains.begin(); key_iter != transmutation_chains.end(); key_iter++)
   {
-    key = (*d).first;
-    norm_factor_sqrd = (perturbed_fields[key][2] * perturbed_fields[key][2]);
+    if (H5LTfind_dataset(cfile, (key_iter->first).c_str()) == 1)
+      continue;
 
-    // Take the sum of the squares
-    for (int q = 0; q < perturbations.shape[0]; q++)
+    std::vector<int> flat (1, 0);
+    for (i_iter = (key_iter->second).begin(); i_iter != (key_iter->second).end(); i_iter++)
     {
-      rss[q] = rss[q] + (deltas[key][q] * deltas[key][q] / norm_factor_sqrd);
+      for (j_iter = (i_iter->second).begin(); j_iter != (i_iter->second).end(); j_iter++)
+      {
+        C = (j_iter->second).size();
+        for (c = 0; c < C; c++)
+        {
+          flat.push_back((j_iter->second)[c].size());
+          flat.insert(flat.end(), (j_iter->second)[c].begin(), (j_iter->second)[c].end());
+          flat[0]++;
+        };
+      };
     };
+
+    hsize_t dims [1] = {flat.size()};
+    H5LTmake_dataset_int(cfile, (key_iter->first).c_str(), 1, dims, &flat[0]);
   };
 
-  // Takes the root of the sum of squares
-  for (int q = 0; q < perturbations.shape[0]; q++)
+  H5Fclose(cfile);
+};
+
+
+
+
+
+void bright::ReactorMG::loadlib(std::string lib)
+{
+  // Loads Apporiate Libraries for ReactorMG.  The library is only read in 
+  // the first time that it is used, after which it is shared between reactors.
+
+  // Check that the file is there
+  if (!pyne::file_exists(lib))
+    throw pyne::FileNotFound(lib);
+
+  //Check to see if the file is in HDF5 format.
+  bool isH5 = H5::H5File::isHdf5(lib);
+  if (!isH5)
+    throw h5wrap::FileNotHDF5(lib);
+
+  library = bright::reactormg_libraries.load(lib);
+
+  // Copy over the public data, which may be modified per reactor
+  I = library->I;
+  J = library->J;
+  K = library->K;
+  K_num = library->K_num;
+  K_ord = library->K_ord;
+  K_ind = library->K_ind;
+
+  nperturbations = library->nperturbations;
+  perturbed_fields = library->perturbed_fields;
+
+  G = library->G;
+  E_g = library->E_g;
+  phi = library->phi;
+  Phi = library->Phi;
+  time0 = library->time0;
+  BU0 = library->BU0;
+  Ti0 = library->Ti0;
+
+  // The cross sections are not copied
+  xs_lib = library->xs_lib;
+  xs_lib_size = library->xs_lib_size;
+};
+
+
+
+void bright::ReactorMG::write_xs_file()
+{
+  // Writes the cross sections of the loaded library to a flat binary sidecar file, 
+  // libfile + ".xs", which later loads of the library will memory map.
+  if (library == NULL)
   {
-    rss[q] = sqrt(rss[q]);
+    std::cout << "!!!Warning!!! no library has been loaded!\n";
+    return;
   };
 
+  library->write_xs_file();
+};
+
+
+
+void bright::ReactorMG::write_chains_file()
+{
+  // Writes the transmutation chains that have been built for the loaded library 
+  // to an HDF5 sidecar file, libfile + ".chains.h5", for use by later runs.
+  if (library == NULL)
+  {
+    std::cout << "!!!Warning!!! no library has been loaded!\n";
+    return;
+  };
 
-  // Now that we have the root of the sum of squares, 
-  // we need to sort the indices by rss from lowest 
-  // to highest.
-  nearest_neighbors = bright::sorted_index(rss);
+  library->write_chains_file();
 };
 
 
 
 
 
+size_t bright::ReactorMG::xs_offset(int rxn, int knd, int n, int N)
+{
+  // Returns the index of the first group of a reaction for the nuclide at K_ind 
+  // index knd and perturbation (or time) n, in a buffer with N of these.  This 
+  // is done in size_t, since large libraries overflow an int.
+  size_t width = (rxn == XS_S) ? ((size_t) G) * G : (size_t) G;
+  return (((size_t) rxn) * K_num * N * G) + (((((size_t) knd) * N) + n) * width);
+};
 
 
+void bright::ReactorMG::interpolate_xs(int rxn, int knd)
+{
+  // Sets a reaction at the current time step for the nuclide at K_ind index knd
+  // to the weighted sum of the interp_rows of the data library.
+  int r, w;
+  int R = interp_rows.size();
+  int width = (rxn == XS_S) ? G*G : G;
+  double weight;
+  double * row;
+  double * y = &xs_itg[xs_offset(rxn, knd, bt_s, S)];
+
+  for (w = 0; w < width; w++)
+    y[w] = 0.0;
 
+  for (r = 0; r < R; r++)
+  {
+    weight = interp_weights[r];
+    row = &xs_lib[xs_offset(rxn, knd, interp_rows[r], nperturbations)];
+    for (w = 0; w < width; w++)
+      y[w] += weight * row[w];
+  };
+};
 
 
 
 
-void bright::ReactorMG::interpolate_cross_sections()
+
+double bright::ReactorMG::perturbation_state(std::string col)
 {
-  // Grab the nearest and next nearest neighbor maps
-  int a0 = nearest_neighbors[0]; 
-  int a1 = nearest_neighbors[1]; 
-  std::map<std::string, double> nn0 = perturbations[a0];
-  std::map<std::string, double> nn1 = perturbations[a1];
-
-  // Calculate the x-factors to interpolate against.
-  // For every variable that is perturbed, 
-  // this factor is the same for all y variables
-  // and is equal to:
-  //
-  //     (xa - xa1)     (xb - xb1)
-  //     ----------  x  ----------  ...
-  //     (xa2 - xa1)    (xb2 - xb2)
-  //
-  // Then the value of the interpolation is 
-  // calculated via
-  //
-  // y = x_factor * (y2 - y1) + y1
-  //
-  double x_factor = 0.0;    
+  // Returns the current value of the reactor parameter that 
+  // corresponds to a column of the perturbation table.
+  if (col == "fuel_density")
+    return rho_fuel;
+  else if (col == "clad_density")
+    return rho_clad;
+  else if (col == "cool_density")
+    return rho_cool;
+  else if (col == "fuel_cell_radius")
+    return r_fuel;
+  else if (col == "void_cell_radius")
+    return r_void;
+  else if (col == "clad_cell_radius")
+    return r_clad;
+  else if (col == "unit_cell_pitch")
+    return pitch;
+  else if (col == "burn_regions")
+    return burn_regions;
+  else if (col == "fuel_specific_power")
+    return specific_power;
+  else if (col == "burn_times")
+    return burn_time;
+
+  // Otherwise this is an initial mass stream column, ie "initial_U235"
+  std::string iso_LL = col;
+  iso_LL.replace(0, 8, "");
+  int iso_zz = pyne::nucname::zzaaam(iso_LL);
+
+  if (0 < mat_feed.comp.count(iso_zz))
+    return mat_feed.comp[iso_zz];
+  else
+    return 0.0;
+};
 
-  if (nn0["fuel_density"] != nn1["fuel_density"])
-    x_factor = x_factor + ((rho_fuel - nn0["fuel_density"])/(nn1["fuel_density"] - nn0["fuel_density"]));
 
-  if (nn0["clad_density"] != nn1["clad_density"])
-    x_factor = x_factor + ((rho_clad - nn0["clad_density"])/(nn1["clad_density"] - nn0["clad_density"]));
 
-  if (nn0["cool_density"] != nn1["cool_density"])
-    x_factor = x_factor + ((rho_cool - nn0["cool_density"])/(nn1["cool_density"] - nn0["cool_density"]));
 
 
-  if (nn0["fuel_cell_radius"] != nn1["fuel_cell_radius"])
-    x_factor = x_factor + ((r_fuel - nn0["fuel_cell_radius"])/(nn1["fuel_cell_radius"] - nn0["fuel_cell_radius"]));
+void bright::ReactorMG::calc_nearest_neighbors()
+{
+  /**
+   * Finds the indices of the perturbation table rows that are nearest to the 
+   * current state of the reactor, sorted from nearest to farthest.  Distance
+   * is the root of the sum of squares of the range-normalized deltas of each 
+   * perturbed column.  Only the two nearest rows are kept since these are all
+   * that interpolate_cross_sections() uses.
+   */
+  int pc;
+  int PC = library->perturbed_cols.size();
+  std::vector<double> pert_point (PC, 0.0);
+
+  for (pc = 0; pc < PC; pc++)
+    pert_point[pc] = perturbation_state(library->perturbed_cols[pc]) / library->perturbed_fields[library->perturbed_cols[pc]][2];
+
+  nearest_neighbors = library->perturbation_tree.nearest(pert_point, 2);
+};
+
 
-  if (nn0["void_cell_radius"] != nn1["void_cell_radius"])
-    x_factor = x_factor + ((r_void - nn0["void_cell_radius"])/(nn1["void_cell_radius"] - nn0["void_cell_radius"]));
 
-  if (nn0["clad_cell_radius"] != nn1["clad_cell_radius"])
-    x_factor = x_factor + ((r_clad - nn0["clad_cell_radius"])/(nn1["clad_cell_radius"] - nn0["clad_cell_radius"]));
 
 
-  if (nn0["unit_cell_pitch"] != nn1["unit_cell_pitch"])
-    x_factor = x_factor + ((pitch - nn0["unit_cell_pitch"])/(nn1["unit_cell_pitch"] - nn0["unit_cell_pitch"]));
 
-  if (nn0["burn_regions"] != nn1["burn_regions"])
-    x_factor = x_factor + ((burn_regions - nn0["burn_regions"])/(nn1["burn_regions"] - nn0["burn_regions"]));
 
-  if (nn0["fuel_specific_power"] != nn1["fuel_specific_power"])
-    x_factor = x_factor + ((specific_power - nn0["fuel_specific_power"])/(nn1["fuel_specific_power"] - nn0["fuel_specific_power"]));
 
 
-  // Calc x-factor for initial mass streams
-  if (10 < perturbations.shape[1])
+
+
+
+void bright::ReactorMG::calc_interpolation_weights()
+{
+  /**
+   * Determines which perturbation table rows, and with what weights, the cross 
+   * sections at the current reactor state are interpolated from.  
+   *
+   * When the perturbed columns form a tensor-product grid, this is multilinear 
+   * interpolation over the corners of the enclosing hypercube.  States outside 
+   * of the grid are linearly extrapolated from the outermost cells.
+   *
+   * Otherwise, the nearest and next nearest neighbors are used.  For every 
+   * variable that is perturbed, the x-factor is the same for all y variables 
+   * and is equal to:
+   *
+   *     (xa - xa1)     (xb - xb1)
+   *     ----------  +  ----------  ...
+   *     (xa2 - xa1)    (xb2 - xb2)
+   *
+   * Then the value of the interpolation is y = x_factor * (y2 - y1) + y1.
+   */
+  interp_rows.clear();
+  interp_weights.clear();
+
+  if (!library->pert_is_grid)
   {
-    int iso_zz;
-    std::string iso_LL;
-    std::string iso_col;
-    double iso_mass;
+    int a0 = nearest_neighbors[0]; 
+    int a1 = nearest_neighbors[1]; 
 
-    for (int p = 9; p < perturbations.shape[1] - 1; p++)
+    double x, x0, x1;
+    double x_factor = 0.0;    
+    for (std::vector<std::string>::iterator col = library->perturbations.cols.begin(); col != library->perturbations.cols.end(); col++)
     {
-      // Grab some names
-      iso_col = perturbations.cols[p];
-      iso_LL = perturbations.cols[p];
-      iso_LL.replace(0, 8, "");
-      iso_zz = pyne::nucname::zzaaam(iso_LL);
-
-      // Determine the mass of the isotope in the feed
-      if (0 < mat_feed.comp.count(iso_zz))
-        iso_mass = mat_feed.comp[iso_zz];
-      else
-        iso_mass = 0.0;
+      x0 = library->perturbations.data[*col][a0];
+      x1 = library->perturbations.data[*col][a1];
+      if (x0 == x1)
+        continue;
 
-      // Calculate the x-factor if appropriate.
-      if (nn0[iso_col] != nn1[iso_col])
-        x_factor = x_factor + ((iso_mass - nn0[iso_col])/(nn1[iso_col] - nn0[iso_col]));
+      x = perturbation_state(*col);
+      x_factor = x_factor + ((x - x0) / (x1 - x0));
     };
+
+    interp_rows.push_back(a0);
+    interp_weights.push_back(1.0 - x_factor);
+    interp_rows.push_back(a1);
+    interp_weights.push_back(x_factor);
+    return;
   };
 
-  if (nn0["burn_times"] != nn1["burn_times"])
-    x_factor = x_factor + ((burn_time - nn0["burn_times"])/(nn1["burn_times"] - nn0["burn_times"]));
+  // Multilinear interpolation, expanded one axis at a time.
+  // Corners with a weight of zero (ie the state is on a grid 
+  // line) are dropped so that exact points cost a single row.
+  int pc, n, lo, c, C;
+  int PC = library->perturbed_cols.size();
+  double x, t;
+  std::vector<int> cells (1, 0), next_cells;
+  std::vector<double> weights (1, 1.0), next_weights;
+
+  for (pc = 0; pc < PC; pc++)
+  {
+    std::vector<double> & axis = library->pert_axes[pc];
+    n = axis.size();
+    x = perturbation_state(library->perturbed_cols[pc]) / library->perturbed_fields[library->perturbed_cols[pc]][2];
+
+    // Find the bracketing interval, clamped to the outermost cells
+    lo = (std::upper_bound(axis.begin(), axis.end(), x) - axis.begin()) - 1;
+    if (lo < 0)
+      lo = 0;
+    else if (n - 2 < lo)
+      lo = n - 2;
+    t = (x - axis[lo]) / (axis[lo+1] - axis[lo]);
+
+    next_cells.clear();
+    next_weights.clear();
+    C = cells.size();
+    for (c = 0; c < C; c++)
+    {
+      if (t != 1.0)
+      {
+        next_cells.push_back((cells[c] * n) + lo);
+        next_weights.push_back(weights[c] * (1.0 - t));
+      };
 
-  // Let's flesh out this time step a bit
-  // for the nuclides not in the data library
-  for (nuc_iter iso = K.begin(); iso != K.end(); iso++)
-  {
-    if (J.count(*iso) == 1)
-      continue;
+      if (t != 0.0)
+      {
+        next_cells.push_back((cells[c] * n) + lo + 1);
+        next_weights.push_back(weights[c] * t);
+      };
+    };
+    cells.swap(next_cells);
+    weights.swap(next_weights);
+  };
 
-    sigma_t_itg[*iso][bt_s] = sigma_t_pg[*iso][a0];
-    sigma_a_itg[*iso][bt_s] = sigma_a_pg[*iso][a0];
-    nubar_sigma_f_itg[*iso][bt_s] = nubar_sigma_f_pg[*iso][a0];
-    chi_itg[*iso][bt_s] = chi_pg[*iso][a0];
-    sigma_f_itg[*iso][bt_s] = sigma_f_pg[*iso][a0];
-    sigma_gamma_itg[*iso][bt_s] = sigma_gamma_pg[*iso][a0];
-    sigma_2n_itg[*iso][bt_s] = sigma_2n_pg[*iso][a0];
-    sigma_3n_itg[*iso][bt_s] = sigma_3n_pg[*iso][a0];
-    sigma_alpha_itg[*iso][bt_s] = sigma_alpha_pg[*iso][a0];
-    sigma_proton_itg[*iso][bt_s] = sigma_proton_pg[*iso][a0];
-    sigma_gamma_x_itg[*iso][bt_s] = sigma_gamma_x_pg[*iso][a0];
-    sigma_2n_x_itg[*iso][bt_s] = sigma_2n_x_pg[*iso][a0];
-
-    for (int g = 0; g < G; g++)
-      sigma_s_itgh[*iso][bt_s][g] = sigma_s_pgh[*iso][a0][g];
-  };
-
-  // Now that we have found the x-factor, we get to do the actual interpolations. Oh Joy!
-  for (nuc_iter iso = J.begin(); iso != J.end(); iso++)
-  {
-    // Interpolate the cross-sections
-    sigma_t_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_t_pg[*iso][a1], sigma_t_pg[*iso][a0]);
-    sigma_a_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_a_pg[*iso][a1], sigma_a_pg[*iso][a0]);
-    nubar_sigma_f_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, nubar_sigma_f_pg[*iso][a1], nubar_sigma_f_pg[*iso][a0]);
-    chi_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, chi_pg[*iso][a1], chi_pg[*iso][a0]);
-    sigma_f_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_f_pg[*iso][a1], sigma_f_pg[*iso][a0]);
-    sigma_gamma_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_gamma_pg[*iso][a1], sigma_gamma_pg[*iso][a0]);
-    sigma_2n_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_2n_pg[*iso][a1], sigma_2n_pg[*iso][a0]);
-    sigma_3n_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_3n_pg[*iso][a1], sigma_3n_pg[*iso][a0]);
-    sigma_alpha_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_alpha_pg[*iso][a1], sigma_alpha_pg[*iso][a0]);
-    sigma_proton_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_proton_pg[*iso][a1], sigma_proton_pg[*iso][a0]);
-    sigma_gamma_x_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_gamma_x_pg[*iso][a1], sigma_gamma_x_pg[*iso][a0]);
-    sigma_2n_x_itg[*iso][bt_s] = bright::y_x_factor_interpolation(x_factor, sigma_2n_x_pg[*iso][a1], sigma_2n_x_pg[*iso][a0]);
-
-    for (int g = 0; g < G; g++)
-      sigma_s_itgh[*iso][bt_s][g] = bright::y_x_factor_interpolation(x_factor, sigma_s_pgh[*iso][a1][g], sigma_s_pgh[*iso][a0][g]);
+  C = cells.size();
+  for (c = 0; c < C; c++)
+  {
+    interp_rows.push_back(library->pert_grid[cells[c]]);
+    interp_weights.push_back(weights[c]);
   };
 };
 
 
 
 
+void bright::ReactorMG::interpolate_cross_sections()
+{
+  // Find the rows and weights to interpolate from
+  calc_interpolation_weights();
+
+  int rxn, knd;
+  for (knd = 0; knd < K_num; knd++)
+    for (rxn = 0; rxn < NXS; rxn++)
+      interpolate_xs(rxn, knd);
+};
+
+
+
+
 
 
 
@@ -938,6 +1486,10 @@ void bright::ReactorMG::fold_mass_weights()
   double Sig_s_fuel_ig, Sig_s_clad_ig, Sig_s_cool_ig;
   double AW_ig;
 
+  int knd;
+  double * sigma_t_g, * sigma_a_g, * nubar_sigma_f_g, * chi_g, * sigma_f_g, * sigma_gamma_g, * sigma_2n_g, * sigma_3n_g, * sigma_alpha_g, * sigma_proton_g, * sigma_gamma_x_g, * sigma_2n_x_g;
+  double * sigma_s_gh;
+
   for (nuc_iter iso = K.begin(); iso != K.end(); iso++)
   {
     N_fuel_i_cm2pb = pyne::cm2_per_barn * N_fuel_it[*iso][bt_s];
@@ -946,47 +1498,63 @@ void bright::ReactorMG::fold_mass_weights()
 
     AW_ig = pyne::atomic_mass(*iso);
 
+    // Grab this nuclide's cross sections for this time step
+    knd = K_ind[*iso];
+    sigma_t_g = &xs_itg[xs_offset(XS_T, knd, bt_s, S)];
+    sigma_a_g = &xs_itg[xs_offset(XS_A, knd, bt_s, S)];
+    nubar_sigma_f_g = &xs_itg[xs_offset(XS_NUBAR_F, knd, bt_s, S)];
+    chi_g = &xs_itg[xs_offset(XS_CHI, knd, bt_s, S)];
+    sigma_f_g = &xs_itg[xs_offset(XS_F, knd, bt_s, S)];
+    sigma_gamma_g = &xs_itg[xs_offset(XS_GAMMA, knd, bt_s, S)];
+    sigma_2n_g = &xs_itg[xs_offset(XS_2N, knd, bt_s, S)];
+    sigma_3n_g = &xs_itg[xs_offset(XS_3N, knd, bt_s, S)];
+    sigma_alpha_g = &xs_itg[xs_offset(XS_ALPHA, knd, bt_s, S)];
+    sigma_proton_g = &xs_itg[xs_offset(XS_PROTON, knd, bt_s, S)];
+    sigma_gamma_x_g = &xs_itg[xs_offset(XS_GAMMA_X, knd, bt_s, S)];
+    sigma_2n_x_g = &xs_itg[xs_offset(XS_2N_X, knd, bt_s, S)];
+    sigma_s_gh = &xs_itg[xs_offset(XS_S, knd, bt_s, S)];
+
     // Loop over all groups
     for (g = 0; g < G; g++)
     {
-      Sigma_t_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_t_itg[*iso][bt_s][g];
-      Sigma_a_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_a_itg[*iso][bt_s][g];
-      nubar_Sigma_f_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * nubar_sigma_f_itg[*iso][bt_s][g];
-      chi_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * chi_itg[*iso][bt_s][g];
-      Sigma_f_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_f_itg[*iso][bt_s][g];
-      Sigma_gamma_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_gamma_itg[*iso][bt_s][g];
-      Sigma_2n_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_2n_itg[*iso][bt_s][g];
-      Sigma_3n_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_3n_itg[*iso][bt_s][g];
-      Sigma_alpha_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_alpha_itg[*iso][bt_s][g];
-      Sigma_proton_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_proton_itg[*iso][bt_s][g];
-      Sigma_gamma_x_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_gamma_x_itg[*iso][bt_s][g];
-      Sigma_2n_x_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_2n_x_itg[*iso][bt_s][g];
-
-      Sigma_t_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_t_itg[*iso][bt_s][g];
-      Sigma_a_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_a_itg[*iso][bt_s][g];
-      nubar_Sigma_f_clad_tg[bt_s][g] += N_clad_i_cm2pb * nubar_sigma_f_itg[*iso][bt_s][g];
-      chi_clad_tg[bt_s][g] += N_clad_i_cm2pb * chi_itg[*iso][bt_s][g];
-      Sigma_f_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_f_itg[*iso][bt_s][g];
-      Sigma_gamma_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_gamma_itg[*iso][bt_s][g];
-      Sigma_2n_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_2n_itg[*iso][bt_s][g];
-      Sigma_3n_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_3n_itg[*iso][bt_s][g];
-      Sigma_alpha_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_alpha_itg[*iso][bt_s][g];
-      Sigma_proton_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_proton_itg[*iso][bt_s][g];
-      Sigma_gamma_x_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_gamma_x_itg[*iso][bt_s][g];
-      Sigma_2n_x_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_2n_x_itg[*iso][bt_s][g];
-
-      Sigma_t_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_t_itg[*iso][bt_s][g];
-      Sigma_a_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_a_itg[*iso][bt_s][g];
-      nubar_Sigma_f_cool_tg[bt_s][g] += N_cool_i_cm2pb * nubar_sigma_f_itg[*iso][bt_s][g];
-      chi_cool_tg[bt_s][g] += N_cool_i_cm2pb * chi_itg[*iso][bt_s][g];
-      Sigma_f_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_f_itg[*iso][bt_s][g];
-      Sigma_gamma_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_gamma_itg[*iso][bt_s][g];
-      Sigma_2n_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_2n_itg[*iso][bt_s][g];
-      Sigma_3n_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_3n_itg[*iso][bt_s][g];
-      Sigma_alpha_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_alpha_itg[*iso][bt_s][g];
-      Sigma_proton_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_proton_itg[*iso][bt_s][g];
-      Sigma_gamma_x_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_gamma_x_itg[*iso][bt_s][g];
-      Sigma_2n_x_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_2n_x_itg[*iso][bt_s][g];
+      Sigma_t_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_t_g[g];
+      Sigma_a_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_a_g[g];
+      nubar_Sigma_f_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * nubar_sigma_f_g[g];
+      chi_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * chi_g[g];
+      Sigma_f_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_f_g[g];
+      Sigma_gamma_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_gamma_g[g];
+      Sigma_2n_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_2n_g[g];
+      Sigma_3n_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_3n_g[g];
+      Sigma_alpha_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_alpha_g[g];
+      Sigma_proton_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_proton_g[g];
+      Sigma_gamma_x_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_gamma_x_g[g];
+      Sigma_2n_x_fuel_tg[bt_s][g] += N_fuel_i_cm2pb * sigma_2n_x_g[g];
+
+      Sigma_t_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_t_g[g];
+      Sigma_a_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_a_g[g];
+      nubar_Sigma_f_clad_tg[bt_s][g] += N_clad_i_cm2pb * nubar_sigma_f_g[g];
+      chi_clad_tg[bt_s][g] += N_clad_i_cm2pb * chi_g[g];
+      Sigma_f_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_f_g[g];
+      Sigma_gamma_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_gamma_g[g];
+      Sigma_2n_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_2n_g[g];
+      Sigma_3n_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_3n_g[g];
+      Sigma_alpha_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_alpha_g[g];
+      Sigma_proton_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_proton_g[g];
+      Sigma_gamma_x_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_gamma_x_g[g];
+      Sigma_2n_x_clad_tg[bt_s][g] += N_clad_i_cm2pb * sigma_2n_x_g[g];
+
+      Sigma_t_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_t_g[g];
+      Sigma_a_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_a_g[g];
+      nubar_Sigma_f_cool_tg[bt_s][g] += N_cool_i_cm2pb * nubar_sigma_f_g[g];
+      chi_cool_tg[bt_s][g] += N_cool_i_cm2pb * chi_g[g];
+      Sigma_f_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_f_g[g];
+      Sigma_gamma_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_gamma_g[g];
+      Sigma_2n_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_2n_g[g];
+      Sigma_3n_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_3n_g[g];
+      Sigma_alpha_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_alpha_g[g];
+      Sigma_proton_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_proton_g[g];
+      Sigma_gamma_x_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_gamma_x_g[g];
+      Sigma_2n_x_cool_tg[bt_s][g] += N_cool_i_cm2pb * sigma_2n_x_g[g];
 
 
       Sig_s_fuel_ig = 0.0;
@@ -995,40 +1563,40 @@ void bright::ReactorMG::fold_mass_weights()
 
       for (h =0; h < G; h++)
       {
-        Sigma_s_fuel_tgh[bt_s][g][h] += N_fuel_i_cm2pb * sigma_s_itgh[*iso][bt_s][g][h];
-        Sigma_s_clad_tgh[bt_s][g][h] += N_clad_i_cm2pb * sigma_s_itgh[*iso][bt_s][g][h];
-        Sigma_s_cool_tgh[bt_s][g][h] += N_cool_i_cm2pb * sigma_s_itgh[*iso][bt_s][g][h];
+        Sigma_s_fuel_tgh[bt_s][g][h] += N_fuel_i_cm2pb * sigma_s_gh[g*G + h];
+        Sigma_s_clad_tgh[bt_s][g][h] += N_clad_i_cm2pb * sigma_s_gh[g*G + h];
+        Sigma_s_cool_tgh[bt_s][g][h] += N_cool_i_cm2pb * sigma_s_gh[g*G + h];
 
-        Sig_s_fuel_ig += N_fuel_i_cm2pb * sigma_s_itgh[*iso][bt_s][g][h];
-        Sig_s_clad_ig += N_clad_i_cm2pb * sigma_s_itgh[*iso][bt_s][g][h];
-        Sig_s_cool_ig += N_cool_i_cm2pb * sigma_s_itgh[*iso][bt_s][g][h];
+        Sig_s_fuel_ig += N_fuel_i_cm2pb * sigma_s_gh[g*G + h];
+        Sig_s_clad_ig += N_clad_i_cm2pb * sigma_s_gh[g*G + h];
+        Sig_s_cool_ig += N_cool_i_cm2pb * sigma_s_gh[g*G + h];
 
 /*
-        Sig_s_fuel_ig += N_fuel_i_cm2pb * sigma_s_itgh[*iso][bt_s][g][g];
-        Sig_s_clad_ig += N_clad_i_cm2pb * sigma_s_itgh[*iso][bt_s][g][g];
-        Sig_s_cool_ig += N_cool_i_cm2pb * sigma_s_itgh[*iso][bt_s][g][g];
+        Sig_s_fuel_ig += N_fuel_i_cm2pb * sigma_s_gh[g*G + g];
+        Sig_s_clad_ig += N_clad_i_cm2pb * sigma_s_gh[g*G + g];
+        Sig_s_cool_ig += N_cool_i_cm2pb * sigma_s_gh[g*G + g];
 
-        Sig_s_fuel_ig += N_fuel_i_cm2pb * sigma_s_itgh[*iso][bt_s][h][h];
-        Sig_s_clad_ig += N_clad_i_cm2pb * sigma_s_itgh[*iso][bt_s][h][h];
-        Sig_s_cool_ig += N_cool_i_cm2pb * sigma_s_itgh[*iso][bt_s][h][h];
+        Sig_s_fuel_ig += N_fuel_i_cm2pb * sigma_s_gh[h*G + h];
+        Sig_s_clad_ig += N_clad_i_cm2pb * sigma_s_gh[h*G + h];
+        Sig_s_cool_ig += N_cool_i_cm2pb * sigma_s_gh[h*G + h];
 
-        Sig_s_fuel_ig += N_fuel_i_cm2pb * sigma_s_itgh[*iso][bt_s][h][g];
-        Sig_s_clad_ig += N_clad_i_cm2pb * sigma_s_itgh[*iso][bt_s][h][g];
-        Sig_s_cool_ig += N_cool_i_cm2pb * sigma_s_itgh[*iso][bt_s][h][g];
+        Sig_s_fuel_ig += N_fuel_i_cm2pb * sigma_s_gh[h*G + g];
+        Sig_s_clad_ig += N_clad_i_cm2pb * sigma_s_gh[h*G + g];
+        Sig_s_cool_ig += N_cool_i_cm2pb * sigma_s_gh[h*G + g];
 */
       };
 
       // Calculate kappas as the inverse of the diffusion length
       // k = 1 / D = 3 * Sigma_tr = 3 (Sigma_t - mu * Sigma_s_gg)
 /*
-      kappa_fuel_tg[bt_s][g] += (3.0 * N_fuel_i_cm2pb * sigma_t_itg[*iso][bt_s][g]) - (2.0 * Sig_s_fuel_ig / AW_ig); 
-      kappa_clad_tg[bt_s][g] += (3.0 * N_fuel_i_cm2pb * sigma_t_itg[*iso][bt_s][g]) - (2.0 * Sig_s_clad_ig / AW_ig); 
-      kappa_cool_tg[bt_s][g] += (3.0 * N_fuel_i_cm2pb * sigma_t_itg[*iso][bt_s][g]) - (2.0 * Sig_s_cool_ig / AW_ig); 
+      kappa_fuel_tg[bt_s][g] += (3.0 * N_fuel_i_cm2pb * sigma_t_g[g]) - (2.0 * Sig_s_fuel_ig / AW_ig); 
+      kappa_clad_tg[bt_s][g] += (3.0 * N_fuel_i_cm2pb * sigma_t_g[g]) - (2.0 * Sig_s_clad_ig / AW_ig); 
+      kappa_cool_tg[bt_s][g] += (3.0 * N_fuel_i_cm2pb * sigma_t_g[g]) - (2.0 * Sig_s_cool_ig / AW_ig); 
 */
 
-      kappa_fuel_tg[bt_s][g] += (N_fuel_i_cm2pb * sigma_a_itg[*iso][bt_s][g]) * Sig_s_fuel_ig * (3.0 - (2.0 / AW_ig));
-      kappa_clad_tg[bt_s][g] += (N_clad_i_cm2pb * sigma_a_itg[*iso][bt_s][g]) * Sig_s_clad_ig * (3.0 - (2.0 / AW_ig));
-      kappa_cool_tg[bt_s][g] += (N_cool_i_cm2pb * sigma_a_itg[*iso][bt_s][g]) * Sig_s_cool_ig * (3.0 - (2.0 / AW_ig));
+      kappa_fuel_tg[bt_s][g] += (N_fuel_i_cm2pb * sigma_a_g[g]) * Sig_s_fuel_ig * (3.0 - (2.0 / AW_ig));
+      kappa_clad_tg[bt_s][g] += (N_clad_i_cm2pb * sigma_a_g[g]) * Sig_s_clad_ig * (3.0 - (2.0 / AW_ig));
+      kappa_cool_tg[bt_s][g] += (N_cool_i_cm2pb * sigma_a_g[g]) * Sig_s_cool_ig * (3.0 - (2.0 / AW_ig));
     };
   };
 
@@ -1156,16 +1724,34 @@ void bright::ReactorMG::assemble_multigroup_matrices()
   //F_fuel_tgh[bt_s] = bright::vector_outer_product(nubar_Sigma_f_fuel_tg[bt_s], chi_fuel_tg[bt_s]);
   //F_tgh[bt_s] = bright::vector_outer_product(nubar_Sigma_f_tg[bt_s], chi_tg[bt_s]);
 
-  // Grab the inverse of the A matrix
-  A_inv_fuel_tgh[bt_s] = bright::matrix_inverse(A_fuel_tgh[bt_s]);
-  A_inv_clad_tgh[bt_s] = bright::matrix_inverse(A_clad_tgh[bt_s]);
-  A_inv_cool_tgh[bt_s] = bright::matrix_inverse(A_cool_tgh[bt_s]);
-  A_inv_tgh[bt_s] = bright::matrix_inverse(A_tgh[bt_s]);
+  // Factor the A matrix, which is all that the criticality calculation needs
+  A_lu = A_tgh[bt_s];
+  bright::lu_decomposition(A_lu, A_piv);
+
+  // Only form the explicit inverses if they have been asked for
+  if (!store_inverses)
+    return;
+
+  std::vector< std::vector<double> > lu;
+  std::vector<int> piv;
+
+  lu = A_fuel_tgh[bt_s];
+  bright::lu_decomposition(lu, piv);
+  A_inv_fuel_tgh[bt_s] = bright::lu_inverse(lu, piv);
+
+  lu = A_clad_tgh[bt_s];
+  bright::lu_decomposition(lu, piv);
+  A_inv_clad_tgh[bt_s] = bright::lu_inverse(lu, piv);
+
+  lu = A_cool_tgh[bt_s];
+  bright::lu_decomposition(lu, piv);
+  A_inv_cool_tgh[bt_s] = bright::lu_inverse(lu, piv);
+
+  A_inv_tgh[bt_s] = bright::lu_inverse(A_lu, A_piv);
 
   // Multiply the inverse of A by F
   A_inv_F_fuel_tgh[bt_s] = bright::matrix_multiplication(A_inv_fuel_tgh[bt_s], F_fuel_tgh[bt_s]);
   A_inv_F_tgh[bt_s] = bright::matrix_multiplication(A_inv_tgh[bt_s], F_tgh[bt_s]);
-
 };
 
 
@@ -1176,224 +1762,182 @@ void bright::ReactorMG::assemble_multigroup_matrices()
 void bright::ReactorMG::assemble_transmutation_matrices()
 {
   //
-  // Assemble the energy integral of transmutation matrix
+  // Assemble the energy integral of transmutation matrix directly, in one pass, 
+  // onto the library's fixed CSR layout of the burnup matrix.
   //
-  int g, i, j, ind, jnd;
-  std::vector< bright::SparseMatrix<double> > T_matrix = std::vector< bright::SparseMatrix<double> > (G,  bright::SparseMatrix<double>(fast_yield_matrix.size(), K_num, K_num));
-  std::vector< bright::sparse_matrix_entry<double> >::iterator fpy_iter, fpy_end;
-  
-  
-  // Add the cross sections
-  double fpy, sig;
-  int fpy_ind;
-  int ind_PU239 = K_ind[942390];
-  int j_gamma, j_2n, j_3n, j_alpha, j_proton, j_gamma_x, j_2n_x; 
-  int jnd_gamma, jnd_2n, jnd_3n, jnd_alpha, jnd_proton, jnd_gamma_x, jnd_2n_x;
+  int g, n, r, s, ind, src;
+  int nslots = library->burnup_col_ind.size();
+  std::vector<double> T_vals (nslots, 0.0);
+
+  // Adjust the flux value for burning
+  std::vector<double> adj_phi (G, 0.0);
+  for (g = 0; g < G; g++)
+    adj_phi[g] = pyne::cm2_per_barn * phi_tg[bt_s][g];
+
+  // Scatter map from columns to the slots of the current row
+  std::vector<int> slot_of (K_num, -1);
+
+  double rate;
+  double * sigma_g;
+  bright::SparseMatrix<double> * fpy;
   for (ind = 0; ind < K_num; ind++)
   {
-    i = K_ord[ind];
+    for (s = library->burnup_row_ptr[ind]; s < library->burnup_row_ptr[ind + 1]; s++)
+      slot_of[library->burnup_col_ind[s]] = s;
 
-    // Add diag entries
-    for (g = 0; g < G; g++)
-      T_matrix[g].push_back(ind, ind, -(sigma_f_itg[i][bt_s][g] + \
-                                        sigma_gamma_itg[i][bt_s][g] + \
-                                        sigma_2n_itg[i][bt_s][g] + \
-                                        sigma_3n_itg[i][bt_s][g] + \
-                                        sigma_alpha_itg[i][bt_s][g] + \
-                                        sigma_proton_itg[i][bt_s][g] + \
-                                        sigma_gamma_x_itg[i][bt_s][g] + \
-                                        sigma_2n_x_itg[i][bt_s][g]));
+    // Add the transmutation reactions
+    for (r = 0; r < NTRANS; r++)
+    {
+      sigma_g = &xs_itg[xs_offset(transmutation_rxns[r], ind, bt_s, S)];
+      rate = 0.0;
+      for (g = 0; g < G; g++)
+        rate += adj_phi[g] * sigma_g[g];
+
+      if (rate == 0.0)
+        continue;
+
+      T_vals[library->burnup_diag[ind]] -= rate;
+      s = library->reaction_slot[ind*NTRANS + r];
+      if (0 <= s)
+        T_vals[s] += rate;
+    };
 
     // Add the fission source
+    sigma_g = &xs_itg[xs_offset(XS_F, ind, bt_s, S)];
     for (g = 0; g < G; g++)
     {
-      sig = sigma_f_itg[i][bt_s][g];
-      if (sig == 0.0)
+      rate = adj_phi[g] * sigma_g[g];
+      if (rate == 0.0)
         continue;
 
-      fpy_end = fission_product_yield_matrix[g].sm.end();
-      fpy_iter = bright::find_row(fission_product_yield_matrix[g].sm.begin(), fpy_end, ind);
-      fpy_ind = ind;
+      T_vals[library->burnup_diag[ind]] -= rate;
 
-      // Deafult to Pu239 FP if yields not available
-      if (fpy_iter == fpy_end)
-      {
-        fpy_iter = bright::find_row(fission_product_yield_matrix[g].sm.begin(), fpy_end, ind_PU239);
-        fpy_ind = ind_PU239;
-      };
+      src = library->fpy_source[g][ind];
+      if (src < 0)
+        continue;
 
-      while((*fpy_iter).row == fpy_ind)
+      fpy = &(library->fission_product_yield_matrix[g]);
+      for (n = library->fpy_row_ptr[g][src]; n < library->fpy_row_ptr[g][src + 1]; n++)
       {
-        jnd = (*fpy_iter).col;
-        fpy = (*fpy_iter).val;
-        T_matrix[g].push_back(ind, jnd, fpy * sig);
-        fpy_iter++;
+        s = slot_of[(*fpy).sm[n].col];
+        if (0 <= s)
+          T_vals[s] += (*fpy).sm[n].val * rate;
       };
     };
 
-    // Add the capture cross-section
-    j_gamma = ((i/10) + 1) * 10;
-    if (K.count(j_gamma) == 1)
-    {
-      jnd_gamma = K_ind[j_gamma];
-      for (g = 0; g < G; g++)
-      {
-        sig = sigma_gamma_itg[i][bt_s][g];
-        if (sig == 0.0)
-          continue;
+    for (s = library->burnup_row_ptr[ind]; s < library->burnup_row_ptr[ind + 1]; s++)
+      slot_of[library->burnup_col_ind[s]] = -1;
+  };
 
-        T_matrix[g].push_back(ind, jnd_gamma, sig);
-      };
-    };
+  // Make the transmutation matrices for this time step, which come out already sorted
+  T_int_tij[bt_s] = bright::SparseMatrix<double>(nslots, K_num, K_num);
+  M_tij[bt_s] = bright::SparseMatrix<double>(nslots, K_num, K_num);
 
-    // Add the (n, 2n) cross-section
-    j_2n = j_gamma - 20;
-    if (K.count(j_2n) == 1)
+  double m_val;
+  for (ind = 0; ind < K_num; ind++)
+  {
+    for (s = library->burnup_row_ptr[ind]; s < library->burnup_row_ptr[ind + 1]; s++)
     {
-      jnd_2n = K_ind[j_2n];
-      for (g = 0; g < G; g++)
-      {
-        sig = sigma_2n_itg[i][bt_s][g];
-        if (sig == 0.0)
-          continue;
+      if (T_vals[s] != 0.0)
+        T_int_tij[bt_s].push_back(ind, library->burnup_col_ind[s], T_vals[s]);
 
-        T_matrix[g].push_back(ind, jnd_2n, sig);
-      };
+      m_val = T_vals[s] + library->burnup_decay[s];
+      if (m_val != 0.0)
+        M_tij[bt_s].push_back(ind, library->burnup_col_ind[s], m_val);
     };
+  };
+};
 
-    // Add the (n, 3n) cross-section
-    j_3n = j_2n - 10;
-    if (K.count(j_3n) == 1)
-    {
-      jnd_3n = K_ind[j_3n];
-      for (g = 0; g < G; g++)
-      {
-        sig = sigma_3n_itg[i][bt_s][g];
-        if (sig == 0.0)
-          continue;
-
-        T_matrix[g].push_back(ind, jnd_3n, sig);
-      };
-    };
 
-    // Add the (n, alpha) cross-section
-    j_alpha = j_3n - 20010;
-    if (K.count(j_alpha) == 1)
-    {
-      jnd_alpha = K_ind[j_alpha];
-      for (g = 0; g < G; g++)
-      {
-        sig = sigma_alpha_itg[i][bt_s][g];
-        if (sig == 0.0)
-          continue;
 
-        T_matrix[g].push_back(ind, jnd_alpha, sig);
-      };
-    };
 
-    // Add the (n, proton) cross-section
-    j_proton = j_gamma - 10010;
-    if (K.count(j_proton) == 1)
-    {
-      jnd_proton = K_ind[j_proton];
-      for (g = 0; g < G; g++)
-      {
-        sig = sigma_proton_itg[i][bt_s][g];
-        if (sig == 0.0)
-          continue;
 
-        T_matrix[g].push_back(ind, jnd_proton, sig);
-      };
-    };
-
-    // Add the capture (excited) cross-section
-    j_gamma_x = j_gamma + 1;
-    if (K.count(j_gamma_x) == 1)
+std::string bright::ReactorMG::transmutation_chains_key()
+{
+  // Names the transmutation chains for the current set of nuclides and cut-offs.
+  // add_transmutation_chains() prunes on the flux-dependent branch ratios, so 
+  // these are hashed in as well.  branch_ratios must already have been computed.
+  unsigned long K_hash = 5381;
+  for (nuc_iter k = K.begin(); k != K.end(); k++)
+    K_hash = (K_hash * 33) ^ (*k);
+
+  unsigned long br_hash = 5381;
+  unsigned char br_bytes [sizeof(double)];
+  for (int ind = 0; ind < branch_ratios.size(); ind++)
+  {
+    for (int jnd = 0; jnd < branch_ratios[ind].size(); jnd++)
     {
-      jnd_gamma_x = K_ind[j_gamma_x];
-      for (g = 0; g < G; g++)
-      {
-        sig = sigma_gamma_x_itg[i][bt_s][g];
-        if (sig == 0.0)
-          continue;
+      if (branch_ratios[ind][jnd] == 0.0)
+        continue;
 
-        T_matrix[g].push_back(ind, jnd_gamma_x, sig);
-      };
+      br_hash = (br_hash * 33) ^ (ind * K_num + jnd);
+      memcpy(br_bytes, &branch_ratios[ind][jnd], sizeof(double));
+      for (int n = 0; n < sizeof(double); n++)
+        br_hash = (br_hash * 33) ^ br_bytes[n];
     };
+  };
 
-    // Add the (n, 2n *) cross-section
-    j_2n_x = j_2n + 1;
-    if (K.count(j_2n_x) == 1)
-    {
-      jnd_2n_x = K_ind[j_2n_x];
-      for (g = 0; g < G; g++)
-      {
-        sig = sigma_2n_x_itg[i][bt_s][g];
-        if (sig == 0.0)
-          continue;
+  std::ostringstream key;
+  key << "chains_" << std::hex << K_hash << "_" << br_hash << std::dec << "_" << K_num << "_" << branch_ratio_cutoff;
+  return key.str();
+};
 
-        T_matrix[g].push_back(ind, jnd_2n_x, sig);
-      };
-    };
-  };
 
-  for (g = 0; g < G; g++)
-    T_matrix[g].clean_up();
 
+void bright::ReactorMG::build_transmutation_chains()
+{
+  // Enumerates the transmutation chains from the burnup matrix of the current 
+  // time step.  branch_ratios must already have been computed.
+  int i, j, ind, jnd;
+  transmutation_chains.clear();
 
+  // Initialize the chains container with the one-step chains
+  std::vector< bright::sparse_matrix_entry<double> >::iterator M_iter, M_end;
+  M_iter = M_tij[bt_s].sm.begin();
+  M_end = M_tij[bt_s].sm.end();
 
-  // Multiply by flux and integrate over energy
-  double adj_phi;
-  for (g = 0; g < G; g++)
+  for ( ; M_iter != M_end; M_iter++)
   {
-    // Adjust the flux value for burning
-    adj_phi = pyne::cm2_per_barn * phi_tg[bt_s][g];
+    ind = (*M_iter).row;
+    i = K_ord[ind];
 
-    // Skip this group if there is no flux 
-    if (adj_phi == 0.0)
+    jnd = (*M_iter).col;
+    j = K_ord[jnd];
+
+    if (i == j)
       continue;
 
-    T_int_tij[bt_s] = T_int_tij[bt_s] + (T_matrix[g] * adj_phi);
-  };
-  
+    if (transmutation_chains.count(i) == 0)
+      transmutation_chains[i] = std::map<int, std::vector< std::vector<int> > > ();
 
-  // Make the transmutation matrix for this time step
-  M_tij[bt_s] = (T_int_tij[bt_s] + decay_matrix);
+    transmutation_chains[i][j] = std::vector< std::vector<int> >(1,  std::vector<int>(2));
+    transmutation_chains[i][j][0][0] = i;
+    transmutation_chains[i][j][0][1] = j;
+  };
 
-  // Add initial transmutatio chains
-  if (bt_s == 0)
+  // Fill in the chains container with more than one-step values
+  for (nuc_iter iso = K.begin(); iso != K.end(); iso++)
   {
-    std::vector< bright::sparse_matrix_entry<double> >::iterator M_iter, M_end;
-    M_iter = M_tij[bt_s].sm.begin();
-    M_end = M_tij[bt_s].sm.end();
+    i = (*iso);
+    ind = K_ind[i];
 
-    // Initialize the chains container
-    for ( ; M_iter != M_end; M_iter++)
+    for (jnd = 0; jnd < K_num; jnd++)
     {
-      ind = (*M_iter).row;
-      i = K_ord[ind];
-
-      jnd = (*M_iter).col;
-      j = K_ord[jnd];
-
-      if (i == j)
+      if (branch_ratios[ind][jnd] == 0.0)
         continue;
 
-      if (transmutation_chains.count(i) == 0)
-        transmutation_chains[i] = std::map<int, std::vector< std::vector<int> > > ();
+      j = K_ord[jnd];
 
-      transmutation_chains[i][j] = std::vector< std::vector<int> >(1,  std::vector<int>(2));
-      transmutation_chains[i][j][0][0] = i;
-      transmutation_chains[i][j][0][1] = j;
+      if (1 < bright::verbosity)
+        std::cout << "    Adding chains for " << i << " --> " << j << "\n";
+      for (int ncp = 0; ncp < transmutation_chains[i][j].size(); ncp++)
+        add_transmutation_chains(transmutation_chains[i][j][ncp]);
     };
   };
-
 };
 
 
 
-
-
 void bright::ReactorMG::add_transmutation_chains(std::vector<int> tc)
 {
   int n, nik, Nik;
@@ -1603,62 +2147,24 @@ double bright::ReactorMG::bateman(int i, int j, double t)
 
 void bright::ReactorMG::calc_criticality()
 {
-  // Init values
-  int n = 0;
-  int N = 100;
-
-  float epsik = 1.0;
-  float tmp_epsiphi; 
-  float epsiphi = 1.0;
-  float epsilon = 0.005;
-
-  double k0 = 1.0;
-  std::vector<double> phi0 (G, 1.0);
-  double k1;
-  std::vector<double> phi1;
-
   int g = 0;
-  double invPk;
-  double nu_Sigma_f_phi0;
-  double nu_Sigma_f_phi1;
 
-
-  // Solve for k and phi simeltaneoulsy
-  while ((n < N) && ((epsilon < epsik) || (epsilon < epsiphi)))
+  // Warm start from the previous time step, if there is one
+  double k0 = 1.0;
+  std::vector<double> phi1 (G, 1.0);
+  if ((0 < bt_s) && (0.0 < phi_t[bt_s - 1]))
   {
-    // Calculate the next eigen-flux
-    phi1 = bright::scalar_matrix_vector_product(1.0 / k0, A_inv_F_tgh[bt_s], phi0);
-
-    // Calculate the next eigen-k
-    nu_Sigma_f_phi0 = 0.0;
-    nu_Sigma_f_phi1 = 0.0;
-    for (g = 0; g < G; g++)
-    {
-      nu_Sigma_f_phi0 += nubar_Sigma_f_tg[bt_s][g] * phi0[g]; 
-      nu_Sigma_f_phi1 += nubar_Sigma_f_tg[bt_s][g] * phi1[g]; 
-    };
-    k1 = k0 * nu_Sigma_f_phi1 / nu_Sigma_f_phi0;
-
-    // Calculate the epsilon value of k 
-    epsik = fabs(1.0 - (k0/k1));
-
-    // Calulate the maximum epsilon of phi over all groups
-    epsiphi = fabs(1.0 - (phi0[0]/phi1[0]));
-    for (g = 1; g < G; g++)
-    {
-      tmp_epsiphi = fabs(1.0 - (phi0[g]/phi1[g]));
-      if (epsiphi < tmp_epsiphi)
-        epsiphi = tmp_epsiphi;
-    };
-
-    // Set the next eigens to the previous values befor looping
-    k0 = k1;
-    phi0 = phi1;
-    n++;
+    k0 = eigen_k_t[bt_s - 1];
+    phi1 = phi_tg[bt_s - 1];
   };
 
-  // Set the final flux values to the class members
-  std::cout << "   k0 = " << k0 << "\n";
+  // Solve for k and phi simeltaneoulsy
+  eigen_iterations_t[bt_s] = bright::solve_eigenvalue(A_tgh[bt_s], A_lu, A_piv, F_tgh[bt_s], nubar_Sigma_f_tg[bt_s], \
+                                                      phi1, k0, eigen_solver, eigen_tol, eigen_max_iter, \
+                                                      &eigen_residual_t[bt_s]);
+  eigen_k_t[bt_s] = k0;
+
+  std::cout << "   k0 = " << k0 << "  (" << eigen_iterations_t[bt_s] << " iterations)\n";
 
   // Normalize the flux
   double phi1_tot = 0.0;
@@ -1707,7 +2213,8 @@ void bright::ReactorMG::calc_criticality()
     k_den += phi_tg[bt_s][g] * ((V_fuel * Sigma_a_fuel_tg[bt_s][g]) + (zeta_tg[bt_s][g] * V_cool * Sigma_a_cool_tg[bt_s][g]));
   };
 
-  k_t[bt_s] = P_NL * k_num / k_den;
+  k_inf_t[bt_s] = k_num / k_den;
+  k_t[bt_s] = P_NL * k_inf_t[bt_s];
 };
 
 
@@ -1718,14 +2225,12 @@ void bright::ReactorMG::calc_criticality()
 
 
 
-void bright::ReactorMG::calc_transmutation()
+std::vector<double> bright::ReactorMG::bateman_transmutation(std::vector<double> comp_prev, double dt)
 {
-  // Calculates a tranmutation step via the Pade method
+  // Calculates a tranmutation step by summing the bateman solutions 
+  // over all of the transmutation chains between each pair of nuclides.
   int i, j, ind, jnd;
 
-  // Get the transmutation matrix for this time delta
-  double dt = (burn_times[bt_s + 1] - burn_times[bt_s]) * pyne::sec_per_day;
-
   int knd, qnd;
   trans_consts = std::vector<double>(K_num, 0.0);
   branch_ratios = M_tij[bt_s].todense();
@@ -1742,39 +2247,22 @@ void bright::ReactorMG::calc_transmutation()
   };
 
 
-  // Fill in the chains container with more than one-step values
+  // Get the chains from the library's cache, building them if they are not there yet
   if (bt_s == 0)
   {
-    for (nuc_iter iso = K.begin(); iso != K.end(); iso++)
+    std::string key = transmutation_chains_key();
+    if ((library != NULL) && library->load_transmutation_chains(key))
+      transmutation_chains = library->transmutation_chains[key];
+    else
     {
-      i = (*iso);
-      ind = K_ind[i];
-
-      for (jnd = 0; jnd < K_num; jnd++)
-      {
-        if (branch_ratios[ind][jnd] == 0.0)
-          continue;
-
-        j = K_ord[jnd];
-
-        std::cout << "    Adding chains for " << i << " --> " << j << "\n";
-        for (int ncp = 0; ncp < transmutation_chains[i][j].size(); ncp++)
-          add_transmutation_chains(transmutation_chains[i][j][ncp]);
-      };
+      build_transmutation_chains();
+      if (library != NULL)
+        library->transmutation_chains[key] = transmutation_chains;
     };
   };
 
 
 
-  // Make mass vectors
-  std::vector<double> comp_prev (K_num, 0.0);
-  for (ind = 0; ind < K_num; ind++)
-  {
-    i = K_ord[ind];
-    comp_prev[ind] = T_it[i][bt_s];
-  };
-
-
   std::vector<double> comp_next (K_num, 0.0);
   for (ind = 0; ind < K_num; ind++)
   {
@@ -1802,6 +2290,47 @@ void bright::ReactorMG::calc_transmutation()
     };
   };
 
+  return comp_next;
+};
+
+
+
+
+
+void bright::ReactorMG::calc_transmutation()
+{
+  // Calculates a tranmutation step via the method given by depletion_solver
+  int i, ind;
+
+  // Get the transmutation matrix for this time delta
+  double dt = (burn_times[bt_s + 1] - burn_times[bt_s]) * pyne::sec_per_day;
+
+  // Make mass vectors
+  std::vector<double> comp_prev (K_num, 0.0);
+  for (ind = 0; ind < K_num; ind++)
+  {
+    i = K_ord[ind];
+    comp_prev[ind] = T_it[i][bt_s];
+  };
+
+  std::vector<double> comp_next;
+  if (depletion_solver == "bateman")
+    comp_next = bateman_transmutation(comp_prev, dt);
+  else
+  {
+    // M_tij is indexed [from][to], so the rate equations need its transpose
+    bright::SparseMatrix<double> A = M_tij[bt_s].transpose();
+
+    if (depletion_solver == "pade")
+      comp_next = A.exp_pade(comp_prev, dt);
+    else
+    {
+      if (depletion_solver != "cram")
+        std::cout << "depletion_solver not set properly, using cram!\n";
+      comp_next = A.exp_cram(comp_prev, dt);
+    };
+  };
+
   // Copy this composition back to the tranmutuation matrix
   for (ind = 0; ind < K_num; ind++)
   {
@@ -1862,19 +2391,7 @@ void bright::ReactorMG::init_core()
   T_it.clear();
 
   // Also initialize the cross-section matrices as a function of time.
-  sigma_t_itg.clear();
-  sigma_a_itg.clear();
-  nubar_sigma_f_itg.clear();
-  chi_itg.clear();
-  sigma_s_itgh.clear();
-  sigma_f_itg.clear();
-  sigma_gamma_itg.clear();
-  sigma_2n_itg.clear();
-  sigma_3n_itg.clear();
-  sigma_alpha_itg.clear();
-  sigma_proton_itg.clear();
-  sigma_gamma_x_itg.clear();
-  sigma_2n_x_itg.clear();
+  xs_itg = xs_block (((size_t) (NXS - 1 + G)) * K_num * S * G, -1.0);
 
   // Also initilaize the mass weights
   A_HM_t = std::vector<double>(S, 0.0);
@@ -1910,21 +2427,6 @@ void bright::ReactorMG::init_core()
     if (0 < mat_feed.comp.count(*iso))
       T_it[*iso][0] = mat_feed.comp[*iso];
 
-    // Init the cross-sections
-    sigma_t_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    sigma_a_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    nubar_sigma_f_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    chi_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    sigma_s_itgh[*iso] = std::vector< std::vector< std::vector<double> > >(S, std::vector< std::vector<double> >(G, std::vector<double>(G, -1.0)));
-    sigma_f_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    sigma_gamma_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    sigma_2n_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    sigma_3n_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    sigma_alpha_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    sigma_proton_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    sigma_gamma_x_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-    sigma_2n_x_itg[*iso] = std::vector< std::vector<double> >(S, std::vector<double>(G, -1.0));
-
     // Init the mass weights
     n_fuel_it[*iso] = std::vector<double>(S, 0.0);
     n_clad_it[*iso] = std::vector<double>(S, 0.0);
@@ -2021,6 +2523,12 @@ void bright::ReactorMG::init_core()
 
   // Init the multilplcation factpr
   k_t = std::vector<double>(S, -1.0);
+  k_inf_t = std::vector<double>(S, -1.0);
+
+  // Init the eigenvalue solver statistics
+  eigen_iterations_t = std::vector<int>(S, 0);
+  eigen_residual_t = std::vector<double>(S, -1.0);
+  eigen_k_t = std::vector<double>(S, -1.0);
 };
 
 void bright::ReactorMG::burnup_core()
@@ -2451,6 +2959,165 @@ void bright::ReactorMG::BUd_bisection_method()
 
 
 
+void bright::ReactorMG::batch_segment(double BUd_lo, double BUd_hi, std::vector<double> & k_b, 
+                                      std::vector<double> & dk_b, std::vector<double> & phi_b, 
+                                      std::vector<double> & dphi_b)
+{
+  /** Finds the multiplication factor and flux of each batch at BUd_lo, along with 
+   *  their change over the segment to BUd_hi.  The segment must not contain a 
+   *  breakpoint, so that every batch stays on the time interval it occupies at the 
+   *  segment midpoint and k and phi are linear in the discharge burnup.
+   */
+  double BUd_mid = (BUd_lo + BUd_hi) / 2.0;
+
+  k_b.resize(B);
+  dk_b.resize(B);
+  phi_b.resize(B);
+  dphi_b.resize(B);
+
+  for (int b = 0; b < B; b++)
+  {
+    double frac = ((double) b + 1.0) / ((double) B);
+    FluencePoint fp = fluence_at_BU(frac * BUd_mid);
+    int s0 = fp.f;
+    if ( (s0 + 1) == S )
+      s0 = s0 - 1;
+
+    double Phi_lo = ((frac * BUd_lo - BU_t[fp.f]) / fp.m) + Phi_t[fp.f];
+    double Phi_hi = ((frac * BUd_hi - BU_t[fp.f]) / fp.m) + Phi_t[fp.f];
+
+    k_b[b] = pyne::solve_line(Phi_lo, Phi_t[s0+1], k_t[s0+1], Phi_t[s0], k_t[s0]);
+    phi_b[b] = pyne::solve_line(Phi_lo, Phi_t[s0+1], phi_t[s0+1], Phi_t[s0], phi_t[s0]);
+    dk_b[b] = pyne::solve_line(Phi_hi, Phi_t[s0+1], k_t[s0+1], Phi_t[s0], k_t[s0]) - k_b[b];
+    dphi_b[b] = pyne::solve_line(Phi_hi, Phi_t[s0+1], phi_t[s0+1], Phi_t[s0], phi_t[s0]) - phi_b[b];
+  };
+};
+
+
+
+
+void bright::ReactorMG::BUd_segment_method()
+{
+  /** Calculates the maximum discharge burnup by finding the segment of the burnup 
+   *  table in which the batch-averaged k crosses unity and solving inside of it.
+   *  Segment ends are the discharge burnups B*BU(t_s)/(b+1) at which some batch 
+   *  reaches a time step.  Between them the k and phi of each batch are linear in 
+   *  BUd, so k(BUd) = sum(k_b phi_b) / sum(phi_b) = 1 is a quadratic equation that 
+   *  is solved exactly.  Segments are scanned upwards from zero burnup, so the first 
+   *  crossing of k = 1 is always the one found.  When there is none, this falls 
+   *  back to BUd_bisection_method() if BUd_fallback is set.
+   */
+  double BUd_max = 1000.0;
+
+  // Discharge burnups at which some batch crosses an interior time step
+  std::vector<double> nodes (1, 0.0);
+  for (int s = 1; s < S - 1; s++)
+  {
+    for (int b = 0; b < B; b++)
+    {
+      double node = ((double) B) * BU_t[s] / ((double) b + 1.0);
+      if ( (0.0 < node) && (node < BUd_max) )
+        nodes.push_back(node);
+    };
+  };
+  nodes.push_back(BUd_max);
+  std::sort(nodes.begin(), nodes.end());
+  nodes.erase(std::unique(nodes.begin(), nodes.end()), nodes.end());
+  int N = nodes.size();
+
+  // In each segment sum(k_b phi_b) - sum(phi_b) = qa t^2 + qb t + qc for 0 <= t <= 1
+  std::vector<double> k_b, dk_b, phi_b, dphi_b;
+  double qa, qb, qc, g_hi;
+  double g_prev = 1.0;
+  double t = -1.0;
+
+  int n = 0;
+  for (n = 0; n < N - 1; n++)
+  {
+    batch_segment(nodes[n], nodes[n+1], k_b, dk_b, phi_b, dphi_b);
+    qa = 0.0;
+    qb = 0.0;
+    qc = 0.0;
+    for (int b = 0; b < B; b++)
+    {
+      qa += dk_b[b] * dphi_b[b];
+      qb += k_b[b] * dphi_b[b] + dk_b[b] * phi_b[b] - dphi_b[b];
+      qc += k_b[b] * phi_b[b] - phi_b[b];
+    };
+    g_hi = qa + qb + qc;
+
+    if ( (qc <= 0.0) && (0.0 < g_prev) )
+    {
+      if (0 < n)
+        t = 0.0;
+      break;
+    };
+
+    if (g_hi <= 0.0)
+    {
+      // Take the smaller root in [0, 1], computed in the numerically stable form
+      t = qc / (qc - g_hi);
+      if (qa != 0.0)
+      {
+        double disc = qb*qb - 4.0*qa*qc;
+        if (disc < 0.0)
+          disc = 0.0;
+        double qq = -0.5 * (qb + (qb < 0.0 ? -1.0 : 1.0) * sqrt(disc));
+        double t1 = (qq != 0.0) ? qq / qa : 2.0;
+        double t2 = (qq != 0.0) ? qc / qq : 2.0;
+        if (t2 < t1)
+          std::swap(t1, t2);
+        if ( (0.0 <= t1) && (t1 <= 1.0) )
+          t = t1;
+        else if ( (0.0 <= t2) && (t2 <= 1.0) )
+          t = t2;
+      }
+      else if (qb != 0.0)
+        t = -qc / qb;
+      break;
+    };
+    g_prev = g_hi;
+  };
+
+  if (t < 0.0)
+  {
+    if (0 < bright::verbosity)
+      std::cout << "No burnup segment brackets k = 1.\n";
+    if (!BUd_fallback)
+      throw bright::BadFuelForm ();
+    if (0 < bright::verbosity)
+      std::cout << "Falling back to the bisection method.\n";
+    BUd_bisection_method();
+    return;
+  };
+
+  BUd = nodes[n] + t * (nodes[n+1] - nodes[n]);
+  k = batch_average_k(BUd);
+
+  if (0 < bright::verbosity)
+  {
+    std::cout << "Final Result of Burnup Segment Method Calculation:\n";
+    std::cout << "Segment = [" << nodes[n] << ", " << nodes[n+1] << "]\n";
+    std::cout << "BUd = " << BUd << "\tk = " << k << "\n";
+    std::cout << "\n";
+  };
+
+  FluencePoint fp = fluence_at_BU(BUd);
+  td_n = fp.f;    // lower index of discharge time
+  Phid = fp.F;    // Discharge fluence
+
+  // time at discharge
+  if ( (fp.f + 1) == S )
+    td = pyne::solve_line(fp.F, Phi_t[fp.f], burn_times[fp.f], Phi_t[fp.f-1], burn_times[fp.f-1]);
+  else
+    td = pyne::solve_line(fp.F, Phi_t[fp.f+1], burn_times[fp.f+1], Phi_t[fp.f], burn_times[fp.f]);
+
+  return;
+};
+
+
+
+
 void bright::ReactorMG::run_P_NL(double temp_pnl)
 {
   /** Does a reactor run for a specific P_NL.
@@ -2460,7 +3127,23 @@ void bright::ReactorMG::run_P_NL(double temp_pnl)
 
   P_NL = temp_pnl;
   burnup_core();
-  BUd_bisection_method();
+  BUd_segment_method();
+};
+
+
+
+
+void bright::ReactorMG::rescale_P_NL(double temp_pnl)
+{
+  /** Sets P_NL and recomputes only the quantities that depend on it.
+   *  Nothing in the burnup itself (fluxes, transmutation, mass weights) 
+   *  depends on P_NL, which only scales k_t.  Thus this may be used in place 
+   *  of burnup_core() after the core has been burned up once.
+   */
+
+  P_NL = temp_pnl;
+  for (int s = 0; s < S; s++)
+    k_t[s] = P_NL * k_inf_t[s];
 };
 
 
@@ -2470,11 +3153,15 @@ void bright::ReactorMG::calibrate_P_NL_to_BUd()
 {
   /** Calibrates the non-leakage probability of a reactors to hit a target burnup.
    *  Calibration proceeds by bisection method...
+   *  The core is burned up once and each trial P_NL only rescales k_t.
    */
   double pnl_a, bud_a, sign_a;
   double pnl_b, bud_b, sign_b;
   double pnl_c, bud_c, sign_c;
 
+  // Burnup the core, which is independent of P_NL
+  burnup_core();
+
   //Find an acceptable lower bound
   pnl_a = 0.05;
   bool FoundA = false;
@@ -2482,7 +3169,8 @@ void bright::ReactorMG::calibrate_P_NL_to_BUd()
   {
     try
     {
-      run_P_NL(pnl_a);
+      rescale_P_NL(pnl_a);
+      BUd_segment_method();
       bud_a = BUd;
       sign_a = (bud_a - target_BU) / fabs(bud_a - target_BU);
       FoundA = true;
@@ -2504,7 +3192,8 @@ void bright::ReactorMG::calibrate_P_NL_to_BUd()
   {
     try
     {
-      run_P_NL(pnl_b);
+      rescale_P_NL(pnl_b);
+      BUd_segment_method();
       bud_b = BUd;
       sign_b = (bud_b - target_BU) / fabs(bud_b - target_BU);
       FoundB = true;
@@ -2526,7 +3215,8 @@ void bright::ReactorMG::calibrate_P_NL_to_BUd()
   while ( (DoA < fabs(pnl_a - pnl_b)) && (DoA < fabs(bud_a - bud_b)) && (q < 100) )
   {
     pnl_c = (pnl_a + pnl_b) / 2.0;
-    run_P_NL(pnl_c);
+    rescale_P_NL(pnl_c);
+    BUd_segment_method();
     bud_c = BUd;
     sign_c = (bud_c - target_BU) / fabs(bud_c - target_BU);
 
@@ -2579,7 +3269,7 @@ pyne::Material bright::ReactorMG::calc()
   // Finds BUd and output isotopics.
   burnup_core();
 
-  BUd_bisection_method();
+  BUd_segment_method();
 
   calc_mat_prod();
 
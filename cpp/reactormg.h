@@ -38,63 +38,138 @@ namespace bright {
   typedef std::vector< std::vector<double> > pert_data_g; 
   typedef std::vector< std::vector< std::vector<double> > > pert_data_gh; 
 
+  typedef std::vector<double> xs_block;  // Dense [reaction][nuc][pert or time][g] cross section buffer
+
+  // Reaction indices into the ReactorMG cross section buffers.  All reactions
+  // are [g] data except for scattering, which is [g][h] and so comes last.
+  enum xs_reaction {XS_T, XS_A, XS_NUBAR_F, XS_CHI, XS_F, XS_GAMMA, XS_2N, XS_3N, 
+                    XS_ALPHA, XS_PROTON, XS_GAMMA_X, XS_2N_X, XS_S, NXS};
+
+  // Number of non-fission transmutation reactions, XS_GAMMA through XS_2N_X
+  const int NTRANS = 7;
+
   typedef std::vector<int> iso_vec;
   typedef std::map<int, int> iso_map;
 
+  typedef std::map<int, std::map<int, std::vector< std::vector<int> > > > chain_map;  // [from nuc][to nuc] -> chains
 
-  class ReactorMG : public FCComp
+
+  class ReactorMGLibrary
   {
-  /** Reactor class
-   *  Basic One-Group Reactor Model.  Computes one Burnup Calculationn with the option of computing output isotopics.
-   *  Specific reactor types inherit this class and change base parameters.
+  /** Data that ReactorMG reads in from a reactor data library and from nuc_data.h5.
+   *  This is loaded once per library file and then shared, read-only, between all 
+   *  of the reactors which use that file.  See reactormg_libraries.
    */
-  protected:
-    // FIXME these should be public eventually, once python bindings are written
+  public:
+    ReactorMGLibrary(std::string lib);
+    ~ReactorMGLibrary();
+
+    std::string libfile;  // Path to the reactor data library
+    std::string xs_file;  // Path to the flat binary cross section sidecar, libfile + ".xs"
+    std::string chains_file;  // Path to the HDF5 transmutation chain sidecar, libfile + ".chains.h5"
+    std::string nuc_data_file;  // Path to the nuc_data.h5 which K and the decay data were read from
+
+    nuc_set I;  // Set of nuclides that may be in mat_feed
+    nuc_set J;  // Set of nuclides that are in the data library
+    nuc_set K;  // Set of all nuclides that are transmuted or decayed
+    int K_num;
+    iso_vec K_ord;
+    iso_map K_ind;
+
+    h5wrap::HomogenousTypeTable<double> perturbations;  // Perturbation table
+    int nperturbations;
+    std::map<std::string, std::vector<double> > perturbed_fields;
+    std::vector<std::string> perturbed_cols;  // Perturbation table columns that actually vary, in index order
+    bright::KDTree perturbation_tree;         // Nearest neighbor index over the normalized perturbed columns
+    bool pert_is_grid;                             // Whether the perturbed columns form a tensor-product grid
+    std::vector< std::vector<double> > pert_axes;  // Sorted, unique, normalized values of each perturbed column
+    std::vector<int> pert_grid;                    // Row-major grid cell index -> perturbation table row
+
+    int G;
+    std::vector<double> E_g;
+    pert_data_g phi_g;
+    pert_data phi;
+    pert_data Phi;
+    pert_data time0;
+    pert_data BU0;
+    std::map<int, pert_data> Ti0;
+
     bright::SparseMatrix<double> decay_matrix;
     bright::SparseMatrix<double> thermal_yield_matrix;
     bright::SparseMatrix<double> fast_yield_matrix;
     std::vector< bright::SparseMatrix<double> > fission_product_yield_matrix;
 
-    pert_data_g phi_g;        // Group fluxes
+    // Compressed sparse row (CSR) layout of the burnup matrix.  This is the same at 
+    // every time step, so reactors only need to refresh the values as they burn.
+    std::vector< std::vector<int> > fpy_row_ptr;  // [g][ind] Start of row ind in fission_product_yield_matrix[g].sm, K_num + 1 long
+    std::vector< std::vector<int> > fpy_source;   // [g][ind] Yield matrix row used for the fission products of ind, or -1
+    std::vector<int> burnup_row_ptr;    // Start of each row in burnup_col_ind, K_num + 1 long
+    std::vector<int> burnup_col_ind;    // Column of each slot of the burnup matrix
+    std::vector<int> burnup_diag;       // Slot of each diagonal entry
+    std::vector<int> reaction_slot;     // [ind*NTRANS + r] Slot of the product of each transmutation reaction, or -1
+    std::vector<double> burnup_decay;   // decay_matrix laid out on the burnup matrix slots
+
+    double * xs_lib;     // Cross sections, [reaction][nuc][pert][g], either read in or memory mapped
+    size_t xs_lib_size;  // Number of doubles in xs_lib
+    bool xs_mapped;      // Whether xs_lib is a memory mapped view of xs_file
+
+    void write_xs_file();
+
+    std::map<std::string, chain_map> transmutation_chains;  // Bateman chains, keyed by ReactorMG::transmutation_chains_key()
+    bool load_transmutation_chains(std::string key);
+    void write_chains_file();
+
+  private:
+    xs_block xs_data;    // Storage for xs_lib when it is read from the HDF5 library
+    void * xs_map;       // Start of the memory mapped xs_file
+    size_t xs_map_size;  // Length of the memory mapping
+
+    bool map_xs_file();
+    void build_burnup_pattern();
+    void set_xs(int rxn, int knd, pert_data_g data);
+    void set_xs(int rxn, int knd, pert_data_gh data);
+  };
+
+  extern LibraryCache<ReactorMGLibrary> reactormg_libraries;  // Process-wide cache of ReactorMG libraries
 
-    std::map<int, std::map<int, std::vector< std::vector<int> > > > transmutation_chains;
 
-    std::map<int, pert_data_g> sigma_t_pg;       // Total cross section from data library
-    std::map<int, pert_data_g> sigma_a_pg;       // Absorption cross section from data library
-    std::map<int, pert_data_g> nubar_sigma_f_pg;   // Neutrons per fission times Fission cross section from data library
-    std::map<int, pert_data_g> chi_pg;           // Fission energy spectrum from data library
-    std::map<int, pert_data_gh> sigma_s_pgh;     // Group to group scattering cross section from data library
-    std::map<int, pert_data_g> sigma_f_pg;       // Fission cross section from data library
-    std::map<int, pert_data_g> sigma_gamma_pg;     // Capture cross section from data library
-    std::map<int, pert_data_g> sigma_2n_pg;      // (n, 2n) cross section from data library
-    std::map<int, pert_data_g> sigma_3n_pg;      // (n, 3n) cross section from data library
-    std::map<int, pert_data_g> sigma_alpha_pg;     // (n, alpha) cross section from data library
-    std::map<int, pert_data_g> sigma_proton_pg;    // (n, proton) cross section from data library
-    std::map<int, pert_data_g> sigma_gamma_x_pg;   // Capture cross section (excited) from data library
-    std::map<int, pert_data_g> sigma_2n_x_pg;    // (n, 2n *) cross section from data library
+  class ReactorMG : public FCComp
+  {
+  /** Reactor class
+   *  Basic One-Group Reactor Model.  Computes one Burnup Calculationn with the option of computing output isotopics.
+   *  Specific reactor types inherit this class and change base parameters.
+   */
+  protected:
+    LibraryHandle<ReactorMGLibrary, reactormg_libraries> library;  // Shared data library, set by loadlib()
+
+    size_t xs_offset(int rxn, int knd, int n, int N);
+    void interpolate_xs(int rxn, int knd);
 
     std::vector< std::vector<double> > branch_ratios;
 
-    h5wrap::HomogenousTypeTable<double> perturbations;  // Load perturbation table
+    double perturbation_state(std::string col);  // Current reactor value for a perturbation column
+
+    // Interpolation engine
+    std::vector<int> interp_rows;                  // Perturbation table rows used for the current interpolation
+    std::vector<double> interp_weights;            // Interpolation weight of each of interp_rows
+    void calc_interpolation_weights();
+
+    std::vector< std::vector<double> > A_lu;  // LU factors of A_tgh at the current time step
+    std::vector<int> A_piv;                   // Row permutation of A_lu
+
+    time_data eigen_k_t;  // Eigenvalue (before P_NL) found at each time step, used to warm start the next one
+    time_data k_inf_t;    // Multiplication factor before P_NL is applied, k_t = P_NL * k_inf_t
+
+    void rescale_P_NL(double temp_pnl);
+    void batch_segment(double BUd_lo, double BUd_hi, std::vector<double> & k_b, 
+                       std::vector<double> & dk_b, std::vector<double> & phi_b, 
+                       std::vector<double> & dphi_b);
 
     time_g phi_tg;    // Group fluxes as a function of time
     time_g lattice_E_tg;  // Lattice function E
     time_g lattice_F_tg;  // Lattuce function F
 
     time_g zeta_tg;     // Group disadvantage factors
-    iso_time_g sigma_t_itg;        // Total cross section as a function of nuclide and burn_time
-    iso_time_g sigma_a_itg;        // Absorption cross section as a function of nuclide and burn_time
-    iso_time_g nubar_sigma_f_itg;    // Neutrons per fission times Fission cross section as a function of nuclide and burn_time
-    iso_time_g chi_itg;            // Fission neutron energy spectrum as a function of nuclide and burn_time
-    iso_time_gh sigma_s_itgh;      // Group to group scattering cross section as a function of nuclide and burn_time
-    iso_time_g sigma_f_itg;        // Fission cross section as a function of nuclide and burn_time
-    iso_time_g sigma_gamma_itg;    // Capture cross section as a function of nuclide and burn_time
-    iso_time_g sigma_2n_itg;       // (n, 2n) cross section as a function of nuclide and burn_time
-    iso_time_g sigma_3n_itg;       // (n, 3n) cross section as a function of nuclide and burn_time
-    iso_time_g sigma_alpha_itg;    // (n, alpha) cross section as a function of nuclide and burn_time
-    iso_time_g sigma_proton_itg;     // (n, proton) cross section as a function of nuclide and burn_time
-    iso_time_g sigma_gamma_x_itg;    // Capture cross section (excited) as a function of nuclide and burn_time
-    iso_time_g sigma_2n_x_itg;     // (n, 2n *) cross section as a function of nuclide and burn_time
 
     time_g Sigma_t_fuel_tg;        // Core-average Macroscopic total cross-section as a function of time and energy group
     time_g Sigma_a_fuel_tg;        // Core-average Macroscopic absorption cross section as a function of time and energy group
@@ -170,6 +245,13 @@ namespace bright {
     time_gh F_tgh;     // Fission Matrix, as a function of time
     time_gh A_inv_tgh;   // Inverse of Absorprion Matrix, as a function of time
     time_gh A_inv_F_tgh; // Inverse of Absorprion Matrix mult by the Fission Matrix, as a function of time
+    bool store_inverses; // Whether to also compute the A_inv and A_inv_F matrices, which calc_criticality() does not need
+
+    std::string eigen_solver;    // Eigenvalue iteration method: power, wielandt, or anderson
+    double eigen_tol;            // Convergence tolerance on the relative change in k and phi
+    int eigen_max_iter;          // Maximum number of eigenvalue iterations per time step
+    std::vector<int> eigen_iterations_t;  // Number of eigenvalue iterations taken, as a function of time
+    time_data eigen_residual_t;           // Final relative change in k and phi, as a function of time
 
     std::vector< bright::SparseMatrix<double> > T_int_tij;   // Energy Integral of the Transmutation Matrix, as a function of time
     std::vector< bright::SparseMatrix<double> > M_tij;     // Burnup Matrix, T_int Matrix plus the Decay Matrix, as a function of time
@@ -210,6 +292,7 @@ namespace bright {
     bool rescale_hydrogen_xs;   // Rescale the Hydrogen-1 XS?
     std::string burnup_via_constant;
     double branch_ratio_cutoff; // Cut-off for bateman chains
+    std::string depletion_solver; // cram, pade, or bateman
 
     double r_fuel;  // Fuel region radius
     double r_void;  // Void region radius
@@ -249,6 +332,12 @@ namespace bright {
 
     std::map<int, pert_data> Ti0;                // Data library's transmutation vector
 
+    // Cross sections, stored as dense buffers indexed by [reaction][nuc] where 
+    // reaction is an xs_reaction and nuc is the K_ind index of the nuclide.
+    double * xs_lib;  // Data library cross sections, [reaction][nuc][pert][g], shared with the library
+    size_t xs_lib_size;  // Number of doubles in xs_lib
+    xs_block xs_itg;  // Cross sections as a function of nuclide and burn_time, [reaction][nuc][time][g]
+
 
     // Attributes calculated from fold_mass_weights()
     time_data A_HM_t;     // Atomic weight of IHM
@@ -290,6 +379,7 @@ namespace bright {
     double BUd;  // Discharge Burnup
     double Phid; // Discharge Fluence
     double k;    // Multiplication factor 
+    bool BUd_fallback;  // Use BUd_bisection_method() when BUd_segment_method() cannot bracket k = 1
 
 
     // Results of calc_sub_streams()
@@ -313,6 +403,8 @@ namespace bright {
     // Public access functions
     void initialize(ReactorParameters rp);
     void loadlib(std::string lib="Reactor.h5");
+    void write_xs_file();
+    void write_chains_file();
     void interpolate_cross_sections();
     void calc_mass_weights();
     void fold_mass_weights();
@@ -334,6 +426,7 @@ namespace bright {
     FluencePoint fluence_at_BU(double BU);
     double     batch_average_k(double BUd);
     void       BUd_bisection_method();
+    void       BUd_segment_method();
     void       run_P_NL(double temp_pnl);
     void       calibrate_P_NL_to_BUd();
 
@@ -351,9 +444,13 @@ namespace bright {
     void calc_zeta();
 
     // Transmutation chain functions
+    chain_map transmutation_chains;  // Bateman chains for the current nuclides, shared via the library
+    std::string transmutation_chains_key();
+    void build_transmutation_chains();
     void add_transmutation_chains(std::vector<int> tc);
     double bateman_chain(int i, int j, int c, double t);
     double bateman(int i, int j, double t);
+    std::vector<double> bateman_transmutation(std::vector<double> comp_prev, double dt);
   };
 
 // end bright
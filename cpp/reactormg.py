@@ -119,6 +119,36 @@ desc['docstrings']['attrs']['burnup_via_constant'] = \
 desc['docstrings']['attrs']['branch_ratio_cutoff'] = \
 """The cutoff value (float) below which the bateman equations are not solved."""
 
+desc['docstrings']['attrs']['depletion_solver'] = \
+"""Flag (str) for the method used to solve the depletion equations over each 
+burnup time step.  Accepted values are "cram" (Chebyshev Rational Approximation 
+Method, the default), "pade" (scaling and squaring Pade approximant of the dense 
+matrix exponential), and "bateman" (the legacy enumeration of transmutation chains, 
+which is the only method that uses branch_ratio_cutoff)."""
+
+desc['docstrings']['attrs']['eigen_iterations_t'] = \
+"""Number of eigenvalue iterations (int) taken by calc_criticality() at 
+each time step."""
+
+desc['docstrings']['attrs']['eigen_max_iter'] = \
+"""The maximum number of eigenvalue iterations (int) allowed per time step."""
+
+desc['docstrings']['attrs']['eigen_residual_t'] = \
+"""The final relative change in k and the flux reached by the eigenvalue 
+solver at each time step."""
+
+desc['docstrings']['attrs']['eigen_solver'] = \
+"""Flag (str) for the iteration method used by calc_criticality() to find the 
+fundamental mode.  Accepted values are "power" (plain power iteration), 
+"wielandt" (Wielandt shifted power iteration, the default), and "anderson" 
+(power iteration with Anderson mixing of the last few iterates).  Any other 
+value makes calc_criticality() raise an error.  Each time step is warm 
+started from the flux and eigenvalue of the one before it."""
+
+desc['docstrings']['attrs']['eigen_tol'] = \
+"""Convergence tolerance (float) on the relative change in k and the flux 
+between eigenvalue iterations."""
+
 desc['docstrings']['attrs']['r_fuel'] = \
 """The radius (float) of the fuel region [cm]."""
 
@@ -210,44 +240,12 @@ desc['docstrings']['attrs']['BU0'] = \
 desc['docstrings']['attrs']['Ti0'] = \
 """Data library's transmutation vector [kg_i]."""
 
-desc['docstrings']['attrs']['sigma_t_pg'] = \
-"""Total cross section from data library [barns]."""
-
-desc['docstrings']['attrs']['sigma_a_pg'] = \
-"""Absorption cross section from data library [barns]."""
-    
-desc['docstrings']['attrs']['nubar_sigma_f_pg'] = \
-"""Neutrons per fission times fission cross section from data library [n barns]."""
-
-desc['docstrings']['attrs']['chi_pg'] = \
-"""Fission energy spectrum from data library [MeV]."""
-
-desc['docstrings']['attrs']['sigma_s_pgh'] = \
-"""Group to group scattering cross section from data library [barns]."""
-
-desc['docstrings']['attrs']['sigma_f_pg'] = \
-"""Fission cross section from data library [barns]."""
-
-desc['docstrings']['attrs']['sigma_gamma_pg'] = \
-"""Capture cross section from data library [barns]."""
-    
-desc['docstrings']['attrs']['sigma_2n_pg'] = \
-"""(n, 2n) cross section from data library [barns]."""
-
-desc['docstrings']['attrs']['sigma_3n_pg'] = \
-"""(n, 3n) cross section from data library [barns]."""
-
-desc['docstrings']['attrs']['sigma_alpha_pg'] = \
-"""(n, alpha) cross section from data library [barns]."""
-
-desc['docstrings']['attrs']['sigma_proton_pg'] = \
-"""(n, proton) cross section from data library [barns]."""
-
-desc['docstrings']['attrs']['sigma_gamma_x_pg'] = \
-"""Capture cross section (excited) from data library [barns]."""
-
-desc['docstrings']['attrs']['sigma_2n_x_pg'] = \
-"""(n, 2n*) cross section from data library [barns]."""
+desc['docstrings']['attrs']['xs_lib'] = \
+"""Data library cross sections [barns], as a flat, read-only, zero-copy view of 
+a dense [reaction][nuc][pert][g] buffer.  The nuc axis is indexed by K_ind and 
+scattering, which is [g][h], is the last reaction.  See xs_views() for a 
+per-reaction view.  This buffer is shared with all other reactors that use the 
+same library."""
 
 desc['docstrings']['attrs']['A_HM_t'] = \
 """Atomic weight of heavy metal."""
@@ -306,47 +304,6 @@ desc['docstrings']['attrs']['zeta_tg'] = \
 desc['docstrings']['attrs']['T_it'] = \
 """Transformation Matrix [kg_i/kgIHM]."""
 
-desc['docstrings']['attrs']['sigma_t_itg'] = \
-"""Total cross section as a function of nuclide and burn_time [barns]."""
-
-desc['docstrings']['attrs']['sigma_a_itg'] = \
-"""Absorption cross section as a function of nuclide and burn_time [barns]."""
-
-desc['docstrings']['attrs']['nubar_sigma_f_itg'] = \
-"""Neutrons per fission times Fission cross section as a function of nuclide 
-and burn_time [n barns]."""
-
-desc['docstrings']['attrs']['chi_itg'] = \
-"""Fission neutron energy spectrum as a function of nuclide and burn_time [MeV]."""
-
-desc['docstrings']['attrs']['sigma_s_itgh'] = \
-"""Group to group scattering cross section as a function of nuclide and 
-burn_time [barns]."""
-
-desc['docstrings']['attrs']['sigma_f_itg'] = \
-"""Fission cross section as a function of nuclide and burn_time [barns]."""
-
-desc['docstrings']['attrs']['sigma_gamma_itg'] = \
-"""Capture cross section as a function of nuclide and burn_time [barns]"""
-
-desc['docstrings']['attrs']['sigma_2n_itg'] = \
-"""(n, 2n) cross section as a function of nuclide and burn_time [barns]."""
-
-desc['docstrings']['attrs']['sigma_3n_itg'] = \
-"""(n, 3n) cross section as a function of nuclide and burn_time [barns]."""
-
-desc['docstrings']['attrs']['sigma_alpha_itg'] = \
-"""(n, alpha) cross section as a function of nuclide and burn_time [barns]."""
-
-desc['docstrings']['attrs']['sigma_proton_itg'] = \
-"""(n, proton) cross section as a function of nuclide and burn_time [barns]."""
-
-desc['docstrings']['attrs']['sigma_gamma_x_itg'] = \
-"""Capture cross section (excited) as a function of nuclide and burn_time [barns]."""
-
-desc['docstrings']['attrs']['sigma_2n_x_itg'] = \
-"""(n, 2n*) cross section as a function of nuclide and burn_time [barns]."""
-
 desc['docstrings']['attrs']['Sigma_t_fuel_tg'] = \
 """Fuel-averaged macroscopic total cross-section as a function of time and 
 energy group [1/cm]."""
@@ -574,19 +531,36 @@ desc['docstrings']['attrs']['F_tgh'] = \
 """Fission Matrix, as a function of time [1/cm]."""
 
 desc['docstrings']['attrs']['A_inv_tgh'] = \
-"""Inverse of absorprion matrix, as a function of time [cm]."""
+"""Inverse of absorprion matrix, as a function of time [cm].  Only computed 
+when store_inverses is True."""
 
 desc['docstrings']['attrs']['A_inv_F_tgh'] = \
 """Inverse of absorprion matrix mult by the fission matrix, as a function 
-of time."""
-
-desc['docstrings']['attrs']['T_int_tij'] = ""
-
-desc['docstrings']['attrs']['M_tij'] = ""
+of time.  Only computed when store_inverses is True."""
+
+desc['docstrings']['attrs']['store_inverses'] = \
+"""Flag (bool) for whether the explicit inverses of the absorption matrices 
+(A_inv_tgh, A_inv_fuel_tgh, A_inv_clad_tgh, A_inv_cool_tgh, A_inv_F_tgh, and 
+A_inv_F_fuel_tgh) are computed at each time step.  The criticality calculation 
+solves against an LU factorization of A_tgh instead, so these are not needed 
+and default to off (zeros)."""
+
+desc['docstrings']['attrs']['T_int_tij'] = \
+"""Energy integral of the transmutation matrix [1/s], as a function of time.  
+This is a read-only list with one (rows, cols, vals) tuple of arrays per time 
+step, laid out as in M_tij."""
+
+desc['docstrings']['attrs']['M_tij'] = \
+"""Burnup matrix, T_int_tij plus the decay matrix, as a function of time.  This 
+is a read-only list with one (rows, cols, vals) tuple of arrays per time step, 
+with entries in row-major order.  Rows are the parent and columns the daughter 
+nuclide, both indexed by K_ind."""
 
 desc['docstrings']['attrs']['nearest_neighbors'] = \
 """Attribute that denotes the indices of the perturbation table which are 
-closest to the current state of the reactor (ie densities, burn_time, etc)."""
+closest to the current state of the reactor (ie densities, burn_time, etc).
+Holds the two nearest rows, nearest first, which are the ones that 
+interpolate_cross_sections() uses."""
 
 desc['docstrings']['attrs']['k_t'] = \
 """Multiplication factor of the core as a function of time."""
@@ -603,6 +577,11 @@ desc['docstrings']['attrs']['BUd'] = \
 desc['docstrings']['attrs']['Phid'] = \
 """Discharge Fluence [n/kb]."""
 
+desc['docstrings']['attrs']['BUd_fallback'] = \
+"""Flag (bool) for whether BUd_segment_method() falls back to 
+BUd_bisection_method() when no segment of the burnup table brackets k = 1.  
+If False, BadFuelForm is raised instead.  Defaults to True."""
+
 desc['docstrings']['attrs']['k'] = \
 """Core multiplication factor."""
 
@@ -640,6 +619,12 @@ target burnup::
 This is computed via the calc_deltaR() method."""
 
 
+desc['docstrings']['attrs']['transmutation_chains'] = \
+"""The Bateman transmutation chains (dict) used by the "bateman" depletion 
+solver, keyed by the initial and then the final nuclide of each chain, whose
+values are lists of chains.  These are shared between all reactors that load
+the same library, under transmutation_chains_key(), and are read only."""
+
 desc['docstrings']['attrs']['tru_cr'] = \
 """The transuranic conversion ratio of the reactor (float).  
 This is set via the calc_tru_cr() method."""
@@ -663,6 +648,12 @@ necessary information from it.  This method is typically called by the
 constructor of the child reactor type object.  It must be called before 
 attempting to do any real computation.
 
+Each library is only read in once per process and is then shared, read-only, 
+between all reactors which load the same file, so long as the file has not 
+since been modified.  If a cross section sidecar written by write_xs_file() 
+is present, the cross sections are memory mapped from it instead.  Files which 
+are not HDF5 raise an error.
+
 Parameters
 ----------
 lib : str, optional 
@@ -670,10 +661,48 @@ lib : str, optional
 
 """
 
+desc['docstrings']['methods']['build_transmutation_chains'] = \
+"""Enumerates the transmutation chains from the burnup matrix and branch ratios 
+of the current time step, and stores them in the transmutation_chains 
+attribute.  The "bateman" depletion solver only does this when the library 
+does not already have chains for transmutation_chains_key().
+"""
+
+desc['docstrings']['methods']['transmutation_chains_key'] = \
+"""Names the transmutation chains for the current set of nuclides and 
+branch_ratio_cutoff, along with the flux-dependent branch ratios 
+that the chains are pruned on.  Reactors whose keys are the same share chains.
+
+Returns
+-------
+key : str
+    Key of the chains in the library and the chains sidecar file.
+"""
+
+desc['docstrings']['methods']['write_chains_file'] = \
+"""Writes the transmutation chains which have been built for the loaded library 
+by the "bateman" depletion solver to an HDF5 sidecar file next to it, 
+libfile + '.chains.h5'.  Chains are keyed by the nuclide set and the cut-off 
+parameters, and later runs (in this or any other process) read them from this 
+file rather than building them again.  The sidecar is ignored if it is older 
+than the library.
+"""
+
+desc['docstrings']['methods']['write_xs_file'] = \
+"""Writes the cross sections of the loaded library to a flat binary sidecar 
+file next to it, libfile + '.xs'.  Subsequent loads of the library (in this or 
+any other process) memory map the cross sections from this file rather than 
+reading them from HDF5.  The sidecar is ignored if it is older than the library 
+or was written from a different nuc_data.h5.
+"""
+
 desc['docstrings']['methods']['interpolate_cross_sections'] = \
 """This method iterpolates the isotopic, time-dependent cross-sections based 
 on the current state of the burn_time, bt_s, and nearest_neighbors attributes.  
 It is prudent to call the calc_nearest_neighbors() method before this one.
+When the perturbation table is a tensor-product grid, the cross sections are
+multilinearly interpolated over the corners of the enclosing grid cell.
+Otherwise the two nearest neighbors are linearly interpolated between.
 """
 
 desc['docstrings']['methods']['calc_mass_weights'] = \
@@ -704,7 +733,9 @@ desc['docstrings']['methods']['assemble_transmutation_matrices'] = \
 """
 
 desc['docstrings']['methods']['calc_criticality'] = \
-"""Performs the criticality calculation to find k for this time step.
+"""Performs the criticality calculation to find k for this time step.  The 
+fundamental mode is found with the method given by eigen_solver, starting 
+from the flux and eigenvalue of the previous time step.
 """
 
 desc['docstrings']['methods']['calc_transmutation(self)'] = \
@@ -726,7 +757,9 @@ are then used to determine discharge compositions and other parameters.
 desc['docstrings']['methods']['calc_nearest_neighbors'] = \
 """Calculates a sorted array that indexes the nearest neighbors of the 
 perturbations based off of the current state of the reactor.  The results may
-be found in the neareest_neighbors attribute.
+be found in the neareest_neighbors attribute.  Neighbors are found via a 
+k-d tree that loadlib() builds over the normalized perturbed columns, so only
+the two nearest rows (which are used for interpolation) are returned.
 """
 
 desc['docstrings']['methods']['calc_T_itd'] = \
@@ -813,6 +846,16 @@ Other root finding methods for determining maximum discharge burnup are
 certainly possible.
 """
 
+desc['docstrings']['methods']['BUd_segment_method'] = \
+"""Calculates the maximum discharge burnup for a given mat_feed in this 
+reactor by finding where the batch averaged multiplication factor first 
+crosses 1.0.  The discharge burnups at which some batch reaches a time step 
+split the burnup table into segments.  Within each segment the k and phi of 
+every batch are linear in BUd, so the flux weighted k(BUd) = 1.0 reduces to 
+a quadratic equation which is solved exactly.  The segments are scanned 
+upward from zero burnup.  See BUd_fallback for when no segment crosses 1.0.
+"""
+
 desc['docstrings']['methods']['run_P_NL'] = \
 """Performs a reactor run for a specific non-leakage probability value.
 This requires that mat_feed be (meaningfully) set and is for use with 
@@ -822,7 +865,7 @@ This function amounts to the following code::
 
     self.P_NL = pnl
     self.fold_mass_weights()
-    self.BUd_bisection_method()
+    self.BUd_segment_method()
 
 Parameters
 ----------
@@ -846,7 +889,7 @@ reactor calculations, the calc() method is relatively simple::
 
     self.mat_feed = input
     self.fold_mass_weights()
-    self.BUd_bisection_method()
+    self.BUd_segment_method()
     self.calc_mat_prod()
     return self.mat_prod
 
@@ -866,3 +909,41 @@ output : Material
     mat_prod
 
 """
+
+
+desc['extra']['pyx'] = \
+'''XS_REACTIONS = ('sigma_t', 'sigma_a', 'nubar_sigma_f', 'chi', 'sigma_f', 'sigma_gamma', 
+                'sigma_2n', 'sigma_3n', 'sigma_alpha', 'sigma_proton', 'sigma_gamma_x', 
+                'sigma_2n_x', 'sigma_s')
+
+def xs_views(rmg, per_time=False):
+    """Splits the dense cross section buffers of a reactor into per-reaction views.
+    No data is copied, so modifying the views of xs_itg modifies the reactor.  The
+    views of xs_lib are read-only since the library is shared between reactors.
+
+    Parameters
+    ----------
+    rmg : ReactorMG 
+        A reactor which has had its library loaded.
+    per_time : bool, optional 
+        If True, the views are of xs_itg rather than xs_lib.
+
+    Returns
+    -------
+    views : dict 
+        Keys are the names in XS_REACTIONS.  Values have shape (K_num, N, G), where
+        N is nperturbations or S, except for 'sigma_s' which is (K_num, N, G, G).
+
+    """
+    xs = rmg.xs_itg if per_time else rmg.xs_lib
+    N = rmg.S if per_time else rmg.nperturbations
+    K_num = rmg.K_num
+    G = rmg.G
+    size = K_num * N * G
+    views = {}
+    for r, rxn in enumerate(XS_REACTIONS[:-1]):
+        views[rxn] = xs[r*size:(r+1)*size].reshape(K_num, N, G)
+    r = len(XS_REACTIONS) - 1
+    views['sigma_s'] = xs[r*size:].reshape(K_num, N, G, G)
+    return views
+'''
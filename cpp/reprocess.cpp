@@ -10,18 +10,70 @@
 /*** Protected Functions ***/
 /***************************/
 
+double bright::Reprocess::sepeff_of(sep_eff_dict & sed, int nuc)
+{
+  // Separation efficiency of nuc from a dictionary with nuclide or element keys.
+  if (0 < sed.count(nuc))
+    return sed[nuc];
+  else if (0 < sed.count(nuc/10000))
+    return sed[nuc/10000];
+  else
+    return 1.0;
+};
+
+
 void bright::Reprocess::initialize(sep_eff_dict sed)
 {
   // Initializes the reprocessing component with specific separation efficiencies.
   // sepeff = dictioanry of separation efficiencies.  Of form {aazzzm: 0.99}, eg {922350, 0.999, 942390: 0.99}
+  sepeff.clear();
   for (std::set<int>::iterator iso = bright::track_nucs.begin(); iso != bright::track_nucs.end(); iso++)
+    sepeff[*iso] = sepeff_of(sed, *iso);
+  update_sepeff();
+};
+
+
+void bright::Reprocess::update_sepeff()
+{
+  /** Lays sepeff out as a dense array in nuclide order, so that separations are a 
+   *  single merge of a composition against it rather than a map lookup per nuclide.
+   *  This is only rebuilt when sepeff has changed since the last call.
+   */
+  bool changed = (sepeff.size() != sepeff_nucs.size());
+  int n = 0;
+  for (sep_eff_iter i = sepeff.begin(); i != sepeff.end() && !changed; i++, n++)
+    changed = (sepeff_nucs[n] != i->first || sepeff_vec[n] != i->second);
+
+  if (!changed)
+    return;
+
+  sepeff_nucs.clear();
+  sepeff_vec.clear();
+  for (sep_eff_iter i = sepeff.begin(); i != sepeff.end(); i++)
   {
-    if (0 < sed.count(*iso))
-      sepeff[*iso] = sed[*iso];
-    else if (0 < sed.count((*iso)/10000))
-      sepeff[*iso] = sed[(*iso)/10000];
+    sepeff_nucs.push_back(i->first);
+    sepeff_vec.push_back(i->second);
+  };
+};
+
+
+void bright::Reprocess::separate(pyne::comp_map & incomp, std::vector<double> & eff, pyne::comp_map & outcomp)
+{
+  /** Multiplies the masses in incomp by the efficiencies eff, which are aligned to 
+   *  sepeff_nucs, in one ordered pass over both.  Nuclides which are not in sepeff 
+   *  are not separated into the product.
+   */
+  int NS = sepeff_nucs.size();
+  int n = 0;
+  outcomp.clear();
+  for (pyne::comp_iter i = incomp.begin(); i != incomp.end(); i++)
+  {
+    while (n < NS && sepeff_nucs[n] < i->first)
+      n++;
+    if (n < NS && sepeff_nucs[n] == i->first)
+      outcomp.insert(outcomp.end(), std::make_pair(i->first, (i->second) * eff[n]));
     else
-      sepeff[*iso] = 1.0;
+      outcomp.insert(outcomp.end(), std::make_pair(i->first, 0.0));
   };
 };
 
@@ -90,10 +142,10 @@ void bright::Reprocess::calc_params ()
 pyne::Material bright::Reprocess::calc ()
 {
   // Does the Reprocessing
+  update_sepeff();
   pyne::comp_map incomp  = mat_feed.mult_by_mass();
   pyne::comp_map outcomp;
-  for (pyne::comp_iter i = incomp.begin(); i != incomp.end(); i++)
-    outcomp[i->first] = (i->second) * sepeff[i->first];
+  separate(incomp, sepeff_vec, outcomp);
 
   mat_prod = pyne::Material(outcomp);
   return mat_prod;
@@ -105,9 +157,9 @@ pyne::Material bright::Reprocess::calc (pyne::comp_map incomp)
   // Does the Reprocessing
   // incomp = input component dictionary of all nuclides. Standard pyne::comp_map object. Assigns this to mat_feed.
   mat_feed = pyne::Material (incomp);
+  update_sepeff();
   pyne::comp_map outcomp;
-  for (pyne::comp_iter i = incomp.begin(); i != incomp.end(); i++)
-    outcomp[i->first] = (i->second) * sepeff[i->first];
+  separate(incomp, sepeff_vec, outcomp);
 
   mat_prod = pyne::Material (outcomp);
   return mat_prod;
@@ -121,3 +173,80 @@ pyne::Material bright::Reprocess::calc (pyne::Material mat)
   mat_feed = mat;
   return calc();
 };
+
+
+
+void bright::Reprocess::calc_many(std::vector<pyne::Material> & feeds, std::vector<int> & nucs, std::vector<double> & prods)
+{
+  /** Separates each of many feed materials with sepeff.  Each feed is laid out as a 
+   *  dense vector over the nuclides of sepeff, which are returned in nucs, and 
+   *  prods[n*nucs.size() + j] is the mass of nucs[j] separated from feeds[n].  
+   *  mat_feed and mat_prod are left at the last of the feeds.
+   */
+  update_sepeff();
+
+  int NF = feeds.size();
+  int NS = sepeff_nucs.size();
+  nucs = sepeff_nucs;
+  prods.assign(NF*NS, 0.0);
+
+  for (int f = 0; f < NF; f++)
+  {
+    pyne::comp_map incomp = feeds[f].mult_by_mass();
+    double * prod = &prods[f*NS];
+    int n = 0;
+    for (pyne::comp_iter i = incomp.begin(); i != incomp.end(); i++)
+    {
+      while (n < NS && sepeff_nucs[n] < i->first)
+        n++;
+      if (n == NS)
+        break;
+      if (sepeff_nucs[n] == i->first)
+        prod[n] = i->second;
+    };
+
+    for (n = 0; n < NS; n++)
+      prod[n] *= sepeff_vec[n];
+  };
+
+  if (0 < NF)
+  {
+    mat_feed = feeds[NF-1];
+    calc();
+  };
+};
+
+
+std::vector<pyne::Material> bright::Reprocess::calc_products(std::vector<sep_eff_dict> seds)
+{
+  /** Separates mat_feed into several product streams at once, one for each of the 
+   *  separation efficiency dictionaries in seds.  These are expanded as initialize() 
+   *  does, over the nuclides of sepeff.  The efficiencies of every stream are applied 
+   *  in a single pass over mat_feed.  mat_prod is left unchanged.
+   */
+  update_sepeff();
+
+  int NP = seds.size();
+  int NS = sepeff_nucs.size();
+  std::vector<double> eff (NP*NS, 0.0);
+  for (int p = 0; p < NP; p++)
+    for (int n = 0; n < NS; n++)
+      eff[p*NS + n] = sepeff_of(seds[p], sepeff_nucs[n]);
+
+  pyne::comp_map incomp = mat_feed.mult_by_mass();
+  std::vector<pyne::comp_map> outcomps (NP);
+  int n = 0;
+  for (pyne::comp_iter i = incomp.begin(); i != incomp.end(); i++)
+  {
+    while (n < NS && sepeff_nucs[n] < i->first)
+      n++;
+    bool found = (n < NS && sepeff_nucs[n] == i->first);
+    for (int p = 0; p < NP; p++)
+      outcomps[p].insert(outcomps[p].end(), std::make_pair(i->first, found ? (i->second) * eff[p*NS + n] : 0.0));
+  };
+
+  std::vector<pyne::Material> prods;
+  for (int p = 0; p < NP; p++)
+    prods.push_back(pyne::Material(outcomps[p]));
+  return prods;
+};
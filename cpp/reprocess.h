@@ -36,6 +36,17 @@ namespace bright {
     pyne::Material calc();
     pyne::Material calc(pyne::comp_map incomp);
     pyne::Material calc(pyne::Material mat);	
+    void calc_many(std::vector<pyne::Material> & feeds, std::vector<int> & nucs, std::vector<double> & prods);
+    std::vector<pyne::Material> calc_products(std::vector<sep_eff_dict> seds);
+
+  protected:
+    // Dense form of sepeff, which is set up by update_sepeff().
+    std::vector<int> sepeff_nucs;     // Nuclides of sepeff, in order.  Normally track_nucs_order.
+    std::vector<double> sepeff_vec;   // Separation efficiency of each nuclide in sepeff_nucs
+
+    double sepeff_of(sep_eff_dict & sed, int nuc);
+    void update_sepeff();
+    void separate(pyne::comp_map & incomp, std::vector<double> & eff, pyne::comp_map & outcomp);
   };
 
 // end namespace
@@ -80,6 +80,51 @@ output : Material
 
 """
 
+calc_many_ds = """calc_many(feeds)
+Separates each of many feed materials with sepeff at once.  Every 
+feed is laid out as a dense vector over the nuclides of sepeff and 
+multiplied through by the separation efficiencies, which are kept as a 
+dense array.  This is much faster than calling calc() in a loop when 
+running many reprocessing passes.  mat_feed and mat_prod are left at 
+their values for the last feed.
+
+Parameters
+----------
+feeds : sequence of dicts or Materials
+    The feed materials to separate.  Nuclide dictionaries (zzaaam keys, 
+    float values) are first converted into Materials.
+
+Returns
+-------
+nucs : 1d numpy int array 
+    The nuclides (zzaaam) of sepeff, ie the columns of prods.  Normally 
+    this is bright_conf.track_nucs_order.
+prods : 2d numpy float array 
+    The (feeds x nucs) masses separated from each feed.  This is the same 
+    as calc(feeds[n]).comp[nucs[j]] times the mass of mat_prod, for row n 
+    and column j.
+"""
+
+
+calc_products_ds = """calc_products(sepeffs)
+Separates mat_feed into several product streams at once, as a plant 
+with more than one output would.  Each stream is given by its own 
+separation efficiency dictionary, which is expanded over the nuclides of 
+sepeff as in initialize().  All of the streams are found in a single pass 
+over mat_feed.  mat_prod is left unchanged.
+
+Parameters
+----------
+sepeffs : sequence of dicts
+    Separation efficiencies of each product stream.  The keys may be 
+    strings or ints, elements or nuclides, as for the constructor.
+
+Returns
+-------
+prods : list of Materials
+    The product streams, in the order of sepeffs.
+"""
+
 
 desc = {
     'docstrings': {
@@ -91,6 +136,8 @@ desc = {
             'initialize': init_ds, 
             'calc_params': calc_params_ds,
             'calc': calc_ds,
+            'calc_many': calc_many_ds,
+            'calc_products': calc_products_ds,
             },
         },
     'attrs': {
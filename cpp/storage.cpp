@@ -2,33 +2,56 @@
 
 #include "storage.h"
 
+// Incomplete partial fraction form of the order 16 Chebyshev rational approximation 
+// (CRAM) to exp(x) on the negative real axis, M. Pusa, Nucl. Sci. Eng. 182 (2016).
+static const int cram_order = 8;
+static const double cram_alpha0 = 2.124853710495224e-16;
+static const std::complex<double> cram_alpha [cram_order] = {
+  std::complex<double>(5.464930576870210e+3, -3.797983575308356e+4),
+  std::complex<double>(9.045112476907548e+1, -1.115537522430261e+3),
+  std::complex<double>(2.344818070467641e+2, -4.228020157070496e+2),
+  std::complex<double>(9.453304067358312e+1, -2.951294291446048e+2),
+  std::complex<double>(7.283792954673409e+2, -1.205646080220011e+5),
+  std::complex<double>(3.648229059594851e+1, -1.155509621409682e+2),
+  std::complex<double>(2.547321630156819e+1, -2.639500283021502e+1),
+  std::complex<double>(2.394538338734709e+1, -5.650522971778156e+0)
+};
+static const std::complex<double> cram_theta [cram_order] = {
+  std::complex<double>(3.509103608414918, 8.436198985884374),
+  std::complex<double>(5.948152268951177, 3.587457362018322),
+  std::complex<double>(-5.264971343442647, 16.22022147316793),
+  std::complex<double>(1.419375897185666, 10.92536348449672),
+  std::complex<double>(6.416177699099435, 1.194122393370139),
+  std::complex<double>(4.993174737717997, 5.996881713603942),
+  std::complex<double>(-1.413928462488886, 13.49772569889275),
+  std::complex<double>(-10.84391707869699, 19.27744616718165)
+};
+
 /******************************/
 /*** Storage Facility Class ***/
 /******************************/
 
-/***************************/
-/*** Protected Functions ***/
-/***************************/
+/****************************************/
+/*** Storage Shared Library Functions ***/
+/****************************************/
 
-void bright::Storage::initialize ()
+bright::LibraryCache<bright::StorageLibrary> bright::storage_libraries;
+
+
+bright::StorageLibrary::StorageLibrary(std::string lib)
 {
-  char decay_file[500];
-  strcpy(decay_file, getenv("BRIGHT_DATA") );
-  #ifdef _WIN32
-    strcat(decay_file, "\\decay.h5");
-  #else
-    strcat(decay_file, "/decay.h5");
-  #endif
+  // Reads in the decay library and puts it in compressed sparse row form.
+  libfile = lib;
 
   // NOTE: The 'decay.h5' librray probably should be rewritten more heirarchically! Changing the following...
   // open the 'decay.h5' file
   hid_t  decay_file_id, decay_dset_id, decay_dspc_id, decay_data_id;
   herr_t decay_status;
 
-  decay_file_id  = H5Fopen(decay_file, H5F_ACC_RDONLY, H5P_DEFAULT);  // Opens the hdf5 file
+  decay_file_id  = H5Fopen(lib.c_str(), H5F_ACC_RDONLY, H5P_DEFAULT); // Opens the hdf5 file
   decay_dset_id  = H5Dopen2(decay_file_id, "/Decay", H5P_DEFAULT);    // Opens the Dataset
   decay_dspc_id  = H5Dget_space(decay_dset_id);	                      // Gets the filespace in order to...
-  decay_data_len = H5Sget_simple_extent_npoints(decay_dspc_id);       // Calculate the number of data entries.
+  int decay_data_len = H5Sget_simple_extent_npoints(decay_dspc_id);   // Calculate the number of data entries.
 
   decay_data_id = H5Tcreate(H5T_COMPOUND, sizeof(decay_nuc) );	// Maps the file entries to a the data structure.
   decay_status  = H5Tinsert(decay_data_id, "fromiso",     HOFFSET(decay_nuc, fromiso),     H5T_STD_I32LE );
@@ -37,30 +60,233 @@ void bright::Storage::initialize ()
   decay_status  = H5Tinsert(decay_data_id, "toiso",       HOFFSET(decay_nuc, toiso),       H5T_STD_I32LE );
   decay_status  = H5Tinsert(decay_data_id, "branchratio", HOFFSET(decay_nuc, branchratio), H5T_IEEE_F64LE);
 
-  // Initializes an array of the data struct and fills it!
-  decay_data   = new decay_nuc [decay_data_len];
-  decay_status = H5Dread(decay_dset_id, decay_data_id, H5S_ALL, H5S_ALL, H5P_DEFAULT, decay_data);
+  // Reads the table into a temporary array of the data struct
+  std::vector<decay_nuc> decay_data (decay_data_len);
+  if (0 < decay_data_len)
+    decay_status = H5Dread(decay_dset_id, decay_data_id, H5S_ALL, H5S_ALL, H5P_DEFAULT, &decay_data[0]);
 
   // Closes the hdf5 file.
+  decay_status = H5Tclose(decay_data_id);
+  decay_status = H5Sclose(decay_dspc_id);
   decay_status = H5Dclose(decay_dset_id);
   decay_status = H5Fclose(decay_file_id);
 
-  // Put the library in a sexier form...
-  //					...for Katy.
-  from_nuc_struct * fis;
+  // Group the daughters by parent.  The first entry for a parent gives its half-life 
+  // and decay constant, while a repeated daughter takes the last branch ratio.
+  std::map<int, std::map<int, double> > to_br;
+  std::map<int, int> first_entry;
   for (int i = 0; i < decay_data_len; i++)
   {
-    if (0 < decay.count(decay_data[i].fromiso))
-      decay[decay_data[i].fromiso].toiso[decay_data[i].toiso] = &(decay_data[i].branchratio);
-    else
+    if (0 == first_entry.count(decay_data[i].fromiso))
+      first_entry[decay_data[i].fromiso] = i;
+    to_br[decay_data[i].fromiso][decay_data[i].toiso] = decay_data[i].branchratio;
+  };
+
+  // Flatten into compressed sparse rows
+  int n = 0;
+  nucs.reserve(to_br.size());
+  halflife.reserve(to_br.size());
+  decayconst.reserve(to_br.size());
+  to_ptr.reserve(to_br.size() + 1);
+  to_nuc.reserve(decay_data_len);
+  branchratio.reserve(decay_data_len);
+  for (std::map<int, std::map<int, double> >::iterator parent = to_br.begin(); parent != to_br.end(); parent++)
+  {
+    decay_nuc & entry = decay_data[first_entry[parent->first]];
+    nuc_ind[parent->first] = n;
+    nucs.push_back(parent->first);
+    halflife.push_back(entry.halflife);
+    decayconst.push_back(entry.decayconst);
+    to_ptr.push_back(to_nuc.size());
+    for (std::map<int, double>::iterator daughter = (parent->second).begin(); daughter != (parent->second).end(); daughter++)
     {
-      fis = new from_nuc_struct;
-      (*fis).halflife = &(decay_data[i].halflife);
-      (*fis).decayconst = &decay_data[i].decayconst;
-      (*fis).toiso[decay_data[i].toiso] = &(decay_data[i].branchratio);
-      decay[decay_data[i].fromiso] = (*fis);
+      to_nuc.push_back(daughter->first);
+      branchratio.push_back(daughter->second);
     };
-  };	
+    n++;
+  };
+  to_ptr.push_back(to_nuc.size());
+};
+
+
+bright::StorageLibrary::~StorageLibrary()
+{
+};
+
+
+int bright::StorageLibrary::row(int nuc)
+{
+  std::map<int, int>::iterator ni = nuc_ind.find(nuc);
+  if (ni == nuc_ind.end())
+    return -1;
+  return ni->second;
+};
+
+
+double bright::StorageLibrary::branch_ratio(int row, int daughter)
+{
+  for (int i = to_ptr[row]; i < to_ptr[row+1]; i++)
+  {
+    if (to_nuc[i] == daughter)
+      return branchratio[i];
+  };
+  return 0.0;
+};
+
+
+bright::nuc_chain_set & bright::StorageLibrary::chains(int nuc)
+{
+  // Gets the decay chains of a mother isotope, which are found the first time they are asked for.
+  std::map<int, nuc_chain_set>::iterator ncs = nucchains.find(nuc);
+  if (ncs != nucchains.end())
+    return ncs->second;
+
+  nuc_chain_set & new_ncs = nucchains[nuc];
+  nuc_chain nc (1, nuc);
+  new_ncs.insert(nc);
+  addchains(nc, new_ncs);
+  return new_ncs;
+};
+
+
+void bright::StorageLibrary::addchains(nuc_chain nc, nuc_chain_set & ncs)
+{
+  // Stable nuclides, and those not in the library, end the chain.
+  int n = row(nc.back());
+  if (n < 0 || to_ptr[n] == to_ptr[n+1] || to_nuc[to_ptr[n]] == 0)
+    return;
+
+  // continue on with next IsoChain if the end of this chain has been reached.
+  for (int i = to_ptr[n]; i < to_ptr[n+1]; i++)
+  {
+    nuc_chain nucchain (nc);
+    nucchain.push_back(to_nuc[i]);
+    ncs.insert(nucchain);
+    addchains(nucchain, ncs);
+  };
+  return;
+};
+
+
+
+void bright::StorageLibrary::build_decay_matrix()
+{
+  /** Builds the decay matrix from the compressed sparse rows of the library.  Its 
+   *  nuclides are put in topological order, parents before daughters, so that the 
+   *  matrix is lower triangular.  The decay data has no cycles, since the Bateman 
+   *  chains would never end if it did.  Should a cycle turn up anyway, its nuclides
+   *  are appended in order and the entries above the diagonal are dropped.
+   */
+  if (!mat_ptr.empty())
+    return;
+
+  int i, n;
+  int NP = nucs.size();
+
+  // Count the parents of every nuclide, ignoring the stable marker 0
+  std::map<int, int> nparents;
+  for (n = 0; n < NP; n++)
+    nparents[nucs[n]];
+  for (n = 0; n < NP; n++)
+  {
+    for (i = to_ptr[n]; i < to_ptr[n+1]; i++)
+    {
+      if (0 != to_nuc[i] && to_nuc[i] != nucs[n])
+        nparents[to_nuc[i]] += 1;
+    };
+  };
+
+  // Kahn's algorithm, taking the lowest nuclide which is ready at each step
+  std::set<int> ready;
+  for (std::map<int, int>::iterator np = nparents.begin(); np != nparents.end(); np++)
+    if (0 == np->second)
+      ready.insert(np->first);
+
+  mat_nucs.clear();
+  mat_ind.clear();
+  while (!ready.empty())
+  {
+    int nuc = *ready.begin();
+    ready.erase(ready.begin());
+    mat_ind[nuc] = mat_nucs.size();
+    mat_nucs.push_back(nuc);
+
+    n = row(nuc);
+    if (n < 0)
+      continue;
+    for (i = to_ptr[n]; i < to_ptr[n+1]; i++)
+    {
+      if (0 == to_nuc[i] || to_nuc[i] == nuc)
+        continue;
+      nparents[to_nuc[i]] -= 1;
+      if (0 == nparents[to_nuc[i]])
+        ready.insert(to_nuc[i]);
+    };
+  };
+
+  if (mat_nucs.size() < nparents.size())
+  {
+    if (0 < bright::verbosity)
+      std::cout << "The decay library has cycles; decays back up these are dropped from the decay matrix.\n";
+    for (std::map<int, int>::iterator np = nparents.begin(); np != nparents.end(); np++)
+    {
+      if (0 < mat_ind.count(np->first))
+        continue;
+      mat_ind[np->first] = mat_nucs.size();
+      mat_nucs.push_back(np->first);
+    };
+  };
+
+  // Gather the parents of each row
+  int NM = mat_nucs.size();
+  std::vector< std::vector< std::pair<int, double> > > parents (NM);
+  mat_diag.assign(NM, 0.0);
+  for (n = 0; n < NP; n++)
+  {
+    int col = mat_ind[nucs[n]];
+    mat_diag[col] = -decayconst[n];
+    for (i = to_ptr[n]; i < to_ptr[n+1]; i++)
+    {
+      if (0 == to_nuc[i] || to_nuc[i] == nucs[n])
+        continue;
+      int j = mat_ind[to_nuc[i]];
+      if (col < j)
+        parents[j].push_back(std::pair<int, double>(col, decayconst[n] * branchratio[i]));
+    };
+  };
+
+  mat_ptr.assign(1, 0);
+  mat_col.clear();
+  mat_val.clear();
+  for (int j = 0; j < NM; j++)
+  {
+    std::sort(parents[j].begin(), parents[j].end());
+    for (i = 0; i < parents[j].size(); i++)
+    {
+      mat_col.push_back(parents[j][i].first);
+      mat_val.push_back(parents[j][i].second);
+    };
+    mat_ptr.push_back(mat_col.size());
+  };
+};
+
+
+
+/***************************/
+/*** Protected Functions ***/
+/***************************/
+
+void bright::Storage::initialize ()
+{
+  char decay_file[500];
+  strcpy(decay_file, getenv("BRIGHT_DATA") );
+  #ifdef _WIN32
+    strcat(decay_file, "\\decay.h5");
+  #else
+    strcat(decay_file, "/decay.h5");
+  #endif
+
+  decay_lib = bright::storage_libraries.load(decay_file);
 };
 
 
@@ -78,56 +304,95 @@ void bright::Storage::print_chain (nuc_chain nc)
 };	
 
 
-double bright::Storage::bateman (int nuc, double mass, nuc_chain nucchain)
+double bright::Storage::bateman (int nuc, double mass, const nuc_chain & nucchain)
 {
   // Solves the Bateman Equations for a isotope and what it decays into.
+  int N = nucchain.size();
+  std::vector<int> rows (N, -1);
+  std::vector<double> lambda (N, 0.0);
+  for (int n = 0; n < N; n++)
+  {
+    rows[n] = decay_lib->row(nucchain[n]);
+    if (0 <= rows[n])
+      lambda[n] = decay_lib->decayconst[rows[n]];
+  };
+
   double coef  = mass;
   double sumpart = 0.0;
-  for (int n = 0; n < nucchain.size(); n++)
+  for (int n = 0; n < N; n++)
   {
     if (nucchain[n] != nuc)
     {
-      // Note: that decay[isochain[n]].decayconst = the decay constant, while...
-      // ...decay[isochain[n]].toiso[isochain[n+1]] represents the branch ratio.
-      coef = coef * (*decay[nucchain[n]].decayconst) * (*decay[nucchain[n]].toiso[nucchain[n+1]]);
+      // Note: that lambda[n] is the decay constant, while the branch ratio 
+      // is that of nucchain[n] to nucchain[n+1].
+      coef = coef * lambda[n] * decay_lib->branch_ratio(rows[n], nucchain[n+1]);
     };
 
     double prodpart = 1.0;
-    for (int m = 0; m < nucchain.size(); m++)
+    for (int m = 0; m < N; m++)
     {
       if (n != m)
-        prodpart = prodpart * ((*decay[nucchain[m]].decayconst) - (*decay[nucchain[n]].decayconst));
+        prodpart = prodpart * (lambda[m] - lambda[n]);
     }
-    sumpart = sumpart + ((exp(-(*decay[nucchain[n]].decayconst) * decay_time))/prodpart);
+    sumpart = sumpart + (exp(-lambda[n] * decay_time) / prodpart);
   };
   return coef * sumpart;
 };
 
 
-void bright::Storage::addchains(nuc_chain nc)
+
+void bright::Storage::decay_rows(std::vector<double> & N0, std::vector<int> & rows)
 {
-  int lastnuc = nc.back();
-  if (decay[lastnuc].toiso.begin()->first == 0)
-    return;
+  // Finds the rows of the decay matrix which N0 may reach, in the order of the matrix.
+  int NM = decay_lib->mat_nucs.size();
+  std::vector<bool> reached (NM, false);
+  rows.clear();
+  for (int j = 0; j < NM; j++)
+  {
+    reached[j] = (0.0 != N0[j]);
+    for (int i = decay_lib->mat_ptr[j]; i < decay_lib->mat_ptr[j+1] && !reached[j]; i++)
+      reached[j] = reached[decay_lib->mat_col[i]];
+    if (reached[j])
+      rows.push_back(j);
+  };
+};
 
-  // continue on with next IsoChain if the end of this chain has been reached.
-  to_nuc_dict tonucs = decay[lastnuc].toiso;
-  for (to_nuc_iter tni = tonucs.begin(); tni != tonucs.end(); tni++)
+
+void bright::cram(std::vector<double> & diag, std::vector<int> & ptr, std::vector<int> & col, 
+                  std::vector<double> & val, std::vector<int> & rows, std::vector<double> & N, double t)
+{
+  /** Replaces N with exp(A t) N using CRAM.  A is lower triangular, with diagonal diag 
+   *  and the off-diagonal entries of row j at ptr[j] through ptr[j+1]-1 of col and val.  
+   *  Only the given rows of N, which must be in order and hold everything N can reach, 
+   *  are touched.  Each pole needs a solve of (A t - theta) x = N, which is forward 
+   *  substitution since A is lower triangular.
+   */
+  int NR = rows.size();
+  std::vector< std::complex<double> > x (diag.size());
+
+  for (int k = 0; k < cram_order; k++)
   {
-    nuc_chain nucchain (nc);
-    nucchain.push_back(tni->first);
-    nucchains.insert(nucchain);
-    addchains(nucchain);
-  }
-  return;
+    for (int r = 0; r < NR; r++)
+    {
+      int j = rows[r];
+      std::complex<double> b = N[j];
+      for (int i = ptr[j]; i < ptr[j+1]; i++)
+        b -= (t * val[i]) * x[col[i]];
+      x[j] = b / ((t * diag[j]) - cram_theta[k]);
+    };
+    for (int r = 0; r < NR; r++)
+      N[rows[r]] += 2.0 * std::real(cram_alpha[k] * x[rows[r]]);
+  };
+
+  for (int r = 0; r < NR; r++)
+    N[rows[r]] *= cram_alpha0;
 };
 
 
-void bright::Storage::addchains(int nuc)
+void bright::Storage::cram(std::vector<int> & rows, std::vector<double> & N, double t)
 {
-  nuc_chain nc(1, nuc);
-  nucchains.insert(nc);
-  addchains(nc);
+  // Replaces N with exp(A t) N, where A is the decay matrix, over the given rows.
+  bright::cram(decay_lib->mat_diag, decay_lib->mat_ptr, decay_lib->mat_col, decay_lib->mat_val, rows, N, t);
 };
 
 
@@ -138,13 +403,15 @@ void bright::Storage::addchains(int nuc)
 
 bright::Storage::Storage(std::string n) : bright::FCComp (stor_p2track, n)
 {
+  decay_time = 0.0;
+  use_decay_matrix = false;
   initialize();
 }
 
 
 bright::Storage::~Storage ()
 {
-  //Should close the 'decay.h5' file
+  // The decay library is shared, see storage_libraries.
 }
 
 
@@ -166,32 +433,35 @@ pyne::Material bright::Storage::calc()
   // decay_time is a float value for the time in seconds.
   // bright::track_nucs throws out any values not in the list before returning vector
 
+  if (use_decay_matrix)
+  {
+    std::vector<double> decay_times (1, decay_time);
+    std::vector<int> nucs;
+    std::vector<double> prods;
+    calc_many(decay_times, nucs, prods);
+    return mat_prod;
+  };
+
   // Initialize the components.
   pyne::comp_map cdin, cdout;
   cdin = mat_feed.mult_by_mass();
 
-  // Adds decay chains to isochains set that aren't already there.
+  // Sums the Bateman solution over every decay chain of each mother, in the shared library.
+  int mom, daughter;
   for (pyne::comp_iter ci = cdin.begin(); ci != cdin.end(); ci++)
   {
-    nuc_chain nc (1, ci->first);
-    if (0 == nucchains.count(nc))
+    mom = ci->first;
+    nuc_chain_set & nucchains = decay_lib->chains(mom);
+    for (nuc_chain_set_iter ncsi = nucchains.begin(); ncsi != nucchains.end(); ncsi++)
     {
-      nucchains.insert(nc);
-      addchains(nc);
-    };
-  };
+      daughter = (*ncsi)[(*ncsi).size()-1];
+      if (0 == bright::track_nucs.count(daughter))
+        continue;
 
-  int mom, daughter;
-  for (nuc_chain_set_iter ncsi = nucchains.begin(); ncsi != nucchains.end(); ncsi++)
-  {
-    mom = (*ncsi)[0];
-    daughter = (*ncsi)[(*ncsi).size()-1];
-    if ( (0 < cdin.count(mom)) && (0 < bright::track_nucs.count(daughter)) )
-    {
       if (0 < cdout.count(daughter))
-        cdout[daughter] = cdout[daughter] + bateman(daughter, cdin[mom], *ncsi);
+        cdout[daughter] = cdout[daughter] + bateman(daughter, ci->second, *ncsi);
       else
-        cdout[daughter] = bateman(daughter, cdin[mom], *ncsi);
+        cdout[daughter] = bateman(daughter, ci->second, *ncsi);
     };
   };
 
@@ -234,3 +504,73 @@ pyne::Material bright::Storage::calc(pyne::Material mat, double t)
     mat_feed = mat;
     return calc();
 }
+
+
+void bright::Storage::calc_many(std::vector<double> & decay_times, std::vector<int> & nucs, std::vector<double> & prods)
+{
+  /** Decays mat_feed for each of many decay times with the decay matrix exponential.
+   *  The matrix is built once, and each time then costs one CRAM solve over the 
+   *  nuclides that mat_feed can reach.  The tracked nuclides that may be present 
+   *  are returned in nucs, and prods[n*nucs.size() + j] is the mass of nucs[j] after 
+   *  decay_times[n].  Nuclides which are not in the decay library are stable.  
+   *  mat_prod and decay_time are left at the last of the decay times.
+   */
+  decay_lib->build_decay_matrix();
+
+  int j, n;
+  int NM = decay_lib->mat_nucs.size();
+  int NT = decay_times.size();
+  pyne::comp_map cdin = mat_feed.mult_by_mass();
+
+  // Split the feed into the part in the decay matrix and the stable remainder
+  std::vector<double> N0 (NM, 0.0);
+  pyne::comp_map stable;
+  for (pyne::comp_iter ci = cdin.begin(); ci != cdin.end(); ci++)
+  {
+    std::map<int, int>::iterator mi = decay_lib->mat_ind.find(ci->first);
+    if (mi == decay_lib->mat_ind.end())
+      stable[ci->first] = ci->second;
+    else
+      N0[mi->second] = ci->second;
+  };
+
+  std::vector<int> rows;
+  decay_rows(N0, rows);
+
+  // The tracked nuclides which may be present
+  std::map<int, int> out_ind;
+  for (j = 0; j < rows.size(); j++)
+    if (0 < bright::track_nucs.count(decay_lib->mat_nucs[rows[j]]))
+      out_ind[decay_lib->mat_nucs[rows[j]]] = -1 - rows[j];
+  for (pyne::comp_iter ci = stable.begin(); ci != stable.end(); ci++)
+    if (0 < bright::track_nucs.count(ci->first))
+      out_ind[ci->first] = 0;
+
+  nucs.clear();
+  for (std::map<int, int>::iterator oi = out_ind.begin(); oi != out_ind.end(); oi++)
+    nucs.push_back(oi->first);
+  int NJ = nucs.size();
+
+  prods.assign(NT*NJ, 0.0);
+  std::vector<double> N (NM, 0.0);
+  for (n = 0; n < NT; n++)
+  {
+    N = N0;
+    cram(rows, N, decay_times[n]);
+    for (j = 0; j < NJ; j++)
+    {
+      int oi = out_ind[nucs[j]];
+      prods[n*NJ + j] = (oi < 0) ? N[-1 - oi] : stable[nucs[j]];
+    };
+  };
+
+  // Leave the product of the last time in mat_prod
+  if (0 < NT)
+  {
+    pyne::comp_map cdout;
+    for (j = 0; j < NJ; j++)
+      cdout[nucs[j]] = prods[(NT-1)*NJ + j];
+    decay_time = decay_times[NT-1];
+    mat_prod = pyne::Material(cdout);
+  };
+};
@@ -20,23 +20,59 @@ namespace bright {
     double branchratio;
   } decay_nuc;
 
-  // Sexy decay library form
-  typedef std::map<int, double *> to_nuc_dict;
-  typedef to_nuc_dict::iterator to_nuc_iter;
-  typedef struct from_nuc_struct
-  {
-    double * halflife;
-    double * decayconst;
-    to_nuc_dict toiso;
-  } from_nuc_struct;
-  typedef std::map<int, from_nuc_struct> decay_dict;
-  typedef decay_dict::iterator decay_iter;
-
   typedef std::vector<int> nuc_chain;
   typedef nuc_chain::iterator nuc_chain_iter;
   typedef std::set<nuc_chain> nuc_chain_set;
   typedef nuc_chain_set::iterator nuc_chain_set_iter;
 
+  class StorageLibrary
+  {
+  /** Decay data that Storage reads in from the decay library.  This is loaded once 
+   *  per library file and then shared between all of the storage facilities which 
+   *  use that file.  See storage_libraries.  The daughters of each parent nuclide 
+   *  are stored in compressed sparse row form.
+   */
+  public:
+    StorageLibrary(std::string lib);
+    ~StorageLibrary();
+
+    std::string libfile;              // Path to the decay library
+    std::map<int, int> nuc_ind;       // Row of each parent nuclide in the arrays below
+    std::vector<int> nucs;            // Parent nuclide of each row
+    std::vector<double> halflife;     // Half-life of each parent [s]
+    std::vector<double> decayconst;   // Decay constant of each parent [1/s]
+    std::vector<int> to_ptr;          // Daughters of row n are at to_ptr[n] through to_ptr[n+1]-1 of the arrays below
+    std::vector<int> to_nuc;          // Daughter nuclides, sorted within each row
+    std::vector<double> branchratio;  // Branch ratio from the parent to each daughter
+
+    int row(int nuc);                           // Row of a parent nuclide, -1 if it is not in the library.
+    double branch_ratio(int row, int daughter); // Branch ratio from the parent in a row to a daughter.
+    nuc_chain_set & chains(int nuc);            // Every decay chain which starts at a nuclide.
+
+    // Decay matrix A, where dN/dt = A N, built on first use by build_decay_matrix().  
+    // Its nuclides are ordered so that parents come before their daughters, which 
+    // makes A lower triangular.
+    std::vector<int> mat_nucs;        // Nuclide of each row of A
+    std::map<int, int> mat_ind;       // Row of each nuclide in A
+    std::vector<double> mat_diag;     // Diagonal of A, ie minus the decay constants
+    std::vector<int> mat_ptr;         // Off-diagonal entries of row j are at mat_ptr[j] through mat_ptr[j+1]-1 below
+    std::vector<int> mat_col;         // Column (parent row) of each off-diagonal entry, always less than its row
+    std::vector<double> mat_val;      // Decay constant of the parent times the branch ratio to the daughter
+    void build_decay_matrix();
+
+  private:
+    std::map<int, nuc_chain_set> nucchains;  // Decay chains of each parent, built on first use
+    void addchains(nuc_chain nc, nuc_chain_set & ncs);
+  };
+
+  extern LibraryCache<StorageLibrary> storage_libraries;  // Process-wide cache of decay libraries
+
+  // Applies exp(A t) to N over the given rows, for a lower triangular matrix A laid out 
+  // as the decay matrix of StorageLibrary is, with CRAM.
+  void cram(std::vector<double> & diag, std::vector<int> & ptr, std::vector<int> & col, 
+            std::vector<double> & val, std::vector<int> & rows, std::vector<double> & N, double t);
+
+
   static std::string stor_p2t [] = {"Mass"};
   static std::set<std::string> stor_p2track (stor_p2t, stor_p2t+1);
 
@@ -46,17 +82,13 @@ namespace bright {
   // Storage/Cooling/Decay Fuel Cycle Component.
   protected:
     // Protected Data
-    nuc_chain_set nucchains;
-    decay_nuc * decay_data;
-    int decay_data_len;
-    decay_dict decay;
+    LibraryHandle<StorageLibrary, storage_libraries> decay_lib;  // Shared decay library, set by initialize()
 
     // Protected functions
     void initialize ();                       // Initializes the constructors.
-    double get_decay ();
-    double bateman(int nuc, double mass, nuc_chain nucchain);  // Solves the Bateman Decay equation.
-    void addchains(nuc_chain nc);               // Get the decay chain for a mother isotope
-    void addchains(int nuc);                     // Get the decay chain for a mother isotope
+    double bateman(int nuc, double mass, const nuc_chain & nucchain);  // Solves the Bateman Decay equation.
+    void cram(std::vector<int> & rows, std::vector<double> & N, double t);  // Applies exp(A t) to N over rows of the decay matrix.
+    void decay_rows(std::vector<double> & N0, std::vector<int> & rows);     // Rows of the decay matrix reachable from N0.
 
     void print_chain (nuc_chain nc);
 
@@ -67,6 +99,7 @@ namespace bright {
 
     //Public data
     double decay_time;			//time to decay for
+    bool use_decay_matrix;  // Decay with the matrix exponential of the decay matrix rather than the Bateman chains
 
     //Public Functions
     void calc_params();
@@ -76,6 +109,7 @@ namespace bright {
     pyne::Material calc(double t);
     pyne::Material calc(pyne::comp_map, double t);
     pyne::Material calc(pyne::Material mat, double t);
+    void calc_many(std::vector<double> & decay_times, std::vector<int> & nucs, std::vector<double> & prods);
   };
 
 // end bright
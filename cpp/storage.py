@@ -18,6 +18,7 @@ desc = {
     'methods': {
         ('calc', ('t', 'f8', '0.0')): 'Material', 
         },
+    'extra': {},
     }
 
 mod = {'Storage': desc,
@@ -30,6 +31,37 @@ to convert to the proper units before using.  Consider using pyne.utils.to_sec()
 for second conversions.
 """
 
+desc['docstrings']['attrs']['use_decay_matrix'] = \
+"""Boolean flag for whether calc() decays mat_feed with the matrix exponential 
+of the decay matrix, rather than by summing bateman() over every decay chain.  
+The matrix exponential is found with the order 16 Chebyshev rational 
+approximation method (CRAM), which is accurate even when decay constants in a 
+chain are equal.  False by default.
+"""
+
+desc['docstrings']['methods']['calc_many'] = \
+"""Decays mat_feed for each of many decay times with the matrix exponential of 
+the decay matrix, whatever the value of use_decay_matrix.  The decay matrix is 
+built once from the shared decay library, after which each time costs a single 
+CRAM solve.  This makes cooling curves over many time points cheap.  mat_prod 
+and decay_time are left at their values for the last time.
+
+Parameters
+----------
+decay_times : sequence of floats
+    The times to decay mat_feed for [seconds].
+
+Returns
+-------
+nucs : 1d numpy int array 
+    The nuclides (zzaaam) in track_nucs which may be present, ie the columns 
+    of prods.
+prods : 2d numpy float array 
+    The (decay_times x nucs) masses of each nuclide after each decay time.
+    This is the same as calc(decay_times[n]).comp[nucs[j]] times the mass 
+    of mat_prod, for row n and column j.
+"""
+
 desc['docstrings']['methods']['calc_params'] = \
 """Here the parameters for Storage are set.  For storage, this amounts to just
 a "Mass" parameter::
@@ -62,3 +94,56 @@ output : Material
 """
 
 
+desc['extra']['cpppxd'] = \
+"""    void cram(cpp_vector[double] &, cpp_vector[int] &, cpp_vector[int] &, cpp_vector[double] &, \\
+              cpp_vector[int] &, cpp_vector[double] &, double) except +"""
+
+desc['extra']['pyx'] = \
+'''def cram(A, N, t):
+    """Applies the matrix exponential of a lower triangular matrix to a vector, 
+    exp(A t) N, with the order 16 Chebyshev rational approximation (CRAM) that 
+    Storage uses for its decay matrix.  Unlike the Bateman formula, this does not 
+    break down when two nuclides in a chain have the same decay constant.
+
+    Parameters
+    ----------
+    A : 2d array of floats
+        The lower triangular (n x n) matrix, such as a decay matrix [1/s] 
+        whose parents come before their daughters.
+    N : sequence of floats
+        The (n) vector to apply the exponential to.
+    t : float
+        The time [s].
+
+    Returns
+    -------
+    N_t : 1d numpy float array
+        The vector exp(A t) N.
+
+    """
+    cdef int i, j, n
+    cdef cpp_vector[double] diag_proxy
+    cdef cpp_vector[int] ptr_proxy
+    cdef cpp_vector[int] col_proxy
+    cdef cpp_vector[double] val_proxy
+    cdef cpp_vector[int] rows_proxy
+    cdef cpp_vector[double] N_proxy
+    A = np.asarray(A, dtype=np.float64)
+    n = len(A)
+    if A.shape != (n, n) or len(N) != n:
+        raise ValueError("A must be square and the same size as N")
+    if (np.triu(A, 1) != 0.0).any():
+        raise ValueError("A must be lower triangular")
+    ptr_proxy.push_back(0)
+    for i in range(n):
+        for j in range(i):
+            if A[i, j] != 0.0:
+                col_proxy.push_back(j)
+                val_proxy.push_back(<double> A[i, j])
+        ptr_proxy.push_back(<int> col_proxy.size())
+        diag_proxy.push_back(<double> A[i, i])
+        rows_proxy.push_back(i)
+        N_proxy.push_back(<double> N[i])
+    cpp_storage.cram(diag_proxy, ptr_proxy, col_proxy, val_proxy, rows_proxy, N_proxy, <double> t)
+    return np.array([N_proxy[i] for i in range(n)], dtype=np.float64)
+'''